@@ -0,0 +1,87 @@
+"""
+Step crowds of wandering agents through the world's tick scheduler.
+
+Spawns 1k, 10k and 50k agents on random free walkable tiles, each walking
+to random tiles within --radius of it whenever it is idle, and times the
+game ticks they run in: picking goals, the batched path searches (at most
+AgentSystem.max_searches_per_tick per tick), stepping and the occupancy
+checks. The first --warmup ticks are not timed, so the crowd is walking
+and the search queue has settled by the time the clock starts.
+
+Runs on assets/maps/map.json (100x100) and a generated 1000x1000 map.
+Agent counts that would fill more than half of a map's walkable tiles are
+skipped, as agents never share a tile.
+
+Usage:
+    python benchmarks/bench_agents.py [--agents 1000 10000 50000] [--ticks 100] [--warmup 100] [--radius 10]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+
+import numpy as np
+
+from common import DEFAULT_MAP, generate_map_data, write_temp_map
+from src.engine.logger import game_logger
+from src.game_state.world_state import WorldState
+
+
+def spawn_wanderers(world, count, radius, seed=0):
+    """Spawn count wanderers on random free walkable tiles; None if the map is too crowded for them."""
+    walkable = np.flatnonzero(np.frombuffer(world.walkable_grid, dtype=np.uint8))
+    if count > walkable.size // 2:
+        return None
+    tiles = np.random.default_rng(seed).choice(walkable, size=count, replace=False)
+    world.agents.clear()
+    return world.agents.spawn_many(tiles % world.width, tiles // world.width, wander_radius=radius)
+
+
+def report(label, world, counts, ticks, warmup, radius):
+    """Print per-tick cost for each crowd size on one map."""
+    walkable = sum(world.walkable_grid)
+    print(f"\n{label}: {world.width}x{world.height} tiles, {walkable} walkable, "
+          f"{world.agents.max_searches_per_tick} searches per tick at most")
+    for count in counts:
+        if spawn_wanderers(world, count, radius) is None:
+            print(f"  {count:>6} agents   skipped: more than half of the walkable tiles")
+            continue
+        agents = world.agents
+        world.ticks.run_ticks(warmup)
+        searches, lines, moves, waits = agents.searches, agents.straight_paths, agents.moves, agents.waits
+        begin = time.perf_counter()
+        world.ticks.run_ticks(ticks)
+        elapsed = time.perf_counter() - begin
+        print(f"  {count:>6} agents   {elapsed / ticks * 1000:8.2f} ms/tick   {ticks / elapsed:8.1f} ticks/s   "
+              f"{(agents.moves - moves) / ticks:9.0f} moves/tick   "
+              f"{(agents.straight_paths - lines) / ticks:6.0f} straight + "
+              f"{(agents.searches - searches) / ticks:4.0f} searched paths/tick   "
+              f"{(agents.waits - waits) / ticks:7.0f} waits/tick   "
+              f"{agents.search_backlog:6} waiting for a search")
+    world.agents.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', type=int, nargs='+', default=[1000, 10000, 50000], help='crowd sizes to time')
+    parser.add_argument('--ticks', type=int, default=100, help='ticks to time per crowd')
+    parser.add_argument('--warmup', type=int, default=100, help='ticks to run before timing')
+    parser.add_argument('--radius', type=int, default=10, help='farthest an agent wanders in one trip, in tiles')
+    parser.add_argument('--size', type=int, default=1000, help='side length of the generated map')
+    args = parser.parse_args()
+    # find_path logs every failed search at debug level
+    game_logger.logger.setLevel(logging.WARNING)
+
+    report(os.path.relpath(DEFAULT_MAP), WorldState(map_file=DEFAULT_MAP), args.agents,
+           args.ticks, args.warmup, args.radius)
+    map_file = write_temp_map(generate_map_data(args.size, args.size, seed=3))
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+    report(f"generated {args.size}x{args.size}", world, args.agents, args.ticks, args.warmup, args.radius)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
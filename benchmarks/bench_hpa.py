@@ -0,0 +1,89 @@
+"""
+Compare A* and hierarchical pathfinding (HPA*) on long clicks.
+
+For each engine, reports the time until the first steps of the path are
+known (what the player waits for after a click) and the time for the full
+path. HPA* is run twice: cold, while chunks are analysed on first use, and
+warm, once their entrances and distances are cached. Route lengths are
+compared against the optimal A* paths.
+
+Usage:
+    python benchmarks/bench_hpa.py [--pairs 20] [--size 1000] [--seed 0] [--water-chance 0.05]
+"""
+import os
+import sys
+import time
+import argparse
+
+from common import DEFAULT_MAP, generate_map_data, write_temp_map, random_walkable_pairs
+from src.game_state.world_state import WorldState
+
+# Tiles the player consumes before the next leg has to be refined
+FIRST_STEPS = 8
+
+
+def path_cost(path):
+    """Movement cost of a tile path (1 per cardinal step, 1.4142 per diagonal)."""
+    return sum(1.4142 if x1 != x2 and y1 != y2 else 1.0 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def time_engine(world, pairs, engine):
+    """
+    Returns:
+        (first_steps_ms, full_ms, path costs) totals over all pairs
+    """
+    first_ms = full_ms = 0.0
+    costs = []
+    for start, goal in pairs:
+        begin = time.perf_counter()
+        path = world.find_path(start, goal, engine=engine)
+        if path is not None:
+            path[:FIRST_STEPS]
+        first_ms += (time.perf_counter() - begin) * 1000
+        path = list(path) if path is not None else None
+        full_ms += (time.perf_counter() - begin) * 1000
+        costs.append(path_cost(path) if path else 0.0)
+    return first_ms, full_ms, costs
+
+
+def report(label, world, pairs):
+    """Print a comparison table for one map."""
+    print(f"\n{label}: {world.width}x{world.height}, {len(pairs)} searches")
+    astar = time_engine(world, pairs, 'astar')
+    rows = [('astar', astar), ('hpa cold', time_engine(world, pairs, 'hpa')),
+            ('hpa warm', time_engine(world, pairs, 'hpa'))]
+    for name, (first_ms, full_ms, costs) in rows:
+        ratios = [cost / best for cost, best in zip(costs, astar[2]) if best]
+        worst = max(ratios) if ratios else 1.0
+        print(f"  {name:<9} first steps {first_ms / len(pairs):8.2f} ms/search  "
+              f"full path {full_ms / len(pairs):8.2f} ms/search  worst length ratio {worst:.3f}")
+
+    pathfinder = world._get_pathfinder('hpa')
+    pathfinder._clusters.clear()
+    begin = time.perf_counter()
+    pathfinder.precompute()
+    print(f"  precompute all chunks: {(time.perf_counter() - begin) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=20, help='searches per map')
+    parser.add_argument('--size', type=int, default=1000, help='side length of the generated map')
+    parser.add_argument('--seed', type=int, default=0, help='seed for start/goal pairs')
+    parser.add_argument('--water-chance', type=float, default=0.05,
+                        help='chance of a scattered water tile on the generated map')
+    args = parser.parse_args()
+
+    world = WorldState(map_file=DEFAULT_MAP)
+    report("assets/maps/map.json", world, random_walkable_pairs(world, args.pairs, seed=args.seed))
+
+    map_file = write_temp_map(generate_map_data(args.size, args.size, seed=7, water_chance=args.water_chance))
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+    report("generated", world, random_walkable_pairs(world, args.pairs, seed=args.seed))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
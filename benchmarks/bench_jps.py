@@ -0,0 +1,79 @@
+"""
+Compare A* and Jump Point Search on random start/goal pairs.
+
+Reports nodes expanded and wall time per engine, and checks that both
+engines return paths of the same length.
+
+Usage:
+    python benchmarks/bench_jps.py [--pairs 50] [--size 1000] [--seed 0] [--water-chance 0.05]
+
+Use --water-chance 0 for open fields broken only by lakes.
+"""
+import os
+import sys
+import time
+import argparse
+
+from common import DEFAULT_MAP, generate_map_data, write_temp_map, random_walkable_pairs
+from src.game_state.world_state import WorldState
+
+ENGINES = ('astar', 'jps')
+
+
+def run_engines(world, pairs):
+    """
+    Run every pair through each engine.
+
+    Returns:
+        dict: engine name -> (total_ms, total_nodes_expanded, path lengths)
+    """
+    results = {}
+    for engine in ENGINES:
+        pathfinder = world._get_pathfinder(engine)
+        total_ms = 0.0
+        nodes = 0
+        lengths = []
+        for start, goal in pairs:
+            begin = time.perf_counter()
+            path = world.find_path(start, goal, engine=engine)
+            total_ms += (time.perf_counter() - begin) * 1000
+            nodes += pathfinder.nodes_expanded
+            lengths.append(len(path) if path else 0)
+        results[engine] = (total_ms, nodes, lengths)
+    return results
+
+
+def report(label, world, pairs):
+    """Print a comparison table for one map."""
+    results = run_engines(world, pairs)
+    print(f"\n{label}: {world.width}x{world.height}, {len(pairs)} searches")
+    for engine in ENGINES:
+        total_ms, nodes, _ = results[engine]
+        print(f"  {engine:<6} {total_ms:10.1f} ms  ({total_ms / len(pairs):7.2f} ms/search)  "
+              f"{nodes:10d} nodes expanded  ({nodes // len(pairs)} per search)")
+    mismatches = sum(a != j for a, j in zip(results['astar'][2], results['jps'][2]))
+    print(f"  path length mismatches: {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=50, help='searches per map')
+    parser.add_argument('--size', type=int, default=1000, help='side length of the generated map')
+    parser.add_argument('--seed', type=int, default=0, help='seed for start/goal pairs')
+    parser.add_argument('--water-chance', type=float, default=0.05,
+                        help='chance of a scattered water tile on the generated map')
+    args = parser.parse_args()
+
+    world = WorldState(map_file=DEFAULT_MAP)
+    report("assets/maps/map.json", world, random_walkable_pairs(world, args.pairs, seed=args.seed))
+
+    map_file = write_temp_map(generate_map_data(args.size, args.size, seed=7, water_chance=args.water_chance))
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+    report("generated", world, random_walkable_pairs(world, args.pairs, seed=args.seed))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
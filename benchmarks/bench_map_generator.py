@@ -0,0 +1,75 @@
+"""
+Measure how long MapGenerator takes to generate maps of increasing size,
+and how writing one large map scales with the number of worker processes.
+
+Terrain and resource placement are timed separately in one process. The
+scaling runs time MapGenerator.write_map to a binary map, which includes
+writing the file; the speedup is relative to one worker.
+
+Usage:
+    python benchmarks/bench_map_generator.py [--sizes 500 1000 2000 4000] [--seed 1]
+                                             [--scaling-size 4000] [--workers 1 2 4 8]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+import common  # noqa: F401  sets up the import path and headless SDL
+from src.engine.map_generator import MapGenerator, WATER
+
+
+def report(size, seed):
+    """Print generation times and the terrain mix for one map size."""
+    generator = MapGenerator(size, size, seed=seed)
+    begin = time.perf_counter()
+    tiles = generator.generate_tiles(0, 0, size, size)
+    terrain_time = time.perf_counter() - begin
+    begin = time.perf_counter()
+    resources = generator.place_resources(tiles, 0, 0)
+    resource_time = time.perf_counter() - begin
+
+    land = np.count_nonzero(tiles != WATER) / tiles.size
+    print(f"{size:>5}x{size:<5} terrain {terrain_time:7.3f} s   resources {resource_time:7.3f} s   "
+          f"total {terrain_time + resource_time:7.3f} s   land {land:5.1%}   {len(resources):>8} resources")
+
+
+def report_scaling(size, seed, worker_counts):
+    """Print the time to write one map to disk with each number of worker processes."""
+    generator = MapGenerator(size, size, seed=seed)
+    path = os.path.join(tempfile.mkdtemp(), 'generated.bin')
+    print(f"{size}x{size} binary map, {os.cpu_count()} CPUs")
+    baseline = None
+    try:
+        for workers in worker_counts:
+            begin = time.perf_counter()
+            generator.write_map(path, workers=workers)
+            elapsed = time.perf_counter() - begin
+            baseline = baseline or elapsed
+            print(f"  {workers:>3} workers  {elapsed:8.3f} s   speedup {baseline / elapsed:5.2f}x")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000],
+                        help='side lengths of the generated maps')
+    parser.add_argument('--seed', type=int, default=1, help='map seed')
+    parser.add_argument('--scaling-size', type=int, default=4000, help='side length of the map for the scaling runs')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='worker counts for the scaling runs')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        report(size, args.seed)
+    report_scaling(args.scaling_size, args.seed, args.workers)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
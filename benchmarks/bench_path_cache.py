@@ -0,0 +1,75 @@
+"""
+Measure repeated trips through WorldState.find_path with and without the path cache.
+
+Simulates a player shuttling between a handful of spots (bank, trees, rocks):
+every trip is one of a few start/goal pairs, with the occasional resource
+being chopped along the way.
+
+Usage:
+    python benchmarks/bench_path_cache.py [--trips 500] [--spots 6] [--size 1000] [--seed 0]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+from common import DEFAULT_MAP, generate_map_data, write_temp_map, random_walkable_pairs
+from src.game_state.world_state import WorldState
+from src.entities.resources import Tree
+
+
+def run_trips(world, pairs, trips, seed):
+    """Walk random trips between the pairs; returns total milliseconds."""
+    rng = random.Random(seed)
+    total_ms = 0.0
+    for trip in range(trips):
+        start, goal = rng.choice(pairs)
+        if rng.random() < 0.5:
+            start, goal = goal, start
+        if trip % 50 == 49:
+            # A tree next to one of the routes is cut down
+            x, y = rng.choice(pairs)[0]
+            world.add_resource(Tree(x + 1, y))
+            world.remove_resource(x + 1, y)
+        begin = time.perf_counter()
+        world.find_path(start, goal)
+        total_ms += (time.perf_counter() - begin) * 1000
+    return total_ms
+
+
+def report(label, world, args):
+    """Print cached vs uncached timings for one map."""
+    pairs = random_walkable_pairs(world, args.spots, seed=args.seed)
+    print(f"\n{label}: {world.width}x{world.height}, {args.trips} trips between {args.spots} pairs of spots")
+    world.path_cache.max_size = 0
+    uncached_ms = run_trips(world, pairs, args.trips, args.seed)
+    world.path_cache.max_size = 256
+    world.path_cache.hits = world.path_cache.misses = 0
+    cached_ms = run_trips(world, pairs, args.trips, args.seed)
+    cache = world.path_cache
+    print(f"  uncached {uncached_ms:10.1f} ms  ({uncached_ms / args.trips:7.3f} ms/trip)")
+    print(f"  cached   {cached_ms:10.1f} ms  ({cached_ms / args.trips:7.3f} ms/trip)  "
+          f"{cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.0%} hit rate)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trips', type=int, default=500, help='find_path calls per run')
+    parser.add_argument('--spots', type=int, default=6, help='distinct start/goal pairs')
+    parser.add_argument('--size', type=int, default=1000, help='side length of the generated map')
+    parser.add_argument('--seed', type=int, default=0, help='seed for spots and trips')
+    args = parser.parse_args()
+
+    report("assets/maps/map.json", WorldState(map_file=DEFAULT_MAP), args)
+
+    map_file = write_temp_map(generate_map_data(args.size, args.size, seed=7))
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+    report("generated", world, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark WorldState.find_path against the original list-scanning A*.
+
+Usage:
+    python benchmarks/bench_pathfinding.py [--pairs 20] [--large-size 1000]
+"""
+import os
+import sys
+import time
+import heapq
+import argparse
+
+from common import DEFAULT_MAP, generate_map_data, write_temp_map, random_walkable_pairs
+from src.game_state.world_state import WorldState
+
+
+def legacy_find_path(world, start_pos, end_pos):
+    """The original WorldState.find_path, kept verbatim for comparison."""
+    start_x, start_y = int(start_pos[0]), int(start_pos[1])
+    end_x, end_y = int(end_pos[0]), int(end_pos[1])
+
+    if not world.is_walkable(end_x, end_y):
+        return None
+
+    def heuristic(a, b):
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        D1 = 1
+        D2 = 1.4142
+        return D1 * (dx + dy) + (D2 - 2 * D1) * min(dx, dy)
+
+    open_set = []
+    heapq.heappush(open_set, (0, (start_x, start_y)))
+    came_from = {}
+    g_score = {(start_x, start_y): 0}
+    f_score = {(start_x, start_y): heuristic((start_x, start_y), (end_x, end_y))}
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+    while open_set:
+        current = heapq.heappop(open_set)[1]
+        if current == (end_x, end_y):
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            path.reverse()
+            return path
+
+        for dx, dy in directions:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if neighbor != (end_x, end_y) and not world.is_walkable(neighbor[0], neighbor[1]):
+                continue
+            if dx != 0 and dy != 0:
+                if not world.is_walkable(current[0] + dx, current[1]) or not world.is_walkable(current[0], current[1] + dy):
+                    continue
+            movement_cost = 1.4142 if (dx != 0 and dy != 0) else 1.0
+            tentative_g_score = g_score[current] + movement_cost
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                f_score[neighbor] = tentative_g_score + heuristic(neighbor, (end_x, end_y))
+                if neighbor not in [i[1] for i in open_set]:
+                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
+    return None
+
+
+def time_searches(search, pairs):
+    """Run search over all pairs, returning (total_ms, worst_ms, paths_found)."""
+    total = worst = 0.0
+    found = 0
+    for start, goal in pairs:
+        begin = time.perf_counter()
+        path = search(start, goal)
+        elapsed = (time.perf_counter() - begin) * 1000
+        total += elapsed
+        worst = max(worst, elapsed)
+        found += path is not None
+    return total, worst, found
+
+
+def report(label, world, pairs, run_legacy=True):
+    """Print timings for the current and legacy engines on one map."""
+    print(f"\n{label}: {world.width}x{world.height}, {len(pairs)} searches")
+    engines = [('flat-array A*', world.find_path)]
+    if run_legacy:
+        engines.append(('legacy A*', lambda s, g: legacy_find_path(world, s, g)))
+    for name, search in engines:
+        total, worst, found = time_searches(search, pairs)
+        print(f"  {name:<14} total {total:9.1f} ms  mean {total / len(pairs):8.2f} ms  "
+              f"worst {worst:8.2f} ms  found {found}/{len(pairs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=20, help='searches per map')
+    parser.add_argument('--large-size', type=int, default=1000, help='side length of the generated map')
+    parser.add_argument('--legacy-max-distance', type=int, default=80,
+                        help='limit legacy searches on the generated map to this distance (it is quadratic)')
+    args = parser.parse_args()
+
+    world = WorldState(map_file=DEFAULT_MAP)
+    report("assets/maps/map.json", world, random_walkable_pairs(world, args.pairs, seed=1))
+
+    map_file = write_temp_map(generate_map_data(args.large_size, args.large_size, seed=7))
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+    report("generated (long clicks)", world, random_walkable_pairs(world, args.pairs, seed=2), run_legacy=False)
+    report("generated (short clicks)", world,
+           random_walkable_pairs(world, args.pairs, seed=3, max_distance=args.legacy_max_distance))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
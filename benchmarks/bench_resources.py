@@ -0,0 +1,92 @@
+"""
+Compare resource lookups by full dictionary scan and through the spatial index.
+
+Times picking the resources visible on one screen (as WorldState.draw does
+each frame) and finding the nearest tree to random tiles, on maps densely
+covered with trees.
+
+Usage:
+    python benchmarks/bench_resources.py [--queries 500] [--density 0.2] [--sizes 200 1000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+from common import generate_map_data, write_temp_map
+from src.entities.resources.resource import ResourceType
+from src.game_state.world_state import WorldState
+
+SCREEN_TILES = (1920 // 32 + 2, 1080 // 32 + 2)
+
+
+def visible_by_scan(world, x0, y0, x1, y1):
+    """Visible resources as WorldState.draw found them before the index."""
+    return [resource for (x, y), resource in world.resources.items() if x0 <= x < x1 and y0 <= y < y1]
+
+
+def nearest_by_scan(world, x, y):
+    """Nearest tree by checking every resource."""
+    best, best_distance = None, None
+    for (rx, ry), resource in world.resources.items():
+        if resource.resource_type != ResourceType.TREE:
+            continue
+        distance = (rx - x) ** 2 + (ry - y) ** 2
+        if best is None or distance < best_distance:
+            best, best_distance = resource, distance
+    return best
+
+
+def timed(function, arguments):
+    """Average milliseconds per call over a list of argument tuples."""
+    begin = time.perf_counter()
+    for args in arguments:
+        function(*args)
+    return (time.perf_counter() - begin) * 1000 / len(arguments)
+
+
+def report(size, density, queries):
+    """Print lookup times for one generated map."""
+    map_data = generate_map_data(size, size, seed=11)
+    rng = random.Random(5)
+    for y, row in enumerate(map_data['tiles']):
+        for x, tile in enumerate(row):
+            if tile == 'GRASS' and rng.random() < density:
+                map_data['resources'][f"{x},{y}"] = {'type': 'Tree' if rng.random() < 0.8 else 'Rock'}
+    map_file = write_temp_map(map_data)
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+
+    views = []
+    points = []
+    for _ in range(queries):
+        x0 = rng.randrange(max(1, size - SCREEN_TILES[0]))
+        y0 = rng.randrange(max(1, size - SCREEN_TILES[1]))
+        views.append((world, x0, y0, x0 + SCREEN_TILES[0], y0 + SCREEN_TILES[1]))
+        points.append((rng.randrange(size), rng.randrange(size)))
+
+    print(f"\n{size}x{size} tiles, {len(world.resources)} resources, {queries} queries")
+    scan = timed(visible_by_scan, views)
+    index = timed(world.get_resources_in_rect, [view[1:] for view in views])
+    print(f"  visible resources  scan {scan:8.3f} ms   index {index:8.3f} ms")
+    scan = timed(nearest_by_scan, [(world, x, y) for x, y in points])
+    index = timed(world.find_nearest_resource, [(x, y, ResourceType.TREE) for x, y in points])
+    print(f"  nearest tree       scan {scan:8.3f} ms   index {index:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=500, help='lookups to time per map')
+    parser.add_argument('--density', type=float, default=0.2, help='chance for a grass tile to hold a resource')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1000], help='side lengths of the generated maps')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        report(size, args.density, args.queries)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
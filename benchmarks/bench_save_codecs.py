@@ -0,0 +1,85 @@
+"""
+Compare the save codecs on a fully populated world snapshot.
+
+Builds the world snapshot SaveManager.collect_game_states would write for a
+map on which every tile has been changed and a tenth of the tiles hold an
+added resource, then times encoding and decoding it with each codec and
+reports the size of the file.
+
+Usage:
+    python benchmarks/bench_save_codecs.py [--sizes 100 1000] [--repeat 3]
+"""
+import sys
+import time
+import random
+import argparse
+
+import common  # noqa: F401  sets up the import path and headless SDL
+from src.engine.map_format import TILE_NAMES
+from src.engine.save_codec import CODECS, decode_file, orjson
+from src.engine.save_journal import WorldChanges
+
+
+def populated_world_state(size, seed=0):
+    """A world snapshot with every tile of a size x size map modified."""
+    rng = random.Random(seed)
+    changes = WorldChanges()
+    for y in range(size):
+        for x in range(size):
+            changes.set_tile(x, y, rng.choice(TILE_NAMES))
+            if rng.random() < 0.1:
+                changes.add_resource(x, y, 'Tree' if rng.random() < 0.8 else 'Rock')
+            elif rng.random() < 0.05:
+                changes.remove_resource(x, y)
+    return {
+        'timestamp': 1700000000,
+        'formatted_time': '2023-11-14 22:13:20',
+        'game_ticks': 123456,
+        'tilemap': {'width': size, 'height': size, **changes.to_dict()},
+        'version': '1.0.0',
+    }
+
+
+def best_time(function, argument, repeat):
+    """Best wall time in milliseconds of repeat calls."""
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function(argument)
+        elapsed = (time.perf_counter() - begin) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(size, repeat):
+    """Print encode and decode times and file sizes for one map size."""
+    state = populated_world_state(size)
+    tilemap = state['tilemap']
+    print(f"\n{size}x{size} map: {len(tilemap['modified_tiles'])} tiles, "
+          f"{len(tilemap['added_resources'])} added and {len(tilemap['removed_resources'])} removed resources")
+    baseline = None
+    for codec in CODECS.values():
+        data = codec.encode_file(state)
+        assert decode_file(data) == decode_file(CODECS['json'].encode_file(state))
+        encode = best_time(codec.encode_file, state, repeat)
+        decode = best_time(decode_file, data, repeat)
+        if baseline is None:
+            baseline = len(data)
+        print(f"  {codec.name:10} encode {encode:9.1f} ms   decode {decode:9.1f} ms   "
+              f"size {len(data) / 1024:9.1f} KB ({len(data) / baseline:5.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help="Map sizes in tiles")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    print(f"orjson: {'installed' if orjson is not None else 'not installed, fast-json uses the json module'}")
+    for size in args.sizes:
+        report(size, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Measure the memory held by a loaded WorldState and the time to load it.
+
+Maps are generated in the WorldState JSON format and converted to the
+binary map format. Each file is loaded once untraced for the load time,
+then once more under tracemalloc for the memory still held by the world
+after loading (the parsed JSON is freed by then; memory-mapped terrain is
+not traced, as it is backed by the file).
+
+Usage:
+    python benchmarks/bench_tile_storage.py [--sizes 100 1000 4000]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+from common import generate_map_data, write_temp_map
+from src.engine.map_format import json_to_binary
+from src.game_state.world_state import WorldState
+
+
+def measure(map_file):
+    """Load time in seconds, plus retained and peak traced memory in bytes, for one map file."""
+    begin = time.perf_counter()
+    world = WorldState(map_file=map_file)
+    load_time = time.perf_counter() - begin
+    del world
+
+    tracemalloc.start()
+    world = WorldState(map_file=map_file)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del world
+    return load_time, retained, peak
+
+
+def report(size):
+    """Print load time and retained memory for one generated map, as JSON and as a binary map."""
+    json_file = write_temp_map(generate_map_data(size, size, seed=3))
+    binary_file = json_file[:-len('.json')] + '.bin'
+    try:
+        json_to_binary(json_file, binary_file)
+        for label, map_file in (('json', json_file), ('binary', binary_file)):
+            load_time, retained, peak = measure(map_file)
+            print(f"{size:>5}x{size:<5} {label:<6} {os.path.getsize(map_file) / 2**20:8.2f} MB file   "
+                  f"load {load_time:8.3f} s   retained {retained / 2**20:9.2f} MB   "
+                  f"peak while loading {peak / 2**20:9.2f} MB")
+    finally:
+        os.remove(json_file)
+        if os.path.exists(binary_file):
+            os.remove(binary_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 4000],
+                        help='side lengths of the generated maps')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        report(size)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
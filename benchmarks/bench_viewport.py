@@ -0,0 +1,108 @@
+"""
+Compare terrain frame times for per-tile drawing, baked chunks and the scroll-reuse viewport.
+
+The camera follows the same lerp as PlayState._update_camera towards a
+target that moves around the map, so most frames scroll by a few pixels.
+
+Usage:
+    python benchmarks/bench_viewport.py [--frames 600] [--width 1920] [--height 1080] [--size 400]
+"""
+import os
+import sys
+import time
+import argparse
+
+import pygame
+
+from common import DEFAULT_MAP, generate_map_data, write_temp_map
+from src.engine.asset_manager import AssetManager
+from src.game_state.world_state import WorldState
+
+
+def draw_per_tile(world, screen, camera_x, camera_y):
+    """Terrain drawing as WorldState.draw did it before chunk baking."""
+    tile_size = world.tile_size
+    start_x = max(0, camera_x // tile_size)
+    start_y = max(0, camera_y // tile_size)
+    end_x = min(world.width, (camera_x + screen.get_width()) // tile_size + 2)
+    end_y = min(world.height, (camera_y + screen.get_height()) // tile_size + 2)
+    for y in range(start_y, end_y):
+        for x in range(start_x, end_x):
+            world.draw_tile(screen, x, y, x * tile_size - camera_x, y * tile_size - camera_y)
+
+
+def camera_path(world, screen, frames):
+    """Camera positions produced by the PlayState lerp following a wandering target."""
+    width, height = screen.get_size()
+    max_x = max(0, world.width * world.tile_size - width)
+    max_y = max(0, world.height * world.tile_size - height)
+    camera_x = camera_y = 0
+    positions = []
+    for frame in range(frames):
+        # The followed point walks a tile every 18 frames and turns every 150
+        leg, step = divmod(frame, 150)
+        target_x = min(max_x, (leg * 150 + step) * world.tile_size // 18)
+        target_y = min(max_y, (leg * 40 + (step if leg % 2 else 0)) * world.tile_size // 18)
+        camera_x = int(camera_x + (target_x - camera_x) * 0.2)
+        camera_y = int(camera_y + (target_y - camera_y) * 0.2)
+        positions.append((camera_x, camera_y))
+    return positions
+
+
+def time_frames(screen, positions, draw):
+    """Average milliseconds per frame for a terrain draw function."""
+    begin = time.perf_counter()
+    for camera_x, camera_y in positions:
+        screen.fill((0, 0, 0))
+        draw(screen, camera_x, camera_y)
+    return (time.perf_counter() - begin) * 1000 / len(positions)
+
+
+def report(label, world, screen, frames):
+    """Print frame times for one map."""
+    positions = camera_path(world, screen, frames)
+    moving = sum(1 for a, b in zip(positions, positions[1:]) if a != b)
+    print(f"\n{label}: {world.width}x{world.height} tiles, {screen.get_width()}x{screen.get_height()} screen, "
+          f"{frames} frames ({moving} with camera movement)")
+
+    world.enable_scrolling_viewport(False)
+    per_tile = time_frames(screen, positions, lambda s, x, y: draw_per_tile(world, s, x, y))
+    world.terrain_cache.invalidate_all()
+    chunks = time_frames(screen, positions, world.terrain_cache.draw)
+    world.enable_scrolling_viewport(True)
+    viewport = world.scrolling_viewport
+    scrolled = time_frames(screen, positions, viewport.draw)
+
+    print(f"  per-tile blits      {per_tile:7.2f} ms/frame")
+    print(f"  baked chunks        {chunks:7.2f} ms/frame")
+    print(f"  scroll-reuse        {scrolled:7.2f} ms/frame  "
+          f"({viewport.full_redraws} full redraws, {viewport.strip_redraws} strip redraws)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=600, help='frames to draw per renderer')
+    parser.add_argument('--width', type=int, default=1920, help='screen width in pixels')
+    parser.add_argument('--height', type=int, default=1080, help='screen height in pixels')
+    parser.add_argument('--size', type=int, default=400, help='side length of the generated map')
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((args.width, args.height))
+    asset_manager = AssetManager()
+
+    world = WorldState(map_file=DEFAULT_MAP)
+    world.set_asset_manager(asset_manager)
+    report("assets/maps/map.json", world, screen, args.frames)
+
+    map_file = write_temp_map(generate_map_data(args.size, args.size, seed=7))
+    try:
+        world = WorldState(map_file=map_file)
+    finally:
+        os.remove(map_file)
+    world.set_asset_manager(asset_manager)
+    report("generated", world, screen, args.frames)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
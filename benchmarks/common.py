@@ -0,0 +1,93 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+
+# Benchmarks run without a window or sound device
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+DEFAULT_MAP = os.path.join(ROOT_DIR, 'assets', 'maps', 'map.json')
+
+
+def generate_map_data(width, height, seed=0, lake_count=None, water_chance=0.05):
+    """
+    Build a random map dictionary in the WorldState JSON format.
+
+    The map is mostly grass with scattered single water tiles plus a number of
+    rectangular lakes, so searches have to route around real obstacles.
+
+    Args:
+        width: Width of the map in tiles
+        height: Height of the map in tiles
+        seed: Random seed for reproducible maps
+        lake_count: Number of lakes; defaults to one per 2,500 tiles
+        water_chance: Chance for any single tile to be water
+
+    Returns:
+        dict: Map data with width, height, tile_size, tiles and resources
+    """
+    rng = random.Random(seed)
+    tiles = [['WATER' if rng.random() < water_chance else 'GRASS' for _ in range(width)]
+             for _ in range(height)]
+
+    if lake_count is None:
+        lake_count = width * height // 2500
+    for _ in range(lake_count):
+        lake_w = rng.randint(3, max(3, width // 20))
+        lake_h = rng.randint(3, max(3, height // 20))
+        left = rng.randrange(0, max(1, width - lake_w))
+        top = rng.randrange(0, max(1, height - lake_h))
+        for y in range(top, top + lake_h):
+            row = tiles[y]
+            for x in range(left, left + lake_w):
+                row[x] = 'WATER'
+
+    return {'width': width, 'height': height, 'tile_size': 32, 'tiles': tiles, 'resources': {}}
+
+
+def write_temp_map(map_data):
+    """
+    Write map data to a temporary JSON file.
+
+    Returns:
+        str: Path of the file; the caller is responsible for removing it
+    """
+    handle = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    with handle:
+        json.dump(map_data, handle)
+    return handle.name
+
+
+def random_walkable_pairs(world, count, seed=0, max_distance=None):
+    """
+    Pick random (start, goal) pairs of walkable tiles.
+
+    Args:
+        world: WorldState to sample from
+        count: Number of pairs to return
+        seed: Random seed for reproducible pairs
+        max_distance: Optional Chebyshev distance limit between start and goal
+
+    Returns:
+        list: List of ((x, y), (x, y)) tuples
+    """
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        start = (rng.randrange(world.width), rng.randrange(world.height))
+        if max_distance is None:
+            goal = (rng.randrange(world.width), rng.randrange(world.height))
+        else:
+            goal = (start[0] + rng.randint(-max_distance, max_distance),
+                    start[1] + rng.randint(-max_distance, max_distance))
+        if world.is_walkable(*start) and world.is_walkable(*goal):
+            pairs.append((start, goal))
+    return pairs
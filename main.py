@@ -20,8 +20,10 @@ game_logger.info("Starting game")
 SCREEN_WIDTH = 800  # Default width
 SCREEN_HEIGHT = 600  # Default height
 FPS = 60
-TICK_RATE = 0.6  # seconds per game tick
 FULLSCREEN = False  # Start in windowed mode by default
+SAVE_BACKEND = 'files'  # 'files' for snapshot and journal files, 'sqlite' for saves/saves.db
+SAVE_CODEC = 'json'  # Snapshot codec: 'json', 'fast-json' or 'binary'
+REPLAY_DIRECTORY = None  # Record every session into this directory, e.g. 'replays'
 
 # Colors - RGB values
 BLACK = (0, 0, 0)
@@ -58,7 +60,7 @@ from src.engine.asset_manager import AssetManager
 asset_manager = AssetManager()
 
 # Create save manager without a default character
-save_manager = SaveManager(character_name=None)
+save_manager = SaveManager(character_name=None, backend=SAVE_BACKEND, codec=SAVE_CODEC)
 
 # Create states
 state_manager.add_state("menu", MenuState())
@@ -66,17 +68,12 @@ state_manager.add_state("character_select", CharacterSelectState(asset_manager,
 
 # Create PlayState with asset and save managers
 map_file = 'assets/maps/map.json'
-play_state = PlayState(asset_manager, save_manager, map_file=map_file)
+play_state = PlayState(asset_manager, save_manager, map_file=map_file, replay_directory=REPLAY_DIRECTORY)
 state_manager.add_state("play", play_state)
 
 # Set initial state
 state_manager.change_state("character_select")
 
-
-# Variables for tick-based system
-tick_timer = 0
-game_ticks = 0
-
 # Main game loop
 running = True
 while running:
@@ -90,16 +87,12 @@ while running:
         if event.type == pygame.QUIT:
             game_logger.info("Game quit requested")
             # Force a final save before quitting
-            if isinstance(state_manager.current_state, PlayState):
-                play_state = state_manager.current_state
-                if hasattr(play_state, 'save_manager') and play_state.player:
-                    game_logger.info("Performing final save before exit")
-                    # Collect character and world states separately
-                    character_state, world_state = play_state.save_manager.collect_game_states(
-                        play_state.player, play_state.tilemap, play_state.game_ticks)
-                    # Save both states
-                    play_state.save_manager.save_game_state(character_state, world_state, play_state.game_ticks)
-                    game_logger.info("Final save complete")
+            current_state = state_manager.get_state(state_manager.current_state)
+            if isinstance(current_state, PlayState):
+                game_logger.info("Performing final save before exit")
+                # Snapshot the character and world, folding in the save journals;
+                # the save writer finishes writing them below
+                current_state.save_game()
             running = False
         
         # Handle window resize events
@@ -141,16 +134,9 @@ while running:
     # Pass events to current state
     state_manager.handle_events(events)
     
-    # Update game state
+    # Update game state; the play state runs the game ticks from delta_time
     state_manager.update(delta_time)
     
-    # Update tick-based system (global game ticks)
-    tick_timer += delta_time
-    if tick_timer >= TICK_RATE:
-        game_ticks += 1
-        tick_timer -= TICK_RATE
-        # Global tick-based logic can go here
-    
     # Draw to the screen
     screen.fill(BLACK)  # Clear the screen
     state_manager.draw(screen)
@@ -165,5 +151,8 @@ while running:
 
 # Clean up
 game_logger.info("Game shutting down")
+# Block until every queued save is on disk
+save_manager.close()
+game_logger.info("Final save complete")
 pygame.quit()
 sys.exit()
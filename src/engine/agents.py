@@ -0,0 +1,476 @@
+"""
+Agents: the world's movers other than the player, stepped in bulk once per tick.
+
+An AgentSystem keeps every agent as a slot in a set of NumPy arrays
+(struct of arrays) rather than as an object: tile position, position on
+the previous tick, goal, a cursor into a shared path buffer, and how long
+the agent has been blocked. WorldState ticks it through the tick
+scheduler, so agents move whether or not anything is drawn, one tile per
+tick like the player.
+
+Each tick runs in four steps:
+
+1. Wanderers (agents with a wander radius) that are idle pick a random
+   walkable goal within their radius.
+2. Queued path requests are solved in one batch, oldest first, at most
+   max_searches_per_tick of them; the rest wait for the next tick, so a
+   crowd asking for paths at once cannot stall a frame. Searches go
+   through WorldState.find_path and its path cache, and run on the main
+   thread, so agents move the same on every run of the same seed.
+3. Every agent with steps left looks at its next tile. It moves if the
+   tile is walkable and was free at the start of the tick; when several
+   agents want the same tile, the lowest agent id gets it.
+4. An agent whose next tile became unwalkable asks for a new path. One
+   held up by other agents waits; after patience ticks a wanderer gives
+   up its goal and an agent sent somewhere with move_to searches again.
+
+The occupancy grid holds, for every tile, the id of the agent standing on
+it plus one, so zero is free. The player is not in it: agents and the
+player walk through each other.
+
+Paths are stored back to back in one int32 buffer of tile indices
+(y * width + x), each agent reading its own stretch through path_pos and
+path_end. The buffer is compacted, and grown if that is not enough, when
+a new path does not fit after the last one.
+"""
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.engine.logger import game_logger
+
+MAX_SEARCHES_PER_TICK = 256  # Path searches solved per tick; the rest wait in the queue
+PATIENCE = 4  # Ticks an agent waits behind other agents before giving up its path
+INITIAL_CAPACITY = 1024  # Agent slots allocated on first spawn; doubled as needed
+
+
+class AgentSystem:
+    """Every agent of a WorldState, in NumPy arrays; see the module docstring."""
+
+    def __init__(self, world_state, seed: int = 0, max_searches_per_tick: int = MAX_SEARCHES_PER_TICK,
+                 patience: int = PATIENCE):
+        """
+        Initialize an empty system. Arrays are allocated on the first spawn.
+
+        Args:
+            world_state: WorldState the agents walk in
+            seed: Seed for the wanderers' goals
+            max_searches_per_tick: Most path searches solved in one tick
+            patience: Ticks an agent waits behind other agents before giving up its path
+        """
+        self.world_state = world_state
+        self.rng = np.random.default_rng(seed)
+        self.max_searches_per_tick = max_searches_per_tick
+        self.patience = patience
+        self.count = 0  # Slots in use, alive or not; every array is valid up to here
+        self.capacity = 0
+        self.occupancy = None  # int32 per tile: id of the agent on it + 1, or 0
+        self._free = []  # Despawned slots, reused by spawn
+        self._requests = []  # Agents that asked for a path this tick
+        self._searches = deque()  # Agents waiting for an A* search, oldest first
+        self._walkable = None  # uint8 view of world_state.walkable_grid
+        self._walkable_source = None  # The bytearray _walkable views
+        self._path_buffer = np.zeros(0, dtype=np.int32)
+        self._path_used = 0  # Entries of _path_buffer written so far
+        # Counters for the benchmark and the debug overlay
+        self.searches = 0  # A* searches run
+        self.straight_paths = 0  # Paths given as a straight line, without a search
+        self.moves = 0  # Tiles stepped by all agents
+        self.waits = 0  # Steps not taken because another agent stood in the way
+        self._allocate(0)
+
+    def __len__(self) -> int:
+        return self.count - len(self._free)
+
+    @property
+    def search_backlog(self) -> int:
+        """Agents waiting for an A* search."""
+        return len(self._searches)
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow every per-agent array to capacity slots, keeping their contents."""
+        def grow(name, dtype, fill=0):
+            array = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:len(old)] = old
+            setattr(self, name, array)
+
+        grow('alive', np.bool_, False)
+        grow('x', np.int32)  # Tile the agent stands on
+        grow('y', np.int32)
+        grow('prev_x', np.int32)  # Tile the agent stood on before the last tick, for interpolation
+        grow('prev_y', np.int32)
+        grow('goal_x', np.int32)  # Tile the agent is heading for
+        grow('goal_y', np.int32)
+        grow('path_pos', np.int32)  # Next step in _path_buffer
+        grow('path_end', np.int32)  # End of the agent's steps in _path_buffer; path_pos == path_end when idle
+        grow('blocked', np.int32)  # Ticks in a row the next step was taken by another agent
+        grow('wander_radius', np.int32)  # 0 for agents that only move when sent with move_to
+        grow('queued', np.bool_, False)  # Waiting for a path
+        self.capacity = capacity
+
+    def _ensure_grids(self) -> None:
+        """Size the occupancy grid to the world and follow a replaced walkability grid."""
+        world = self.world_state
+        size = world.width * world.height
+        if self.occupancy is None or self.occupancy.size != size:
+            if len(self):
+                game_logger.warning("World was resized; removing every agent")
+                self.clear()
+            self.occupancy = np.zeros(size, dtype=np.int32)
+        if self._walkable_source is not world.walkable_grid:
+            self._walkable_source = world.walkable_grid
+            self._walkable = np.frombuffer(world.walkable_grid, dtype=np.uint8)
+
+    # ------------------------------------------------------------------
+    # Spawning
+    # ------------------------------------------------------------------
+    def spawn(self, x: int, y: int, wander_radius: int = 0) -> int:
+        """
+        Place an agent on a free walkable tile.
+
+        Args:
+            x: X coordinate of the tile in grid space
+            y: Y coordinate of the tile in grid space
+            wander_radius: Walk to random tiles up to this far away when idle; 0 stays put
+
+        Returns:
+            int: Id of the new agent
+
+        Raises:
+            ValueError: If the tile is outside the map, unwalkable or taken
+        """
+        return int(self.spawn_many([x], [y], wander_radius)[0])
+
+    def spawn_many(self, xs, ys, wander_radius: int = 0) -> np.ndarray:
+        """
+        Place one agent on each of a batch of free walkable tiles.
+
+        Raises:
+            ValueError: If any tile is outside the map, unwalkable, taken or given twice;
+                no agent is placed then
+
+        Returns:
+            numpy.ndarray: Ids of the new agents, in the order of the tiles
+        """
+        self._ensure_grids()
+        world = self.world_state
+        xs = np.asarray(xs, dtype=np.int32).ravel()
+        ys = np.asarray(ys, dtype=np.int32).ravel()
+        if xs.shape != ys.shape:
+            raise ValueError("xs and ys must have the same length")
+        inside = (xs >= 0) & (xs < world.width) & (ys >= 0) & (ys < world.height)
+        if not inside.all():
+            raise ValueError("Cannot spawn agents outside the map")
+        tiles = ys * world.width + xs
+        if not self._walkable[tiles].all() or self.occupancy[tiles].any():
+            raise ValueError("Cannot spawn agents on unwalkable or taken tiles")
+        if np.unique(tiles).size != tiles.size:
+            raise ValueError("Cannot spawn two agents on one tile")
+
+        reused = min(len(self._free), len(tiles))
+        ids = np.empty(len(tiles), dtype=np.int32)
+        for i in range(reused):
+            ids[i] = self._free.pop()
+        fresh = len(tiles) - reused
+        if self.count + fresh > self.capacity:
+            capacity = max(self.capacity, INITIAL_CAPACITY)
+            while capacity < self.count + fresh:
+                capacity *= 2
+            self._allocate(capacity)
+        ids[reused:] = np.arange(self.count, self.count + fresh, dtype=np.int32)
+        self.count += fresh
+
+        self.alive[ids] = True
+        self.x[ids] = self.prev_x[ids] = self.goal_x[ids] = xs
+        self.y[ids] = self.prev_y[ids] = self.goal_y[ids] = ys
+        self.path_pos[ids] = self.path_end[ids] = 0
+        self.blocked[ids] = 0
+        self.wander_radius[ids] = wander_radius
+        self.queued[ids] = False
+        self.occupancy[tiles] = ids + 1
+        return ids
+
+    def despawn(self, agent: int) -> None:
+        """Remove an agent; its id may be given to a later spawn."""
+        if not (0 <= agent < self.count and self.alive[agent]):
+            return
+        self.alive[agent] = False
+        self.queued[agent] = False
+        self.path_pos[agent] = self.path_end[agent] = 0
+        self.occupancy[self.y[agent] * self.world_state.width + self.x[agent]] = 0
+        self._free.append(agent)
+
+    def clear(self) -> None:
+        """Remove every agent."""
+        if self.occupancy is not None:
+            self.occupancy[:] = 0
+        self.alive[:] = False
+        self.queued[:] = False
+        self.count = 0
+        self._free.clear()
+        self._requests.clear()
+        self._searches.clear()
+        self._path_used = 0
+
+    def agent_at(self, x: int, y: int) -> Optional[int]:
+        """Id of the agent standing on tile (x, y), or None."""
+        world = self.world_state
+        if self.occupancy is None or not (0 <= x < world.width and 0 <= y < world.height):
+            return None
+        occupant = int(self.occupancy[y * world.width + x])
+        return occupant - 1 if occupant else None
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+    def move_to(self, agents, goal_x, goal_y) -> None:
+        """
+        Send agents to goal tiles. Their searches are queued and solved on coming ticks.
+
+        Args:
+            agents: An agent id or an array of them
+            goal_x: X coordinate of the goal, or one per agent
+            goal_y: Y coordinate of the goal, or one per agent
+        """
+        agents = np.atleast_1d(np.asarray(agents, dtype=np.int32))
+        alive = self.alive[agents]
+        agents = agents[alive]
+        self.goal_x[agents] = goal_x if np.isscalar(goal_x) else np.asarray(goal_x)[alive]
+        self.goal_y[agents] = goal_y if np.isscalar(goal_y) else np.asarray(goal_y)[alive]
+        self._request_paths(agents)
+
+    def _request_paths(self, agents: np.ndarray) -> None:
+        """Stop agents where they are and queue a search to their goals."""
+        self.path_pos[agents] = self.path_end[agents]
+        self.blocked[agents] = 0
+        new = agents[~self.queued[agents]]
+        self.queued[new] = True
+        self._requests.extend(new.tolist())
+
+    def is_idle(self, agent: int) -> bool:
+        """True if the agent has no steps left and is not waiting for a path."""
+        return bool(self.path_pos[agent] == self.path_end[agent] and not self.queued[agent])
+
+    def interpolated(self, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions of all slots in tiles, alpha of the way from the previous tick's tiles.
+
+        Returns:
+            (xs, ys): float32 arrays of length count; check alive for the slots in use
+        """
+        n = self.count
+        xs = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * np.float32(alpha)
+        ys = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * np.float32(alpha)
+        return xs.astype(np.float32), ys.astype(np.float32)
+
+    # ------------------------------------------------------------------
+    # Ticks
+    # ------------------------------------------------------------------
+    def tick(self, current_tick: int) -> None:
+        """
+        Run one tick for every agent. Registered with the world's tick scheduler.
+
+        Args:
+            current_tick: Number of the tick being run
+        """
+        if len(self) == 0:
+            return
+        self._ensure_grids()
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self._pick_wander_goals()
+        self._solve_queued()
+        self._step()
+
+    def _pick_wander_goals(self) -> None:
+        """Give idle wanderers a random walkable goal within their radius."""
+        n = self.count
+        world = self.world_state
+        idle = np.flatnonzero(self.alive[:n] & (self.wander_radius[:n] > 0) & ~self.queued[:n] &
+                              (self.path_pos[:n] == self.path_end[:n]))
+        if idle.size == 0:
+            return
+        radius = self.wander_radius[idle]
+        goal_x = np.clip(self.x[idle] + self.rng.integers(-radius, radius + 1), 0, world.width - 1)
+        goal_y = np.clip(self.y[idle] + self.rng.integers(-radius, radius + 1), 0, world.height - 1)
+        # Agents that drew an unwalkable tile or their own try again next tick
+        usable = self._walkable[goal_y * world.width + goal_x].astype(np.bool_) & \
+            ((goal_x != self.x[idle]) | (goal_y != self.y[idle]))
+        idle = idle[usable]
+        self.goal_x[idle] = goal_x[usable]
+        self.goal_y[idle] = goal_y[usable]
+        self._request_paths(idle)
+
+    def _solve_queued(self) -> None:
+        """
+        Give paths to the agents that asked for one.
+
+        Every new request is first tried as a straight line, checked for
+        the whole batch at once; the rest join the search queue, of which
+        the oldest max_searches_per_tick are searched.
+        """
+        if self._requests:
+            agents = np.array(self._requests, dtype=np.int32)
+            self._requests.clear()
+            # Despawned while waiting, or asked twice by a reused slot
+            agents = agents[self.queued[agents]]
+            agents = agents[np.sort(np.unique(agents, return_index=True)[1])]
+            lined = self._straight_paths(agents)
+            # Blocked early on, the route may still be clear the other way round
+            lined[~lined] = self._straight_paths(agents[~lined], diagonal_last=True)
+            self.queued[agents[lined]] = False
+            self._searches.extend(agents[~lined].tolist())
+
+        world = self.world_state
+        width = world.width
+        searches = self._searches
+        for _ in range(min(len(searches), self.max_searches_per_tick)):
+            agent = searches.popleft()
+            if not self.queued[agent]:
+                continue  # Despawned while waiting
+            self.queued[agent] = False
+            start = (int(self.x[agent]), int(self.y[agent]))
+            goal = (int(self.goal_x[agent]), int(self.goal_y[agent]))
+            self.searches += 1
+            # Random goals seldom repeat, so the world's path cache is skipped
+            path = world.find_path(start, goal, engine=world.select_path_engine(start, goal))
+            if not path or len(path) < 2:
+                continue
+            steps = [y * width + x for x, y in path[1:]]
+            begin = self._reserve(len(steps))
+            self._path_buffer[begin:begin + len(steps)] = steps
+            self.path_pos[agent] = begin
+            self.path_end[agent] = begin + len(steps)
+
+    def _straight_paths(self, agents: np.ndarray, diagonal_last: bool = False) -> np.ndarray:
+        """
+        Give agents whose goal is in plain sight the straight route to it.
+
+        The route runs diagonally until level with the goal, then straight
+        (or straight first with diagonal_last), which is as short as any
+        path A* could find. Like A*, it only steps diagonally past two
+        walkable tiles.
+
+        Returns:
+            numpy.ndarray: Mask of the agents that got a path
+        """
+        width = self.world_state.width
+        walkable = self._walkable
+        x0 = self.x[agents].astype(np.int64)
+        y0 = self.y[agents].astype(np.int64)
+        dx = self.goal_x[agents] - x0
+        dy = self.goal_y[agents] - y0
+        adx, ady = np.abs(dx), np.abs(dy)
+        lengths = np.maximum(adx, ady)
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(agents.size, dtype=np.bool_)
+
+        # One row per step of every route: its agent and its number k, from 1
+        owner = np.repeat(np.arange(agents.size), lengths)
+        starts = np.zeros(agents.size, dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        k = np.arange(total) - starts[owner] + 1
+        if diagonal_last:
+            # Number the steps so the diagonal ones come last: the first
+            # lengths - adx steps leave x where it is, and likewise for y
+            kx = np.maximum(k - (lengths - adx)[owner], 0)
+            ky = np.maximum(k - (lengths - ady)[owner], 0)
+        else:
+            kx = ky = k
+        step_x, step_y = np.sign(dx)[owner], np.sign(dy)[owner]
+        x = x0[owner] + step_x * np.minimum(kx, adx[owner])
+        y = y0[owner] + step_y * np.minimum(ky, ady[owner])
+        prev_x = x - step_x * ((kx > 0) & (kx <= adx[owner]))
+        prev_y = y - step_y * ((ky > 0) & (ky <= ady[owner]))
+        tiles = y * width + x
+        # The tile entered and the two tiles beside a diagonal step (the same tiles on a straight one)
+        passable = walkable[tiles] & walkable[prev_y * width + x] & walkable[y * width + prev_x]
+        clear = (np.bincount(owner[passable == 0], minlength=agents.size) == 0) & (lengths > 0)
+
+        lined = agents[clear]
+        if lined.size:
+            steps = tiles[clear[owner]]
+            begin = self._reserve(steps.size)
+            self._path_buffer[begin:begin + steps.size] = steps
+            offsets = np.zeros(lined.size, dtype=np.int64)
+            np.cumsum(lengths[clear][:-1], out=offsets[1:])
+            self.path_pos[lined] = begin + offsets
+            self.path_end[lined] = self.path_pos[lined] + lengths[clear]
+            self.straight_paths += lined.size
+        return clear
+
+    def _reserve(self, length: int) -> int:
+        """Room for length steps at the end of the path buffer; returns where it starts."""
+        if self._path_used + length > len(self._path_buffer):
+            self._compact_paths()
+            if self._path_used + length > len(self._path_buffer):
+                size = max(len(self._path_buffer), 4096)
+                while size < self._path_used + length:
+                    size *= 2
+                buffer = np.zeros(size, dtype=np.int32)
+                buffer[:self._path_used] = self._path_buffer[:self._path_used]
+                self._path_buffer = buffer
+        begin = self._path_used
+        self._path_used += length
+        return begin
+
+    def _compact_paths(self) -> None:
+        """Move the steps agents have left to the front of the path buffer, dropping walked ones."""
+        n = self.count
+        agents = np.flatnonzero(self.path_pos[:n] < self.path_end[:n])
+        lengths = (self.path_end[agents] - self.path_pos[agents]).astype(np.int64)
+        starts = np.zeros(agents.size, dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        total = int(lengths.sum())
+        # Source index of each kept step: its agent's old start, plus its offset in the agent's steps
+        sources = np.repeat(self.path_pos[agents] - starts, lengths) + np.arange(total)
+        self._path_buffer[:total] = self._path_buffer[sources]
+        self.path_pos[agents] = starts
+        self.path_end[agents] = starts + lengths
+        self._path_used = total
+
+    def _step(self) -> None:
+        """Move every agent with steps left onto its next tile, if it can."""
+        width = self.world_state.width
+        n = self.count
+        walking = np.flatnonzero(self.path_pos[:n] < self.path_end[:n])
+        if walking.size == 0:
+            return
+        tiles = self._path_buffer[self.path_pos[walking]]
+        walkable = self._walkable[tiles].astype(np.bool_)
+
+        # The world changed under the path: search again from here
+        cut_off = walking[~walkable]
+        if cut_off.size:
+            self._request_paths(cut_off)
+
+        # Free at the start of the tick; on a tie, np.unique keeps the lowest agent id
+        free = walkable & (self.occupancy[tiles] == 0)
+        candidates = walking[free]
+        taken, first = np.unique(tiles[free], return_index=True)
+        movers = candidates[first]
+        self.occupancy[self.y[movers] * width + self.x[movers]] = 0
+        self.occupancy[taken] = movers + 1
+        self.x[movers] = taken % width
+        self.y[movers] = taken // width
+        self.path_pos[movers] += 1
+        self.blocked[movers] = 0
+        self.moves += movers.size
+
+        waiting = np.setdiff1d(walking[walkable], movers, assume_unique=True)
+        if waiting.size == 0:
+            return
+        self.waits += waiting.size
+        self.blocked[waiting] += 1
+        stuck = waiting[self.blocked[waiting] >= self.patience]
+        if stuck.size:
+            wanderers = self.wander_radius[stuck] > 0
+            # Wanderers pick another goal next tick; sent agents search again, in case the way is clear now
+            self.path_pos[stuck[wanderers]] = self.path_end[stuck[wanderers]]
+            self.blocked[stuck[wanderers]] = 0
+            self._request_paths(stuck[~wanderers])
@@ -37,9 +37,8 @@ class AssetManager:
         self._default_font = None
         self._default_font_size = 24
         
-        # Initialize pygame mixer if not already initialized
-        if pygame.mixer.get_init() is None:
-            pygame.mixer.init()
+        # The mixer is initialized by the first load_sound, so the manager
+        # (and the module-level instance) can be created without a sound device
     
     def _get_asset_path(self, *path_parts: str) -> str:
         """
@@ -74,10 +73,10 @@ class AssetManager:
                 print(f"Image not found: {full_path}")
                 return None
                 
-            if convert_alpha:
-                image = pygame.image.load(full_path).convert_alpha()
-            else:
-                image = pygame.image.load(full_path).convert()
+            image = pygame.image.load(full_path)
+            # Converting needs a display mode; without one (headless runs) keep the image as loaded
+            if pygame.display.get_init() and pygame.display.get_surface() is not None:
+                image = image.convert_alpha() if convert_alpha else image.convert()
                 
             self._images[name] = image
             return image
@@ -118,6 +117,8 @@ class AssetManager:
                 print(f"Sound not found: {full_path}")
                 return None
                 
+            if pygame.mixer.get_init() is None:
+                pygame.mixer.init()
             sound = pygame.mixer.Sound(full_path)
             self._sounds[name] = sound
             return sound
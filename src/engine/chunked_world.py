@@ -0,0 +1,366 @@
+"""
+Chunked world maps that are streamed from disk around the player.
+
+A chunked map is a directory:
+
+    manifest.json   width, height, tile_size and chunk_size of the world
+    walkable.bin    one byte per tile (y * width + x), 1 where a tile can be
+                    entered; the navigation layer searched by pathfinding
+    chunks/X_Y.bin  terrain and resources of chunk (X, Y) as a binary map
+                    (see src.engine.map_format) with chunk-local coordinates
+
+Only the walkability layer is read up front. Terrain and resources are read
+a chunk at a time when they are first needed or when they come within
+reach of the focus point.
+
+Usage:
+    python -m src.engine.chunked_world assets/maps/map.json worlds/island [--chunk-size 64]
+"""
+import os
+import sys
+import json
+import queue
+import argparse
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.engine.logger import game_logger
+from src.engine.map_format import read_binary_map, write_binary_map
+
+MANIFEST = 'manifest.json'
+WALKABLE = 'walkable.bin'
+CHUNK_DIRECTORY = 'chunks'
+
+
+def is_chunked_map(path: str) -> bool:
+    """Whether path is a chunked map directory."""
+    return os.path.isdir(path) and os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def _chunk_path(directory: str, cx: int, cy: int) -> str:
+    return os.path.join(directory, CHUNK_DIRECTORY, f"{cx}_{cy}.bin")
+
+
+def _write_file(path: str, data) -> None:
+    """Write data next to path and move it into place."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def write_chunked_map(directory: str, width: int, height: int, tile_size: int, tiles, walkable,
+                      resources: List[Tuple[int, int, str]], chunk_size: int = 64) -> None:
+    """
+    Write a whole world as a chunked map.
+
+    Args:
+        directory: Directory to write; created if missing
+        width: Width of the map in tiles
+        height: Height of the map in tiles
+        tile_size: Size of each tile in pixels
+        tiles: Buffer of width * height tile codes, row-major
+        walkable: Buffer of width * height walkability bytes, row-major
+        resources: (x, y, type name) tuples in world coordinates
+        chunk_size: Side length of a chunk in tiles
+    """
+    os.makedirs(os.path.join(directory, CHUNK_DIRECTORY), exist_ok=True)
+    tiles = memoryview(tiles)
+    by_chunk: Dict[Tuple[int, int], list] = {}
+    for x, y, name in resources:
+        by_chunk.setdefault((x // chunk_size, y // chunk_size), []).append((x % chunk_size, y % chunk_size, name))
+
+    for cy in range((height + chunk_size - 1) // chunk_size):
+        for cx in range((width + chunk_size - 1) // chunk_size):
+            x0, y0 = cx * chunk_size, cy * chunk_size
+            cols = min(chunk_size, width - x0)
+            rows = min(chunk_size, height - y0)
+            chunk_tiles = b''.join(tiles[(y0 + ly) * width + x0:(y0 + ly) * width + x0 + cols]
+                                   for ly in range(rows))
+            write_chunk(directory, cx, cy, cols, rows, tile_size, chunk_tiles, by_chunk.get((cx, cy), []))
+
+    _write_file(os.path.join(directory, WALKABLE), walkable)
+    write_manifest(directory, width, height, tile_size, chunk_size)
+
+
+def write_chunk(directory: str, cx: int, cy: int, cols: int, rows: int, tile_size: int, tiles,
+                resources: List[Tuple[int, int, str]]) -> None:
+    """
+    Write the file of one chunk into a chunked map directory.
+
+    Args:
+        directory: Chunked map directory; its chunks directory must exist
+        cx, cy: Chunk coordinates
+        cols, rows: Size of the chunk in tiles (smaller than chunk_size at the map edge)
+        tile_size: Size of each tile in pixels
+        tiles: Buffer of cols * rows tile codes, row-major
+        resources: (x, y, type name) tuples in chunk-local coordinates
+    """
+    write_binary_map(_chunk_path(directory, cx, cy), cols, rows, tile_size, tiles, resources)
+
+
+def write_manifest(directory: str, width: int, height: int, tile_size: int, chunk_size: int) -> None:
+    """Write the manifest, which is what makes a directory a chunked map; write it last."""
+    manifest = {'format': 'chunked', 'version': 1, 'width': width, 'height': height,
+                'tile_size': tile_size, 'chunk_size': chunk_size}
+    _write_file(os.path.join(directory, MANIFEST), json.dumps(manifest, indent=2).encode())
+
+
+class Chunk:
+    """Terrain and resources of one loaded chunk."""
+
+    __slots__ = ('cx', 'cy', 'x0', 'y0', 'cols', 'rows', 'tiles', 'resources', 'dirty')
+
+    def __init__(self, cx: int, cy: int, x0: int, y0: int, cols: int, rows: int,
+                 tiles: bytearray, resources: List[Tuple[int, int, str]]):
+        self.cx = cx
+        self.cy = cy
+        self.x0 = x0
+        self.y0 = y0
+        self.cols = cols
+        self.rows = rows
+        self.tiles = tiles          # cols * rows tile codes, row-major
+        self.resources = resources  # (x, y, type name) in world coordinates
+        self.dirty = False          # Changed since it was read; written back when evicted or saved
+
+
+class ChunkStore:
+    """
+    Loads the chunks of a chunked map on demand and streams them around a focus point.
+
+    The store also acts as a flat, row-major tile-code grid (``store[y *
+    width + x]``), so WorldState can use it as its tile grid: reading or
+    writing a tile of a chunk that is not in memory loads that chunk on the
+    spot. set_focus() asks a worker thread to read the chunks within
+    load_radius of the focus ahead of time and evicts those farther than
+    unload_radius; chunks read by the worker are installed by poll() on the
+    main thread. Changed chunks are written back when evicted and by save().
+
+    on_load(chunk) runs on the main thread after a chunk is installed and
+    on_unload(chunk) before a chunk is evicted. Whoever changes a chunk's
+    resources updates chunk.resources and sets chunk.dirty.
+    """
+
+    def __init__(self, directory: str, load_radius: int = 2, unload_radius: int = 3,
+                 on_load: Callable[[Chunk], None] = None, on_unload: Callable[[Chunk], None] = None):
+        """
+        Open a chunked map.
+
+        Args:
+            directory: Chunked map directory
+            load_radius: Chunks within this many chunks of the focus are prefetched
+            unload_radius: Chunks farther than this many chunks from the focus are evicted
+            on_load: Called with each chunk after it is installed
+            on_unload: Called with each chunk before it is evicted
+        """
+        with open(os.path.join(directory, MANIFEST), 'r') as f:
+            manifest = json.load(f)
+        self.directory = directory
+        self.width = manifest['width']
+        self.height = manifest['height']
+        self.tile_size = manifest['tile_size']
+        self.chunk_size = manifest['chunk_size']
+        self.chunks_x = (self.width + self.chunk_size - 1) // self.chunk_size
+        self.chunks_y = (self.height + self.chunk_size - 1) // self.chunk_size
+        self.load_radius = load_radius
+        self.unload_radius = max(unload_radius, load_radius)
+        self.on_load = on_load
+        self.on_unload = on_unload
+        self.loads = 0      # Chunks installed so far, read by either thread
+        self.evictions = 0  # Chunks dropped from memory so far
+
+        self.walkable = bytearray(self.width * self.height)
+        with open(os.path.join(directory, WALKABLE), 'rb') as f:
+            f.readinto(self.walkable)
+
+        self._chunks: Dict[Tuple[int, int], Chunk] = {}
+        self._requested = {}         # Chunks queued for the worker and not yet installed -> ticket
+        self._tickets = 0            # Tickets issued so far; only the latest request of a chunk is installed
+        self._focus = None
+        self._inbox = queue.Queue()  # main -> worker: ((cx, cy), ticket) / None
+        self._finished = deque()     # worker -> main: (ticket, read Chunk)
+        self._thread = None
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def __contains__(self, chunk: Tuple[int, int]) -> bool:
+        return chunk in self._chunks
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.width * self.height:
+            raise IndexError(index)
+        y, x = divmod(index, self.width)
+        chunk = self.chunk(x // self.chunk_size, y // self.chunk_size)
+        return chunk.tiles[(y - chunk.y0) * chunk.cols + x - chunk.x0]
+
+    def __setitem__(self, index: int, code: int) -> None:
+        y, x = divmod(index, self.width)
+        chunk = self.chunk(x // self.chunk_size, y // self.chunk_size)
+        chunk.tiles[(y - chunk.y0) * chunk.cols + x - chunk.x0] = code
+        chunk.dirty = True
+
+    def loaded_chunks(self) -> Iterator[Chunk]:
+        """The chunks currently in memory."""
+        return iter(list(self._chunks.values()))
+
+    # ------------------------------------------------------------------
+    # Main thread API
+    # ------------------------------------------------------------------
+    def chunk(self, cx: int, cy: int) -> Chunk:
+        """Get chunk (cx, cy), reading it now if it is not in memory."""
+        chunk = self._chunks.get((cx, cy))
+        if chunk is None:
+            # Any copy still in flight on the worker is discarded by poll()
+            self._requested.pop((cx, cy), None)
+            chunk = self._install(self._read(cx, cy))
+        return chunk
+
+    def chunk_at(self, x: int, y: int) -> Chunk:
+        """Get the chunk containing tile (x, y), reading it if needed."""
+        return self.chunk(x // self.chunk_size, y // self.chunk_size)
+
+    def load_area(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        """Make sure every chunk overlapping the tile rectangle [x0, x1) x [y0, y1) is in memory."""
+        size = self.chunk_size
+        for cy in range(max(0, y0 // size), min(self.chunks_y, (y1 - 1) // size + 1)):
+            for cx in range(max(0, x0 // size), min(self.chunks_x, (x1 - 1) // size + 1)):
+                self.chunk(cx, cy)
+
+    def set_focus(self, x: int, y: int) -> None:
+        """
+        Stream chunks around tile (x, y).
+
+        Queues the chunks within load_radius that are not in memory for the
+        worker thread and evicts the chunks beyond unload_radius.
+        """
+        focus = (x // self.chunk_size, y // self.chunk_size)
+        if focus == self._focus:
+            return
+        self._focus = focus
+        fx, fy = focus
+
+        for key in [key for key in self._chunks
+                    if max(abs(key[0] - fx), abs(key[1] - fy)) > self.unload_radius]:
+            self._evict(key)
+        self._requested = {key: ticket for key, ticket in self._requested.items()
+                           if max(abs(key[0] - fx), abs(key[1] - fy)) <= self.unload_radius}
+
+        radius = self.load_radius
+        wanted = [(cx, cy)
+                  for cy in range(max(0, fy - radius), min(self.chunks_y, fy + radius + 1))
+                  for cx in range(max(0, fx - radius), min(self.chunks_x, fx + radius + 1))
+                  if (cx, cy) not in self._chunks and (cx, cy) not in self._requested]
+        if not wanted:
+            return
+        # Nearest chunks first
+        wanted.sort(key=lambda key: max(abs(key[0] - fx), abs(key[1] - fy)))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='chunk-loader', daemon=True)
+            self._thread.start()
+        for key in wanted:
+            self._tickets += 1
+            self._requested[key] = self._tickets
+            self._inbox.put((key, self._tickets))
+
+    def poll(self) -> int:
+        """
+        Install chunks read by the worker. Call once per frame on the main thread.
+
+        Returns:
+            Number of chunks installed
+        """
+        installed = 0
+        for _ in range(len(self._finished)):
+            ticket, chunk = self._finished.popleft()
+            key = (chunk.cx, chunk.cy)
+            if self._requested.get(key) != ticket or key in self._chunks:
+                # Loaded synchronously in the meantime, no longer near the focus, or
+                # requested again since (the file may have been rewritten on eviction)
+                continue
+            del self._requested[key]
+            self._install(chunk)
+            installed += 1
+        return installed
+
+    def save(self) -> None:
+        """Write every changed chunk in memory and the walkability layer."""
+        for chunk in self._chunks.values():
+            if chunk.dirty:
+                self._write(chunk)
+        _write_file(os.path.join(self.directory, WALKABLE), self.walkable)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker thread; chunks still queued are not read."""
+        if self._thread is not None:
+            self._inbox.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        self._requested.clear()
+
+    def _install(self, chunk: Chunk) -> Chunk:
+        self._chunks[(chunk.cx, chunk.cy)] = chunk
+        self.loads += 1
+        if self.on_load is not None:
+            self.on_load(chunk)
+        return chunk
+
+    def _evict(self, key: Tuple[int, int]) -> None:
+        chunk = self._chunks[key]
+        if self.on_unload is not None:
+            self.on_unload(chunk)
+        if chunk.dirty:
+            self._write(chunk)
+        del self._chunks[key]
+        self.evictions += 1
+
+    def _write(self, chunk: Chunk) -> None:
+        resources = [(x - chunk.x0, y - chunk.y0, name) for x, y, name in chunk.resources]
+        write_binary_map(_chunk_path(self.directory, chunk.cx, chunk.cy), chunk.cols, chunk.rows,
+                         self.tile_size, chunk.tiles, resources)
+        chunk.dirty = False
+
+    # ------------------------------------------------------------------
+    # Both threads
+    # ------------------------------------------------------------------
+    def _read(self, cx: int, cy: int) -> Chunk:
+        """Read chunk (cx, cy) from disk; touches no shared state."""
+        map_data = read_binary_map(_chunk_path(self.directory, cx, cy))
+        x0, y0 = cx * self.chunk_size, cy * self.chunk_size
+        tiles = bytearray(map_data['tiles'])
+        map_data['tiles'].release()
+        resources = [(x0 + x, y0 + y, name) for x, y, name in map_data['resources']]
+        return Chunk(cx, cy, x0, y0, map_data['width'], map_data['height'], tiles, resources)
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            message = self._inbox.get()
+            if message is None:
+                return
+            key, ticket = message
+            try:
+                self._finished.append((ticket, self._read(*key)))
+            except Exception as e:
+                game_logger.error(f"Chunk loader failed to read chunk {key}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split a JSON or binary map into a chunked map directory.")
+    parser.add_argument('source', help='map to read')
+    parser.add_argument('destination', help='chunked map directory to write')
+    parser.add_argument('--chunk-size', type=int, default=64, help='side length of a chunk in tiles')
+    args = parser.parse_args(argv)
+
+    # Loading through WorldState applies its walkability rules to the navigation layer
+    from src.game_state.world_state import WorldState
+    world = WorldState(map_file=args.source)
+    world.save_chunked(args.destination, args.chunk_size)
+    print(f"Wrote {world.width}x{world.height} map to {args.destination} in {args.chunk_size}x{args.chunk_size} chunks")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
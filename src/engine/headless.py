@@ -0,0 +1,183 @@
+"""
+Run the game world without a window, as fast as it will go.
+
+A HeadlessSimulation loads a map into a WorldState and a PlayerState whose
+player has no sprite, and runs game ticks back to back through the same
+tick scheduler the game uses: nothing is drawn, no display mode is set
+and no image is converted. A bot walks the player to random tiles near it
+whenever it stops, so pathfinding and movement are exercised as in play;
+with a save directory the game is also journaled every tick.
+
+It is meant for soak tests and bots. The report gives ticks per second
+and the time spent in each system:
+
+    python -m src.engine.headless [assets/maps/map.json] [--ticks 10000] [--seed 0] [--save-dir DIR]
+
+Game logging is cut to warnings unless --log-level says otherwise.
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from typing import Dict, Optional
+
+# No window and no sound device; set before pygame is first initialized
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from src.engine.logger import game_logger
+from src.engine.save_manager import SaveManager
+from src.game_state.player_state import PlayerState
+from src.game_state.world_state import WorldState
+
+DEFAULT_MAP = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'assets', 'maps', 'map.json')
+
+
+class HeadlessSimulation:
+    """A world and a bot-driven player ticking without a display; see the module docstring."""
+
+    def __init__(self, map_file: str = DEFAULT_MAP, seed: int = 0, wander_radius: int = 20,
+                 save_directory: Optional[str] = None, path_service: bool = False):
+        """
+        Load the map and place the player on a random walkable tile.
+
+        Args:
+            map_file: Map to load, in any format WorldState reads
+            seed: Seed for the player's start and the bot's destinations
+            wander_radius: Farthest the bot walks in one trip, in tiles on each axis
+            save_directory: Journal the game into this directory every tick if given
+            path_service: Search paths on the background worker, as PlayState does
+        """
+        self.rng = random.Random(seed)
+        self.wander_radius = wander_radius
+        self.world = WorldState(map_file=map_file)
+        if path_service:
+            self.world.start_path_service()
+        # Seconds spent per system; the scheduler adds its callbacks by name
+        self.timings: Dict[str, float] = {}
+        self.world.ticks.timings = self.timings
+
+        self.save_manager = None
+        if save_directory is not None:
+            self.save_manager = SaveManager(character_name='headless', save_directory=save_directory)
+        self.player_state = PlayerState(None, self.save_manager, world_state=self.world, headless=True)
+        self.player = self.player_state.create_player(*self._random_walkable_tile())
+        self.recorder = None  # A ReplayRecorder to write the bot's clicks to
+        self.trips = 0  # Destinations the bot has walked to or is walking to
+        self.ticks_run = 0
+        self.elapsed = 0.0
+        self.closed = False
+
+    def _random_walkable_tile(self, near=None):
+        """A random walkable tile, anywhere or within wander_radius of near."""
+        for _ in range(1000):
+            if near is None:
+                x, y = self.rng.randrange(self.world.width), self.rng.randrange(self.world.height)
+            else:
+                x = near[0] + self.rng.randint(-self.wander_radius, self.wander_radius)
+                y = near[1] + self.rng.randint(-self.wander_radius, self.wander_radius)
+            if self.world.is_walkable(x, y):
+                return x, y
+        raise ValueError("Could not find a walkable tile")
+
+    def _wander(self):
+        """Send the player somewhere new once it has stopped."""
+        player = self.player
+        if player.moving or player.path_request is not None:
+            return
+        try:
+            x, y = self._random_walkable_tile((player.grid_x, player.grid_y))
+        except ValueError:
+            return
+        self.click(x, y)
+        if player.moving or player.path_request is not None:
+            self.trips += 1
+
+    def click(self, tile_x: int, tile_y: int) -> None:
+        """Click a tile as the player would, recording the click if there is a recorder."""
+        if self.recorder is not None:
+            self.recorder.record_click(tile_x, tile_y)
+        self.player_state.handle_click(tile_x, tile_y)
+
+    def _timed(self, name, function, *args):
+        begin = time.perf_counter()
+        function(*args)
+        self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - begin
+
+    def run(self, ticks: int) -> None:
+        """
+        Run ticks game ticks back to back.
+
+        Each step is one frame of exactly one tick: the bot clicks if the
+        player is idle, WorldState.update delivers background paths and runs
+        the tick (timers, the player's paths and movement), PlayerState.update
+        animates, and the game is journaled if there is a save directory.
+        """
+        tick_interval = self.world.ticks.tick_interval
+        begin = time.perf_counter()
+        for _ in range(ticks):
+            self._timed('bot clicks (pathfinding)', self._wander)
+            self._timed('WorldState.update', self.world.update, tick_interval)
+            self._timed('PlayerState.update', self.player_state.update, tick_interval)
+            if self.save_manager is not None:
+                self._timed('SaveManager.auto_save', self.save_manager.auto_save,
+                            self.player, self.world, self.world.game_ticks)
+        self.elapsed += time.perf_counter() - begin
+        self.ticks_run += ticks
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks_run / self.elapsed if self.elapsed else 0.0
+
+    def report(self) -> str:
+        """Ticks per second and the time spent per system, as printed by the command line."""
+        lines = [f"{self.ticks_run} ticks in {self.elapsed:.2f} s: {self.ticks_per_second:,.0f} ticks/s "
+                 f"({self.world.width}x{self.world.height} map, {self.trips} trips, "
+                 f"player at {(self.player.grid_x, self.player.grid_y)})"]
+        # WorldState.update includes the tick callbacks, which are listed under it
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            per_tick = seconds / self.ticks_run * 1e6 if self.ticks_run else 0.0
+            share = seconds / self.elapsed if self.elapsed else 0.0
+            lines.append(f"  {name:40} {seconds * 1000:10.1f} ms  {per_tick:8.1f} us/tick  {share:6.1%}")
+        return '\n'.join(lines)
+
+    def close(self) -> None:
+        """Stop the background workers and write pending saves."""
+        if self.closed:
+            return
+        self.closed = True
+        self.world.stop_path_service()
+        self.world.stop_streaming()
+        if self.save_manager is not None:
+            self.save_manager.checkpoint(self.player, self.world, self.world.game_ticks)
+            self.save_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('map_file', nargs='?', default=DEFAULT_MAP, help="Map to simulate")
+    parser.add_argument('--ticks', type=int, default=10000, help="Game ticks to run")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the bot")
+    parser.add_argument('--radius', type=int, default=20, help="Farthest the bot walks in one trip, in tiles")
+    parser.add_argument('--save-dir', help="Journal the game into this directory every tick")
+    parser.add_argument('--path-service', action='store_true', help="Search paths on the background worker, as the game does")
+    parser.add_argument('--log-level', default='warning', choices=['debug', 'info', 'warning', 'error'],
+                        help="Game log level; the game logs every step at debug level, which dominates a fast run")
+    args = parser.parse_args()
+    game_logger.logger.setLevel(getattr(logging, args.log_level.upper()))
+
+    simulation = HeadlessSimulation(args.map_file, seed=args.seed, wander_radius=args.radius,
+                                    save_directory=args.save_dir, path_service=args.path_service)
+    try:
+        simulation.run(args.ticks)
+    finally:
+        simulation.close()
+    print(simulation.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
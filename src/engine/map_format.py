@@ -0,0 +1,250 @@
+"""
+Binary map format and converters to and from the JSON map format.
+
+Layout (little-endian):
+
+    header     24 bytes: magic b'PMAP', version (u16), header size (u16),
+               width (u32), height (u32), tile size (u16), reserved (u16),
+               resource count (u32)
+    tiles      width * height bytes, row-major (y * width + x), one tile code each
+    resources  resource count entries of x (u32), y (u32), type code (u8)
+
+Tile codes are the TileType values defined here (GRASS = 1 ... STONE = 5),
+so the tile layer can be used as WorldState.tile_grid without conversion.
+read_binary_map maps the file copy-on-write, which makes the tile layer a
+zero-copy view that can still be edited in memory; numpy users can wrap
+it with ``numpy.frombuffer(tiles, dtype=numpy.uint8).reshape(height, width)``.
+
+Usage:
+    python -m src.engine.map_format to-binary assets/maps/map.json assets/maps/map.bin
+    python -m src.engine.map_format to-json assets/maps/map.bin map.json
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+from enum import Enum, auto
+from typing import Dict, List, Tuple
+
+MAGIC = b'PMAP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIHHI')
+RESOURCE_ENTRY = struct.Struct('<IIB')
+
+
+class TileType(Enum):
+    """Types of tiles in the game world."""
+    GRASS = auto()
+    WATER = auto()
+    SAND = auto()
+    DIRT = auto()
+    STONE = auto()
+
+# Terrain is stored as one byte per tile holding TileType.value
+TILE_TYPES_BY_CODE = {tile_type.value: tile_type for tile_type in TileType}
+BLOCKING_TILE_TYPES = (TileType.WATER, TileType.STONE)
+
+# bytes.translate table mapping a tile code to 1 if the tile can be entered
+WALKABLE_BY_CODE = bytes(1 if code in TILE_TYPES_BY_CODE and TILE_TYPES_BY_CODE[code] not in BLOCKING_TILE_TYPES
+                         else 0 for code in range(256))
+
+# Tile names in code order; the code of a name is its index + 1
+TILE_NAMES = tuple(tile_type.name for tile_type in TileType)
+TILE_CODES = {tile_type.name: tile_type.value for tile_type in TileType}
+
+# Resource class names as used in the JSON format, in code order starting at 1
+RESOURCE_NAMES = ('Tree', 'Rock')
+RESOURCE_CODES = {name: code for code, name in enumerate(RESOURCE_NAMES, start=1)}
+
+# read_binary_map checks the tile layer for unknown codes this many bytes at a time
+SCAN_BYTES = 1 << 20
+
+
+def is_binary_map(path: str) -> bool:
+    """Whether the file at path starts with the binary map magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_binary_map(path: str) -> Dict:
+    """
+    Load a binary map.
+
+    The file is memory-mapped copy-on-write: the returned tile layer reads
+    straight from the page cache, and writes to it stay in this process.
+
+    Args:
+        path: Path of the binary map file
+
+    Returns:
+        dict: width, height, tile_size, tiles (writable memoryview of tile
+        codes) and resources (list of (x, y, type name) tuples)
+
+    Raises:
+        ValueError: If the file is not a binary map, is truncated, or holds
+            an unknown tile or resource code (the message gives its offset)
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapped) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a binary map")
+    magic, version, header_size, width, height, tile_size, _, resource_count = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a binary map")
+    if version > VERSION:
+        raise ValueError(f"{path} uses binary map version {version}, newer than supported ({VERSION})")
+
+    resources_offset = header_size + width * height
+    if len(mapped) < resources_offset + resource_count * RESOURCE_ENTRY.size:
+        raise ValueError(f"{path} is truncated")
+
+    # Deleting every known code leaves only the unknown ones; slices keep large maps from being copied whole
+    known_codes = bytes(TILE_TYPES_BY_CODE)
+    for start in range(header_size, resources_offset, SCAN_BYTES):
+        end = min(start + SCAN_BYTES, resources_offset)
+        if mapped[start:end].translate(None, known_codes):
+            offset = next(offset for offset in range(start, end) if mapped[offset] not in TILE_TYPES_BY_CODE)
+            raise ValueError(f"{path} has unknown tile code {mapped[offset]} at offset {offset}")
+
+    resources = []
+    for index, (x, y, code) in enumerate(RESOURCE_ENTRY.iter_unpack(
+            memoryview(mapped)[resources_offset:resources_offset + resource_count * RESOURCE_ENTRY.size])):
+        if not 1 <= code <= len(RESOURCE_NAMES):
+            offset = resources_offset + index * RESOURCE_ENTRY.size
+            raise ValueError(f"{path} has unknown resource code {code} in the entry at offset {offset}")
+        resources.append((x, y, RESOURCE_NAMES[code - 1]))
+
+    return {
+        'width': width,
+        'height': height,
+        'tile_size': tile_size,
+        'tiles': memoryview(mapped)[header_size:resources_offset],
+        'resources': resources,
+    }
+
+
+def write_binary_map(path: str, width: int, height: int, tile_size: int, tiles,
+                     resources: List[Tuple[int, int, str]]) -> None:
+    """
+    Write a binary map.
+
+    The file is written next to its destination and moved into place, so a
+    map that is still memory-mapped by a running game is never truncated.
+
+    Args:
+        path: Destination path
+        width: Width of the map in tiles
+        height: Height of the map in tiles
+        tile_size: Size of each tile in pixels
+        tiles: Buffer of width * height tile codes, row-major
+        resources: (x, y, type name) tuples; unknown type names are skipped
+    """
+    if len(tiles) != width * height:
+        raise ValueError(f"Expected {width * height} tile codes, got {len(tiles)}")
+    write_binary_map_bands(path, width, height, tile_size, [(tiles, resources)])
+
+
+def write_binary_map_bands(path: str, width: int, height: int, tile_size: int, bands) -> int:
+    """
+    Write a binary map from bands of whole rows, top to bottom.
+
+    Only one band is held at a time, so maps can be written while they are
+    being generated. Like write_binary_map, the file is moved into place
+    once complete.
+
+    Args:
+        path: Destination path
+        width: Width of the map in tiles
+        height: Height of the map in tiles
+        tile_size: Size of each tile in pixels
+        bands: Iterable of (tiles, resources): a buffer of whole rows of tile
+            codes and the (x, y, type name) tuples placed on them
+
+    Returns:
+        int: Number of resources written
+
+    Raises:
+        ValueError: If the bands do not add up to width * height tiles
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    entries = []
+    tile_count = 0
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, HEADER.size, width, height, tile_size, 0, 0))
+        for tiles, resources in bands:
+            tile_count += f.write(tiles)
+            entries.extend(RESOURCE_ENTRY.pack(x, y, RESOURCE_CODES[name])
+                           for x, y, name in resources if name in RESOURCE_CODES)
+        f.write(b''.join(entries))
+        # The resource count is only known now
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, HEADER.size, width, height, tile_size, 0, len(entries)))
+    if tile_count != width * height:
+        os.remove(temp_path)
+        raise ValueError(f"Expected {width * height} tile codes, got {tile_count}")
+    os.replace(temp_path, path)
+    return len(entries)
+
+
+def json_to_binary(json_path: str, binary_path: str) -> None:
+    """
+    Convert a JSON map to the binary format.
+
+    Unknown tile names become grass and unknown resource types are dropped,
+    as when WorldState loads the JSON map.
+    """
+    with open(json_path, 'r') as f:
+        map_data = json.load(f)
+    width, height = map_data['width'], map_data['height']
+    tiles = bytearray([TILE_CODES['GRASS']]) * (width * height)
+    grass = TILE_CODES['GRASS']
+    for y, row in enumerate(map_data['tiles'][:height]):
+        row = bytes(TILE_CODES.get(name, grass) for name in row[:width])
+        tiles[y * width:y * width + len(row)] = row
+    resources = []
+    for position, resource_data in map_data.get('resources', {}).items():
+        x, y = map(int, position.split(','))
+        resources.append((x, y, resource_data['type']))
+    write_binary_map(binary_path, width, height, map_data['tile_size'], tiles, resources)
+
+
+def binary_to_json(binary_path: str, json_path: str) -> None:
+    """Convert a binary map back to the JSON format written by WorldState.save_state."""
+    map_data = read_binary_map(binary_path)
+    width = map_data['width']
+    tiles = map_data['tiles']
+    json_data = {
+        'width': width,
+        'height': map_data['height'],
+        'tile_size': map_data['tile_size'],
+        'tiles': [[TILE_TYPES_BY_CODE[code].name for code in tiles[y * width:(y + 1) * width]]
+                  for y in range(map_data['height'])],
+        'resources': {f"{x},{y}": {'type': name, 'position': [x, y]}
+                      for x, y, name in map_data['resources']},
+    }
+    tiles.release()
+    with open(json_path, 'w') as f:
+        json.dump(json_data, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert maps between the JSON and binary formats.")
+    parser.add_argument('direction', choices=['to-binary', 'to-json'])
+    parser.add_argument('source', help='map to read')
+    parser.add_argument('destination', help='map to write')
+    args = parser.parse_args(argv)
+
+    if args.direction == 'to-binary':
+        json_to_binary(args.source, args.destination)
+    else:
+        binary_to_json(args.source, args.destination)
+    print(f"Wrote {args.destination} ({os.path.getsize(args.destination)} bytes)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
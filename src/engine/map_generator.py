@@ -1,131 +1,462 @@
+"""
+Procedural island maps in the WorldState map format.
+
+Terrain comes from fractal value noise: random values on an integer lattice,
+blended with a smoothstep curve and summed over several octaves. Elevation
+noise minus a radial falloff gives one island surrounded by water; a thin
+band above the water line becomes beach, the highest ground stone, and a
+second (moisture) noise field turns dry grass into dirt.
+
+Resources are placed with a jittered-grid sampler instead of rejection
+loops: the map is divided into cells, each cell proposes one candidate
+position, and candidates are kept where the terrain and a density mask
+allow. Offsets stay inside the first cell_size - 1 tiles of their cell, so
+two trees or rocks are never orthogonal neighbours and forests stay
+walkable.
+
+Every random value is a hash of (seed, world coordinates), not a draw from
+a stateful generator, so the same seed always gives the same map and any
+rectangle of it can be generated on its own with identical results.
+
+All of the work is done on whole NumPy arrays; a 4000x4000 map takes a few
+seconds. Larger maps are written straight to disk by MapGenerator.write_map,
+which generates bands of rows across a pool of worker processes. Because
+nothing depends on which band a tile is generated in, the bands join without
+seams and the file is the same for any number of workers.
+
+Usage:
+    python -m src.engine.map_generator [output] --size 8000 --workers 8 [--seed 1]
+    python -m src.engine.map_generator worlds/island --size 8000 --chunk-size 64
+"""
+import os
+import sys
+import json
+import time
 import random
-from enum import Enum
-from typing import List, Tuple, Dict, Optional
-from src.maps.tilemap import Tile, TileMap, TileType
-from src.entities.resources import Tree, Rock
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.engine.chunked_world import CHUNK_DIRECTORY, WALKABLE, write_chunk, write_manifest
+from src.engine.map_format import TILE_CODES, TILE_NAMES, WALKABLE_BY_CODE, write_binary_map, write_binary_map_bands
+
+GRASS = TILE_CODES['GRASS']
+WATER = TILE_CODES['WATER']
+SAND = TILE_CODES['SAND']
+DIRT = TILE_CODES['DIRT']
+STONE = TILE_CODES['STONE']
+
+# Salts that keep the noise fields and samplers independent of each other
+ELEVATION_SALT = 1
+MOISTURE_SALT = 2
+FOREST_SALT = 3
+TREE_SALT = 4
+ROCK_SALT = 5
+
+_MASK64 = (1 << 64) - 1
+
+# Rows generated per task when writing a binary map
+BAND_ROWS = 128
+DEFAULT_OUTPUT = os.path.join('assets', 'maps', 'generated_map.bin')
+
+WALKABLE_TABLE = np.frombuffer(WALKABLE_BY_CODE, dtype=np.uint8)
+
+
+def _hash(seed: int, salt: int, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Hash integer coordinates to well-mixed 64-bit values.
+
+    xs and ys are broadcast against each other; the result only depends on
+    seed, salt and the coordinates, never on the shape of the arrays.
+    """
+    key = np.uint64((seed * 0x9E3779B97F4A7C15 + salt * 0xD1B54A32D192ED03) & _MASK64)
+    h = (xs.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)) ^ \
+        (ys.astype(np.uint64) * np.uint64(0x165667B19E3779F9)) ^ key
+    # splitmix64 finalizer
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def _unit(h: np.ndarray) -> np.ndarray:
+    """Turn hashes into float32 values in [0, 1)."""
+    return (h >> np.uint64(40)).astype(np.float32) * np.float32(1.0 / (1 << 24))
+
+
+def _smoothstep(t: np.ndarray) -> np.ndarray:
+    return t * t * (3 - 2 * t)
+
+
+def value_noise(seed: int, salt: int, left: int, top: int, width: int, height: int,
+                scale: float) -> np.ndarray:
+    """
+    One octave of value noise over a rectangle of tiles.
+
+    Args:
+        seed: Map seed
+        salt: Distinguishes independent noise fields of the same seed
+        left, top: World position of the rectangle's top-left tile
+        width, height: Size of the rectangle in tiles
+        scale: Lattice spacing in tiles; larger values give smoother noise
+
+    Returns:
+        numpy.ndarray: float32 array of shape (height, width) in [0, 1)
+    """
+    def axis(start, count):
+        positions = (np.arange(start, start + count, dtype=np.float64) + 0.5) / scale
+        cells = np.floor(positions).astype(np.int64)
+        weights = _smoothstep((positions - cells).astype(np.float32))
+        return cells, weights
+
+    ix, sx = axis(left, width)
+    iy, sy = axis(top, height)
+    lattice_x = np.arange(ix[0], ix[-1] + 2)
+    lattice_y = np.arange(iy[0], iy[-1] + 2)
+    lattice = _unit(_hash(seed, salt, lattice_x[np.newaxis, :], lattice_y[:, np.newaxis]))
+
+    # Interpolate along x for every lattice row, then along y between rows
+    cols = ix - lattice_x[0]
+    rows = lattice[:, cols] * (1 - sx) + lattice[:, cols + 1] * sx
+    r = iy - lattice_y[0]
+    return rows[r] * (1 - sy)[:, np.newaxis] + rows[r + 1] * sy[:, np.newaxis]
+
+
+def fractal_noise(seed: int, salt: int, left: int, top: int, width: int, height: int,
+                  scale: float, octaves: int, persistence: float = 0.5) -> np.ndarray:
+    """
+    Sum octaves of value noise, halving the lattice spacing each octave.
+
+    Returns:
+        numpy.ndarray: float32 array of shape (height, width) in [0, 1)
+    """
+    total = np.zeros((height, width), dtype=np.float32)
+    amplitude = 1.0
+    amplitude_sum = 0.0
+    for octave in range(octaves):
+        total += np.float32(amplitude) * value_noise(seed, salt * 16 + octave, left, top, width, height,
+                                                     scale / (1 << octave))
+        amplitude_sum += amplitude
+        amplitude *= persistence
+    total *= np.float32(1.0 / amplitude_sum)
+    return total
+
 
 class MapGenerator:
     """
-    Handles generation of game maps with different biomes and features.
+    Generates island maps that WorldState can load.
+
+    Tiles are produced as a (height, width) uint8 array of tile codes (the
+    TileType values), resources as (x, y, type name) tuples, which is what
+    the binary map format stores.
     """
-    
-    def __init__(self, width: int, height: int, tile_size: int = 32):
+
+    def __init__(self, width: int, height: int, tile_size: int = 32, seed: Optional[int] = None):
         """
         Initialize the map generator.
-        
+
         Args:
             width: Width of the map in tiles
             height: Height of the map in tiles
             tile_size: Size of each tile in pixels
+            seed: Seed for reproducible maps; a random one is picked if omitted
         """
         self.width = width
         self.height = height
         self.tile_size = tile_size
-        self.tile_map = None
-        self.resources = {}
-    
-    def generate_map(self, seed: Optional[int] = None) -> TileMap:
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+
+        # Terrain shape
+        self.island_height = 0.5
+        self.falloff = 0.7
+        self.water_level = 0.5
+        self.beach_width = 0.025
+        self.stone_level = 0.97
+        self.dry_level = 0.4
+        # Resource density: one candidate per cell, kept with these chances
+        self.tree_cell_size = 3
+        self.rock_cell_size = 5
+        self.forest_threshold = 0.45
+        self.rock_chance_on_dirt = 0.35
+        self.rock_chance_on_grass = 0.03
+
+        # First octave features are about a quarter of the map across; stop
+        # once the lattice is finer than a few tiles
+        self.scale = max(16.0, max(width, height) / 4)
+        self.octaves = max(1, min(7, int(np.log2(self.scale / 3)) + 1))
+
+    def generate_map(self, seed: Optional[int] = None) -> Dict:
         """
-        Generate a new map with the specified dimensions.
-        
+        Generate the whole map.
+
         Args:
-            seed: Optional random seed for reproducible generation
-            
+            seed: Optional seed replacing the generator's seed
+
         Returns:
-            A new TileMap instance with generated terrain
+            dict: width, height, tile_size, tiles (uint8 array of shape
+            (height, width)) and resources (list of (x, y, type name))
         """
         if seed is not None:
-            random.seed(seed)
-        
-        # Create a new tilemap
-        self.tile_map = TileMap(self.width, self.height, self.tile_size)
-        self.resources = {}
-        
-        # Generate terrain
-        self._generate_terrain()
-        
-        # Add resources
-        self._add_resources()
-        
-        return self.tile_map
-    
-    def _generate_terrain(self):
-        """Generate the base terrain for the map."""
-        # Simple terrain generation - can be expanded with noise algorithms later
-        for y in range(self.height):
-            for x in range(self.width):
-                # Simple random terrain generation
-                rand_val = random.random()
-                
-                if rand_val < 0.05:  # 5% chance for water
-                    self.tile_map.set_tile(x, y, TileType.WATER)
-                elif rand_val < 0.1:  # 5% chance for sand (near water)
-                    self.tile_map.set_tile(x, y, TileType.SAND)
-                else:  # 90% chance for grass (main terrain)
-                    self.tile_map.set_tile(x, y, TileType.GRASS)
-    
-    def _add_resources(self):
-        """Add resources like trees and rocks to the map."""
-        # Add trees
-        num_trees = int(self.width * self.height * 0.03)  # 3% of map is trees
-        self._place_resources(num_trees, TileType.TREE, Tree)
-        
-        # Add rocks
-        num_rocks = int(self.width * self.height * 0.02)  # 2% of map is rocks
-        self._place_resources(num_rocks, TileType.ROCK, Rock)
-    
-    def _place_resources(self, count: int, tile_type: TileType, resource_class):
+            self.seed = seed
+        tiles = self.generate_tiles(0, 0, self.width, self.height)
+        return {
+            'width': self.width,
+            'height': self.height,
+            'tile_size': self.tile_size,
+            'tiles': tiles,
+            'resources': self.place_resources(tiles, 0, 0),
+        }
+
+    def generate_tiles(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        """
+        Generate the terrain of a rectangle of the map.
+
+        The result is the same as slicing the terrain of the whole map.
+
+        Returns:
+            numpy.ndarray: uint8 tile codes of shape (height, width)
+        """
+        elevation = fractal_noise(self.seed, ELEVATION_SALT, left, top, width, height,
+                                  self.scale, self.octaves)
+
+        # Radial falloff from the map centre sinks the edges below water
+        def axis(start, count, size):
+            centred = (np.arange(start, start + count, dtype=np.float32) + 0.5) * np.float32(2.0 / size) - 1
+            return centred * centred
+
+        distance = axis(left, width, self.width)[np.newaxis, :] + axis(top, height, self.height)[:, np.newaxis]
+        elevation += np.float32(self.island_height)
+        elevation -= np.float32(self.falloff) * distance
+
+        moisture = fractal_noise(self.seed, MOISTURE_SALT, left, top, width, height,
+                                 self.scale / 2, max(1, self.octaves - 2))
+
+        tiles = np.full((height, width), GRASS, dtype=np.uint8)
+        tiles[moisture < self.dry_level] = DIRT
+        tiles[elevation >= self.stone_level] = STONE
+        tiles[elevation < self.water_level + self.beach_width] = SAND
+        tiles[elevation < self.water_level] = WATER
+        return tiles
+
+    def place_resources(self, tiles: np.ndarray, left: int, top: int) -> List[Tuple[int, int, str]]:
         """
-        Place resources of a specific type on the map.
-        
+        Place trees and rocks on a rectangle of generated terrain.
+
         Args:
-            count: Number of resources to place
-            tile_type: The type of tile to place
-            resource_class: The class of resource to create
+            tiles: Terrain of the rectangle from generate_tiles
+            left, top: World position of the rectangle's top-left tile
+
+        Returns:
+            list: (x, y, type name) tuples in world coordinates
+
+        Raises:
+            ValueError: If tree_cell_size or rock_cell_size is below 2
         """
-        placed = 0
-        attempts = 0
-        max_attempts = count * 2  # Limit placement attempts
-        
-        while placed < count and attempts < max_attempts:
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            
-            # Only place on grass tiles that don't already have a resource
-            tile = self.tile_map.get_tile(x, y)
-            if tile and tile.tile_type == TileType.GRASS and (x, y) not in self.resources:
-                # Create and place the resource
-                resource = resource_class(x, y)
-                self.resources[(x, y)] = resource
-                self.tile_map.set_tile(x, y, tile_type)
-                placed += 1
-                
-            attempts += 1
-    
-    def get_resources(self) -> dict:
+        height, width = tiles.shape
+        forest = fractal_noise(self.seed, FOREST_SALT, left, top, width, height,
+                               max(8.0, self.scale / 8), 3)
+
+        rock_x, rock_y, rock_keep = self._candidates(ROCK_SALT, self.rock_cell_size, left, top, width, height)
+        terrain = tiles[rock_y - top, rock_x - left]
+        chance = np.where(terrain == DIRT, self.rock_chance_on_dirt,
+                          np.where(terrain == GRASS, self.rock_chance_on_grass, 0.0))
+        rock_keep &= _unit(_hash(self.seed, ROCK_SALT + 16, rock_x, rock_y)) < chance
+        rock_x, rock_y = rock_x[rock_keep], rock_y[rock_keep]
+
+        tree_x, tree_y, tree_keep = self._candidates(TREE_SALT, self.tree_cell_size, left, top, width, height)
+        terrain = tiles[tree_y - top, tree_x - left]
+        density = (forest[tree_y - top, tree_x - left] - self.forest_threshold) / (1 - self.forest_threshold)
+        tree_keep &= (terrain == GRASS) & (_unit(_hash(self.seed, TREE_SALT + 16, tree_x, tree_y)) < density * 2)
+        # A rock wins over a tree proposed for the same tile
+        occupied = np.zeros((height, width), dtype=bool)
+        occupied[rock_y - top, rock_x - left] = True
+        tree_keep &= ~occupied[tree_y - top, tree_x - left]
+        tree_x, tree_y = tree_x[tree_keep], tree_y[tree_keep]
+
+        return ([(x, y, 'Tree') for x, y in zip(tree_x.tolist(), tree_y.tolist())] +
+                [(x, y, 'Rock') for x, y in zip(rock_x.tolist(), rock_y.tolist())])
+
+    def write_map(self, path: str, workers: int = 1, chunk_size: Optional[int] = None) -> int:
+        """
+        Generate the map and write it to disk as it is generated.
+
+        The map is split into bands of whole rows that are generated across
+        a pool of worker processes, so the whole map is never held in
+        memory. The output does not depend on the number of workers.
+
+        Args:
+            path: Binary map file to write, or the chunked map directory if
+                chunk_size is given
+            workers: Number of worker processes; 1 generates in this process
+            chunk_size: Write a chunked map (see src.engine.chunked_world)
+                with chunks of this many tiles a side; each worker writes
+                the chunk files of the rows it generated
+
+        Returns:
+            int: Number of resources placed
+        """
+        if chunk_size:
+            return self._write_chunked(path, workers, chunk_size)
+        bands = [(self, top, min(BAND_ROWS, self.height - top)) for top in range(0, self.height, BAND_ROWS)]
+        return write_binary_map_bands(path, self.width, self.height, self.tile_size,
+                                      _run(_generate_band, bands, workers))
+
+    def _write_chunked(self, directory: str, workers: int, chunk_size: int) -> int:
+        """Write a chunked map, one row of chunks per task."""
+        os.makedirs(os.path.join(directory, CHUNK_DIRECTORY), exist_ok=True)
+        chunk_rows = [(self, directory, chunk_size, cy) for cy in range((self.height + chunk_size - 1) // chunk_size)]
+        walkable_path = os.path.join(directory, WALKABLE)
+        resource_count = 0
+        with open(walkable_path + '.tmp', 'wb') as f:
+            for walkable, count in _run(_generate_chunk_row, chunk_rows, workers):
+                f.write(walkable)
+                resource_count += count
+        os.replace(walkable_path + '.tmp', walkable_path)
+        write_manifest(directory, self.width, self.height, self.tile_size, chunk_size)
+        return resource_count
+
+    def _candidates(self, salt: int, cell_size: int, left: int, top: int, width: int, height: int):
         """
-        Get the dictionary of resources on the map.
-        
+        One jittered candidate per cell overlapping the rectangle.
+
         Returns:
-            Dictionary mapping (x, y) coordinates to Resource objects
+            tuple: flat world x and y arrays of the candidates, and a mask of
+            those inside the rectangle
         """
-        return self.resources
+        if cell_size < 2:
+            # Offsets fall in the first cell_size - 1 tiles, which leaves nothing to jitter over
+            raise ValueError(f"Resource cell size must be at least 2, not {cell_size}")
+        cells_x = np.arange(left // cell_size, (left + width - 1) // cell_size + 1)
+        cells_y = np.arange(top // cell_size, (top + height - 1) // cell_size + 1)
+        cells_x, cells_y = np.meshgrid(cells_x, cells_y)
+        h = _hash(self.seed, salt, cells_x.ravel(), cells_y.ravel())
+        jitter = np.uint64(cell_size - 1)
+        xs = cells_x.ravel() * cell_size + (h % jitter).astype(np.int64)
+        ys = cells_y.ravel() * cell_size + ((h >> np.uint64(32)) % jitter).astype(np.int64)
+        inside = (xs >= left) & (xs < left + width) & (ys >= top) & (ys < top + height)
+        xs = np.where(inside, xs, left)
+        ys = np.where(inside, ys, top)
+        return xs, ys, inside
 
 
-def create_map(width: int, height: int, tile_size: int = 32, seed: Optional[int] = None) -> Tuple[TileMap, dict]:
+def _run(function, tasks, workers: int):
+    """Yield function(*task) for each task in order, across worker processes if workers > 1."""
+    if workers <= 1:
+        for task in tasks:
+            yield function(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(function, *zip(*tasks))
+
+
+def _generate_band(generator: MapGenerator, top: int, rows: int):
+    """Terrain and resources of whole rows top to top + rows; runs in a worker process."""
+    tiles = generator.generate_tiles(0, top, generator.width, rows)
+    return tiles, generator.place_resources(tiles, 0, top)
+
+
+def _generate_chunk_row(generator: MapGenerator, directory: str, chunk_size: int, cy: int):
+    """
+    Generate row cy of chunks and write their chunk files; runs in a worker process.
+
+    Returns:
+        tuple: walkability bytes of the rows and the number of resources placed
     """
-    Convenience function to create a new map with resources.
-    
+    top = cy * chunk_size
+    tiles, resources = _generate_band(generator, top, min(chunk_size, generator.height - top))
+    rows = tiles.shape[0]
+
+    walkable = WALKABLE_TABLE[tiles]
+    by_chunk: Dict[int, list] = {}
+    for x, y, name in resources:
+        # Trees and rocks both block movement
+        walkable[y - top, x] = 0
+        by_chunk.setdefault(x // chunk_size, []).append((x % chunk_size, y - top, name))
+
+    for cx in range((generator.width + chunk_size - 1) // chunk_size):
+        x0 = cx * chunk_size
+        chunk_tiles = np.ascontiguousarray(tiles[:, x0:x0 + chunk_size])
+        write_chunk(directory, cx, cy, chunk_tiles.shape[1], rows, generator.tile_size,
+                    chunk_tiles.reshape(-1), by_chunk.get(cx, []))
+    return walkable.tobytes(), len(resources)
+
+
+def to_json_data(map_data: Dict) -> Dict:
+    """Convert a generated map to the JSON format read by WorldState."""
+    names = np.array(TILE_NAMES)[map_data['tiles'] - 1]
+    return {
+        'width': map_data['width'],
+        'height': map_data['height'],
+        'tile_size': map_data['tile_size'],
+        'tiles': names.tolist(),
+        'resources': {f"{x},{y}": {'type': name, 'position': [x, y]}
+                      for x, y, name in map_data['resources']},
+    }
+
+
+def save_map(map_data: Dict, path: str) -> None:
+    """
+    Write a generated map, as a binary map if path ends in .bin and as JSON otherwise.
+    """
+    if path.endswith('.bin'):
+        write_binary_map(path, map_data['width'], map_data['height'], map_data['tile_size'],
+                         np.ascontiguousarray(map_data['tiles']).reshape(-1), map_data['resources'])
+    else:
+        with open(path, 'w') as f:
+            json.dump(to_json_data(map_data), f)
+
+
+def create_map(width: int, height: int, tile_size: int = 32, seed: Optional[int] = None,
+               path: Optional[str] = None) -> Dict:
+    """
+    Convenience function to generate a map and optionally save it.
+
     Args:
         width: Width of the map in tiles
         height: Height of the map in tiles
         tile_size: Size of each tile in pixels
         seed: Optional random seed for reproducible generation
-        
+        path: If given, the map is written there (see save_map)
+
     Returns:
-        A tuple containing the generated TileMap and a dictionary of resources
+        dict: The generated map, see MapGenerator.generate_map
     """
-    generator = MapGenerator(width, height, tile_size)
-    tile_map = generator.generate_map(seed)
-    resources = generator.get_resources()
-    return tile_map, resources
+    map_data = MapGenerator(width, height, tile_size, seed).generate_map()
+    if path is not None:
+        save_map(map_data, path)
+    return map_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate an island map.")
+    parser.add_argument('output', nargs='?', default=DEFAULT_OUTPUT,
+                        help='binary map (.bin) or JSON map (.json) to write; '
+                             'a chunked map directory with --chunk-size')
+    parser.add_argument('--size', type=int, default=1000, help='width and height of the map in tiles')
+    parser.add_argument('--width', type=int, help='width of the map in tiles (overrides --size)')
+    parser.add_argument('--height', type=int, help='height of the map in tiles (overrides --size)')
+    parser.add_argument('--seed', type=int, help='seed for reproducible maps (random if omitted)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--chunk-size', type=int, help='write a chunked map with chunks of this many tiles a side')
+    parser.add_argument('--tile-size', type=int, default=32, help='size of a tile in pixels')
+    args = parser.parse_args(argv)
+
+    generator = MapGenerator(args.width or args.size, args.height or args.size, args.tile_size, args.seed)
+    begin = time.perf_counter()
+    if args.output.endswith('.json') and not args.chunk_size:
+        # JSON is written from the whole map in memory
+        map_data = generator.generate_map()
+        save_map(map_data, args.output)
+        resource_count = len(map_data['resources'])
+    else:
+        resource_count = generator.write_map(args.output, args.workers, args.chunk_size)
+    print(f"Wrote {generator.width}x{generator.height} map (seed {generator.seed}, {resource_count} resources) "
+          f"to {args.output} in {time.perf_counter() - begin:.2f} s")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+Pathfinding engines for tile-based movement.
+"""
+
+from .astar import GridAStar, octile_distance
+from .jps import JumpPointSearch
+from .hpa import HierarchicalPathfinder, RefiningPath
+from .path_cache import PathCache
+from .path_service import PathfindingService, PathRequest
+
+# Engines selectable by name, each built as cls(width, height, walkable_grid)
+ENGINES = {'astar': GridAStar, 'jps': JumpPointSearch, 'hpa': HierarchicalPathfinder}
+
+__all__ = ['GridAStar', 'JumpPointSearch', 'HierarchicalPathfinder', 'RefiningPath', 'PathCache',
+           'PathfindingService', 'PathRequest', 'ENGINES', 'octile_distance']
@@ -0,0 +1,175 @@
+"""
+A* pathfinding over a flat, row-major tile grid.
+"""
+import heapq
+from array import array
+from typing import List, Optional, Tuple
+
+# Movement costs (sqrt(2) for diagonal, 1 for cardinal)
+STRAIGHT_COST = 1.0
+DIAGONAL_COST = 1.4142
+
+# Possible movement directions (8-way movement including diagonals)
+DIRECTIONS = (
+    (0, 1), (1, 0), (0, -1), (-1, 0),   # Cardinal directions
+    (1, 1), (1, -1), (-1, 1), (-1, -1)  # Diagonal directions
+)
+
+
+def octile_distance(x1: int, y1: int, x2: int, y2: int) -> float:
+    """
+    Diagonal distance heuristic (admissible and consistent for 8-way movement).
+
+    Args:
+        x1, y1: First grid position
+        x2, y2: Second grid position
+
+    Returns:
+        float: Cost of the cheapest obstacle-free route between the positions
+    """
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    return STRAIGHT_COST * (dx + dy) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * min(dx, dy)
+
+
+class GridAStar:
+    """
+    A* search over a width x height tile grid.
+
+    The open set is a binary heap with lazy deletion: improved nodes are simply
+    pushed again and stale entries are skipped once their node is closed.
+    G-scores, parents and closed flags live in flat arrays indexed by
+    ``y * width + x``. The arrays are reused between searches; each entry is
+    stamped with the id of the search that wrote it, so nothing has to be
+    cleared between calls.
+    """
+
+    def __init__(self, width: int, height: int, walkable_grid):
+        """
+        Initialize the search buffers.
+
+        Args:
+            width: Width of the grid in tiles
+            height: Height of the grid in tiles
+            walkable_grid: Row-major bytes-like grid, non-zero where a tile can be
+                entered. It is read live, so in-place updates are seen by later searches.
+        """
+        self.width = width
+        self.height = height
+        self.walkable_grid = walkable_grid
+        self.nodes_expanded = 0  # Nodes closed by the most recent search
+
+        size = width * height
+        self._g_score = array('d', bytes(8 * size))
+        self._parent = array('q', bytes(8 * size))
+        self._seen = array('I', bytes(4 * size))    # Search id that set g/parent
+        self._closed = array('I', bytes(4 * size))  # Search id that closed the node
+        self._search_id = 0
+
+    def _next_search_id(self) -> int:
+        """Advance the search stamp, clearing the buffers if it wraps around."""
+        self._search_id += 1
+        if self._search_id > 0xFFFFFFFF:
+            size = self.width * self.height
+            self._seen = array('I', bytes(4 * size))
+            self._closed = array('I', bytes(4 * size))
+            self._search_id = 1
+        return self._search_id
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find the cheapest path from start to goal.
+
+        Diagonal steps are only allowed when both adjacent cardinal tiles are
+        walkable, so paths never cut corners.
+
+        Args:
+            start: (x, y) grid coordinates to start from
+            goal: (x, y) grid coordinates to reach
+
+        Returns:
+            List of (x, y) tuples from start to goal inclusive, or None if no path exists
+        """
+        width, height = self.width, self.height
+        walkable = self.walkable_grid
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        self.nodes_expanded = 0
+
+        if not (0 <= start_x < width and 0 <= start_y < height):
+            return None
+        if not (0 <= goal_x < width and 0 <= goal_y < height) or not walkable[goal_y * width + goal_x]:
+            return None
+
+        search_id = self._next_search_id()
+        g_score, parent, seen, closed = self._g_score, self._parent, self._seen, self._closed
+
+        start_index = start_y * width + start_x
+        goal_index = goal_y * width + goal_x
+        g_score[start_index] = 0.0
+        parent[start_index] = -1
+        seen[start_index] = search_id
+
+        open_heap = [(octile_distance(start_x, start_y, goal_x, goal_y), start_index)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        diagonal_extra = DIAGONAL_COST - 2 * STRAIGHT_COST
+        expanded = 0
+
+        while open_heap:
+            _, current = heappop(open_heap)
+            if closed[current] == search_id:
+                continue  # Stale entry for a node that was already expanded
+            closed[current] = search_id
+            expanded += 1
+
+            if current == goal_index:
+                self.nodes_expanded = expanded
+                return self._reconstruct(current)
+
+            y, x = divmod(current, width)
+            current_g = g_score[current]
+
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                neighbor = ny * width + nx
+                if not walkable[neighbor]:
+                    continue
+
+                if dx and dy:
+                    # Prevent cutting through walls diagonally
+                    if not walkable[current + dx] or not walkable[neighbor - dx]:
+                        continue
+                    tentative_g = current_g + DIAGONAL_COST
+                else:
+                    tentative_g = current_g + STRAIGHT_COST
+
+                if closed[neighbor] == search_id:
+                    continue
+                if seen[neighbor] == search_id and tentative_g >= g_score[neighbor]:
+                    continue
+
+                seen[neighbor] = search_id
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+
+                hx = abs(nx - goal_x)
+                hy = abs(ny - goal_y)
+                h = hx + hy + diagonal_extra * (hx if hx < hy else hy)
+                heappush(open_heap, (tentative_g + h, neighbor))
+
+        self.nodes_expanded = expanded
+        return None
+
+    def _reconstruct(self, index: int) -> List[Tuple[int, int]]:
+        """Walk the parent array back from index to the start of the search."""
+        width = self.width
+        parent = self._parent
+        path = []
+        while index != -1:
+            y, x = divmod(index, width)
+            path.append((x, y))
+            index = parent[index]
+        path.reverse()
+        return path
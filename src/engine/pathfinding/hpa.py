@@ -0,0 +1,515 @@
+"""
+Hierarchical pathfinding (HPA*) over a flat, row-major tile grid.
+"""
+import heapq
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .astar import DIRECTIONS, DIAGONAL_COST, STRAIGHT_COST, octile_distance
+
+# Border runs at least this long get an entrance at each end instead of one in the middle
+LONG_ENTRANCE_RUN = 8
+
+
+class RefiningPath:
+    """
+    A tile path that is refined from abstract waypoints only as it is consumed.
+
+    Supports the list operations the movement code relies on: truthiness,
+    indexing, slicing with an explicit stop, ``pop(0)`` and iteration. Asking
+    for ``len()``, a negative index or an open-ended slice refines the whole
+    remaining route.
+    """
+
+    def __init__(self, start: Tuple[int, int], waypoints: List[Tuple[int, int]],
+                 refine: Callable[[Tuple[int, int], Tuple[int, int]], Optional[List[Tuple[int, int]]]]):
+        """
+        Initialize the path.
+
+        Args:
+            start: First tile of the path
+            waypoints: Remaining abstract waypoints after start, ending at the goal
+            refine: Callable (a, b) -> tile list from a to b inclusive, or None if blocked
+        """
+        self._tiles = [start]
+        self._last = start
+        self._waypoints = deque(waypoints)
+        self._refine = refine
+
+    def _ensure(self, count: Optional[int] = None) -> None:
+        """Refine segments until at least count tiles are buffered (all if None)."""
+        while self._waypoints and (count is None or len(self._tiles) < count):
+            target = self._waypoints.popleft()
+            segment = self._refine(self._last, target)
+            if not segment:
+                # The world changed under the route; stop at the last reachable tile
+                self._waypoints.clear()
+                return
+            self._tiles.extend(segment[1:])
+            self._last = target
+
+    @property
+    def is_refined(self) -> bool:
+        """True once every segment has been turned into tiles."""
+        return not self._waypoints
+
+    def __bool__(self) -> bool:
+        return bool(self._tiles) or bool(self._waypoints)
+
+    def __len__(self) -> int:
+        self._ensure()
+        return len(self._tiles)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0 or (index.start or 0) < 0:
+                self._ensure()
+            else:
+                self._ensure(index.stop)
+        elif index < 0:
+            self._ensure()
+        else:
+            self._ensure(index + 1)
+        return self._tiles[index]
+
+    def __iter__(self):
+        self._ensure()
+        return iter(list(self._tiles))
+
+    def pop(self, index: int = 0) -> Tuple[int, int]:
+        """Remove and return a tile, refining the next segment if needed."""
+        self._ensure(index + 1 if index >= 0 else None)
+        return self._tiles.pop(index)
+
+
+class _Cluster:
+    """Cached abstract-graph data for one chunk."""
+    __slots__ = ('x0', 'y0', 'cols', 'rows', 'is_open', 'crossings', 'intra_edges', 'adjacency')
+
+    def __init__(self, x0: int, y0: int, cols: int, rows: int):
+        self.x0 = x0
+        self.y0 = y0
+        self.cols = cols
+        self.rows = rows
+        self.is_open = False   # True when every tile is walkable, so distances are octile
+        self.crossings = {}    # node -> list of partner nodes across chunk borders
+        self.intra_edges = {}  # node -> {node: walking distance}, filled on demand
+        self.adjacency = None  # Local movement graph, built by the first bounded search
+
+
+class HierarchicalPathfinder:
+    """
+    HPA* search: plan on a graph of cluster entrances, then refine locally.
+
+    The grid is split into cluster_size x cluster_size chunks. Wherever two
+    neighbouring chunks share a run of walkable border tiles, one or two
+    entrance crossings are placed. Inside each chunk, the walking distance
+    between its entrances is found with a search bounded to the chunk.
+    Long routes are planned over that small abstract graph, and the tiles of
+    each leg are only worked out when the walker gets there.
+
+    Entrances and intra-chunk distances are computed the first time a search
+    reaches them and cached. Changing a tile drops the cached edges of its own
+    chunk; if the tile lies on a chunk border whose entrances move, the chunk
+    across that border is dropped as well.
+    """
+
+    def __init__(self, width: int, height: int, walkable_grid, cluster_size: int = 16):
+        """
+        Initialize the pathfinder.
+
+        Args:
+            width: Width of the grid in tiles
+            height: Height of the grid in tiles
+            walkable_grid: Row-major bytes-like grid, non-zero where a tile can be entered
+            cluster_size: Side length of a chunk in tiles
+        """
+        self.width = width
+        self.height = height
+        self.walkable_grid = walkable_grid
+        self.cluster_size = cluster_size
+        self.clusters_x = (width + cluster_size - 1) // cluster_size
+        self.clusters_y = (height + cluster_size - 1) // cluster_size
+        self.nodes_expanded = 0  # Abstract nodes closed by the most recent search
+        # Values above 1 trade a little route length for far fewer abstract expansions
+        self.heuristic_weight = 1.0
+
+        self._borders = {}   # (cx, cy, 'E'|'S') -> list of ((x, y), (x, y)) crossings
+        self._clusters = {}  # (cx, cy) -> _Cluster
+
+    # ------------------------------------------------------------------
+    # Cache maintenance
+    # ------------------------------------------------------------------
+    def invalidate_tile(self, x: int, y: int) -> None:
+        """
+        Drop cached abstract edges affected by a change to tile (x, y).
+
+        Args:
+            x: X coordinate of the changed tile
+            y: Y coordinate of the changed tile
+        """
+        size = self.cluster_size
+        cx, cy = x // size, y // size
+        self._clusters.pop((cx, cy), None)
+
+        local_x, local_y = x % size, y % size
+        if local_x == 0 and cx > 0:
+            self._refresh_border(cx - 1, cy, 'E')
+        if local_x == size - 1:
+            self._refresh_border(cx, cy, 'E')
+        if local_y == 0 and cy > 0:
+            self._refresh_border(cx, cy - 1, 'S')
+        if local_y == size - 1:
+            self._refresh_border(cx, cy, 'S')
+
+    def _refresh_border(self, cx: int, cy: int, side: str) -> None:
+        """Rescan a cached border; if its entrances moved, drop both adjoining chunks."""
+        key = (cx, cy, side)
+        old = self._borders.get(key)
+        if old is None:
+            return
+        new = self._scan_border(cx, cy, side)
+        self._borders[key] = new
+        if new != old:
+            self._clusters.pop((cx, cy), None)
+            self._clusters.pop((cx + 1, cy) if side == 'E' else (cx, cy + 1), None)
+
+    # ------------------------------------------------------------------
+    # Abstract graph construction
+    # ------------------------------------------------------------------
+    def _cluster_of(self, tile: Tuple[int, int]) -> Tuple[int, int]:
+        return tile[0] // self.cluster_size, tile[1] // self.cluster_size
+
+    def _border(self, cx: int, cy: int, side: str) -> list:
+        """Crossings on the east ('E') or south ('S') border of a chunk."""
+        key = (cx, cy, side)
+        crossings = self._borders.get(key)
+        if crossings is None:
+            crossings = self._scan_border(cx, cy, side)
+            self._borders[key] = crossings
+        return crossings
+
+    def _scan_border(self, cx: int, cy: int, side: str) -> list:
+        """Find entrance crossings between a chunk and its east or south neighbour."""
+        size, width, height = self.cluster_size, self.width, self.height
+        grid = self.walkable_grid
+        if side == 'E':
+            x = (cx + 1) * size - 1
+            if x + 1 >= width:
+                return []
+            pairs = [((x, y), (x + 1, y)) for y in range(cy * size, min((cy + 1) * size, height))]
+        else:
+            y = (cy + 1) * size - 1
+            if y + 1 >= height:
+                return []
+            pairs = [((x, y), (x, y + 1)) for x in range(cx * size, min((cx + 1) * size, width))]
+
+        crossings = []
+        run = []
+        for inside, outside in pairs:
+            if grid[inside[1] * width + inside[0]] and grid[outside[1] * width + outside[0]]:
+                run.append((inside, outside))
+                continue
+            self._add_entrances(run, crossings)
+            run = []
+        self._add_entrances(run, crossings)
+        return crossings
+
+    @staticmethod
+    def _add_entrances(run: list, crossings: list) -> None:
+        """Place entrances for one contiguous run of open border crossings."""
+        if not run:
+            return
+        if len(run) >= LONG_ENTRANCE_RUN:
+            crossings.append(run[0])
+            crossings.append(run[-1])
+        else:
+            crossings.append(run[len(run) // 2])
+
+    def _cluster(self, cx: int, cy: int) -> '_Cluster':
+        """Get a chunk's abstract graph data, creating it on first use."""
+        cluster = self._clusters.get((cx, cy))
+        if cluster is not None:
+            return cluster
+
+        size = self.cluster_size
+        x0, y0 = cx * size, cy * size
+        cluster = _Cluster(x0, y0, min(size, self.width - x0), min(size, self.height - y0))
+        grid, width = self.walkable_grid, self.width
+        cluster.is_open = all(
+            grid.find(0, row, row + cluster.cols) == -1
+            for row in range((y0 * width) + x0, (y0 + cluster.rows) * width, width)
+        )
+        borders = [(cx, cy, 'E', 0), (cx, cy, 'S', 0), (cx - 1, cy, 'E', 1), (cx, cy - 1, 'S', 1)]
+        for bx, by, side, own in borders:
+            if bx < 0 or by < 0:
+                continue
+            for pair in self._border(bx, by, side):
+                cluster.crossings.setdefault(pair[own], []).append(pair[1 - own])
+
+        self._clusters[(cx, cy)] = cluster
+        return cluster
+
+    def _adjacency(self, cluster: '_Cluster') -> list:
+        """
+        Local movement graph of a chunk: for each local tile index, a list of
+        (neighbour local index, step cost). Built once per chunk so the bounded
+        searches need no bounds or corner checks.
+        """
+        if cluster.adjacency is not None:
+            return cluster.adjacency
+        width, grid = self.width, self.walkable_grid
+        cols, rows = cluster.cols, cluster.rows
+        adjacency = [()] * (cols * rows)
+        for ly in range(rows):
+            row_index = (cluster.y0 + ly) * width + cluster.x0
+            for lx in range(cols):
+                index = row_index + lx
+                if not grid[index]:
+                    continue
+                steps = []
+                for dx, dy in DIRECTIONS:
+                    nx, ny = lx + dx, ly + dy
+                    if nx < 0 or ny < 0 or nx >= cols or ny >= rows:
+                        continue
+                    neighbor = index + dy * width + dx
+                    if not grid[neighbor]:
+                        continue
+                    if dx and dy:
+                        if not grid[index + dx] or not grid[neighbor - dx]:
+                            continue
+                        steps.append((ny * cols + nx, DIAGONAL_COST))
+                    else:
+                        steps.append((ny * cols + nx, STRAIGHT_COST))
+                adjacency[ly * cols + lx] = steps
+        cluster.adjacency = adjacency
+        return adjacency
+
+    def _intra_edges(self, node: Tuple[int, int]) -> Dict[Tuple[int, int], float]:
+        """
+        Walking distances from an entrance to the other entrances of its chunk.
+
+        Computed with one bounded search the first time the node is expanded
+        and cached with the chunk, so only chunks a search actually crosses pay
+        for their distances.
+        """
+        cluster = self._cluster(*self._cluster_of(node))
+        edges = cluster.intra_edges.get(node)
+        if edges is None:
+            others = [other for other in cluster.crossings if other != node]
+            edges = self._distances(cluster, node, others)
+            cluster.intra_edges[node] = edges
+        return edges
+
+    def _distances(self, cluster: '_Cluster', source: Tuple[int, int], targets) -> Dict[Tuple[int, int], float]:
+        """Walking distances from source to the targets it can reach inside the chunk."""
+        if cluster.is_open:
+            return {t: octile_distance(source[0], source[1], t[0], t[1]) for t in targets}
+        return self._search_cluster(cluster, source, targets)[0]
+
+    def _search_cluster(self, cluster: '_Cluster', source: Tuple[int, int], targets) -> tuple:
+        """
+        Uniform-cost search from source that never leaves the given chunk.
+
+        Args:
+            cluster: Chunk to stay inside
+            source: Tile to search from
+            targets: Tiles to find; the search stops once all are settled
+
+        Returns:
+            (costs, parent): costs maps each reachable target to its walking
+            distance; parent is the local-index parent list of the search
+        """
+        adjacency = self._adjacency(cluster)
+        cols, x0, y0 = cluster.cols, cluster.x0, cluster.y0
+        size = len(adjacency)
+        local_targets = {(t[1] - y0) * cols + (t[0] - x0): t for t in targets}
+        remaining = set(local_targets)
+
+        source_local = (source[1] - y0) * cols + (source[0] - x0)
+        dist = [float('inf')] * size
+        parent = [-1] * size
+        settled = bytearray(size)
+        dist[source_local] = 0.0
+        heap = [(0.0, source_local)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        costs = {}
+
+        while heap and remaining:
+            cost, current = heappop(heap)
+            if settled[current]:
+                continue
+            settled[current] = 1
+            if current in remaining:
+                remaining.discard(current)
+                costs[local_targets[current]] = cost
+            for neighbor, step in adjacency[current]:
+                new_cost = cost + step
+                if new_cost < dist[neighbor]:
+                    dist[neighbor] = new_cost
+                    parent[neighbor] = current
+                    heappush(heap, (new_cost, neighbor))
+        return costs, parent
+
+    def precompute(self) -> None:
+        """
+        Analyse every chunk up front instead of on first use.
+
+        Useful behind a loading screen: afterwards no search pays for chunk
+        analysis until tiles change.
+        """
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                for node in self._cluster(cx, cy).crossings:
+                    self._intra_edges(node)
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+    def find_waypoints(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Plan a route over the abstract graph.
+
+        Args:
+            start: (x, y) grid coordinates to start from
+            goal: (x, y) grid coordinates to reach
+
+        Returns:
+            List of waypoint tiles from start to goal inclusive, or None if unreachable
+        """
+        width = self.width
+        self.nodes_expanded = 0
+        for x, y in (start, goal):
+            if not (0 <= x < width and 0 <= y < self.height):
+                return None
+        if not self.walkable_grid[goal[1] * width + goal[0]]:
+            return None
+        if start == goal:
+            return [start]
+
+        start_cluster = self._cluster_of(start)
+        goal_cluster = self._cluster_of(goal)
+
+        # Temporary edges from the start and goal to their chunks' entrances
+        cluster = self._cluster(*start_cluster)
+        start_nodes = [n for n in cluster.crossings if n != start]
+        if goal_cluster == start_cluster:
+            start_nodes.append(goal)
+        start_edges = self._distances(cluster, start, start_nodes)
+
+        cluster = self._cluster(*goal_cluster)
+        goal_edges = self._distances(cluster, goal, list(cluster.crossings))
+
+        g_score = {start: 0.0}
+        parent = {start: None}
+        closed = set()
+        # Ties on f are broken towards the larger g, i.e. nodes closer to the goal
+        weight = self.heuristic_weight
+        heap = [(weight * octile_distance(start[0], start[1], goal[0], goal[1]), 0.0, start)]
+        expanded = 0
+
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            expanded += 1
+            if node == goal:
+                self.nodes_expanded = expanded
+                waypoints = []
+                while node is not None:
+                    waypoints.append(node)
+                    node = parent[node]
+                waypoints.reverse()
+                return waypoints
+
+            crossings = self._cluster(*self._cluster_of(node)).crossings
+            if node == start:
+                edges = list(start_edges.items())
+            elif node in crossings:
+                edges = list(self._intra_edges(node).items())
+            else:
+                edges = []
+            edges.extend((partner, STRAIGHT_COST) for partner in crossings.get(node, ()))
+            if node in goal_edges:
+                edges.append((goal, goal_edges[node]))
+
+            node_g = g_score[node]
+            for neighbor, cost in edges:
+                if neighbor in closed:
+                    continue
+                tentative_g = node_g + cost
+                if tentative_g < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = node
+                    h = weight * octile_distance(neighbor[0], neighbor[1], goal[0], goal[1])
+                    heapq.heappush(heap, (tentative_g + h, -tentative_g, neighbor))
+
+        self.nodes_expanded = expanded
+        return None
+
+    def refine_segment(self, a: Tuple[int, int], b: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Turn one abstract leg into tiles.
+
+        Args:
+            a: Leg start
+            b: Leg end; either in the same chunk as a or directly across a border
+
+        Returns:
+            List of tiles from a to b inclusive, or None if the leg is now blocked
+        """
+        if not self.walkable_grid[b[1] * self.width + b[0]]:
+            return None
+        cluster_key = self._cluster_of(a)
+        if self._cluster_of(b) != cluster_key:
+            return [a, b]
+        cluster = self._cluster(*cluster_key)
+        if cluster.is_open:
+            return self._open_line(a, b)
+        costs, parent = self._search_cluster(cluster, a, [b])
+        if b not in costs:
+            return None
+        cols, x0, y0 = cluster.cols, cluster.x0, cluster.y0
+        source_local = (a[1] - y0) * cols + (a[0] - x0)
+        index = (b[1] - y0) * cols + (b[0] - x0)
+        tiles = [b]
+        while index != source_local:
+            index = parent[index]
+            ly, lx = divmod(index, cols)
+            tiles.append((x0 + lx, y0 + ly))
+        tiles.reverse()
+        return tiles
+
+    @staticmethod
+    def _open_line(a: Tuple[int, int], b: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Cheapest tiles from a to b over open ground: diagonal steps first, then straight."""
+        x, y = a
+        tiles = [a]
+        while (x, y) != b:
+            x += (b[0] > x) - (b[0] < x)
+            y += (b[1] > y) - (b[1] < y)
+            tiles.append((x, y))
+        return tiles
+
+    def find_lazy_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[RefiningPath]:
+        """
+        Plan a route and return it as a path that refines itself while it is walked.
+
+        Returns:
+            RefiningPath from start to goal, or None if unreachable
+        """
+        waypoints = self.find_waypoints(start, goal)
+        if waypoints is None:
+            return None
+        return RefiningPath(waypoints[0], waypoints[1:], self.refine_segment)
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Plan and fully refine a route.
+
+        Returns:
+            List of (x, y) tuples from start to goal inclusive, or None if unreachable
+        """
+        path = self.find_lazy_path(start, goal)
+        return list(path) if path is not None else None
@@ -0,0 +1,236 @@
+"""
+Jump Point Search over a flat, row-major tile grid.
+"""
+import heapq
+from typing import List, Optional, Tuple
+
+from .astar import GridAStar, octile_distance
+
+
+class JumpPointSearch(GridAStar):
+    """
+    Jump Point Search for uniform-cost 8-way grids without corner cutting.
+
+    Instead of expanding every neighbour, the search "jumps" along straight
+    and diagonal lines and only adds nodes where the route can branch (forced
+    neighbours) or the goal is reached. Diagonal steps follow the same rule as
+    GridAStar: both adjacent cardinal tiles must be walkable. Path costs are
+    identical to GridAStar's; only far fewer nodes are expanded on open terrain.
+
+    Search buffers are inherited from GridAStar and only touched at jump points.
+    """
+
+    def _walkable(self, x: int, y: int) -> bool:
+        """Bounds-checked lookup in the walkability grid."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.walkable_grid[y * self.width + x] != 0
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find the cheapest path from start to goal.
+
+        Args:
+            start: (x, y) grid coordinates to start from
+            goal: (x, y) grid coordinates to reach
+
+        Returns:
+            List of (x, y) tuples from start to goal inclusive, one per tile,
+            or None if no path exists
+        """
+        width, height = self.width, self.height
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        self.nodes_expanded = 0
+
+        if not (0 <= start_x < width and 0 <= start_y < height):
+            return None
+        if not self._walkable(goal_x, goal_y):
+            return None
+
+        search_id = self._next_search_id()
+        g_score, parent, seen, closed = self._g_score, self._parent, self._seen, self._closed
+
+        start_index = start_y * width + start_x
+        goal_index = goal_y * width + goal_x
+        g_score[start_index] = 0.0
+        parent[start_index] = -1
+        seen[start_index] = search_id
+
+        open_heap = [(octile_distance(start_x, start_y, goal_x, goal_y), start_index)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expanded = 0
+
+        while open_heap:
+            _, current = heappop(open_heap)
+            if closed[current] == search_id:
+                continue
+            closed[current] = search_id
+            expanded += 1
+
+            if current == goal_index:
+                self.nodes_expanded = expanded
+                return self._reconstruct(current)
+
+            y, x = divmod(current, width)
+            current_g = g_score[current]
+            parent_index = parent[current]
+
+            for dx, dy in self._successor_directions(x, y, parent_index):
+                jump_point = self._jump(x, y, dx, dy, goal_x, goal_y)
+                if jump_point is None:
+                    continue
+                jx, jy = jump_point
+                neighbor = jy * width + jx
+                if closed[neighbor] == search_id:
+                    continue
+
+                tentative_g = current_g + octile_distance(x, y, jx, jy)
+                if seen[neighbor] == search_id and tentative_g >= g_score[neighbor]:
+                    continue
+
+                seen[neighbor] = search_id
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                heappush(open_heap, (tentative_g + octile_distance(jx, jy, goal_x, goal_y), neighbor))
+
+        self.nodes_expanded = expanded
+        return None
+
+    def _successor_directions(self, x: int, y: int, parent_index: int) -> List[Tuple[int, int]]:
+        """
+        Directions worth jumping in from (x, y), pruned by the direction of travel.
+
+        Args:
+            x, y: Node being expanded
+            parent_index: Flat index of the node's parent, or -1 for the start node
+
+        Returns:
+            List of (dx, dy) unit directions
+        """
+        walkable = self._walkable
+        if parent_index == -1:
+            directions = []
+            for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                if walkable(x + dx, y + dy):
+                    directions.append((dx, dy))
+            for dx, dy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                if walkable(x + dx, y) and walkable(x, y + dy) and walkable(x + dx, y + dy):
+                    directions.append((dx, dy))
+            return directions
+
+        py, px = divmod(parent_index, self.width)
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        directions = []
+
+        if dx and dy:
+            # Diagonal travel: continue diagonally and along both of its components
+            vertical = walkable(x, y + dy)
+            horizontal = walkable(x + dx, y)
+            if vertical:
+                directions.append((0, dy))
+            if horizontal:
+                directions.append((dx, 0))
+            if vertical and horizontal and walkable(x + dx, y + dy):
+                directions.append((dx, dy))
+        elif dx:
+            # Horizontal travel: forward plus the sides that may have been forced
+            forward = walkable(x + dx, y)
+            for side in (1, -1):
+                if walkable(x, y + side):
+                    directions.append((0, side))
+                    if forward and walkable(x + dx, y + side):
+                        directions.append((dx, side))
+            if forward:
+                directions.append((dx, 0))
+        else:
+            # Vertical travel
+            forward = walkable(x, y + dy)
+            for side in (1, -1):
+                if walkable(x + side, y):
+                    directions.append((side, 0))
+                    if forward and walkable(x + side, y + dy):
+                        directions.append((side, dy))
+            if forward:
+                directions.append((0, dy))
+        return directions
+
+    def _jump(self, x: int, y: int, dx: int, dy: int, goal_x: int, goal_y: int) -> Optional[Tuple[int, int]]:
+        """
+        Follow a direction from (x, y) until a jump point, the goal or an obstacle.
+
+        Args:
+            x, y: Position to jump from
+            dx, dy: Unit direction of travel
+            goal_x, goal_y: Goal position
+
+        Returns:
+            (x, y) of the jump point, or None if the line dead-ends
+        """
+        if dx and dy:
+            walkable = self._walkable
+            while True:
+                # Diagonal steps may not cut corners
+                if not walkable(x + dx, y) or not walkable(x, y + dy):
+                    return None
+                x += dx
+                y += dy
+                if not walkable(x, y):
+                    return None
+                if x == goal_x and y == goal_y:
+                    return x, y
+                if (self._jump_straight(x, y, dx, 0, goal_x, goal_y) is not None or
+                        self._jump_straight(x, y, 0, dy, goal_x, goal_y) is not None):
+                    return x, y
+        return self._jump_straight(x, y, dx, dy, goal_x, goal_y)
+
+    def _jump_straight(self, x: int, y: int, dx: int, dy: int, goal_x: int, goal_y: int) -> Optional[Tuple[int, int]]:
+        """Cardinal part of _jump: stop where a blocked tile behind opens a side route."""
+        width, height = self.width, self.height
+        grid = self.walkable_grid
+        index = y * width + x
+        goal_index = goal_y * width + goal_x
+
+        if dx:
+            has_above = y > 0
+            has_below = y < height - 1
+            while True:
+                x += dx
+                index += dx
+                if x < 0 or x >= width or not grid[index]:
+                    return None
+                if index == goal_index:
+                    return x, y
+                # The tile we came from is always in bounds, so only the side rows need checks
+                if has_above and grid[index - width] and not grid[index - width - dx]:
+                    return x, y
+                if has_below and grid[index + width] and not grid[index + width - dx]:
+                    return x, y
+
+        step = dy * width
+        has_left = x > 0
+        has_right = x < width - 1
+        while True:
+            y += dy
+            index += step
+            if y < 0 or y >= height or not grid[index]:
+                return None
+            if index == goal_index:
+                return x, y
+            if has_left and grid[index - 1] and not grid[index - 1 - step]:
+                return x, y
+            if has_right and grid[index + 1] and not grid[index + 1 - step]:
+                return x, y
+
+    def _reconstruct(self, index: int) -> List[Tuple[int, int]]:
+        """Expand the chain of jump points into one entry per tile walked."""
+        jump_points = super()._reconstruct(index)
+        path = [jump_points[0]]
+        for tx, ty in jump_points[1:]:
+            x, y = path[-1]
+            dx = (tx > x) - (tx < x)
+            dy = (ty > y) - (ty < y)
+            while (x, y) != (tx, ty):
+                x += dx
+                y += dy
+                path.append((x, y))
+        return path
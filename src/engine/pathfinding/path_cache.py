@@ -0,0 +1,114 @@
+"""
+LRU cache of finished paths with per-tile invalidation.
+"""
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# A tile change can invalidate a path through it or, via the no-corner-cutting rule, next to it
+_NEIGHBOURHOOD = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+
+
+class PathCache:
+    """
+    Least-recently-used cache of tile paths keyed by (start, goal).
+
+    Every cached path is indexed by the tiles it walks over and their eight
+    neighbours, so a change to one tile drops exactly the paths it could
+    affect. Failed searches are not cached: any tile in the world could open
+    a route, so there is nothing precise to index them by.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of paths kept; 0 disables caching
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (start, goal) -> tuple of tiles
+        self._tile_index = {}          # (x, y) -> set of keys whose path is on or next to it
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Look up a cached path.
+
+        Returns:
+            A fresh list of tiles the caller may consume, or None on a miss
+        """
+        key = (start, goal)
+        path = self._entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return list(path)
+
+    def put(self, start: Tuple[int, int], goal: Tuple[int, int], path: List[Tuple[int, int]]) -> None:
+        """Store a path, evicting the least recently used entries beyond max_size."""
+        if self.max_size <= 0:
+            return
+        key = (start, goal)
+        if key in self._entries:
+            self._discard(key)
+        path = tuple(path)
+        self._entries[key] = path
+        index = self._tile_index
+        for x, y in path:
+            for dx, dy in _NEIGHBOURHOOD:
+                tile = (x + dx, y + dy)
+                keys = index.get(tile)
+                if keys is None:
+                    index[tile] = {key}
+                else:
+                    keys.add(key)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate_tile(self, x: int, y: int) -> int:
+        """
+        Drop every path that runs over or next to tile (x, y).
+
+        Returns:
+            Number of paths dropped
+        """
+        keys = self._tile_index.get((x, y))
+        if not keys:
+            return 0
+        keys = list(keys)
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop every cached path; the hit and miss counters are kept."""
+        self._entries.clear()
+        self._tile_index.clear()
+
+    def _discard(self, key) -> None:
+        """Remove one entry and its tile index references."""
+        path = self._entries.pop(key)
+        index = self._tile_index
+        for x, y in path:
+            for dx, dy in _NEIGHBOURHOOD:
+                tile = (x + dx, y + dy)
+                keys = index.get(tile)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[tile]
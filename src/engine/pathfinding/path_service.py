@@ -0,0 +1,196 @@
+"""
+Background pathfinding so that searches never run inside a frame.
+"""
+import queue
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+from src.engine.logger import game_logger
+
+
+class PathRequest:
+    """
+    A path search submitted to a PathfindingService.
+
+    The request is finished once ``done`` is True; ``path`` then holds the
+    tile list (start and goal inclusive) or None if no path exists.
+    """
+
+    def __init__(self, start: Tuple[int, int], goal: Tuple[int, int], engine: str, owner=None):
+        """
+        Initialize the request.
+
+        Args:
+            start: (x, y) grid coordinates to start from
+            goal: (x, y) grid coordinates to reach
+            engine: Name of the engine to search with
+            owner: Requests from the same owner replace each other; None never does
+        """
+        self.start = start
+        self.goal = goal
+        self.engine = engine
+        self.owner = owner
+        self.path = None
+        self.done = False
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Discard the request; it will not be searched or delivered."""
+        self.cancelled = True
+
+
+class PathfindingService:
+    """
+    Solves path requests on a worker thread and delivers them on a later frame.
+
+    The worker searches its own copy of the walkability grid. Tile changes
+    made on the main thread are forwarded to it in order with the requests,
+    so every search sees the grid as it was when the request was made.
+    Results are handed over by ``poll()``, which runs on the main thread:
+    a path that a later tile change has blocked is searched again, and good
+    paths are stored in the world's path cache.
+
+    A newer request from the same owner (e.g. the next click of a player)
+    cancels the older one. A search that is already running is not
+    interrupted, but its result is thrown away.
+    """
+
+    def __init__(self, world_state, engines: dict):
+        """
+        Initialize the service and start its worker thread.
+
+        Args:
+            world_state: WorldState whose grid is searched
+            engines: Mapping of engine name -> engine class (width, height, walkable_grid)
+        """
+        self.world_state = world_state
+        self._engine_classes = engines
+        self._grid = bytearray(world_state.walkable_grid)  # Only touched by the worker thread
+        self._width = world_state.width
+        self._height = world_state.height
+        self._engines = {}
+
+        self._pending = {}             # owner -> latest PathRequest
+        self._inbox = queue.Queue()    # main -> worker: ('tile', x, y, walkable) / ('path', request) / None
+        self._finished = deque()       # worker -> main: searched requests
+        self._thread = threading.Thread(target=self._run, name='pathfinding', daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Main thread API
+    # ------------------------------------------------------------------
+    def request(self, start: Tuple[int, int], goal: Tuple[int, int], engine: str = None, owner=None) -> PathRequest:
+        """
+        Submit a search; the result arrives through a later ``poll()``.
+
+        Args:
+            start: (x, y) grid coordinates to start from
+            goal: (x, y) grid coordinates to reach
+            engine: Engine name; defaults to the world's choice for this distance
+            owner: Any hashable; an earlier request from the same owner is cancelled
+
+        Returns:
+            The PathRequest, to be checked for ``done``
+        """
+        if engine is not None and engine not in self._engine_classes:
+            raise ValueError(f"Unknown pathfinding engine: {engine}")
+        world = self.world_state
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        use_cache = engine is None
+        request = PathRequest(start, goal, engine or world.select_path_engine(start, goal), owner)
+
+        if owner is not None:
+            previous = self._pending.get(owner)
+            if previous is not None and not previous.done:
+                previous.cancel()
+            self._pending[owner] = request
+
+        if not world.is_walkable(*goal):
+            self._finished.append(request)
+            return request
+        if use_cache:
+            cached = world.path_cache.get(start, goal)
+            if cached is not None:
+                request.path = cached
+                self._finished.append(request)
+                return request
+
+        self._inbox.put(('path', request))
+        return request
+
+    def tile_changed(self, x: int, y: int, walkable: int) -> None:
+        """Forward a walkability change to the worker's copy of the grid."""
+        self._inbox.put(('tile', x, y, walkable))
+
+    def poll(self) -> List[PathRequest]:
+        """
+        Deliver finished searches. Call once per frame on the main thread.
+
+        Returns:
+            Requests that became done during this call
+        """
+        world = self.world_state
+        delivered = []
+        for _ in range(len(self._finished)):
+            request = self._finished.popleft()
+            if request.cancelled:
+                continue
+            path = request.path
+            if path and not all(world.is_walkable(x, y) for x, y in path[1:]):
+                # The world changed after the search; try again against the new grid
+                game_logger.debug(f"Path to {request.goal} was blocked while searching, requeueing")
+                request.path = None
+                self._inbox.put(('path', request))
+                continue
+            if path:
+                world.path_cache.put(request.start, request.goal, path)
+            request.done = True
+            delivered.append(request)
+            if self._pending.get(request.owner) is request:
+                del self._pending[request.owner]
+        return delivered
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Cancel everything outstanding and stop the worker thread."""
+        for request in self._pending.values():
+            request.cancel()
+        self._pending.clear()
+        self._inbox.put(None)
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            message = self._inbox.get()
+            if message is None:
+                return
+            if message[0] == 'tile':
+                _, x, y, walkable = message
+                self._grid[y * self._width + x] = walkable
+                hierarchical = self._engines.get('hpa')
+                if hierarchical is not None:
+                    hierarchical.invalidate_tile(x, y)
+                continue
+
+            request = message[1]
+            if request.cancelled:
+                continue
+            try:
+                path = self._engine(request.engine).find_path(request.start, request.goal)
+            except Exception as e:
+                game_logger.error(f"Pathfinding worker failed on {request.start} -> {request.goal}: {e}")
+                path = None
+            request.path = list(path) if path is not None else None
+            self._finished.append(request)
+
+    def _engine(self, name: str):
+        """Worker-side engine instance over the worker's grid."""
+        engine = self._engines.get(name)
+        if engine is None:
+            engine = self._engine_classes[name](self._width, self._height, self._grid)
+            self._engines[name] = engine
+        return engine
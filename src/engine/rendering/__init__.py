@@ -0,0 +1,10 @@
+"""
+Rendering helpers for drawing the world efficiently.
+"""
+
+from .terrain_cache import TerrainChunkCache
+from .viewport import ScrollingViewport
+from .render_queue import RenderQueue, LAYER_GROUND, LAYER_SPRITES, LAYER_OVERLAY
+
+__all__ = ['TerrainChunkCache', 'ScrollingViewport', 'RenderQueue',
+           'LAYER_GROUND', 'LAYER_SPRITES', 'LAYER_OVERLAY']
@@ -0,0 +1,84 @@
+"""
+Depth-sorted sprite queue drawn with a single Surface.blits call.
+"""
+from typing import List, Optional, Tuple
+
+import pygame
+
+# Layers are drawn in order; within a layer, items with a smaller sort key are drawn first
+LAYER_GROUND = 0   # Decals lying on the terrain, e.g. click indicators
+LAYER_SPRITES = 1  # Resources, the player and other upright objects, sorted by the y of their base
+LAYER_OVERLAY = 2  # Progress bars and labels that stay on top of every sprite
+
+
+class RenderQueue:
+    """
+    Collects the sprites of a frame and draws them back to front.
+
+    Entities submit a surface, a screen position and a sort key (usually
+    the world y of the point they stand on) instead of blitting themselves.
+    flush() sorts the items once, so an object whose base is lower on the
+    screen is drawn in front of the ones behind it, and hands them to
+    ``Surface.blits`` in one call. Items with equal keys keep their
+    submission order.
+
+    flush() can also return dirty rects: the areas covered by this frame's
+    items together with those covered by the previous frame's, which is
+    what ``pygame.display.update`` needs to refresh when only sprites have
+    changed since the last frame.
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self.flushed = 0  # Items drawn by the last flush, for profiling and tests
+        self._items = []
+        self._previous_rects: List[pygame.Rect] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def submit(self, surface: pygame.Surface, position: Tuple[int, int], sort_key: float = 0,
+               layer: int = LAYER_SPRITES, area: Optional[pygame.Rect] = None) -> None:
+        """
+        Queue a surface to be drawn this frame.
+
+        Args:
+            surface: The image to draw
+            position: Screen position of the image's top-left corner
+            sort_key: Depth within the layer; larger keys are drawn later (in front)
+            layer: LAYER_GROUND, LAYER_SPRITES, LAYER_OVERLAY or any other int
+            area: Optional part of the surface to draw, as for Surface.blit
+        """
+        self._items.append((layer, sort_key, len(self._items), surface, position, area))
+
+    def clear(self) -> None:
+        """Drop the queued items without drawing them."""
+        self._items.clear()
+
+    def flush(self, screen: pygame.Surface, dirty: bool = False) -> Optional[List[pygame.Rect]]:
+        """
+        Draw every queued item in depth order and empty the queue.
+
+        Args:
+            screen: The surface to draw on
+            dirty: If True, return the rects that changed since the previous flush
+
+        Returns:
+            List of screen rects to pass to pygame.display.update when dirty
+            is True, otherwise None
+        """
+        items = self._items
+        items.sort(key=lambda item: item[:3])
+        blits = [(surface, position) if area is None else (surface, position, area)
+                 for _, _, _, surface, position, area in items]
+        self.flushed = len(blits)
+        self._items = []
+
+        rects = screen.blits(blits, doreturn=dirty)
+        if not dirty:
+            self._previous_rects = []
+            return None
+        bounds = screen.get_rect()
+        changed = [rect.clip(bounds) for rect in rects + self._previous_rects]
+        self._previous_rects = rects
+        return [rect for rect in changed if rect.width and rect.height]
@@ -0,0 +1,115 @@
+"""
+Pre-rendered terrain chunks for drawing the tile map with a few blits.
+"""
+from collections import OrderedDict
+from typing import Tuple
+
+import pygame
+
+
+class TerrainChunkCache:
+    """
+    Bakes chunk_size x chunk_size tile regions into surfaces and draws the visible ones.
+
+    Terrain rarely changes, so instead of blitting every visible tile each
+    frame the tiles of a chunk are drawn once onto a chunk surface. A frame
+    then costs one blit per chunk overlapping the camera. Chunks are baked on
+    first use, dropped when a tile inside them changes and re-baked the next
+    time they are visible. At most max_chunks surfaces are kept; the least
+    recently drawn chunks are evicted first.
+    """
+
+    def __init__(self, world_state, chunk_size: int = 16, max_chunks: int = 48):
+        """
+        Initialize the cache.
+
+        Args:
+            world_state: WorldState whose tiles are drawn
+            chunk_size: Side length of a chunk in tiles
+            max_chunks: Number of baked chunk surfaces to keep; never fewer than are visible
+        """
+        self.world_state = world_state
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.bakes = 0  # Chunks baked so far, for profiling and tests
+        self.generation = 0  # Bumped whenever every chunk is dropped
+        self._chunks = OrderedDict()  # (cx, cy) -> pygame.Surface, least recently drawn first
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __contains__(self, chunk: Tuple[int, int]) -> bool:
+        return chunk in self._chunks
+
+    def invalidate_tile(self, x: int, y: int) -> None:
+        """Drop the baked chunk containing tile (x, y)."""
+        self._chunks.pop((x // self.chunk_size, y // self.chunk_size), None)
+
+    def invalidate_all(self) -> None:
+        """Drop every baked chunk, e.g. after the map or tile images were reloaded."""
+        self._chunks.clear()
+        self.generation += 1
+
+    def draw(self, screen: pygame.Surface, camera_x: int, camera_y: int, area: pygame.Rect = None) -> None:
+        """
+        Draw the terrain visible through the camera.
+
+        Args:
+            screen: The surface to draw on
+            camera_x: Camera x offset in pixels
+            camera_y: Camera y offset in pixels
+            area: Optional screen rectangle to limit drawing to; only chunks
+                overlapping it are blitted, clipped to it
+        """
+        world = self.world_state
+        chunk_pixels = self.chunk_size * world.tile_size
+        if area is None:
+            area = screen.get_rect()
+        max_cx = (world.width - 1) // self.chunk_size
+        max_cy = (world.height - 1) // self.chunk_size
+        start_cx = max(0, (camera_x + area.left) // chunk_pixels)
+        start_cy = max(0, (camera_y + area.top) // chunk_pixels)
+        end_cx = min(max_cx, (camera_x + area.right - 1) // chunk_pixels)
+        end_cy = min(max_cy, (camera_y + area.bottom - 1) // chunk_pixels)
+        if start_cx > end_cx or start_cy > end_cy:
+            return
+
+        chunks = self._chunks
+        blits = []
+        for cy in range(start_cy, end_cy + 1):
+            for cx in range(start_cx, end_cx + 1):
+                key = (cx, cy)
+                surface = chunks.get(key)
+                if surface is None:
+                    surface = self._bake(cx, cy)
+                    chunks[key] = surface
+                else:
+                    chunks.move_to_end(key)
+                blits.append((surface, (cx * chunk_pixels - camera_x, cy * chunk_pixels - camera_y)))
+        clip = screen.get_clip()
+        screen.set_clip(area.clip(clip))
+        screen.blits(blits, doreturn=False)
+        screen.set_clip(clip)
+
+        # Chunks drawn by this call were just moved to the end, so older ones go first
+        limit = max(self.max_chunks, len(blits))
+        while len(chunks) > limit:
+            chunks.popitem(last=False)
+
+    def _bake(self, cx: int, cy: int) -> pygame.Surface:
+        """Render the tiles of one chunk onto a new surface."""
+        world = self.world_state
+        size, tile_size = self.chunk_size, world.tile_size
+        x0, y0 = cx * size, cy * size
+        cols = min(size, world.width - x0)
+        rows = min(size, world.height - y0)
+
+        surface = pygame.Surface((cols * tile_size, rows * tile_size))
+        if pygame.display.get_surface() is not None:
+            # Match the display format so the per-frame blits need no conversion
+            surface = surface.convert()
+        for ly in range(rows):
+            for lx in range(cols):
+                world.draw_tile(surface, x0 + lx, y0 + ly, lx * tile_size, ly * tile_size)
+        self.bakes += 1
+        return surface
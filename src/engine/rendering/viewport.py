@@ -0,0 +1,109 @@
+"""
+Viewport renderer that reuses last frame's terrain while the camera scrolls.
+"""
+from typing import List
+
+import pygame
+
+
+class ScrollingViewport:
+    """
+    Keeps the terrain of the previous frame in an offscreen buffer.
+
+    When the camera moves by a few pixels, the buffer is shifted with
+    ``Surface.scroll`` and only the row and column strips that scrolled into
+    view are drawn from the terrain cache. Tiles changed while on screen are
+    redrawn individually. The whole buffer is redrawn on the first frame,
+    after a resize, and when the camera jumps by more than max_scroll of the
+    screen in one frame, since scrolling would then save little.
+    """
+
+    def __init__(self, terrain_cache, max_scroll: float = 0.5):
+        """
+        Initialize the viewport.
+
+        Args:
+            terrain_cache: TerrainChunkCache that draws the terrain
+            max_scroll: Largest camera move, as a fraction of the screen size,
+                that is handled by scrolling instead of a full redraw
+        """
+        self.terrain_cache = terrain_cache
+        self.max_scroll = max_scroll
+        self.full_redraws = 0   # Frames that redrew the whole buffer
+        self.strip_redraws = 0  # Frames that scrolled and redrew only exposed strips
+        self._buffer = None
+        self._camera = None
+        self._generation = terrain_cache.generation
+        self._dirty_tiles = []  # World pixel rects of changed tiles to redraw
+
+    def invalidate(self) -> None:
+        """Force a full redraw on the next frame."""
+        self._camera = None
+
+    def invalidate_tile(self, x: int, y: int) -> None:
+        """Redraw tile (x, y) on the next frame if it is on screen."""
+        tile_size = self.terrain_cache.world_state.tile_size
+        self._dirty_tiles.append(pygame.Rect(x * tile_size, y * tile_size, tile_size, tile_size))
+
+    def draw(self, screen: pygame.Surface, camera_x: int, camera_y: int) -> None:
+        """
+        Draw the terrain visible through the camera.
+
+        Args:
+            screen: The surface to draw on
+            camera_x: Camera x offset in pixels
+            camera_y: Camera y offset in pixels
+        """
+        width, height = screen.get_size()
+        buffer = self._buffer
+        if buffer is None or buffer.get_size() != (width, height):
+            buffer = self._buffer = pygame.Surface((width, height), 0, screen)
+            self._camera = None
+        if self._generation != self.terrain_cache.generation:
+            # The map or tile images were reloaded
+            self._generation = self.terrain_cache.generation
+            self._camera = None
+
+        if self._camera is None:
+            self._redraw(buffer.get_rect(), camera_x, camera_y)
+            self.full_redraws += 1
+        else:
+            dx = camera_x - self._camera[0]
+            dy = camera_y - self._camera[1]
+            if abs(dx) > width * self.max_scroll or abs(dy) > height * self.max_scroll:
+                self._redraw(buffer.get_rect(), camera_x, camera_y)
+                self.full_redraws += 1
+            else:
+                areas = self._exposed_strips(width, height, dx, dy)
+                if dx or dy:
+                    buffer.scroll(-dx, -dy)
+                    self.strip_redraws += 1
+                for rect in self._dirty_tiles:
+                    areas.append(rect.move(-camera_x, -camera_y))
+                for area in areas:
+                    area = area.clip(buffer.get_rect())
+                    if area.width and area.height:
+                        self._redraw(area, camera_x, camera_y)
+
+        self._dirty_tiles.clear()
+        self._camera = (camera_x, camera_y)
+        screen.blit(buffer, (0, 0))
+
+    @staticmethod
+    def _exposed_strips(width: int, height: int, dx: int, dy: int) -> List[pygame.Rect]:
+        """Screen areas left without content after scrolling by (-dx, -dy)."""
+        strips = []
+        if dx > 0:
+            strips.append(pygame.Rect(width - dx, 0, dx, height))
+        elif dx < 0:
+            strips.append(pygame.Rect(0, 0, -dx, height))
+        if dy > 0:
+            strips.append(pygame.Rect(0, height - dy, width, dy))
+        elif dy < 0:
+            strips.append(pygame.Rect(0, 0, width, -dy))
+        return strips
+
+    def _redraw(self, area: pygame.Rect, camera_x: int, camera_y: int) -> None:
+        """Clear one buffer area and draw the terrain inside it."""
+        self._buffer.fill((0, 0, 0), area)
+        self.terrain_cache.draw(self._buffer, camera_x, camera_y, area)
@@ -0,0 +1,356 @@
+"""
+Record game sessions and play them back tick for tick.
+
+A ReplayRecorder writes the player's input (tile clicks and key presses),
+each with the game tick it happened on, and seeds the random module with
+a seed it writes too. After every tick it writes a checksum of the world
+and the player. A ReplayPlayer rebuilds the world the recording started
+from, feeds the input back in on the same ticks through the tick
+scheduler and compares the checksums tick by tick, so the first tick on
+which the game behaves differently is reported.
+
+Replays are JSON lines, like the save journals:
+
+    {"replay": 1, "map_file": ..., "seed": ..., "tick": 0, "player": [x, y], "changes": {...}, "timers": [...]}
+    {"tick": 12, "click": [4, 5]}
+    {"tick": 12, "key": "f4"}
+    {"tick": 13, "checksum": 2844256386}
+    {"tick": 12, "path_ready": 15}
+
+Input recorded on tick n was handled after tick n ran and is fed back
+before tick n + 1. Clicks are replayed through PlayerState.handle_click;
+keys only matter to the display, except quick load (F9), which replays
+cannot reproduce and shows up as a divergence.
+
+A click's path is taken up PATH_DELIVERY_TICKS ticks after the click. If
+the background path service had not finished the search by then, the
+path_ready entry, filed under the click's tick, says on which tick the
+player did take it up (or dropped it for a newer click, or the recording
+ended), and the replay holds the path back until the same tick. Played
+back on the path service, a search the recording had on time is waited
+for, which only the replay does.
+
+Play back as fast as possible without a display, or at the game's pace,
+and record headless sessions with the wandering bot of
+src.engine.headless:
+
+    python -m src.engine.replay play session.replay [--real-time] [--min-ticks-per-second N]
+    python -m src.engine.replay record session.replay [--map assets/maps/map.json] [--ticks 2000] [--seed 0]
+
+play exits with status 1 if the game diverges from the recording or runs
+slower than --min-ticks-per-second, so a replay doubles as an end-to-end
+regression and performance test.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import logging
+import argparse
+from typing import Dict, List, Optional
+
+from src.engine.logger import game_logger
+from src.engine.save_journal import WorldChanges
+from src.entities.player.player import PATH_DELIVERY_TICKS
+from src.game_state.player_state import PlayerState
+from src.game_state.world_state import WorldState
+
+REPLAY_VERSION = 1
+
+
+def state_checksum(world, player) -> int:
+    """
+    CRC32 of the simulated state: terrain, walkability (which covers the
+    resources), resource count, pending timers, the tick, the agents' tiles,
+    and the player's tile, movement flags and next steps. Screen positions
+    are left out, as they depend on the frame rate, and so is the length of
+    the path, which would make a refining path finish its search.
+    """
+    state = [world.game_ticks, len(world.resources), world.timers.to_list()]
+    if isinstance(world.tile_grid, bytearray):
+        checksum = zlib.crc32(world.tile_grid)
+        checksum = zlib.crc32(world.walkable_grid, checksum)
+    else:
+        # Chunked maps only hold the chunks near the player; their changes cover the rest
+        checksum = 0
+        state.append(world.changes.to_dict())
+    if player is not None:
+        path = player.path[:2] if player.path else []
+        state += [player.grid_x, player.grid_y, player.moving, player.actually_moving,
+                  player.final_tile_pending, getattr(player, 'next_grid_x', None),
+                  getattr(player, 'next_grid_y', None), [list(step) for step in path]]
+    agents = world.agents
+    if len(agents):
+        checksum = zlib.crc32(agents.x[:agents.count].tobytes(), checksum)
+        checksum = zlib.crc32(agents.y[:agents.count].tobytes(), checksum)
+    return zlib.crc32(json.dumps(state, separators=(',', ':')).encode('utf-8'), checksum)
+
+
+class ReplayRecorder:
+    """Writes a replay of a running game; see the module docstring."""
+
+    def __init__(self, path: str, world, player_state, map_file: Optional[str] = None, seed: Optional[int] = None):
+        """
+        Start recording. The player should be standing still.
+
+        Args:
+            path: Replay file to write
+            world: WorldState of the game
+            player_state: PlayerState of the game
+            map_file: Map the world was loaded from; defaults to world.map_file
+            seed: Seed for the random module; a new one is picked if None
+        """
+        self.path = path
+        self.world = world
+        self.player_state = player_state
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        random.seed(self.seed)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'w')
+        player = player_state.player
+        self._write({
+            'replay': REPLAY_VERSION,
+            'map_file': map_file or world.map_file,
+            'seed': self.seed,
+            'tick': world.game_ticks,
+            'player': [player.grid_x, player.grid_y],
+            'changes': world.changes.to_dict(),
+            'timers': world.timers.to_list(),
+        })
+        # Paths that came late before the recording are no concern of it
+        player.late_paths.clear()
+        # Registered after the world and the player, so the checksum sees the finished tick
+        world.ticks.on_tick(self._record_checksum)
+        game_logger.info(f"Recording replay to {path} with seed {self.seed}")
+
+    def _write(self, entry: Dict) -> None:
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    def record_click(self, tile_x: int, tile_y: int) -> None:
+        """Record a click on a tile, as passed to PlayerState.handle_click."""
+        self._write({'tick': self.world.game_ticks, 'click': [int(tile_x), int(tile_y)]})
+
+    def record_key(self, name: str) -> None:
+        """Record a key press by its pygame key name."""
+        self._write({'tick': self.world.game_ticks, 'key': name})
+
+    def _record_late_paths(self) -> None:
+        player = self.player_state.player
+        for ready_tick, taken_tick in player.late_paths:
+            # Filed under the click's tick, so playback knows it when feeding the click
+            self._write({'tick': ready_tick - PATH_DELIVERY_TICKS, 'path_ready': taken_tick})
+        player.late_paths.clear()
+
+    def _record_checksum(self, tick: int) -> None:
+        self._record_late_paths()
+        self._write({'tick': tick, 'checksum': state_checksum(self.world, self.player_state.player)})
+
+    def close(self) -> None:
+        """Stop recording and close the file."""
+        if self._file.closed:
+            return
+        self.world.ticks.remove(self._record_checksum)
+        player = self.player_state.player
+        if player.path_request is not None and self.world.game_ticks >= player.path_ready_tick:
+            # Still searching when the recording ended: playback must not take it up either
+            player.late_paths.append((player.path_ready_tick, self.world.game_ticks + 1))
+        self._record_late_paths()
+        self._file.close()
+        game_logger.info(f"Replay saved to {self.path}")
+
+
+class Replay:
+    """A replay file read into memory."""
+
+    def __init__(self, header: Dict, inputs: Dict[int, List[Dict]], checksums: Dict[int, int]):
+        self.header = header
+        self.inputs = inputs  # tick -> input entries recorded on that tick, in order
+        self.checksums = checksums  # tick -> checksum after that tick
+        self.start_tick = header['tick']
+        self.end_tick = max(checksums, default=self.start_tick)
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        """
+        Read a replay file. A last line cut short by a crash is skipped.
+
+        Raises:
+            ValueError: If the file is not a replay this version can play
+        """
+        with open(path) as f:
+            lines = f.read().split('\n')
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            raise ValueError(f"{path} is not a replay")
+        if not isinstance(header, dict) or header.get('replay') != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+        inputs, checksums = {}, {}
+        for number, line in enumerate(lines[1:], start=2):
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                if number >= len(lines) - 1:
+                    break
+                raise ValueError(f"{path}:{number}: damaged replay entry")
+            if 'checksum' in entry:
+                checksums[entry['tick']] = entry['checksum']
+            else:
+                inputs.setdefault(entry['tick'], []).append(entry)
+        return cls(header, inputs, checksums)
+
+
+class ReplayPlayer:
+    """Plays a Replay back through the tick scheduler, checking every tick's checksum."""
+
+    def __init__(self, replay: Replay, map_file: Optional[str] = None, path_service: bool = False):
+        """
+        Rebuild the world and player the recording started from.
+
+        Args:
+            replay: The recording
+            map_file: Map to load instead of the one named in the replay
+            path_service: Search paths on the background worker, as the game does
+        """
+        header = replay.header
+        self.replay = replay
+        self.world = WorldState(map_file=map_file or header['map_file'])
+        self.world.apply_changes(WorldChanges.from_dict(header.get('changes') or {}))
+        self.world.take_unsaved_changes()
+        self.world.game_ticks = header['tick']
+        self.world.timers.load(header.get('timers') or [], header['tick'])
+        if path_service:
+            self.world.start_path_service()
+        self.player_state = PlayerState(None, None, world_state=self.world, headless=True)
+        self.player_state.create_player(*header['player'])
+        self.world.ticks.on_tick(self._check)
+        random.seed(header['seed'])
+
+        self.diverged_at = None  # First tick whose checksum differs from the recording
+        self.ticks_run = 0
+        self.elapsed = 0.0
+
+    def _check(self, tick: int) -> None:
+        expected = self.replay.checksums.get(tick)
+        if expected is None or self.diverged_at is not None:
+            return
+        if state_checksum(self.world, self.player_state.player) != expected:
+            self.diverged_at = tick
+            player = self.player_state.player
+            game_logger.warning(f"Replay diverged on tick {tick}: player at ({player.grid_x}, {player.grid_y})")
+
+    def _feed(self, tick: int) -> None:
+        """Hand over the input recorded on a tick."""
+        for entry in self.replay.inputs.get(tick, ()):
+            if 'click' in entry:
+                self.player_state.handle_click(*entry['click'])
+            elif 'path_ready' in entry:
+                self.player_state.player.path_ready_tick = entry['path_ready']
+
+    def _await_path(self, tick: int) -> None:
+        """Finish the background search of a path the recording took up on tick."""
+        player = self.player_state.player
+        request = player.path_request
+        service = self.world.path_service
+        if request is None or service is None or tick < player.path_ready_tick:
+            return
+        while not request.done and not request.cancelled:
+            service.poll()
+            time.sleep(0.001)
+
+    def run(self, real_time: bool = False, stop_on_divergence: bool = True) -> bool:
+        """
+        Play the replay to its last tick.
+
+        Each step feeds the input of the last tick and runs exactly one
+        tick. In real time the steps are spaced tick_interval apart;
+        otherwise they run back to back.
+
+        Returns:
+            bool: True if every tick matched the recording
+        """
+        world = self.world
+        tick_interval = world.ticks.tick_interval
+        begin = time.perf_counter()
+        while world.game_ticks < self.replay.end_tick:
+            if stop_on_divergence and self.diverged_at is not None:
+                break
+            self._feed(world.game_ticks)
+            if real_time:
+                delay = begin + (self.ticks_run + 1) * tick_interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self._await_path(world.game_ticks + 1)
+            world.update(tick_interval)
+            self.player_state.update(tick_interval)
+            self.ticks_run += 1
+        self.elapsed = time.perf_counter() - begin
+        return self.diverged_at is None
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks_run / self.elapsed if self.elapsed else 0.0
+
+    def close(self) -> None:
+        self.world.stop_path_service()
+        self.world.stop_streaming()
+
+
+def record_headless(path: str, map_file: str, ticks: int, seed: int = 0) -> None:
+    """Record a session of the headless bot wandering for a number of ticks."""
+    from src.engine.headless import HeadlessSimulation
+    simulation = HeadlessSimulation(map_file, seed=seed)
+    simulation.recorder = ReplayRecorder(path, simulation.world, simulation.player_state, map_file, seed=seed)
+    try:
+        simulation.run(ticks)
+    finally:
+        simulation.recorder.close()
+        simulation.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['play', 'record'], help="Play a replay back, or record a headless one")
+    parser.add_argument('replay', help="Replay file")
+    parser.add_argument('--map', help="Map file; for play, overrides the map named in the replay")
+    parser.add_argument('--real-time', action='store_true', help="Play at the game's pace instead of full speed")
+    parser.add_argument('--path-service', action='store_true', help="Search paths on the background worker")
+    parser.add_argument('--min-ticks-per-second', type=float, help="Fail if playback is slower than this")
+    parser.add_argument('--ticks', type=int, default=2000, help="Ticks to record")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the recorded bot and the random module")
+    args = parser.parse_args()
+    game_logger.logger.setLevel(logging.WARNING)
+    # No window and no sound device; the game imports this module with its display already open
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    if args.command == 'record':
+        from src.engine.headless import DEFAULT_MAP
+        record_headless(args.replay, args.map or DEFAULT_MAP, args.ticks, args.seed)
+        print(f"Recorded {args.ticks} ticks to {args.replay}")
+        return 0
+
+    player = ReplayPlayer(Replay.load(args.replay), map_file=args.map, path_service=args.path_service)
+    try:
+        matched = player.run(real_time=args.real_time)
+    finally:
+        player.close()
+    print(f"{player.ticks_run} ticks in {player.elapsed:.2f} s: {player.ticks_per_second:,.0f} ticks/s")
+    if not matched:
+        print(f"Diverged from the recording on tick {player.diverged_at}")
+        return 1
+    print("Every tick matched the recording")
+    if args.min_ticks_per_second is not None and player.ticks_per_second < args.min_ticks_per_second:
+        print(f"Slower than {args.min_ticks_per_second:,.0f} ticks/s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
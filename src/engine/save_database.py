@@ -0,0 +1,259 @@
+"""
+SQLite storage for saves, an alternative to the snapshot and journal files.
+
+All characters and the world live in one database (saves/saves.db):
+
+- characters: one row per character. The fields shown on the select screen
+  (last played, position, version) have their own columns and an index, so
+  listing characters reads a few columns instead of parsing every save.
+  The remaining fields are kept as JSON in data.
+- world: a single row with the tick counter, timestamp, map size and
+  version.
+- world_tiles, world_resources: the tiles and resources changed relative to
+  the map file, one row per position, so saving a tick writes only the rows
+  it changed.
+- world_timers: the world's pending timers in the order they will run,
+  rewritten on the ticks that change them.
+
+The database runs in WAL mode with synchronous=NORMAL. Writes go into an
+open transaction that the SaveManager commits every few ticks, on a
+checkpoint and on close, so a commit costs one WAL append for a batch of
+ticks. A crash loses at most the ticks since the last commit, and never
+leaves a half-written save.
+"""
+import json
+import sqlite3
+from typing import Dict, List, Optional
+
+from src.engine.save_journal import WorldChanges
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    name TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL DEFAULT 0,
+    grid_x INTEGER NOT NULL DEFAULT 0,
+    grid_y INTEGER NOT NULL DEFAULT 0,
+    version TEXT,
+    data TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS characters_by_last_played
+    ON characters (timestamp DESC, name, grid_x, grid_y, version);
+CREATE TABLE IF NOT EXISTS world (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    game_ticks INTEGER NOT NULL DEFAULT 0,
+    timestamp INTEGER NOT NULL DEFAULT 0,
+    width INTEGER,
+    height INTEGER,
+    version TEXT
+);
+CREATE TABLE IF NOT EXISTS world_tiles (
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    tile TEXT NOT NULL,
+    PRIMARY KEY (x, y)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS world_resources (
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0,
+    added TEXT,
+    PRIMARY KEY (x, y)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS world_timers (
+    position INTEGER PRIMARY KEY,
+    tick INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL DEFAULT '{}'
+);
+"""
+
+# Character fields stored in their own columns rather than in data
+CHARACTER_COLUMNS = ('timestamp', 'grid_position', 'version')
+
+
+class SaveDatabase:
+    """The characters and world of one save directory in a SQLite database."""
+
+    def __init__(self, path: str):
+        """
+        Open the database, creating it and its tables if needed.
+
+        Args:
+            path: Database file, or ':memory:'
+        """
+        self.path = path
+        # Transactions are started explicitly so that several saves share one
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.commits = 0  # Transactions committed, for diagnostics
+
+    def _write(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        self._begin()
+        return self.connection.execute(sql, parameters)
+
+    def _write_many(self, sql: str, rows) -> None:
+        self._begin()
+        self.connection.executemany(sql, rows)
+
+    def _begin(self) -> None:
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN")
+
+    def commit(self) -> None:
+        """Commit the writes made since the last commit, as one transaction."""
+        if self.connection.in_transaction:
+            self.connection.execute("COMMIT")
+            self.commits += 1
+
+    def close(self) -> None:
+        """Commit and close the database."""
+        self.commit()
+        self.connection.close()
+
+    def list_characters(self) -> List[Dict]:
+        """
+        The characters with the fields for the select screen, most recently played first.
+
+        Only reads the characters_by_last_played index.
+        """
+        rows = self.connection.execute(
+            "SELECT name, timestamp, grid_x, grid_y, version FROM characters "
+            "ORDER BY timestamp DESC, name")
+        return [{'name': name, 'timestamp': timestamp, 'grid_position': [grid_x, grid_y], 'version': version}
+                for name, timestamp, grid_x, grid_y, version in rows]
+
+    def has_character(self, name: str) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM characters WHERE name = ?", (name,)).fetchone() is not None
+
+    def load_character(self, name: str) -> Optional[Dict]:
+        """The character's saved fields, or None if there is no such character."""
+        row = self.connection.execute(
+            "SELECT timestamp, grid_x, grid_y, version, data FROM characters WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        timestamp, grid_x, grid_y, version, data = row
+        character = json.loads(data)
+        character.update(timestamp=timestamp, grid_position=[grid_x, grid_y])
+        if version is not None:
+            character['version'] = version
+        return character
+
+    def save_character(self, name: str, state: Dict) -> None:
+        """Replace the character's row with state."""
+        grid_x, grid_y = state.get('grid_position') or (0, 0)
+        data = {key: value for key, value in state.items() if key not in CHARACTER_COLUMNS}
+        self._write(
+            "INSERT OR REPLACE INTO characters (name, timestamp, grid_x, grid_y, version, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (name, int(state.get('timestamp', 0)), grid_x, grid_y, state.get('version'), json.dumps(data)))
+
+    def update_character(self, name: str, fields: Dict) -> None:
+        """Change some fields of a saved character, as a journal entry would."""
+        character = self.load_character(name) or {}
+        character.update(fields)
+        self.save_character(name, character)
+
+    def delete_character(self, name: str) -> bool:
+        """Remove a character; returns False if there was none."""
+        return self._write("DELETE FROM characters WHERE name = ?", (name,)).rowcount > 0
+
+    def has_world(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM world").fetchone() is not None
+
+    def world_metadata(self) -> Optional[Dict]:
+        """The world row alone: game_ticks, timestamp and version, or None without a world save."""
+        row = self.connection.execute("SELECT game_ticks, timestamp, version FROM world").fetchone()
+        if row is None:
+            return None
+        game_ticks, timestamp, version = row
+        return {'game_ticks': game_ticks, 'timestamp': timestamp, 'version': version}
+
+    def load_world(self) -> Optional[Dict]:
+        """
+        The saved world in the form of a world save file, or None if there is none.
+
+        Returns:
+            dict: game_ticks, timestamp, version, a tilemap with the map
+                size and the lists of WorldChanges.to_dict, and the pending
+                timers as TimerQueue.to_list rows
+        """
+        row = self.connection.execute(
+            "SELECT game_ticks, timestamp, width, height, version FROM world").fetchone()
+        if row is None:
+            return None
+        game_ticks, timestamp, width, height, version = row
+        changes = WorldChanges()
+        for x, y, tile in self.connection.execute("SELECT x, y, tile FROM world_tiles"):
+            changes.tiles[(x, y)] = tile
+        for x, y, removed, added in self.connection.execute("SELECT x, y, removed, added FROM world_resources"):
+            if removed:
+                changes.removed_resources.add((x, y))
+            if added is not None:
+                changes.added_resources[(x, y)] = added
+        tilemap = {'width': width, 'height': height, **changes.to_dict()}
+        timers = [[tick, event, json.loads(data)] for tick, event, data in self.connection.execute(
+            "SELECT tick, event, data FROM world_timers ORDER BY position")]
+        return {'game_ticks': game_ticks, 'timestamp': timestamp, 'version': version, 'tilemap': tilemap,
+                'timers': timers}
+
+    def save_world(self, state: Dict) -> None:
+        """Replace the saved world with state, a dictionary shaped like load_world returns."""
+        tilemap = state.get('tilemap') or {}
+        self._write("INSERT OR REPLACE INTO world (id, game_ticks, timestamp, width, height, version) "
+                    "VALUES (0, ?, ?, ?, ?, ?)",
+                    (state.get('game_ticks', 0), int(state.get('timestamp', 0)),
+                     tilemap.get('width'), tilemap.get('height'), state.get('version')))
+        self._write("DELETE FROM world_tiles")
+        self._write("DELETE FROM world_resources")
+        self._record_world_changes(WorldChanges.from_dict(tilemap))
+        self._save_timers(state.get('timers') or [])
+
+    def update_world(self, game_ticks: int, timestamp: Optional[int] = None,
+                     changes: Optional[WorldChanges] = None, timers: Optional[List] = None) -> None:
+        """Save a tick: the tick counter, the changes made since the last save and the timers if they changed."""
+        # The row may not exist yet if the world has never been saved whole
+        if timestamp is None:
+            self._write("INSERT INTO world (id, game_ticks) VALUES (0, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET game_ticks = excluded.game_ticks", (game_ticks,))
+        else:
+            self._write("INSERT INTO world (id, game_ticks, timestamp) VALUES (0, ?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET game_ticks = excluded.game_ticks, "
+                        "timestamp = excluded.timestamp", (game_ticks, timestamp))
+        if changes:
+            self._record_world_changes(changes)
+        if timers is not None:
+            self._save_timers(timers)
+
+    def _save_timers(self, timers: List) -> None:
+        self._write("DELETE FROM world_timers")
+        self._write_many("INSERT INTO world_timers (position, tick, event, data) VALUES (?, ?, ?, ?)",
+                         [(position, tick, event, json.dumps(data))
+                          for position, (tick, event, data) in enumerate(timers)])
+
+    def _record_world_changes(self, changes: WorldChanges) -> None:
+        """Upsert the rows for changed tiles and resources."""
+        if changes.tiles:
+            self._write_many("INSERT OR REPLACE INTO world_tiles (x, y, tile) VALUES (?, ?, ?)",
+                             [(x, y, name) for (x, y), name in changes.tiles.items()])
+        # A removal drops any resource added there before; an addition in the
+        # same changes came after it (see WorldChanges.remove_resource)
+        if changes.removed_resources:
+            self._write_many("INSERT OR REPLACE INTO world_resources (x, y, removed, added) VALUES (?, ?, 1, NULL)",
+                             list(changes.removed_resources))
+        if changes.added_resources:
+            self._write_many(
+                "INSERT INTO world_resources (x, y, added) VALUES (?, ?, ?) "
+                "ON CONFLICT (x, y) DO UPDATE SET added = excluded.added",
+                [(x, y, name) for (x, y), name in changes.added_resources.items()])
+
+    def delete_world(self) -> bool:
+        """Remove the saved world; returns False if there was none."""
+        existed = self.has_world()
+        self._write("DELETE FROM world")
+        self._write("DELETE FROM world_tiles")
+        self._write("DELETE FROM world_resources")
+        self._write("DELETE FROM world_timers")
+        return existed
@@ -0,0 +1,222 @@
+"""
+Index of the saves in a save directory, for the character select screen.
+
+saves/saves.index is a small JSON file holding, for every character, the
+fields the select screen shows (name, last played, position, game version)
+and the world's tick counter and timestamp, so listing saves reads one file
+instead of every snapshot and journal. SaveManager keeps it current: each
+save updates it in memory, and it is written with the snapshots and when
+the save manager is flushed or closed.
+
+If it is lost or out of step with the save files (a save copied in by
+hand, a crash before it was written), rebuild it from the saves with
+
+    python -m src.engine.save_index rebuild [saves]
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.engine.logger import game_logger
+from src.engine.save_journal import SaveJournal
+from src.engine.save_writer import SaveWriter, replace_file
+
+INDEX_FILE = "saves.index"
+WORLD_FILE = "world.json"
+INDEX_VERSION = 1
+
+
+def encode_index(index: Dict) -> bytes:
+    return json.dumps(index, separators=(',', ':')).encode('utf-8')
+
+
+def character_names(save_directory: str) -> List[str]:
+    """Names of the characters with a snapshot or journal in save_directory, from the file names alone."""
+    if not os.path.exists(save_directory):
+        return []
+    names = set()
+    for filename in os.listdir(save_directory):
+        name, extension = os.path.splitext(filename)
+        if extension in ('.json', '.journal') and filename != WORLD_FILE and name != 'world':
+            names.add(name)
+    return sorted(names)
+
+
+def read_latest_fields(journal: SaveJournal) -> Optional[Dict]:
+    """The snapshot with the top-level fields of every journal entry applied, without the world changes."""
+    if not journal.exists():
+        return None
+    fields = journal.read_snapshot() or {}
+    for entry in journal.entries():
+        entry.pop('changes', None)
+        fields.update(entry)
+    fields.pop('tilemap', None)
+    return fields
+
+
+class SaveIndex:
+    """The saves.index file of a save directory; see the module docstring."""
+
+    def __init__(self, save_directory: str, writer: Optional[SaveWriter] = None):
+        """
+        Initialize the index. Nothing is read until it is used.
+
+        Args:
+            save_directory: Directory holding the saves and the index
+            writer: Optional SaveWriter to write the index in the background
+        """
+        self.save_directory = save_directory
+        self.path = os.path.join(save_directory, INDEX_FILE)
+        self.writer = writer
+        self._characters = None  # name -> metadata, loaded on first use
+        self._world = None
+        self.dirty = False  # Changed since it was last written
+
+    def _load(self) -> None:
+        if self._characters is not None:
+            return
+        self._characters, self._world = {}, None
+        if self.writer is not None:
+            self.writer.flush()
+        if not os.path.exists(self.path):
+            self.rebuild()
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                index = json.loads(f.read())
+            self._characters = dict(index['characters'])
+            self._world = index.get('world')
+        except (ValueError, KeyError, TypeError, IOError) as e:
+            game_logger.warning(f"Save index {self.path} is unreadable ({e}); rebuilding it")
+            self.rebuild()
+
+    def characters(self) -> List[Dict]:
+        """Metadata of every character, most recently played first."""
+        self._load()
+        return sorted(self._characters.values(), key=lambda entry: (-entry['timestamp'], entry['name']))
+
+    def character(self, name: str) -> Optional[Dict]:
+        self._load()
+        return self._characters.get(name)
+
+    def world(self) -> Optional[Dict]:
+        """Tick counter, timestamp and version of the world save, or None without one."""
+        self._load()
+        return self._world
+
+    def update_character(self, name: str, fields: Dict) -> None:
+        """Take the indexed fields of a character from a snapshot or journal entry."""
+        self._load()
+        entry = dict(self._characters.get(name) or {'name': name, 'timestamp': 0,
+                                                    'grid_position': [0, 0], 'version': None})
+        if 'timestamp' in fields:
+            entry['timestamp'] = int(fields['timestamp'])
+        if 'grid_position' in fields:
+            entry['grid_position'] = list(fields['grid_position'])
+        if 'version' in fields:
+            entry['version'] = fields['version']
+        # Entries are replaced, never changed, so a written index can share them
+        self._characters[name] = entry
+        self.dirty = True
+
+    def remove_character(self, name: str) -> None:
+        self._load()
+        if self._characters.pop(name, None) is not None:
+            self.dirty = True
+
+    def update_world(self, fields: Dict) -> None:
+        """Take the indexed fields of the world from a snapshot or journal entry."""
+        self._load()
+        world = dict(self._world or {'timestamp': 0, 'game_ticks': 0, 'version': None})
+        for key in ('timestamp', 'game_ticks', 'version'):
+            if key in fields:
+                world[key] = fields[key]
+        self._world = world
+        self.dirty = True
+
+    def remove_world(self) -> None:
+        self._load()
+        if self._world is not None:
+            self._world = None
+            self.dirty = True
+
+    def is_in_sync(self) -> bool:
+        """Whether the index lists exactly the characters that have save files (checked by file name only)."""
+        self._load()
+        if self.writer is not None:
+            self.writer.flush()
+        return sorted(self._characters) == character_names(self.save_directory)
+
+    def save(self) -> None:
+        """Write the index if it changed."""
+        if not self.dirty:
+            return
+        index = {'version': INDEX_VERSION, 'characters': dict(self._characters), 'world': self._world}
+        if self.writer is not None:
+            self.writer.replace(self.path, index, encode_index)
+        else:
+            replace_file(self.path, encode_index(index))
+        self.dirty = False
+
+    def rebuild(self) -> int:
+        """
+        Build the index again from the save files and write it.
+
+        Returns:
+            int: Number of characters indexed
+        """
+        if self.writer is not None:
+            self.writer.flush()
+        self._characters, self._world = {}, None
+        for name in character_names(self.save_directory):
+            path = os.path.join(self.save_directory, f"{name}.json")
+            try:
+                fields = read_latest_fields(SaveJournal(path))
+            except (ValueError, IOError) as e:
+                # Still listed, so the index stays in step with the files
+                game_logger.error(f"Unreadable save {path}: {e}")
+                fields = {}
+            self.update_character(name, fields or {})
+        try:
+            world = read_latest_fields(SaveJournal(os.path.join(self.save_directory, WORLD_FILE)))
+        except (ValueError, IOError) as e:
+            game_logger.error(f"Skipping unreadable world save: {e}")
+            world = None
+        if world is not None:
+            self.update_world(world)
+        self.dirty = True
+        if os.path.exists(self.save_directory):
+            self.save()
+        game_logger.info(f"Rebuilt save index with {len(self._characters)} characters")
+        return len(self._characters)
+
+
+def format_timestamp(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def main():
+    default_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                     "saves")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['rebuild', 'show'], help="Rebuild the index, or print it")
+    parser.add_argument('save_directory', nargs='?', default=default_directory, help="Save directory")
+    args = parser.parse_args()
+
+    index = SaveIndex(args.save_directory)
+    if args.command == 'rebuild':
+        print(f"Indexed {index.rebuild()} characters in {index.path}")
+    for entry in index.characters():
+        print(f"{entry['name']:20} last played {format_timestamp(entry['timestamp'])}  "
+              f"at {tuple(entry['grid_position'])}  version {entry['version']}")
+    world = index.world()
+    if world is not None:
+        print(f"world: {world['game_ticks']} ticks, saved {format_timestamp(world['timestamp'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
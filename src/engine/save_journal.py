@@ -0,0 +1,217 @@
+"""
+Incremental saves: a snapshot file plus an append-only journal of changes.
+
+Each save file (a character, the world) has a snapshot, written with one of
+the codecs of src.engine.save_codec, and next to it a journal with the same
+name and a .journal extension. Saving between checkpoints appends one
+compact JSON line per tick holding only what changed, so the bytes written
+per tick follow the size of the changes, not of the state. Compaction folds
+the journal back into a new snapshot.
+
+Loading reads the snapshot and replays the journal over it. Journal entries
+only ever set values (a field, a tile, a resource), so replaying a journal
+over a snapshot that already contains it gives the same state; a crash
+between writing a snapshot and removing the journal is harmless. A line cut
+short by a crash while appending is skipped.
+
+With a SaveWriter the files are written on its background thread; reads
+wait for pending writes first, so they always see the latest save.
+"""
+import os
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.engine.logger import game_logger
+from src.engine.save_codec import CODECS, SaveCodec, decode_file
+from src.engine.save_writer import SaveWriter, append_file, replace_file
+
+
+class SaveJournal:
+    """A snapshot and the journal of changes appended to it since."""
+
+    def __init__(self, snapshot_path: str, writer: Optional[SaveWriter] = None):
+        """
+        Initialize the journal.
+
+        Args:
+            snapshot_path: Path of the snapshot file; the journal is kept next
+                to it with a .journal extension
+            writer: Optional SaveWriter to write in the background; without
+                one, writes happen before the methods return
+        """
+        self.snapshot_path = snapshot_path
+        self.writer = writer
+        self.journal_path = os.path.splitext(snapshot_path)[0] + '.journal'
+        self.entry_count = None  # Entries in the journal file, counted on first use
+        self.bytes_appended = 0  # Journal bytes written by this instance, for diagnostics
+
+    def exists(self) -> bool:
+        """Whether there is a snapshot or journal to load."""
+        self._flush()
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def read_snapshot(self) -> Optional[Dict]:
+        """
+        Read the snapshot on its own.
+
+        Returns:
+            dict or None: The snapshot, or None if there is none
+
+        Raises:
+            ValueError: If the snapshot cannot be decoded
+        """
+        self._flush()
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, 'rb') as f:
+            return decode_file(f.read())
+
+    def entries(self) -> Iterator[Dict]:
+        """Yield the journal entries in the order they were appended."""
+        self._flush()
+        if not os.path.exists(self.journal_path):
+            self.entry_count = 0
+            return
+        count = 0
+        with open(self.journal_path, 'r') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.endswith('\n'):
+                    game_logger.warning(f"Skipping incomplete entry {line_number} of {self.journal_path}")
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    game_logger.warning(f"Skipping unreadable entry {line_number} of {self.journal_path}")
+                    continue
+                count += 1
+                yield entry
+        self.entry_count = count
+
+    def append(self, entry: Dict) -> int:
+        """
+        Append one entry to the journal.
+
+        Returns:
+            int: Bytes written
+        """
+        if self.entry_count is None:
+            self._repair()
+        # Entries are small, so they are encoded here and only written in the background
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+        if self.writer is not None:
+            self.writer.append(self.journal_path, line)
+        else:
+            append_file(self.journal_path, line)
+        self.entry_count += 1
+        self.bytes_appended += len(line)
+        return len(line)
+
+    def write_snapshot(self, state: Dict, codec: SaveCodec = CODECS['json']) -> None:
+        """
+        Replace the snapshot with state and empty the journal.
+
+        state must include every change in the journal, and with a writer
+        it must not be changed afterwards. The snapshot is written next to
+        its destination, fsynced and moved into place, so a crash leaves
+        either the old or the new snapshot.
+
+        Args:
+            state: Snapshot to write
+            codec: SaveCodec to encode it with; read_snapshot finds out
+                which one was used from the file
+        """
+        if self.writer is not None:
+            self.writer.replace(self.snapshot_path, state, codec.encode_file, remove=(self.journal_path,))
+        else:
+            replace_file(self.snapshot_path, codec.encode_file(state))
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        self.entry_count = 0
+
+    def _repair(self) -> None:
+        """Count the existing entries and cut off a line left incomplete by a crash."""
+        self.entry_count = sum(1 for _ in self.entries())
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb+') as f:
+                data = f.read()
+                end = data.rfind(b'\n') + 1
+                if end != len(data):
+                    f.truncate(end)
+
+    def _flush(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+
+    def pending_entries(self) -> int:
+        """Number of journal entries not yet compacted into the snapshot."""
+        if self.entry_count is None:
+            self.entry_count = sum(1 for _ in self.entries())
+        return self.entry_count
+
+    def delete(self) -> None:
+        """Remove the snapshot and the journal."""
+        self._flush()
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class WorldChanges:
+    """
+    Terrain and resource changes made to a world relative to its map file.
+
+    WorldState records every set_tile, add_resource and remove_resource
+    here. Positions are (x, y) tuples; tiles and resources are stored by
+    name, as in map files.
+    """
+
+    __slots__ = ('tiles', 'removed_resources', 'added_resources')
+
+    def __init__(self):
+        self.tiles: Dict[Tuple[int, int], str] = {}  # (x, y) -> tile name
+        self.removed_resources = set()  # (x, y) of map resources that were removed
+        self.added_resources: Dict[Tuple[int, int], str] = {}  # (x, y) -> resource type name
+
+    def __bool__(self) -> bool:
+        return bool(self.tiles or self.removed_resources or self.added_resources)
+
+    def set_tile(self, x: int, y: int, tile_name: str) -> None:
+        self.tiles[(x, y)] = tile_name
+
+    def add_resource(self, x: int, y: int, resource_name: str) -> None:
+        self.added_resources[(x, y)] = resource_name
+
+    def remove_resource(self, x: int, y: int) -> None:
+        # The position may hold a resource from the map, so remember the removal
+        # even when it cancels an addition
+        self.added_resources.pop((x, y), None)
+        self.removed_resources.add((x, y))
+
+    def merge(self, other: 'WorldChanges') -> None:
+        """Apply the later changes in other on top of these."""
+        self.tiles.update(other.tiles)
+        for x, y in other.removed_resources:
+            self.remove_resource(x, y)
+        self.added_resources.update(other.added_resources)
+
+    def to_dict(self) -> Dict[str, List]:
+        """Lists for a JSON save; applying them in key order rebuilds the changes."""
+        return {
+            'modified_tiles': [[x, y, name] for (x, y), name in self.tiles.items()],
+            'removed_resources': [[x, y] for x, y in self.removed_resources],
+            'added_resources': [[x, y, name] for (x, y), name in self.added_resources.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'WorldChanges':
+        """Inverse of to_dict; missing keys are treated as no changes."""
+        changes = cls()
+        if not data:
+            return changes
+        for x, y, name in data.get('modified_tiles', []):
+            changes.tiles[(x, y)] = name
+        for x, y in data.get('removed_resources', []):
+            changes.removed_resources.add((x, y))
+        for x, y, name in data.get('added_resources', []):
+            changes.added_resources[(x, y)] = name
+        return changes
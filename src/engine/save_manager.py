@@ -1,23 +1,58 @@
 import os
 import json
 import time
+import sqlite3
 from datetime import datetime
 from src.engine.logger import game_logger
+from src.engine.save_codec import get_codec
+from src.engine.save_database import SaveDatabase
+from src.engine.save_index import SaveIndex
+from src.engine.save_journal import SaveJournal, WorldChanges
+from src.engine.save_writer import SaveWriter
 
 class SaveManager:
     """
     Manages saving and loading game state.
     Automatically saves game progress and allows loading from save files.
+    
+    Each save file is a snapshot plus a journal (see src.engine.save_journal):
+    auto_save appends only what changed since the previous save, and every
+    compact_interval journal entries, or on checkpoint, the journals are
+    folded into new snapshots.
+    
+    Files are written by a SaveWriter thread, so saving never waits for the
+    disk; loading waits for pending writes. Call close before exiting.
+    
+    Snapshots are encoded with codec (see src.engine.save_codec), which can
+    be changed between saves: every snapshot records its codec, so saves
+    written with any codec, or before codecs existed, load the same way.
+    
+    The metadata the character select screen shows is kept in a save index
+    (see src.engine.save_index), updated by every save.
+    
+    With backend='sqlite' everything is kept in saves.db instead (see
+    src.engine.save_database): auto_save writes the changed rows, which are
+    committed every commit_interval ticks and on checkpoint.
     """
-    def __init__(self, character_name=None):
+    def __init__(self, character_name=None, save_directory=None, backend='files', codec='json'):
         """
         Initialize the save manager.
         
         Args:
             character_name: Optional character name. If not provided, no save files will be checked.
+            save_directory: Optional directory for save files; defaults to saves/ in the game directory
+            backend: 'files' for snapshots and journals, or 'sqlite'
+            codec: Name of the codec for snapshots: 'json', 'fast-json' or 'binary'
+        
+        Raises:
+            ValueError: If the backend or codec is unknown
         """
+        if backend not in ('files', 'sqlite'):
+            raise ValueError(f"Unknown save backend: {backend}")
         # Ensure save directory path is absolute
-        self.save_directory = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "saves"))
+        if save_directory is None:
+            save_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "saves")
+        self.save_directory = os.path.abspath(save_directory)
         
         # Set character name if provided
         self.character_name = character_name
@@ -30,11 +65,126 @@ class SaveManager:
             self.character_save_file = os.path.join(self.save_directory, f"{self.character_name}.json")
         
         self.auto_save_interval = 1  # Save every game tick
+        self.compact_interval = 600  # Journal entries between snapshots
+        self.commit_interval = 10  # Ticks between SQLite commits
         self.last_save_tick = 0
+        self.last_commit_tick = 0
+        
+        self.writer = SaveWriter()  # Writes save files in the background
+        self.world_journal = SaveJournal(self.world_save_file, self.writer)
+        self._character_journal = None  # SaveJournal of character_save_file, see character_journal
+        self._saved_character_fields = {}  # Character fields as of the last save, to journal only changes
         
         # Ensure save directory exists
         os.makedirs(self.save_directory, exist_ok=True)
-        game_logger.info(f"Save manager initialized. Save directory: {self.save_directory}")
+        
+        self.backend = backend
+        self.codec = get_codec(codec)  # SaveCodec for the next snapshots
+        self.database = None
+        self.index = None  # SaveIndex of the save files; the database has its own
+        if backend == 'sqlite':
+            self.database = SaveDatabase(os.path.join(self.save_directory, "saves.db"))
+        else:
+            self.index = SaveIndex(self.save_directory, self.writer)
+        game_logger.info(f"Save manager initialized. Save directory: {self.save_directory}, backend: {backend}")
+    
+    @property
+    def character_journal(self):
+        """SaveJournal of the current character's save file, or None without a character."""
+        if not self.character_save_file:
+            return None
+        if self._character_journal is None or self._character_journal.snapshot_path != self.character_save_file:
+            self._character_journal = SaveJournal(self.character_save_file, self.writer)
+            self._saved_character_fields = {}
+        return self._character_journal
+    
+    def select_character(self, character_name):
+        """Make character_name the character that is loaded and saved."""
+        self.character_name = character_name
+        self.character_save_file = os.path.join(self.save_directory, f"{character_name}.json")
+    
+    def list_characters(self):
+        """Names of the saved characters, most recently played first."""
+        return [character['name'] for character in self.character_index()]
+    
+    def character_index(self):
+        """
+        Metadata of the saved characters, most recently played first.
+        
+        It comes from the save index (or the database's index), without
+        reading any save. If the index does not list the same characters as
+        the save directory holds, it is rebuilt first.
+        
+        Returns:
+            list: Dictionaries with name, timestamp, grid_position and version
+        """
+        if self.database is not None:
+            return self.database.list_characters()
+        if not self.index.is_in_sync():
+            game_logger.warning("Save index is out of date; rebuilding it")
+            self.index.rebuild()
+        return self.index.characters()
+    
+    def world_index(self):
+        """Timestamp, game_ticks and version of the world save from the index, or None without one."""
+        if self.database is not None:
+            return self.database.world_metadata()
+        return self.index.world()
+    
+    def rebuild_index(self):
+        """
+        Rebuild the save index from the saves themselves.
+        
+        Returns:
+            int: Number of characters indexed
+        """
+        if self.database is not None:
+            self.database.connection.execute("REINDEX characters_by_last_played")
+            return len(self.database.list_characters())
+        return self.index.rebuild()
+    
+    def character_exists(self, character_name):
+        """Whether a character of that name has been saved."""
+        if self.database is not None:
+            return self.database.has_character(character_name)
+        return SaveJournal(os.path.join(self.save_directory, f"{character_name}.json"), self.writer).exists()
+    
+    def create_character(self, character_name, character_state):
+        """
+        Save a new character and select it.
+        
+        Returns:
+            bool: True if the character was saved
+        """
+        self.select_character(character_name)
+        try:
+            if self.database is not None:
+                self.database.save_character(character_name, character_state)
+                self.database.commit()
+            else:
+                self.character_journal.write_snapshot(character_state, self.codec)
+                self.index.update_character(character_name, character_state)
+                self.index.save()
+        except (IOError, RuntimeError, sqlite3.Error) as e:
+            game_logger.error(f"Error creating character {character_name}: {e}")
+            return False
+        self._saved_character_fields = dict(character_state)
+        game_logger.info(f"Created save for character: {character_name}")
+        return True
+    
+    def has_character_save(self):
+        """Whether the current character has a save to load."""
+        if not self.character_name:
+            return False
+        if self.database is not None:
+            return self.database.has_character(self.character_name)
+        return self.character_journal.exists()
+    
+    def has_world_save(self):
+        """Whether there is a world save to load."""
+        if self.database is not None:
+            return self.database.has_world()
+        return self.world_journal.exists()
     
     def get_save_files(self):
         """Get the character and world save files if they exist"""
@@ -43,38 +193,32 @@ class SaveManager:
         if not os.path.exists(self.save_directory):
             return save_files
         
-        # Check for the character's save file
-        if os.path.exists(self.character_save_file):
-            try:
-                with open(self.character_save_file, 'r') as file:
-                    save_data = json.load(file)
-                    # Extract metadata for display
-                    save_files.append({
-                        'filename': f"{self.character_name}.json",
-                        'player_name': self.character_name,
-                        'timestamp': save_data.get('timestamp', 0),
-                        'formatted_time': datetime.fromtimestamp(save_data.get('timestamp', 0)).strftime('%Y-%m-%d %H:%M:%S'),
-                        'position': save_data.get('grid_position', (0, 0)),
-                        'type': 'character'
-                    })
-            except (json.JSONDecodeError, IOError) as e:
-                game_logger.error(f"Error reading save file {self.character_name}.json: {e}")
+        # Metadata for display comes from the index, not the saves
+        if self.character_name:
+            save_data = next((entry for entry in self.character_index() if entry['name'] == self.character_name), None)
+            if save_data is not None:
+                # Extract metadata for display
+                save_files.append({
+                    'filename': f"{self.character_name}.json",
+                    'player_name': self.character_name,
+                    'timestamp': save_data.get('timestamp', 0),
+                    'formatted_time': datetime.fromtimestamp(save_data.get('timestamp', 0)).strftime('%Y-%m-%d %H:%M:%S'),
+                    'position': save_data.get('grid_position', (0, 0)),
+                    'type': 'character'
+                })
         
         # Check for world save file
-        if os.path.exists(self.world_save_file):
-            try:
-                with open(self.world_save_file, 'r') as file:
-                    world_data = json.load(file)
-                    # Extract metadata for display
-                    save_files.append({
-                        'filename': "world.json",
-                        'timestamp': world_data.get('timestamp', 0),
-                        'formatted_time': datetime.fromtimestamp(world_data.get('timestamp', 0)).strftime('%Y-%m-%d %H:%M:%S'),
-                        'game_ticks': world_data.get('game_ticks', 0),
-                        'type': 'world'
-                    })
-            except (json.JSONDecodeError, IOError) as e:
-                game_logger.error(f"Error reading world save file: {e}")
+        if self.has_world_save():
+            world_data = self.world_index()
+            if world_data is not None:
+                # Extract metadata for display
+                save_files.append({
+                    'filename': "world.json",
+                    'timestamp': world_data.get('timestamp', 0),
+                    'formatted_time': datetime.fromtimestamp(world_data.get('timestamp', 0)).strftime('%Y-%m-%d %H:%M:%S'),
+                    'game_ticks': world_data.get('game_ticks', 0),
+                    'type': 'world'
+                })
         
         return save_files
     
@@ -90,32 +234,48 @@ class SaveManager:
         return self.world_save_file
     
     def load_character_save(self):
-        """Load the character's save file"""
-        if not os.path.exists(self.character_save_file):
+        """Load the character's save file, with the changes journaled since"""
+        if not self.has_character_save():
             game_logger.error(f"Save file not found for character: {self.character_name}")
             return None
             
         try:
-            with open(self.character_save_file, 'r') as file:
-                save_data = json.load(file)
-                game_logger.info(f"Loaded save file for character: {self.character_name}")
-                return save_data
-        except (json.JSONDecodeError, IOError) as e:
+            if self.database is not None:
+                save_data = self.database.load_character(self.character_name)
+            else:
+                save_data = self.character_journal.read_snapshot() or {}
+                for entry in self.character_journal.entries():
+                    save_data.update(entry)
+            self._saved_character_fields = dict(save_data)
+            game_logger.info(f"Loaded save file for character: {self.character_name}")
+            return save_data
+        except (ValueError, IOError, sqlite3.Error) as e:
             game_logger.error(f"Error loading save file for {self.character_name}: {e}")
             return None
     
     def load_world_save(self):
-        """Load the world save file"""
-        if not os.path.exists(self.world_save_file):
+        """Load the world save file, with the changes journaled since"""
+        if not self.has_world_save():
             game_logger.error("World save file not found")
             return None
             
         try:
-            with open(self.world_save_file, 'r') as file:
-                world_data = json.load(file)
-                game_logger.info("Loaded world save file")
+            if self.database is not None:
+                world_data = self.database.load_world()
+                game_logger.info("Loaded world save")
                 return world_data
-        except (json.JSONDecodeError, IOError) as e:
+            world_data = self.world_journal.read_snapshot() or {}
+            tilemap = world_data.setdefault('tilemap', {})
+            changes = WorldChanges.from_dict(tilemap)
+            for entry in self.world_journal.entries():
+                entry_changes = entry.pop('changes', None)
+                if entry_changes:
+                    changes.merge(WorldChanges.from_dict(entry_changes))
+                world_data.update(entry)
+            tilemap.update(changes.to_dict())
+            game_logger.info("Loaded world save file")
+            return world_data
+        except (ValueError, IOError, sqlite3.Error) as e:
             game_logger.error(f"Error loading world save file: {e}")
             return None
     
@@ -123,10 +283,18 @@ class SaveManager:
         """
         Save the character and world state to separate files.
         
+        This writes complete snapshots and empties the journals; use
+        checkpoint to save a running game, or auto_save to save only changes.
+        The dictionaries are handed to the writer thread and must not be
+        changed afterwards.
+        
         Args:
             character_state: Dictionary containing character-specific data
             world_state: Dictionary containing world data (tilemap, game ticks)
             current_tick: Current game tick
+            
+        Returns:
+            bool: True if both snapshots were queued for writing
         """
         # Save on every tick as specified in the game design
         self.last_save_tick = current_tick
@@ -134,43 +302,205 @@ class SaveManager:
         # Ensure save directory exists
         os.makedirs(self.save_directory, exist_ok=True)
         
+        if self.database is not None:
+            return self._save_to_database(character_state, world_state, current_tick)
+        
         # Save character state
-        try:
-            with open(self.character_save_file, 'w') as file:
-                json.dump(character_state, file, indent=2)
+        if self.character_journal is not None:
+            try:
+                self.character_journal.write_snapshot(character_state, self.codec)
+                # Later journal entries are compared with what was just written
+                self._saved_character_fields = json.loads(json.dumps(character_state))
                 
                 # Only log at DEBUG level to reduce console spam
-                game_logger.debug(f"Character state saved for {self.character_name}")
-        except IOError as e:
-            game_logger.error(f"Error saving character state: {e}")
-            return False
+                game_logger.debug(f"Character state queued for saving for {self.character_name}")
+            except (IOError, RuntimeError) as e:
+                game_logger.error(f"Error saving character state: {e}")
+                return False
         
         # Save world state
         try:
-            with open(self.world_save_file, 'w') as file:
-                json.dump(world_state, file, indent=2)
-                
-                # Only log at DEBUG level to reduce console spam
-                game_logger.debug("World state saved")
-        except IOError as e:
+            self.world_journal.write_snapshot(world_state, self.codec)
+            
+            if self.character_journal is not None:
+                self.index.update_character(self.character_name, character_state)
+            self.index.update_world(world_state)
+            self.index.save()
+            
+            # Only log at DEBUG level to reduce console spam
+            game_logger.debug("World state queued for saving")
+        except (IOError, RuntimeError) as e:
             game_logger.error(f"Error saving world state: {e}")
             return False
             
         return True
     
+    def _save_to_database(self, character_state, world_state, current_tick):
+        """save_game_state for the SQLite backend: replace the rows in one transaction."""
+        try:
+            if self.character_name:
+                self.database.save_character(self.character_name, character_state)
+                self._saved_character_fields = json.loads(json.dumps(character_state))
+            self.database.save_world(world_state)
+            self.database.commit()
+            self.last_commit_tick = current_tick
+            game_logger.debug("Game state saved to the database")
+            return True
+        except sqlite3.Error as e:
+            game_logger.error(f"Error saving game state to the database: {e}")
+            return False
+    
+    def checkpoint(self, player, world, current_tick):
+        """
+        Save complete snapshots of a running game, compacting the journals.
+        
+        Args:
+            player: Player object
+            world: WorldState of the game
+            current_tick: Current game tick
+            
+        Returns:
+            bool: True if both snapshots were written
+        """
+        # The snapshot holds every change and timer, so none are left to journal
+        world.take_unsaved_changes()
+        world.take_unsaved_timers()
+        character_state, world_state = self.collect_game_states(player, world, current_tick)
+        return self.save_game_state(character_state, world_state, current_tick)
+    
+    def auto_save(self, player, world, current_tick):
+        """
+        Journal the game's changes if auto_save_interval ticks have passed since the last save.
+        
+        Args:
+            player: Player object
+            world: WorldState of the game
+            current_tick: Current game tick
+            
+        Returns:
+            int: Bytes written, 0 if it was not time to save
+        """
+        if current_tick - self.last_save_tick < self.auto_save_interval:
+            return 0
+        return self.record_changes(player, world, current_tick)
+    
+    def record_changes(self, player, world, current_tick):
+        """
+        Append what changed since the last save to the journals.
+        
+        Character fields are compared with the last saved values and world
+        changes are taken from the WorldState, so an idle tick writes a few
+        bytes. Once a journal holds compact_interval entries the journals
+        are folded into new snapshots with checkpoint. The SQLite backend
+        writes the same changes as rows and commits them every
+        commit_interval ticks.
+        
+        Args:
+            player: Player object
+            world: WorldState of the game
+            current_tick: Current game tick
+            
+        Returns:
+            int: Bytes written, or rows written with the SQLite backend
+        """
+        if self.database is not None:
+            return self._record_to_database(player, world, current_tick)
+        self.last_save_tick = current_tick
+        timestamp = int(time.time())
+        written = 0
+        
+        try:
+            journal = self.character_journal
+            if journal is not None:
+                fields = {'character_name': self.character_name,
+                          'grid_position': [player.grid_x, player.grid_y]}
+                changed = {key: value for key, value in fields.items()
+                           if self._saved_character_fields.get(key) != value}
+                if changed:
+                    changed['timestamp'] = timestamp
+                    written += journal.append(changed)
+                    self._saved_character_fields.update(changed)
+                    self.index.update_character(self.character_name, changed)
+            
+            entry = {'game_ticks': current_tick}
+            changes = world.take_unsaved_changes()
+            if changes:
+                entry['changes'] = changes.to_dict()
+                entry['timestamp'] = timestamp
+            # Written whole, and only on ticks that scheduled, cancelled or ran a timer
+            timers = world.take_unsaved_timers()
+            if timers is not None:
+                entry['timers'] = timers
+            written += self.world_journal.append(entry)
+            # The index is written with the next snapshot, or by flush or close
+            self.index.update_world(entry)
+        except (IOError, RuntimeError) as e:
+            game_logger.error(f"Error journaling game state: {e}")
+            return written
+        
+        pending = self.world_journal.pending_entries()
+        if journal is not None:
+            pending = max(pending, journal.pending_entries())
+        if pending >= self.compact_interval:
+            self.checkpoint(player, world, current_tick)
+            game_logger.debug(f"Compacted save journals after {pending} entries")
+        return written
+    
+    def _record_to_database(self, player, world, current_tick):
+        """record_changes for the SQLite backend."""
+        self.last_save_tick = current_tick
+        timestamp = int(time.time())
+        written = 0
+        try:
+            if self.character_name:
+                position = [player.grid_x, player.grid_y]
+                if self._saved_character_fields.get('grid_position') != position:
+                    fields = {'grid_position': position, 'timestamp': timestamp}
+                    self.database.update_character(self.character_name, fields)
+                    self._saved_character_fields.update(fields)
+                    written += 1
+            changes = world.take_unsaved_changes()
+            timers = world.take_unsaved_timers()
+            self.database.update_world(current_tick, timestamp if changes else None, changes, timers)
+            written += 1 + len(changes.tiles) + len(changes.removed_resources) + len(changes.added_resources)
+            written += len(timers or ())
+            if current_tick - self.last_commit_tick >= self.commit_interval:
+                self.database.commit()
+                self.last_commit_tick = current_tick
+        except sqlite3.Error as e:
+            game_logger.error(f"Error saving game state to the database: {e}")
+        return written
+    
     # No longer need the cleanup method since we're only using one save file per character
     def _cleanup_old_saves(self, max_saves=1):
         """No longer needed as we're using a single save file per character"""
         pass
 
     
-    def collect_game_states(self, player, tilemap, game_ticks):
+    def flush(self):
+        """Wait until every save handed over so far is on disk."""
+        if self.index is not None:
+            self.index.save()
+        self.writer.flush()
+        if self.database is not None:
+            self.database.commit()
+    
+    def close(self):
+        """Write the pending saves and stop the writer thread; call once when the game exits."""
+        if self.index is not None:
+            self.index.save()
+        self.writer.close()
+        if self.database is not None:
+            self.database.close()
+        game_logger.info("Save writer flushed and stopped")
+    
+    def collect_game_states(self, player, world, game_ticks):
         """
         Collect character and world state data into separate dictionaries.
         
         Args:
             player: Player object
-            tilemap: Tilemap object
+            world: WorldState object; its changes relative to the map file are saved
             game_ticks: Current game tick count
             
         Returns:
@@ -191,42 +521,69 @@ class SaveManager:
             'version': '1.0.0'  # Game version for compatibility checking
         }
         
-        # Collect world data (tilemap and game ticks)
+        # Collect world data (tilemap, game ticks and pending timers)
         world_state = {
             'timestamp': timestamp,
             'formatted_time': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
             'game_ticks': game_ticks,
             'tilemap': {
-                'width': tilemap.width,
-                'height': tilemap.height,
-                # Store only modified tiles to keep save files smaller
-                'modified_tiles': []
+                'width': world.width,
+                'height': world.height,
+                # Store only modified tiles and resources to keep save files smaller
+                **world.changes.to_dict()
             },
+            'timers': world.timers.to_list(),
             'version': '1.0.0'  # Game version for compatibility checking
         }
         
-        # In the future, we would collect modified tiles here
-        # For now, we'll just store the dimensions
-        
         return character_state, world_state
     
     def delete_save_file(self, filename):
         """Delete a save file by filename"""
         save_path = os.path.join(self.save_directory, filename)
         
+        if self.database is not None:
+            return self._delete_from_database(filename, save_path)
+        
         if not os.path.exists(save_path):
             game_logger.error(f"Save file not found: {filename}")
             return False
             
         try:
-            os.remove(save_path)
+            # The journal goes with its snapshot
+            self.writer.flush()
+            SaveJournal(save_path).delete()
+            if filename == "world.json":
+                self.index.remove_world()
+            else:
+                self.index.remove_character(os.path.splitext(filename)[0])
+            self.index.save()
             game_logger.info(f"Deleted save file: {filename}")
             
             # Reset current save file if it was the one deleted
-            if self.current_save_file == save_path:
-                self.current_save_file = None
+            if self.character_save_file == save_path:
+                self.character_save_file = None
                 
             return True
         except IOError as e:
             game_logger.error(f"Error deleting save file {filename}: {e}")
             return False
+    
+    def _delete_from_database(self, filename, save_path):
+        """delete_save_file for the SQLite backend; filenames are those of get_save_files."""
+        try:
+            if filename == "world.json":
+                deleted = self.database.delete_world()
+            else:
+                deleted = self.database.delete_character(os.path.splitext(filename)[0])
+            self.database.commit()
+        except sqlite3.Error as e:
+            game_logger.error(f"Error deleting save {filename}: {e}")
+            return False
+        if not deleted:
+            game_logger.error(f"Save file not found: {filename}")
+            return False
+        game_logger.info(f"Deleted save: {filename}")
+        if self.character_save_file == save_path:
+            self.character_save_file = None
+        return True
@@ -0,0 +1,176 @@
+"""
+Background writer for save files.
+
+The game thread hands finished save data to a SaveWriter and carries on;
+a worker thread serialises it and writes it out. Whole files are written to
+a temporary file, fsynced and moved into place with os.replace, so a crash
+leaves either the old or the new file, never a truncated one. Appends are
+fsynced once per batch.
+
+A snapshot of a file makes any earlier snapshot of the same file that has
+not been written yet obsolete, along with appends to files the snapshot
+replaces (its journal), so back-to-back saves are coalesced and only the
+latest is written. Everything else is written in the order it was handed
+over. flush and close wait until all of it is on disk.
+"""
+import os
+import json
+import atexit
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+from src.engine.logger import game_logger
+
+
+def encode_json_snapshot(state: Dict) -> bytes:
+    """The serialiser used for snapshots unless another one is given."""
+    return json.dumps(state, indent=2).encode('utf-8')
+
+
+def replace_file(path: str, data: bytes) -> None:
+    """Write data to a temporary file next to path, fsync it and move it into place."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def append_file(path: str, data: bytes) -> None:
+    """Append data to path and fsync it."""
+    with open(path, 'ab') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class SaveWriter:
+    """Writes save files on a background thread, see the module docstring."""
+
+    def __init__(self):
+        self._pending = deque()  # ('replace', path, state, encode, remove) or ('append', path, data)
+        self._condition = threading.Condition()
+        self._busy = False  # The thread is writing a batch taken off _pending
+        self._closed = False
+        self._thread = None  # Started by the first write
+        self.files_written = 0  # Snapshots and appends written, for diagnostics
+        self.coalesced = 0  # Writes dropped because a later snapshot made them obsolete
+        self.errors = 0
+
+    def replace(self, path: str, state, encode: Callable = encode_json_snapshot,
+                remove: Iterable[str] = ()) -> None:
+        """
+        Write a snapshot of a whole file in the background.
+
+        state belongs to the writer from now on and must not be changed by
+        the caller; it is serialised with encode(state) on the writer
+        thread.
+
+        Args:
+            path: File to replace
+            state: Data to write
+            encode: Turns state into bytes
+            remove: Files to delete once the snapshot is in place, such as
+                the journal it contains; pending appends to them are dropped
+        """
+        remove = tuple(remove)
+        with self._condition:
+            self._check_open()
+            kept = deque(op for op in self._pending
+                         if not (op[0] == 'replace' and op[1] == path)
+                         and not (op[0] == 'append' and op[1] in remove))
+            self.coalesced += len(self._pending) - len(kept)
+            kept.append(('replace', path, state, encode, remove))
+            self._pending = kept
+            self._start()
+
+    def append(self, path: str, data: bytes) -> None:
+        """Append bytes to a file in the background, after everything handed over before."""
+        with self._condition:
+            self._check_open()
+            self._pending.append(('append', path, data))
+            self._start()
+
+    def pending(self) -> int:
+        """Number of writes not yet started."""
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything handed over so far is written.
+
+        Returns:
+            bool: False if the timeout ran out first
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self) -> None:
+        """Write everything still pending and stop the thread. Later writes raise RuntimeError."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        atexit.unregister(self.close)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("SaveWriter is closed")
+
+    def _start(self) -> None:
+        """Start the thread if needed and wake it up; called with the condition held."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SaveWriter", daemon=True)
+            self._thread.start()
+            # The thread is a daemon so it never keeps the game alive; write what is left at exit
+            atexit.register(self.close)
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch = list(self._pending)
+                self._pending.clear()
+                self._busy = True
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write_batch(self, batch) -> None:
+        """Write a batch in order, joining consecutive appends to one file into one write."""
+        index = 0
+        while index < len(batch):
+            op = batch[index]
+            try:
+                if op[0] == 'append':
+                    path, chunks = op[1], [op[2]]
+                    while index + 1 < len(batch) and batch[index + 1][0] == 'append' and batch[index + 1][1] == path:
+                        index += 1
+                        chunks.append(batch[index][2])
+                    append_file(path, b''.join(chunks))
+                else:
+                    _, path, state, encode, remove = op
+                    replace_file(path, encode(state))
+                    for stale in remove:
+                        if os.path.exists(stale):
+                            os.remove(stale)
+                self.files_written += 1
+            except Exception as e:
+                self.errors += 1
+                game_logger.error(f"Error writing save file {op[1]}: {e}")
+            index += 1
@@ -0,0 +1,162 @@
+"""
+Bucketed spatial index for objects placed on the tile grid.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class SpatialGrid:
+    """
+    Maps tile positions to objects, bucketed into bucket_size x bucket_size chunks.
+
+    Range queries only visit the buckets overlapping the requested rectangle,
+    so their cost depends on the size of the area asked for, not on how many
+    objects the world holds. At most one object is stored per tile.
+    """
+
+    def __init__(self, bucket_size: int = 16):
+        """
+        Initialize an empty index.
+
+        Args:
+            bucket_size: Side length of a bucket in tiles
+        """
+        self.bucket_size = bucket_size
+        self._buckets: Dict[Tuple[int, int], Dict[Tuple[int, int], Any]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, position: Tuple[int, int]) -> bool:
+        return self.get(*position) is not None
+
+    def insert(self, x: int, y: int, item: Any) -> None:
+        """Store item at tile (x, y), replacing whatever was there."""
+        key = (x // self.bucket_size, y // self.bucket_size)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {}
+        if (x, y) not in bucket:
+            self._count += 1
+        bucket[(x, y)] = item
+
+    def remove(self, x: int, y: int) -> Optional[Any]:
+        """
+        Remove the object at tile (x, y).
+
+        Returns:
+            The removed object, or None if the tile was empty
+        """
+        key = (x // self.bucket_size, y // self.bucket_size)
+        bucket = self._buckets.get(key)
+        if bucket is None or (x, y) not in bucket:
+            return None
+        item = bucket.pop((x, y))
+        if not bucket:
+            del self._buckets[key]
+        self._count -= 1
+        return item
+
+    def get(self, x: int, y: int) -> Optional[Any]:
+        """Object at tile (x, y), or None."""
+        bucket = self._buckets.get((x // self.bucket_size, y // self.bucket_size))
+        return bucket.get((x, y)) if bucket is not None else None
+
+    def clear(self) -> None:
+        """Remove every object."""
+        self._buckets.clear()
+        self._count = 0
+
+    def query_rect(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[Tuple[Tuple[int, int], Any]]:
+        """
+        Objects inside a tile rectangle.
+
+        Args:
+            x0, y0: Top-left tile, inclusive
+            x1, y1: Bottom-right tile, exclusive
+
+        Yields:
+            ((x, y), item) pairs
+        """
+        if x0 >= x1 or y0 >= y1:
+            return
+        size = self.bucket_size
+        buckets = self._buckets
+        for by in range(y0 // size, (y1 - 1) // size + 1):
+            for bx in range(x0 // size, (x1 - 1) // size + 1):
+                bucket = buckets.get((bx, by))
+                if not bucket:
+                    continue
+                inside = (bx * size >= x0 and by * size >= y0 and
+                          (bx + 1) * size <= x1 and (by + 1) * size <= y1)
+                if inside:
+                    yield from bucket.items()
+                    continue
+                for (x, y), item in bucket.items():
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        yield (x, y), item
+
+    def nearest(self, x: int, y: int, max_distance: Optional[float] = None,
+                predicate: Optional[Callable[[Any], bool]] = None) -> Optional[Tuple[Tuple[int, int], Any]]:
+        """
+        Closest object to tile (x, y) by straight-line distance.
+
+        Buckets are searched in rings around the starting bucket, stopping
+        once no unvisited ring can hold anything closer than the best match.
+
+        Args:
+            x, y: Tile to search from
+            max_distance: Ignore objects farther away than this many tiles
+            predicate: Optional filter; only objects for which it returns True count
+
+        Returns:
+            ((x, y), item) of the closest match, or None if there is none
+        """
+        if not self._buckets:
+            return None
+        size = self.bucket_size
+        home_x, home_y = x // size, y // size
+        limit = float('inf') if max_distance is None else max_distance * max_distance
+        best = None
+        best_distance = limit
+
+        # Furthest ring that can still contain a bucket
+        bucket_xs = [bx for bx, _ in self._buckets]
+        bucket_ys = [by for _, by in self._buckets]
+        max_ring = max(abs(home_x - min(bucket_xs)), abs(home_x - max(bucket_xs)),
+                       abs(home_y - min(bucket_ys)), abs(home_y - max(bucket_ys)))
+
+        for ring in range(max_ring + 1):
+            # Tiles in this ring are at least (ring - 1) * size + 1 tiles away
+            gap = max(0, (ring - 1) * size + 1)
+            if gap * gap > best_distance:
+                break
+            for bx, by in self._ring(home_x, home_y, ring):
+                bucket = self._buckets.get((bx, by))
+                if not bucket:
+                    continue
+                for (ox, oy), item in bucket.items():
+                    distance = (ox - x) * (ox - x) + (oy - y) * (oy - y)
+                    if distance > best_distance:
+                        continue
+                    # Equal distances go to the topmost, then leftmost object, so results are stable
+                    if best is not None and distance == best_distance and (oy, ox) >= (best[0][1], best[0][0]):
+                        continue
+                    if predicate is None or predicate(item):
+                        best = ((ox, oy), item)
+                        best_distance = distance
+        return best
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> List[Tuple[int, int]]:
+        """Bucket coordinates at Chebyshev distance ring from (cx, cy)."""
+        if ring == 0:
+            return [(cx, cy)]
+        cells = []
+        for bx in range(cx - ring, cx + ring + 1):
+            cells.append((bx, cy - ring))
+            cells.append((bx, cy + ring))
+        for by in range(cy - ring + 1, cy + ring):
+            cells.append((cx - ring, by))
+            cells.append((cx + ring, by))
+        return cells
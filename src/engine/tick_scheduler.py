@@ -0,0 +1,122 @@
+"""
+Fixed-step game tick scheduler.
+
+The game simulates in whole ticks of tick_interval seconds, whatever the
+frame rate. Each frame hands the scheduler the real time that passed;
+it is added to an accumulator and one tick is run for every full
+tick_interval in it. Every tick runs the tick callbacks exactly once, in
+the order they were registered, with the number of the new tick.
+
+What is left in the accumulator is how far the game is between the last
+tick and the next one. As alpha (0.0 to 1.0) it is passed to the frame
+callbacks after the ticks of a frame, so sprites can be drawn part of the
+way through the move they started on the last tick.
+
+After a long stall (loading a map, a window drag, a breakpoint) the
+accumulator could hold many ticks; at most max_ticks_per_frame of them
+are run in one frame and the rest of the backlog is dropped, so the game
+slows down for a moment instead of freezing to catch up.
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.engine.logger import game_logger
+
+TICK_INTERVAL = 0.3  # Seconds per game tick; the player walks one tile per tick
+MAX_TICKS_PER_FRAME = 5
+
+
+class TickScheduler:
+    """The game's single clock; see the module docstring."""
+
+    def __init__(self, tick_interval: float = TICK_INTERVAL, max_ticks_per_frame: int = MAX_TICKS_PER_FRAME):
+        """
+        Initialize the scheduler at tick 0.
+
+        Args:
+            tick_interval: Seconds per game tick
+            max_ticks_per_frame: Most ticks run by one call to advance
+        """
+        if tick_interval <= 0:
+            raise ValueError("tick_interval must be positive")
+        if max_ticks_per_frame < 1:
+            raise ValueError("max_ticks_per_frame must be at least 1")
+        self.tick_interval = tick_interval
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.tick = 0  # Number of the last tick run
+        self.accumulator = 0.0  # Seconds towards the next tick
+        self.alpha = 0.0  # accumulator as a fraction of tick_interval
+        self.dropped_ticks = 0  # Ticks skipped by the catch-up cap, for diagnostics
+        # Set to a dict to add up the seconds spent in each callback, by qualified name
+        self.timings: Optional[Dict[str, float]] = None
+        self._tick_callbacks: List[Callable[[int], None]] = []
+        self._frame_callbacks: List[Callable[[float], None]] = []
+
+    def on_tick(self, callback: Callable[[int], None]) -> Callable[[int], None]:
+        """Call callback(tick) on every tick. Returns the callback, so this works as a decorator."""
+        self._tick_callbacks.append(callback)
+        return callback
+
+    def on_frame(self, callback: Callable[[float], None]) -> Callable[[float], None]:
+        """Call callback(alpha) once per frame, after that frame's ticks."""
+        self._frame_callbacks.append(callback)
+        return callback
+
+    def remove(self, callback: Callable) -> None:
+        """Stop calling a tick or frame callback."""
+        if callback in self._tick_callbacks:
+            self._tick_callbacks.remove(callback)
+        if callback in self._frame_callbacks:
+            self._frame_callbacks.remove(callback)
+
+    def advance(self, delta_time: float) -> int:
+        """
+        Run the ticks that fall due in delta_time seconds, then the frame callbacks.
+
+        Args:
+            delta_time: Real seconds since the last frame
+
+        Returns:
+            int: Number of ticks run
+        """
+        self.accumulator += max(0.0, delta_time)
+        due = int(self.accumulator // self.tick_interval)
+        if due > self.max_ticks_per_frame:
+            self.dropped_ticks += due - self.max_ticks_per_frame
+            game_logger.debug(f"Tick scheduler behind by {due} ticks; dropping {due - self.max_ticks_per_frame}")
+            due = self.max_ticks_per_frame
+            self.accumulator %= self.tick_interval
+        else:
+            self.accumulator -= due * self.tick_interval
+        self.run_ticks(due)
+        self.alpha = min(1.0, self.accumulator / self.tick_interval)
+        if self.timings is not None:
+            self._run_timed(self._frame_callbacks, self.alpha)
+            return due
+        for callback in tuple(self._frame_callbacks):
+            callback(self.alpha)
+        return due
+
+    def run_ticks(self, count: int) -> None:
+        """Run count ticks straight away, without touching the accumulator."""
+        for _ in range(count):
+            self.tick += 1
+            if self.timings is not None:
+                self._run_timed(self._tick_callbacks, self.tick)
+                continue
+            for callback in tuple(self._tick_callbacks):
+                callback(self.tick)
+
+    def _run_timed(self, callbacks: List[Callable], argument) -> None:
+        timings = self.timings
+        for callback in tuple(callbacks):
+            begin = time.perf_counter()
+            callback(argument)
+            name = getattr(callback, '__qualname__', repr(callback))
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - begin
+
+    def reset(self, tick: int = 0) -> None:
+        """Continue from tick, such as the tick counter of a loaded save, with nothing accumulated."""
+        self.tick = tick
+        self.accumulator = 0.0
+        self.alpha = 0.0
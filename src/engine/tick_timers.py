@@ -0,0 +1,164 @@
+"""
+Timers keyed by game tick, for world events that happen later.
+
+Rather than looking at every resource on every tick, anything that should
+happen at a later tick (a resource growing back, a harvest finishing, a
+respawn) schedules a timer for that tick. Each tick then costs only the
+timers that are due: pending timers sit in a binary heap ordered by tick
+and by the order they were scheduled, so run_due pops the due ones and
+never looks at the rest.
+
+A timer names an event rather than holding a function, so pending timers
+can be written into saves: its data must be JSON-compatible (a dict of
+plain values) and the handler for the event is registered once with
+TimerQueue.register. Cancelled timers are only marked and skipped when
+they come up (lazy deletion, as in the pathfinding heap); the heap is
+rebuilt without them once they make up most of it.
+"""
+import heapq
+from typing import Callable, Dict, List, Optional
+
+from src.engine.logger import game_logger
+
+
+class Timer:
+    """A pending event; returned by TimerQueue.schedule and passed to its handler."""
+
+    __slots__ = ('tick', 'event', 'data', 'cancelled')
+
+    def __init__(self, tick: int, event: str, data: Optional[Dict] = None):
+        self.tick = tick
+        self.event = event
+        self.data = data if data is not None else {}
+        self.cancelled = False
+
+    def __repr__(self):
+        return f"Timer(tick={self.tick}, event={self.event!r}, data={self.data!r})"
+
+
+class TimerQueue:
+    """Timers ordered by the tick they are due; see the module docstring."""
+
+    def __init__(self):
+        self.tick = 0  # Last tick run
+        self.handlers: Dict[str, Callable[[Timer], None]] = {}
+        self._heap = []  # (tick, sequence, Timer)
+        self._sequence = 0
+        self._cancelled = 0  # Cancelled timers still in the heap
+        self.dirty = False  # Timers scheduled, cancelled or run since the last take_dirty
+        self.fired = 0  # Timers run, for diagnostics
+
+    def __len__(self) -> int:
+        """Number of pending timers."""
+        return len(self._heap) - self._cancelled
+
+    def register(self, event: str, handler: Callable[[Timer], None]) -> None:
+        """Call handler(timer) for every timer of this event that falls due."""
+        self.handlers[event] = handler
+
+    def schedule(self, tick: int, event: str, data: Optional[Dict] = None) -> Timer:
+        """
+        Run an event at a game tick.
+
+        A tick that has already been run means the next one. Timers due on
+        the same tick run in the order they were scheduled.
+
+        Args:
+            tick: Game tick to run the event on
+            event: Name of the registered handler
+            data: JSON-compatible dictionary passed to the handler as timer.data
+
+        Returns:
+            Timer: Handle for cancel
+        """
+        timer = Timer(max(int(tick), self.tick + 1), event, data)
+        heapq.heappush(self._heap, (timer.tick, self._sequence, timer))
+        self._sequence += 1
+        self.dirty = True
+        return timer
+
+    def schedule_in(self, ticks: int, event: str, data: Optional[Dict] = None) -> Timer:
+        """Run an event a number of ticks after the last tick run."""
+        return self.schedule(self.tick + ticks, event, data)
+
+    def cancel(self, timer: Timer) -> bool:
+        """
+        Stop a timer from running.
+
+        Returns:
+            bool: False if it had already run or been cancelled
+        """
+        if timer.cancelled or timer.tick <= self.tick:
+            return False
+        timer.cancelled = True
+        self._cancelled += 1
+        self.dirty = True
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return True
+
+    def run_due(self, tick: int) -> int:
+        """
+        Run the timers due on or before tick.
+
+        Timers a handler schedules for this tick or earlier run on the next.
+
+        Returns:
+            int: Number of timers run
+        """
+        self.tick = tick
+        heap = self._heap
+        ran = 0
+        while heap and heap[0][0] <= tick:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                self._cancelled -= 1
+                continue
+            self.dirty = True
+            handler = self.handlers.get(timer.event)
+            if handler is None:
+                game_logger.warning(f"No handler for timer event {timer.event!r}; dropping it")
+                continue
+            try:
+                handler(timer)
+            except Exception as e:
+                game_logger.error(f"Error in timer {timer}: {e}")
+            ran += 1
+        self.fired += ran
+        return ran
+
+    def pending(self) -> List[Timer]:
+        """The pending timers, in the order they will run."""
+        return [entry[2] for entry in sorted(self._heap) if not entry[2].cancelled]
+
+    def to_list(self) -> List[List]:
+        """The pending timers as [tick, event, data] rows, in the order they will run, for a save."""
+        return [[timer.tick, timer.event, timer.data] for timer in self.pending()]
+
+    def load(self, rows: List[List], tick: int) -> None:
+        """
+        Replace the pending timers with those of a save.
+
+        Args:
+            rows: Rows written by to_list
+            tick: The game tick the save was made at
+        """
+        self.clear()
+        self.tick = tick
+        for timer_tick, event, data in rows:
+            self.schedule(timer_tick, event, data)
+        self.dirty = False
+
+    def clear(self) -> None:
+        """Drop every pending timer."""
+        self._heap = []
+        self._cancelled = 0
+        self.dirty = True
+
+    def take_dirty(self) -> bool:
+        """Whether the timers changed since the last call, for an incremental save."""
+        dirty = self.dirty
+        self.dirty = False
+        return dirty
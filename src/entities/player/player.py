@@ -6,12 +6,16 @@ import math
 from collections import deque
 from src.engine.logger import game_logger
 from src.entities.player.human_sprite import HumanSprite
+from src.engine.rendering.render_queue import RenderQueue, LAYER_SPRITES
+from src.engine.pathfinding import PathRequest
+
+PATH_DELIVERY_TICKS = 1  # A click's path is taken up this many ticks after the click, never sooner
 
 class Player:
     """
     Player class that handles player attributes, movement, and rendering.
     """
-    def __init__(self, grid_x, grid_y, tilemap, asset_manager, world_state=None):
+    def __init__(self, grid_x, grid_y, tilemap, asset_manager, world_state=None, headless=False):
         """
         Initialize the player.
         
@@ -21,6 +25,7 @@ class Player:
             tilemap: For backward compatibility, but should be None
             asset_manager: Asset manager for loading images and resources
             world_state: Reference to the world state for world interaction and pathfinding
+            headless: Skip building the sprite, for simulations without a display
         """
         if world_state is None:
             raise ValueError("world_state is required for Player initialization")
@@ -31,16 +36,21 @@ class Player:
         self.world_state = world_state
         self.on_arrival_callback = None  # Callback for when the player reaches their destination
         
-        # Initialize sprite and rect with blue color
-        self.sprite = HumanSprite(color=(0, 0, 255))  # Blue clothing
-        
-        # Force regeneration of sprite cache to ensure different animations for each direction
-        self.sprite._generate_cached_sprites()
-        
-        # Explicitly set the initial direction to down (0)
-        self.sprite.direction = 0
-        
-        self.rect = self.sprite.rect
+        if headless:
+            # Movement only; everything that animates or draws checks for a sprite
+            self.sprite = None
+            self.rect = pygame.Rect(0, 0, 32, 32)
+        else:
+            # Initialize sprite and rect with blue color
+            self.sprite = HumanSprite(color=(0, 0, 255))  # Blue clothing
+            
+            # Force regeneration of sprite cache to ensure different animations for each direction
+            self.sprite._generate_cached_sprites()
+            
+            # Explicitly set the initial direction to down (0)
+            self.sprite.direction = 0
+            
+            self.rect = self.sprite.rect
         
         # Set initial position
         self.x, self.y = self.world_state.world_to_screen(self.grid_x, self.grid_y)
@@ -83,6 +93,10 @@ class Player:
         self.final_tile_pending = False  # Flag to handle final tile movement
         self.actually_moving = False     # Flag to track when character is physically moving (not just queued)
         self.path = []  # Path for movement
+        self.path_request = None  # PathRequest of the last click, until its path is taken up
+        self.path_ready_tick = 0  # First tick that may take up path_request
+        self.late_paths = []  # (path_ready_tick, tick taken up) of paths taken up late, for the replay recorder
+        self.pending_on_arrival = None  # Arrival callback to attach once that path arrives
         
         # Attributes and stats
         self.max_health = 100
@@ -108,21 +122,83 @@ class Player:
         
         # Determine the starting position for pathfinding
         # If we're already moving and have a pending tile, use that as the start position
-        start_x, start_y = self.grid_x, self.grid_y
-        
-        # If we're in the middle of a movement and have a next position, use that instead
-        if self.moving and hasattr(self, 'next_grid_x') and hasattr(self, 'next_grid_y'):
-            start_x, start_y = self.next_grid_x, self.next_grid_y
+        start_x, start_y = self._path_start()
+        if (start_x, start_y) != (self.grid_x, self.grid_y):
             game_logger.debug(f"Starting new path from next position: ({start_x}, {start_y})")
         
+        # Whether the path is searched here or on the background path service,
+        # tick() takes it up PATH_DELIVERY_TICKS ticks from now, so a click
+        # starts moving on the same tick however long the search takes
+        game_ticks = getattr(self.world_state, 'game_ticks', 0)
+        if self.path_request is not None and game_ticks >= self.path_ready_tick:
+            # The last click's path was due but never arrived; it is dropped before the next tick
+            self.late_paths.append((self.path_ready_tick, game_ticks + 1))
+        self.path_ready_tick = game_ticks + PATH_DELIVERY_TICKS
+        self.pending_on_arrival = on_arrival
+        path_service = getattr(self.world_state, 'path_service', None)
+        if path_service is not None:
+            # A newer click replaces the pending one (owner=self cancels it)
+            self.path_request = path_service.request((start_x, start_y), (tile_x, tile_y), owner=self)
+            game_logger.debug(f"Requested path to ({tile_x}, {tile_y})")
+            return True
+        
         # Find path using A* from the appropriate starting position
         path = self.world_state.find_path((start_x, start_y), (tile_x, tile_y))
         
         # If no path found, return False
         if not path:
             game_logger.info(f"MOVE_TO_TILE: No path found to ({tile_x}, {tile_y})")
+            self.path_request = None
             return False
         
+        request = PathRequest((start_x, start_y), (tile_x, tile_y), None, owner=self)
+        request.path = path
+        request.done = True
+        self.path_request = request
+        game_logger.debug(f"Found path to ({tile_x}, {tile_y})")
+        return True
+    
+    def _path_start(self):
+        """Tile a new path should start from: the tile being entered if mid-move."""
+        if self.moving and hasattr(self, 'next_grid_x') and hasattr(self, 'next_grid_y'):
+            return self.next_grid_x, self.next_grid_y
+        return self.grid_x, self.grid_y
+    
+    def _receive_path(self, current_tick):
+        """Start walking the path of the last click once it is searched and due."""
+        request = self.path_request
+        if request is None or not request.done or current_tick < self.path_ready_tick:
+            return
+        self.path_request = None
+        if current_tick > self.path_ready_tick:
+            # The background search took longer than PATH_DELIVERY_TICKS; replays note it
+            self.late_paths.append((self.path_ready_tick, current_tick))
+            game_logger.debug(f"Path arrived {current_tick - self.path_ready_tick} ticks late")
+        tile_x, tile_y = request.goal
+        
+        if not request.path:
+            game_logger.info(f"MOVE_TO_TILE: No path found to ({tile_x}, {tile_y})")
+            return
+        
+        start_x, start_y = self._path_start()
+        if request.path[0] != (start_x, start_y):
+            # We walked on while the search ran; plan again from where we are now
+            self.move_to_tile(tile_x, tile_y, self.pending_on_arrival)
+            return
+        
+        self._start_path(request.path, start_x, start_y, self.pending_on_arrival)
+        game_logger.debug(f"Received path to ({tile_x}, {tile_y})")
+    
+    def _start_path(self, path, start_x, start_y, on_arrival=None):
+        """
+        Begin following a path on the next game tick.
+        
+        Args:
+            path: Tiles to walk, starting with (start_x, start_y)
+            start_x: X coordinate the path starts from
+            start_y: Y coordinate the path starts from
+            on_arrival: Optional callback for when the last tile is reached
+        """
         # Set the callback to be called when we arrive
         if on_arrival:
             self.on_arrival_callback = on_arrival
@@ -136,10 +212,11 @@ class Player:
         self.moving = True
         self.actually_moving = False
         self.movement_queued = True
-        self.last_move_tick = getattr(self.world_state, 'game_ticks', 0) - 1  # Ensure movement starts on next tick
+        self.last_move_tick = getattr(self.world_state, 'game_ticks', 0)  # Walking starts on the next tick
         
         # Set initial facing direction based on the first step in the path
-        if len(path) > 1:
+        # (slice instead of len() so hierarchical paths only refine their first leg)
+        if len(path[:2]) > 1:
             # Get the first movement step
             first_step = path[1]  # path[0] is current position
             dx = first_step[0] - start_x
@@ -175,12 +252,10 @@ class Player:
         current_pos = self.world_state.world_to_screen(self.grid_x, self.grid_y)
         self.movement_start_x = current_pos[0]
         self.movement_start_y = current_pos[1]
+        self.movement_target_x = current_pos[0]
+        self.movement_target_y = current_pos[1]
         self.x = current_pos[0]
         self.y = current_pos[1]
-            
-        game_logger.debug(f"Found path with {len(self.path)} tiles to ({tile_x}, {tile_y})")
-        
-        return True
         
     def _setup_next_movement_segment(self):
         """Set up the next movement segment."""
@@ -287,113 +362,127 @@ class Player:
         
         game_logger.debug(f"Starting smooth movement from ({self.start_x}, {self.start_y}) to ({self.target_x}, {self.target_y})")
     
-    def update(self, current_time):
-        """Update the player's movement and position based on game ticks."""
-        try:
-            # Get current game tick and tick information from world state
-            current_tick = getattr(self.world_state, 'game_ticks', 0)
-            tick_interval = getattr(self.world_state, 'tick_interval', 300) / 1000.0  # Convert to seconds
-            last_tick_time = getattr(self.world_state, 'last_tick_time', current_time - 16)
-            
-            # Calculate delta time since last update
-            dt = 1.0 / 60.0  # Default delta time if we can't calculate it
-            if hasattr(self, '_last_update_time'):
-                dt = (current_time - self._last_update_time) / 1000.0  # Convert to seconds
-            self._last_update_time = current_time
+    def tick(self, current_tick):
+        """
+        Advance the player's movement by one game tick.
+        
+        Called by the world's TickScheduler exactly once per tick, so the
+        player walks one segment per tick whatever the frame rate.
+        
+        Args:
+            current_tick: Number of the tick being run
+        """
+        # Paths are only taken up on ticks, never between them, so a session
+        # plays out the same tick for tick on replay
+        if self.path_request is not None:
+            self._receive_path(current_tick)
+        
+        if not self.moving:
+            return
+        
+        # Check if this is the first movement (queued movement)
+        if hasattr(self, 'movement_queued') and self.movement_queued:
+            # Start the movement on this tick
+            self.movement_queued = False
+            # This is when we actually start moving - set the flag here
+            self.actually_moving = True
             
-            # Handle movement
-            if self.moving:
-                # Check if we're on a new game tick
-                if current_tick > self.last_move_tick:
-                    # Check if this is the first movement (queued movement)
-                    if hasattr(self, 'movement_queued') and self.movement_queued:
-                        # Start the movement on this tick
-                        self.movement_queued = False
-                        # This is when we actually start moving - set the flag here
-                        self.actually_moving = True
-                        
-                        # Now that we're actually moving, set the sprite's walking state
-                        # THIS IS THE ONLY PLACE WHERE walking SHOULD BE SET TO TRUE
-                        if hasattr(self, 'sprite') and self.sprite:
-                            self.sprite.walking = True
-                            # Start animation from beginning
-                            self.sprite.animation_time = 0
-                            
-                        game_logger.debug(f"Starting queued movement on tick {current_tick}")
-                        
-                    # Check if we need to finalize the last movement
-                    elif hasattr(self, 'final_tile_pending') and self.final_tile_pending:
-                        # Update grid position to the final tile
-                        self.grid_x, self.grid_y = self.next_grid_x, self.next_grid_y
-                        
-                        # Remove the tiles we've moved through
-                        tiles_to_remove = getattr(self, 'tiles_to_remove', 1)
-                        for _ in range(min(tiles_to_remove, len(self.path))):
-                            self.path.pop(0)
-                            
-                        self.final_tile_pending = False
-                        
-                        # If we've reached the end of the path
-                        if not self.path:
-                            self.moving = False
-                            self.actually_moving = False
-                            self.path = []          
-                            # Call the arrival callback if it exists
-                            if hasattr(self, 'on_arrival_callback') and self.on_arrival_callback:
-                                try:
-                                    self.on_arrival_callback()
-                                except Exception as e:
-                                    game_logger.error(f"Error in arrival callback: {e}")
-                                finally:
-                                    self.on_arrival_callback = None
-                    
-                    # We've moved to a new tick, process the movement for this tick if still moving
-                    if self.moving and self.path:
-                        self._process_movement_for_tick(current_tick)
+            # Now that we're actually moving, set the sprite's walking state
+            # THIS IS THE ONLY PLACE WHERE walking SHOULD BE SET TO TRUE
+            if hasattr(self, 'sprite') and self.sprite:
+                self.sprite.walking = True
+                # Start animation from beginning
+                self.sprite.animation_time = 0
                 
-                # Always do smooth visual interpolation between positions
-                # Get current position in screen coordinates
-                current_x, current_y = self.world_state.world_to_screen(self.grid_x, self.grid_y)
+            game_logger.debug(f"Starting queued movement on tick {current_tick}")
+            
+        # Check if we need to finalize the last movement
+        elif hasattr(self, 'final_tile_pending') and self.final_tile_pending:
+            # Update grid position to the final tile
+            self.grid_x, self.grid_y = self.next_grid_x, self.next_grid_y
+            
+            # Remove the tiles we've moved through
+            tiles_to_remove = getattr(self, 'tiles_to_remove', 1)
+            for _ in range(tiles_to_remove):
+                if not self.path:
+                    break
+                self.path.pop(0)
                 
-                # Determine the next position to move towards
-                if hasattr(self, 'path') and self.path:
-                    # Calculate how far we should be between current position and next position
-                    # based on time since last tick
-                    time_since_tick = (current_time - last_tick_time) / 1000.0
-                    progress = min(1.0, time_since_tick / tick_interval)
-                    
-                    # Get the next position (either from next_grid_x/y or from path)
-                    if hasattr(self, 'next_grid_x') and hasattr(self, 'next_grid_y'):
-                        next_x, next_y = self.world_state.world_to_screen(self.next_grid_x, self.next_grid_y)
-                    elif self.path:
-                        next_x, next_y = self.world_state.world_to_screen(self.path[0][0], self.path[0][1])
-                    else:
-                        next_x, next_y = current_x, current_y
-                    
-                    # Store the start position for this movement segment if not already set
-                    if not hasattr(self, 'movement_start_x') or not hasattr(self, 'movement_start_y'):
-                        self.movement_start_x = current_x
-                        self.movement_start_y = current_y
-                        self.movement_target_x = next_x
-                        self.movement_target_y = next_y
-                    
-                    # Interpolate position for smooth movement
-                    # Use the stored start and target positions to avoid jumps
-                    self.x = self.movement_start_x + (self.movement_target_x - self.movement_start_x) * progress
-                    self.y = self.movement_start_y + (self.movement_target_y - self.movement_start_y) * progress
-                    
-                    # Update the rect position
-                    if hasattr(self, 'rect'):
-                        self.rect.centerx = int(self.x)
-                        self.rect.centery = int(self.y) - self.character_y_offset  # Apply character y offset
-                else:
-                    # No path, just stay at current position
-                    self.x = current_x
-                    self.y = current_y
-                    if hasattr(self, 'rect'):
-                        self.rect.centerx = int(self.x)
-                        self.rect.centery = int(self.y) - self.character_y_offset  # Apply character y offset
+            self.final_tile_pending = False
             
+            # If we've reached the end of the path
+            if not self.path:
+                self.moving = False
+                self.actually_moving = False
+                self.path = []          
+                # Call the arrival callback if it exists
+                if hasattr(self, 'on_arrival_callback') and self.on_arrival_callback:
+                    try:
+                        self.on_arrival_callback()
+                    except Exception as e:
+                        game_logger.error(f"Error in arrival callback: {e}")
+                    finally:
+                        self.on_arrival_callback = None
+        
+        # Process the movement for this tick if still moving
+        if self.moving and self.path:
+            self._process_movement_for_tick(current_tick)
+    
+    def interpolate(self, alpha):
+        """
+        Place the player part of the way through the current move.
+        
+        Called by the world's TickScheduler once per frame, after that
+        frame's ticks.
+        
+        Args:
+            alpha: How far the game is from the last tick to the next (0.0 to 1.0)
+        """
+        if not self.moving:
+            return
+        
+        # Get current position in screen coordinates
+        current_x, current_y = self.world_state.world_to_screen(self.grid_x, self.grid_y)
+        
+        # Determine the next position to move towards
+        if hasattr(self, 'path') and self.path:
+            # Get the next position (either from next_grid_x/y or from path)
+            if hasattr(self, 'next_grid_x') and hasattr(self, 'next_grid_y'):
+                next_x, next_y = self.world_state.world_to_screen(self.next_grid_x, self.next_grid_y)
+            else:
+                next_x, next_y = self.world_state.world_to_screen(self.path[0][0], self.path[0][1])
+            
+            # Store the start position for this movement segment if not already set
+            if not hasattr(self, 'movement_start_x') or not hasattr(self, 'movement_start_y'):
+                self.movement_start_x = current_x
+                self.movement_start_y = current_y
+                self.movement_target_x = next_x
+                self.movement_target_y = next_y
+            
+            # Interpolate position for smooth movement
+            # Use the stored start and target positions to avoid jumps
+            self.x = self.movement_start_x + (self.movement_target_x - self.movement_start_x) * alpha
+            self.y = self.movement_start_y + (self.movement_target_y - self.movement_start_y) * alpha
+        else:
+            # No path, just stay at current position
+            self.x = current_x
+            self.y = current_y
+        
+        # Update the rect position
+        if hasattr(self, 'rect'):
+            self.rect.centerx = int(self.x)
+            self.rect.centery = int(self.y) - self.character_y_offset  # Apply character y offset
+    
+    def update(self, delta_time):
+        """
+        Per-frame player update: animate the sprite.
+        
+        Movement itself happens in tick() and interpolate().
+        
+        Args:
+            delta_time: Seconds since the last frame
+        """
+        try:
             # Always update the sprite direction based on facing
             if hasattr(self, 'sprite') and self.sprite:
                 # Convert facing direction to sprite direction
@@ -413,7 +502,7 @@ class Player:
                 is_moving = self.actually_moving
                 
                 # Update the sprite with the current direction and walking state
-                self.sprite.update(dt, is_moving=is_moving, direction=sprite_direction)
+                self.sprite.update(delta_time, is_moving=is_moving, direction=sprite_direction)
                 
         except Exception as e:
             game_logger.error(f"Error in player update: {e}")
@@ -426,11 +515,9 @@ class Player:
         if not self.moving or not self.path:
             return
             
-        # We can move up to 2 tiles per tick
-        tiles_to_move = min(len(self.path), self.tiles_per_move)
-        
         # Store the tiles we'll move through in this tick
-        tiles_for_this_tick = self.path[:tiles_to_move]
+        tiles_for_this_tick = self.path[:self.tiles_per_move]
+        tiles_to_move = len(tiles_for_this_tick)
         
         # Set up the movement segment
         start_tile = (self.grid_x, self.grid_y)
@@ -500,6 +587,66 @@ class Player:
         if hasattr(self, 'movement_queue') and self.movement_queue and not self.moving:
             self._start_next_move()
                 
+    def submit(self, queue, screen, camera_x=0, camera_y=0):
+        """
+        Queue the player's current animation frame for drawing.
+        
+        The frame is sorted by the player's y position (the centre of the tile
+        it stands on), so resources on lower rows are drawn in front of it.
+        
+        Args:
+            queue: RenderQueue collecting this frame's sprites
+            screen: The surface that will be drawn on, used to skip off-screen sprites
+            camera_x: Camera x offset
+            camera_y: Camera y offset
+            
+        Returns:
+            bool: True if a frame was queued
+        """
+        if not screen or not hasattr(screen, 'blit') or not hasattr(self, 'sprite') or not self.sprite:
+            return False
+            
+        # Ensure we have valid position
+        if not hasattr(self, 'x') or not hasattr(self, 'y'):
+            return False
+            
+        # Calculate screen position with camera offset
+        screen_x = int(self.x - camera_x)
+        screen_y = int(self.y - camera_y)
+        
+        # Skip drawing if off-screen (with some margin for sprites that might be partially visible)
+        margin = 128  # Increased margin to account for sprite size
+        if (screen_x < -margin or screen_x > screen.get_width() + margin or 
+            screen_y < -margin or screen_y > screen.get_height() + margin):
+            return False
+        
+        # Update animation state
+        self.sprite.walking = hasattr(self, 'moving') and self.moving
+        
+        # Update sprite facing direction
+        if hasattr(self, 'facing'):
+            if self.facing == 'left':
+                self.sprite.direction = 1  # Left
+            elif self.facing == 'right':
+                self.sprite.direction = 3  # Right
+            elif self.facing == 'up':
+                self.sprite.direction = 2  # Up
+            else:  # down or default
+                self.sprite.direction = 0  # Down
+        
+        frame = self.sprite.get_current_frame()
+        if frame is None:
+            return False
+        
+        # The sprite is centred on the player's position, raised by the y offset
+        frame_width, frame_height = frame.get_size()
+        pos_x = screen_x - frame_width // 2
+        pos_y = screen_y - self.character_y_offset - frame_height // 2
+        self.sprite.rect = self.rect
+        self.rect.update(pos_x, pos_y, frame_width, frame_height)
+        queue.submit(frame, (pos_x, pos_y), self.y, LAYER_SPRITES)
+        return True
+    
     def draw(self, screen, camera_x=0, camera_y=0, debug=False):
         """
         Draw the player on the screen.
@@ -510,47 +657,15 @@ class Player:
             camera_y: Camera y offset
             debug: If True, draw debug information
         """
-        if not screen or not hasattr(screen, 'blit') or not hasattr(self, 'sprite') or not self.sprite:
-            return
-            
         try:
-            # Ensure we have valid position
-            if not hasattr(self, 'x') or not hasattr(self, 'y'):
+            queue = RenderQueue()
+            if not self.submit(queue, screen, camera_x, camera_y):
                 return
-                
-            # Calculate screen position with camera offset
+            queue.flush(screen)
+            
             screen_x = int(self.x - camera_x)
             screen_y = int(self.y - camera_y)
             
-            # Skip drawing if off-screen (with some margin for sprites that might be partially visible)
-            margin = 128  # Increased margin to account for sprite size
-            if (screen_x < -margin or screen_x > screen.get_width() + margin or 
-                screen_y < -margin or screen_y > screen.get_height() + margin):
-                return
-            
-            # Update animation state
-            self.sprite.walking = hasattr(self, 'moving') and self.moving
-            
-            # Update sprite facing direction
-            if hasattr(self, 'facing'):
-                if self.facing == 'left':
-                    self.sprite.direction = 1  # Left
-                elif self.facing == 'right':
-                    self.sprite.direction = 3  # Right
-                elif self.facing == 'up':
-                    self.sprite.direction = 2  # Up
-                else:  # down or default
-                    self.sprite.direction = 0  # Down
-            
-            # Draw the sprite at the current position
-            # Make sure to update the rect position first
-            self.rect.centerx = screen_x
-            self.rect.centery = screen_y
-            self.sprite.rect = self.rect
-            
-            # Draw the sprite with feet at the specified position, applying the y offset
-            self.sprite.draw(screen, screen_x, screen_y - self.character_y_offset)
-            
             # Draw debug information
             if debug:
                 # Draw player position
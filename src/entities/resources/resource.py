@@ -2,6 +2,8 @@ import pygame
 from enum import Enum
 from typing import Tuple, Optional
 
+from src.engine.rendering.render_queue import RenderQueue, LAYER_SPRITES, LAYER_OVERLAY
+
 class ResourceType(Enum):
     """Types of resources in the game."""
     TREE = "tree"
@@ -94,6 +96,24 @@ class Resource:
             camera_y: Camera y position
             asset_manager: Asset manager to get the resource image
         """
+        queue = RenderQueue()
+        self.submit(queue, screen, camera_x, camera_y, asset_manager)
+        queue.flush(screen)
+        
+    def submit(self, queue: RenderQueue, screen: pygame.Surface, camera_x: int, camera_y: int, asset_manager):
+        """
+        Queue the resource sprite (and its harvest progress bar) for drawing.
+        
+        The sprite is sorted by the bottom edge of its tile, so it is drawn in
+        front of whatever stands on the rows above it.
+        
+        Args:
+            queue: RenderQueue collecting this frame's sprites
+            screen: Pygame surface that will be drawn on, used to skip off-screen resources
+            camera_x: Camera x position
+            camera_y: Camera y position
+            asset_manager: Asset manager to get the resource image
+        """
         if self.is_harvested:
             return
             
@@ -110,22 +130,32 @@ class Resource:
         image = asset_manager.get_image(self.resource_type.value)
         if image:
             # For trees, adjust the y-position to account for the height of the sprite
-            y_offset = -16 if self.resource_type == ResourceType.TREE else 0
-            screen.blit(image, (pixel_x, pixel_y + y_offset))
+            y_offset = self._sprite_y_offset()
+            queue.submit(image, (pixel_x, pixel_y + y_offset), (self.y + 1) * 32, LAYER_SPRITES)
             
             # Draw progress bar if being harvested
             if self.is_harvesting and self.harvest_time > 0:
                 progress = self.current_harvest_time / self.harvest_time
-                bar_width = 32
-                bar_height = 4
-                bar_x = pixel_x
-                bar_y = pixel_y - 6 + y_offset  # Position above the resource
-                
-                # Draw background of progress bar
-                pygame.draw.rect(screen, (100, 100, 100), (bar_x, bar_y, bar_width, bar_height))
-                # Draw progress
-                pygame.draw.rect(screen, (0, 255, 0), (bar_x, bar_y, int(bar_width * progress), bar_height))
+                bar = pygame.Surface((32, 4))
+                bar.fill((100, 100, 100))
+                bar.fill((0, 255, 0), (0, 0, int(32 * progress), 4))
+                # Position above the resource
+                queue.submit(bar, (pixel_x, pixel_y - 6 + y_offset), (self.y + 1) * 32, LAYER_OVERLAY)
     
+    def _sprite_y_offset(self) -> int:
+        """Vertical offset of the sprite from its tile; trees reach 16 pixels into the tile above."""
+        return -16 if self.resource_type == ResourceType.TREE else 0
+    
+    def get_sprite_rect(self) -> pygame.Rect:
+        """
+        Get the area the resource visibly covers, for click hit-testing.
+        
+        Returns:
+            pygame.Rect: The tile rectangle, extended upwards by the tree canopy for trees
+        """
+        y_offset = self._sprite_y_offset()
+        return pygame.Rect(self.x * 32, self.y * 32 + y_offset, 32, 32 - y_offset)
+        
     def get_rect(self) -> pygame.Rect:
         """
         Get the rectangle for collision detection.
@@ -1,6 +1,8 @@
 """
 Play state for the main game.
 """
+import os
+import time
 import pygame
 from .game_state import GameState
 from .player_state import PlayerState
@@ -8,11 +10,16 @@ from .world_state import WorldState
 from src.engine.asset_manager import AssetManager
 from src.engine.save_manager import SaveManager
 from src.engine.logger import game_logger
+from src.engine.rendering import RenderQueue
+from src.engine.replay import ReplayRecorder
+
+# Keys written to replays, for reading them back; only F9 changes the game
+REPLAYED_KEYS = (pygame.K_F3, pygame.K_F4, pygame.K_i, pygame.K_F5, pygame.K_F9)
 
 class PlayState(GameState):
     """Main gameplay state."""
     
-    def __init__(self, asset_manager, save_manager, map_file='assets/maps/generated_map.json'):
+    def __init__(self, asset_manager, save_manager, map_file='assets/maps/generated_map.json', replay_directory=None):
         """
         Initialize play state.
         
@@ -20,6 +27,7 @@ class PlayState(GameState):
             asset_manager: The asset manager for loading game assets
             save_manager: The save manager for handling game saves
             map_file: Path to the map JSON file to load
+            replay_directory: Record a replay of every session into this directory if given
         """
         super().__init__()
         self.asset_manager = asset_manager
@@ -37,12 +45,19 @@ class PlayState(GameState):
         self.camera_x = 0
         self.camera_y = 0
         
+        # Sprites of the current frame, drawn back to front
+        self.render_queue = RenderQueue()
+        
         # UI state
         self.show_inventory = False
         
         # Debug info
         self.debug_font = pygame.font.Font(None, 24)
         self.show_debug = False
+        
+        # Replay of the current session
+        self.replay_directory = replay_directory
+        self.replay_recorder = None
     
     def enter_state(self, character_name=None):
         """
@@ -56,6 +71,9 @@ class PlayState(GameState):
         # Set up the world
         self.world.setup_world()
         
+        # Search paths on a background thread so long clicks never stall a frame
+        self.world.start_path_service()
+        
         # Initialize player state with the selected character
         if not self.player_initialized:
             self.player_state = PlayerState(
@@ -65,11 +83,7 @@ class PlayState(GameState):
             )
             
             if character_name and self.save_manager.character_name != character_name:
-                self.save_manager.character_name = character_name
-                self.save_manager.character_save_file = os.path.join(
-                    self.save_manager.save_directory, 
-                    f"{character_name}.json"
-                )
+                self.save_manager.select_character(character_name)
             
             # Try to load player state if a character name is provided, otherwise create new
             if character_name and self.player_state.load_player():
@@ -81,7 +95,15 @@ class PlayState(GameState):
                 else:
                     game_logger.info("Created new character")
             
+            # Re-apply the saved changes to the world on top of the map file
+            self.world.load_state(self.save_manager)
+            
             self.player_initialized = True
+        
+        if self.replay_directory and self.replay_recorder is None:
+            name = self.save_manager.character_name or 'session'
+            path = os.path.join(self.replay_directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.replay")
+            self.replay_recorder = ReplayRecorder(path, self.world, self.player_state)
     
     def handle_events(self, events):
         """Handle game events."""
@@ -91,9 +113,14 @@ class PlayState(GameState):
                 
             # Handle key presses
             if event.type == pygame.KEYDOWN:
+                if self.replay_recorder and event.key in REPLAYED_KEYS:
+                    self.replay_recorder.record_key(pygame.key.name(event.key))
                 # Toggle debug info
                 if event.key == pygame.K_F3:
                     self.show_debug = not self.show_debug
+                # Toggle the scroll-reuse terrain renderer
+                elif event.key == pygame.K_F4:
+                    self.world.enable_scrolling_viewport(self.world.scrolling_viewport is None)
                 # Toggle inventory
                 elif event.key == pygame.K_i:
                     self.show_inventory = not self.show_inventory
@@ -116,30 +143,43 @@ class PlayState(GameState):
                     tile_x = int(world_x // tile_size)
                     tile_y = int(world_y // tile_size)
                     
+                    # Clicking a tree's canopy targets the tree even though it is drawn over another tile
+                    resource = self.world.get_resource_at_point(world_x, world_y)
+                    if resource is not None:
+                        tile_x, tile_y = resource.x, resource.y
+                    
                     game_logger.info(f"MOUSE_CLICK: Screen: ({mouse_x}, {mouse_y}), "
                                    f"World: ({world_x:.1f}, {world_y:.1f}), "
                                    f"Grid: ({tile_x}, {tile_y})")
                     
                     if hasattr(self.player_state, 'handle_click'):
                         game_logger.debug(f"Forwarding click to player_state.handle_click({tile_x}, {tile_y})")
+                        if self.replay_recorder:
+                            self.replay_recorder.record_click(tile_x, tile_y)
                         self.player_state.handle_click(tile_x, tile_y)
                     else:
                         game_logger.warning("player_state has no handle_click method")
     
     def update(self, delta_time):
         """Update game state."""
-        current_time = pygame.time.get_ticks()  # Keep time in milliseconds for consistency
+        # Run the game ticks that fell due; the player walks and interpolates on them
+        self.world.update(delta_time)
         
-        # Update world and player
-        self.world.update(current_time)
-        
-        # Update player with the current time for movement interpolation
+        # Pick up finished paths and animate the player
         if hasattr(self, 'player_state') and self.player_state:
-            self.player_state.update(current_time)
+            self.player_state.update(delta_time)
         
         # Update camera to follow player if player exists
         if hasattr(self, 'player_state') and self.player_state and self.player_state.player:
             self._update_camera()
+            
+            # Stream map chunks in around the player on chunked maps
+            player = self.player_state.player
+            self.world.set_focus(player.grid_x, player.grid_y)
+            
+            # Journal what changed this tick; the save manager decides when to write
+            if self.save_manager.character_name:
+                self.save_manager.auto_save(player, self.world, self.world.game_ticks)
     
     def _update_camera(self):
         """Update camera to follow player."""
@@ -192,24 +232,24 @@ class PlayState(GameState):
         # Clear the screen
         screen.fill((0, 0, 0))
         
-        # Draw the world
+        # Draw the terrain and queue the resources on it
+        queue = self.render_queue
         if hasattr(self, 'world'):
-            self.world.draw(screen, self.camera_x, self.camera_y)
+            self.world.draw(screen, self.camera_x, self.camera_y, queue)
             
-        # Draw the player if it exists
+        # Queue the player if it exists
         if hasattr(self, 'player_state') and hasattr(self.player_state, 'player') and self.player_state.player:
             try:
-                # Draw the player through the player state
-                self.player_state.draw(screen, self.camera_x, self.camera_y)
+                # Queue the player and click indicators through the player state
+                self.player_state.submit(queue, screen, self.camera_x, self.camera_y)
                 
-                # Draw player debug info if enabled
-                if hasattr(self, 'show_debug') and self.show_debug:
-                    self._draw_debug_info(screen)
-                    
                 # Player is loaded, no need to show loading message
             except Exception as e:
                 game_logger.error(f"Error drawing player: {e}")
         
+        # Draw resources and the player together, sorted so whatever stands lower is in front
+        queue.flush(screen)
+        
         # Draw UI elements
         if hasattr(self, 'show_inventory') and self.show_inventory:
             self._draw_inventory(screen)
@@ -252,6 +292,7 @@ class PlayState(GameState):
             f"Game Ticks: {self.world.game_ticks}",
             "",
             "F3: Toggle Debug",
+            "F4: Toggle Scroll Renderer",
             "F5: Quick Save",
             "F9: Quick Load",
             "I: Toggle Inventory"
@@ -262,10 +303,9 @@ class PlayState(GameState):
             screen.blit(text, (10, 10 + i * 25))
     
     def save_game(self):
-        """Save the current game state."""
-        if hasattr(self.save_manager, 'save_character'):
-            self.save_manager.save_character(self.player_state.player)
-            self.world.save_state(self.save_manager)
+        """Save the current game state as complete snapshots, compacting the save journals."""
+        if self.player_state and self.player_state.player and self.save_manager.character_name:
+            self.save_manager.checkpoint(self.player_state.player, self.world, self.world.game_ticks)
             game_logger.info("Game saved successfully")
     
     def load_game(self):
@@ -278,6 +318,11 @@ class PlayState(GameState):
         """Called when state becomes inactive."""
         # Save game when exiting
         self.save_game()
+        if self.replay_recorder:
+            self.replay_recorder.close()
+            self.replay_recorder = None
+        self.world.stop_path_service()
+        self.world.stop_streaming()
     
     def resize(self, width, height):
         """Handle window resize."""
@@ -4,11 +4,12 @@ Player state management for the game.
 import pygame
 from src.entities.player.player import Player
 from src.engine.logger import game_logger
+from src.engine.rendering import RenderQueue, LAYER_GROUND
 
 class PlayerState:
     """Manages player state and actions."""
     
-    def __init__(self, asset_manager, save_manager, world_state):
+    def __init__(self, asset_manager, save_manager, world_state, headless=False):
         """
         Initialize player state.
         
@@ -16,8 +17,10 @@ class PlayerState:
             asset_manager: The asset manager for loading player assets
             save_manager: The save manager for handling game saves
             world_state: Reference to the WorldState for world interaction
+            headless: Create players without sprites, for simulations without a display
         """
         self.player = None
+        self.headless = headless
         self.asset_manager = asset_manager
         self.save_manager = save_manager
         self.world_state = world_state
@@ -27,8 +30,19 @@ class PlayerState:
         
         # Set up player after world is initialized
         if world_state:
+            # Walk and interpolate whichever player is current on the world's clock
+            world_state.ticks.on_tick(self._tick_player)
+            world_state.ticks.on_frame(self._interpolate_player)
             self._setup_player()
     
+    def _tick_player(self, tick):
+        if self.player:
+            self.player.tick(tick)
+    
+    def _interpolate_player(self, alpha):
+        if self.player:
+            self.player.interpolate(alpha)
+    
     def _setup_player(self):
         """Set up the player with the current world state."""
         if not hasattr(self, 'player') or not self.player:
@@ -53,7 +67,8 @@ class PlayerState:
             x, y, 
             tilemap=None,  # We'll use world_state for pathfinding
             asset_manager=self.asset_manager,
-            world_state=self.world_state
+            world_state=self.world_state,
+            headless=self.headless
         )
         return self.player
     
@@ -88,11 +103,11 @@ class PlayerState:
             
         return False
     
-    def update(self, current_time):
+    def update(self, delta_time):
         """Update player state.
         
         Args:
-            current_time: Current game time in seconds
+            delta_time: Seconds since the last frame
         """
         if not hasattr(self, 'player') or not self.player:
             return
@@ -102,9 +117,9 @@ class PlayerState:
             if hasattr(self.player, 'process_movement_queue'):
                 self.player.process_movement_queue()
                 
-            # Update player state with current time for movement interpolation
+            # Paths and movement run on the world's ticks; this animates the sprite
             if hasattr(self.player, 'update'):
-                self.player.update(current_time)
+                self.player.update(delta_time)
                 
         except Exception as e:
             game_logger.error(f"Error updating player: {e}")
@@ -119,10 +134,24 @@ class PlayerState:
     
     def draw(self, screen, camera_x, camera_y):
         """Draw player and related UI elements."""
+        queue = RenderQueue()
+        self.submit(queue, screen, camera_x, camera_y)
+        queue.flush(screen)
+    
+    def submit(self, queue, screen, camera_x, camera_y):
+        """
+        Queue the player and click indicators for drawing.
+        
+        Args:
+            queue: RenderQueue collecting this frame's sprites
+            screen: The surface that will be drawn on
+            camera_x: Camera x offset
+            camera_y: Camera y offset
+        """
         if self.player:
-            self.player.draw(screen, camera_x, camera_y)
+            self.player.submit(queue, screen, camera_x, camera_y)
         
-        # Draw click indicators
+        # Click indicators lie on the ground, below every sprite
         if hasattr(self, 'world_state') and self.world_state:
             tile_size = self.world_state.tile_size
             for x, y, time_remaining in self.click_indicators:
@@ -130,7 +159,7 @@ class PlayerState:
                 if alpha > 0:
                     s = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
                     pygame.draw.rect(s, (255, 255, 0, alpha), (0, 0, tile_size, tile_size), 2)
-                    screen.blit(s, (x * tile_size - camera_x, y * tile_size - camera_y))
+                    queue.submit(s, (x * tile_size - camera_x, y * tile_size - camera_y), y, LAYER_GROUND)
     
     def handle_click(self, tile_x, tile_y, button=1):
         """
@@ -151,13 +180,6 @@ class PlayerState:
         grid_y = int(round(tile_y))
         game_logger.info(f"CLICK: Processing click at grid position: ({grid_x}, {grid_y})")
         
-        if self.world_state.is_walkable(grid_x, grid_y):
-            game_logger.info(f"MOVE_START: Moving to walkable tile: ({grid_x}, {grid_y})")
-            success = self.player.move_to_tile(grid_x, grid_y)
-            game_logger.info(f"MOVE_INITIATED: {success}")
-        else:
-            game_logger.warning(f"MOVE_BLOCKED: Tile not walkable: ({grid_x}, {grid_y})")
-            
         # Clear any existing click indicators and add new one
         self.click_indicators = [(grid_x, grid_y, 1000)]  # 1000ms = 1 second
         
@@ -170,6 +192,7 @@ class PlayerState:
             game_logger.info(f"TARGET_RESOURCE: Targeting {type(resource).__name__} at ({grid_x}, {grid_y})")
             
             # Move to the nearest walkable tile next to the resource
+            # (resources mark their own tile unwalkable in the world's walkability grid)
             for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                 nx, ny = grid_x + dx, grid_y + dy
                 if self.world_state.is_walkable(nx, ny):
@@ -5,24 +5,49 @@ import os
 import json
 import pygame
 import random
-from enum import Enum, auto
 from dataclasses import dataclass
 from typing import Dict, Tuple, Optional, List
 
 from src.entities.resources import Tree, Rock
 from src.engine.logger import game_logger
+from src.engine.pathfinding import ENGINES, PathCache, PathfindingService
+from src.engine.rendering import TerrainChunkCache, ScrollingViewport, RenderQueue
+from src.engine.spatial_index import SpatialGrid
+from src.engine.agents import AgentSystem
+from src.engine.tick_scheduler import TickScheduler
+from src.engine.tick_timers import TimerQueue
+from src.engine.map_format import (TileType, TILE_TYPES_BY_CODE, BLOCKING_TILE_TYPES, WALKABLE_BY_CODE,
+                                   is_binary_map, read_binary_map, write_binary_map)
+from src.engine.chunked_world import ChunkStore, is_chunked_map, write_chunked_map
+from src.engine.save_journal import WorldChanges
 
-class TileType(Enum):
-    """Types of tiles in the game world."""
-    GRASS = auto()
-    WATER = auto()
-    SAND = auto()
-    DIRT = auto()
-    STONE = auto()
+# Image names in the asset manager, per tile type
+TILE_IMAGE_NAMES = {
+    TileType.GRASS: "grass",
+    TileType.WATER: "water",
+    TileType.SAND: "sand",
+    TileType.DIRT: "dirt",
+    TileType.STONE: "stone",
+}
+
+# Fallback colored rectangles if no image is available
+TILE_COLORS = {
+    TileType.GRASS: (34, 139, 34),  # Forest green
+    TileType.WATER: (30, 144, 255),  # Dodger blue
+    TileType.SAND: (238, 214, 175),  # Sand
+    TileType.DIRT: (139, 69, 19),    # Brown
+    TileType.STONE: (169, 169, 169)  # Dark gray
+}
 
 @dataclass
 class Tile:
-    """Represents a single tile in the game world."""
+    """
+    Represents a single tile in the game world.
+    
+    WorldState stores terrain as a byte grid rather than as Tile objects;
+    get_tile builds one of these as a read-only snapshot. Change tiles with
+    WorldState.set_tile.
+    """
     tile_type: TileType = TileType.GRASS
     walkable: bool = True
     image: pygame.Surface = None
@@ -30,7 +55,7 @@ class Tile:
     
     def __post_init__(self):
         """Initialize the tile with default values based on type."""
-        self.walkable = self.tile_type not in [TileType.WATER, TileType.STONE]
+        self.walkable = self.tile_type not in BLOCKING_TILE_TYPES
         
     def draw(self, screen: pygame.Surface, x: int, y: int, tile_size: int) -> None:
         """
@@ -45,15 +70,7 @@ class Tile:
         if self.image:
             screen.blit(self.image, (x, y))
         else:
-            # Fallback colored rectangles if no image is available
-            colors = {
-                TileType.GRASS: (34, 139, 34),  # Forest green
-                TileType.WATER: (30, 144, 255),  # Dodger blue
-                TileType.SAND: (238, 214, 175),  # Sand
-                TileType.DIRT: (139, 69, 19),    # Brown
-                TileType.STONE: (169, 169, 169)  # Dark gray
-            }
-            color = colors.get(self.tile_type, (0, 0, 0))  # Default to black
+            color = TILE_COLORS.get(self.tile_type, (0, 0, 0))  # Default to black
             pygame.draw.rect(screen, color, (x, y, tile_size, tile_size))
 
 class WorldState:
@@ -68,18 +85,36 @@ class WorldState:
         """
         self.map_file = map_file
         self.asset_manager = None  # Initialize asset_manager attribute
-        # Initialize tick-based logic
-        self.game_ticks = 0
-        self.last_tick_time = pygame.time.get_ticks()
-        self.tick_interval = 300  # 0.3 seconds per game tick (300ms) for 1 tile per game tick
+        # The game's one clock; update() advances it and the player hooks its movement into it
+        self.ticks = TickScheduler()
+        self.ticks.on_tick(self._update_world_state)
+        # Events due at a later tick; pending ones are saved with the world
+        self.timers = TimerQueue()
+        self.timers.register('respawn_resource', self._respawn_resource)
+        # Enemies, NPCs and other movers besides the player, stepped together every tick
+        self.agents = AgentSystem(self)
+        self.ticks.on_tick(self.agents.tick)
         self.resources = {}  # (x, y) -> Resource mapping
-        game_logger.debug(f"WorldState initialized with tick_interval={self.tick_interval}ms")
+        self.resource_index = SpatialGrid()  # The same resources, bucketed for area queries
+        game_logger.debug(f"WorldState initialized with tick_interval={self.ticks.tick_interval}s")
         
         # Tile map properties
         self.width = 100  # Default, will be overwritten by _load_map
         self.height = 100  # Default, will be overwritten by _load_map
         self.tile_size = 32  # Default, will be overwritten by _load_map
-        self.tiles = []  # 2D list of Tile objects
+        self.tile_grid = bytearray()  # Row-major (y * width + x) TileType.value of every tile
+        self.map_format = 'json'  # Format of map_file, 'json', 'binary' or 'chunked'; save_state writes the same
+        self.chunk_store = None  # ChunkStore streaming terrain and resources of a chunked map
+        self.tile_images = {}  # TileType -> pygame.Surface, filled once the asset manager is set
+        self.walkable_grid = bytearray()  # Row-major (y * width + x), 1 where a tile can be entered
+        self.pathfinding_engine = 'astar'  # Default engine for find_path: 'astar', 'jps' or 'hpa'
+        self.hierarchical_path_distance = 64  # Clicks farther than this (in tiles) use HPA*; None disables
+        self.path_cache = PathCache(max_size=256)  # Recent find_path results, see find_path
+        self.path_service = None  # Background PathfindingService, see start_path_service
+        self.terrain_cache = TerrainChunkCache(self)  # Baked terrain chunks used by draw
+        self.scrolling_viewport = None  # Opt-in ScrollingViewport, see enable_scrolling_viewport
+        self.changes = WorldChanges()  # Every change made since the map file was loaded
+        self.unsaved_changes = WorldChanges()  # Changes not yet handed to the save manager
         
         # Initialize with a default map in case setup_world isn't called
         self._init_tiles(100, 100, 32)
@@ -101,7 +136,7 @@ class WorldState:
         if self.asset_manager:
             self._load_tile_images()
     
-    def _init_tiles(self, width: int, height: int, tile_size: int) -> None:
+    def _init_tiles(self, width: int, height: int, tile_size: int, tile_grid=None, walkable_grid=None) -> None:
         """
         Initialize the tile grid with default grass tiles.
         
@@ -109,20 +144,29 @@ class WorldState:
             width: Width of the map in tiles
             height: Height of the map in tiles
             tile_size: Size of each tile in pixels
+            tile_grid: Optional writable buffer of width * height tile codes to
+                use as the tile grid instead of all grass
+            walkable_grid: Optional bytearray to use as the walkability grid
+                instead of an all-walkable one
         """
         self.width = width
         self.height = height
         self.tile_size = tile_size
-        self.tiles = []
         
-        # Create a 2D grid of default grass tiles
-        for y in range(height):
-            row = []
-            for x in range(width):
-                tile = Tile(TileType.GRASS)
-                tile.rect = pygame.Rect(x * tile_size, y * tile_size, tile_size, tile_size)
-                row.append(tile)
-            self.tiles.append(row)
+        # Start with a grid of default grass tiles
+        if tile_grid is None:
+            tile_grid = bytearray([TileType.GRASS.value]) * (width * height)
+        self.tile_grid = tile_grid
+        
+        # Every default tile is grass, so the whole grid starts walkable
+        if walkable_grid is None:
+            walkable_grid = bytearray(b'\x01') * (width * height)
+        self.walkable_grid = walkable_grid
+        
+        # Pathfinding buffers are sized to the grid, so rebuild them with it
+        self._pathfinders = {}
+        self.path_cache.clear()
+        self.terrain_cache.invalidate_all()
     
     def _load_tile_images(self) -> None:
         """Load images for tiles from the asset manager."""
@@ -137,62 +181,83 @@ class WorldState:
         self.asset_manager.load_image("dirt", "images/grass.png")   # Using grass as placeholder
         self.asset_manager.load_image("stone", "images/rock.png")   # Using rock as placeholder
         
-        # Assign images to tiles
-        for y, row in enumerate(self.tiles):
-            for x, tile in enumerate(row):
-                if tile.tile_type == TileType.GRASS:
-                    tile.image = self.asset_manager.get_image("grass")
-                elif tile.tile_type == TileType.WATER:
-                    tile.image = self.asset_manager.get_image("water")
-                elif tile.tile_type == TileType.SAND:
-                    tile.image = self.asset_manager.get_image("sand")
-                elif tile.tile_type == TileType.DIRT:
-                    tile.image = self.asset_manager.get_image("dirt")
-                elif tile.tile_type == TileType.STONE:
-                    tile.image = self.asset_manager.get_image("stone")
+        # Tiles share one image per type
+        self.tile_images = {tile_type: self.asset_manager.get_image(name)
+                            for tile_type, name in TILE_IMAGE_NAMES.items()}
+        
+        # Chunks baked before the images were available used fallback colours
+        self.terrain_cache.invalidate_all()
     
     def _load_map(self):
-        """Load the map from the JSON file."""
+        """
+        Load the map from the map file.
+        
+        The map can be JSON, a binary map (src.engine.map_format) or a chunked
+        map directory (src.engine.chunked_world). For a chunked map only the
+        walkability layer is read here; terrain and resources are streamed in
+        by chunk as they are used or come near the focus, see set_focus.
+        """
         try:
-            with open(self.map_file, 'r') as f:
-                map_data = json.load(f)
-            
-            # Initialize tiles with the loaded dimensions
-            self._init_tiles(
-                width=map_data['width'],
-                height=map_data['height'],
-                tile_size=map_data['tile_size']
-            )
-            
-            # Load tiles
-            tile_type_map = {
-                'GRASS': TileType.GRASS,
-                'WATER': TileType.WATER,
-                'SAND': TileType.SAND,
-                'DIRT': TileType.DIRT,
-                'STONE': TileType.STONE
-            }
-            
-            for y, row in enumerate(map_data['tiles']):
-                for x, tile_type_name in enumerate(row):
-                    if tile_type_name in tile_type_map:
-                        tile_type = tile_type_map[tile_type_name]
-                        self.set_tile(x, y, tile_type)
+            self.stop_streaming()
+            self.chunk_store = None
+            self.changes = WorldChanges()
+            self.unsaved_changes = WorldChanges()
+            if is_chunked_map(self.map_file):
+                store = ChunkStore(self.map_file, on_load=self._chunk_loaded, on_unload=self._chunk_unloading)
+                self.map_format = 'chunked'
+                self.resources = {}
+                self.resource_index.clear()
+                self._init_tiles(store.width, store.height, store.tile_size,
+                                 tile_grid=store, walkable_grid=store.walkable)
+                self.chunk_store = store
+                resource_entries = []
+            elif is_binary_map(self.map_file):
+                # The tile layer is memory-mapped and used as the tile grid without copying
+                map_data = read_binary_map(self.map_file)
+                self.map_format = 'binary'
+                self._init_tiles(map_data['width'], map_data['height'], map_data['tile_size'],
+                                 tile_grid=map_data['tiles'])
+                resource_entries = map_data['resources']
+            else:
+                with open(self.map_file, 'r') as f:
+                    map_data = json.load(f)
+                self.map_format = 'json'
+                
+                # Initialize tiles with the loaded dimensions
+                self._init_tiles(
+                    width=map_data['width'],
+                    height=map_data['height'],
+                    tile_size=map_data['tile_size']
+                )
+                
+                # Load tiles a row at a time straight into the byte grid; unknown names stay grass
+                codes = {tile_type.name: tile_type.value for tile_type in TileType}
+                grass = TileType.GRASS.value
+                width = self.width
+                for y, row in enumerate(map_data['tiles'][:self.height]):
+                    row = bytes(codes.get(name, grass) for name in row[:width])
+                    self.tile_grid[y * width:y * width + len(row)] = row
+                
+                resource_entries = []
+                for pos_str, resource_data in map_data.get('resources', {}).items():
+                    x, y = map(int, pos_str.split(','))
+                    resource_entries.append((x, y, resource_data['type']))
             
             # Load resources
             self.resources = {}
-            for pos_str, resource_data in map_data.get('resources', {}).items():
-                x, y = map(int, pos_str.split(','))
-                resource_type = resource_data['type']
-                
-                if resource_type == 'Tree':
-                    resource = Tree(x, y)
-                elif resource_type == 'Rock':
-                    resource = Rock(x, y)
-                else:
-                    continue
-                
-                self.resources[(x, y)] = resource
+            for x, y, resource_type in resource_entries:
+                resource = self._create_resource(x, y, resource_type)
+                if resource is not None:
+                    self.resources[(x, y)] = resource
+            
+            self.resource_index.clear()
+            for (x, y), resource in self.resources.items():
+                self.resource_index.insert(x, y, resource)
+            
+            # Build the walkability grid once from the loaded terrain and resources
+            # (a chunked map ships its own, so that no chunk has to be read for it)
+            if self.chunk_store is None:
+                self._rebuild_walkable_grid()
             
             # Load tile images if asset manager is available
             if self.asset_manager:
@@ -204,29 +269,120 @@ class WorldState:
             game_logger.error(f"Failed to load map from {self.map_file}: {e}")
             raise
         
-    def update(self, current_time):
-        """Update world state."""
-        # Handle game ticks (every tick_interval milliseconds)
-        time_since_last_tick = current_time - self.last_tick_time
-        if time_since_last_tick > self.tick_interval:
-            # Calculate how many ticks have passed (in case we missed some)
-            ticks_passed = time_since_last_tick // self.tick_interval
-            self.game_ticks += ticks_passed
-            self.last_tick_time = current_time
-            
-            # Log tick update
-            game_logger.debug(f"Tick update: game_ticks={self.game_ticks}, time_since_last_tick={time_since_last_tick}ms")
+    @staticmethod
+    def _create_resource(x, y, resource_type):
+        """
+        Create a resource from its class name as stored in map files.
+        
+        Returns:
+            The Resource, or None for unknown types
+        """
+        if resource_type == 'Tree':
+            return Tree(x, y)
+        if resource_type == 'Rock':
+            return Rock(x, y)
+        return None
+    
+    def _chunk_loaded(self, chunk):
+        """Add the resources of a chunk that was just streamed in (walkability is already known)."""
+        for x, y, resource_type in chunk.resources:
+            resource = self._create_resource(x, y, resource_type)
+            if resource is not None:
+                self.resources[(x, y)] = resource
+                self.resource_index.insert(x, y, resource)
+    
+    def _chunk_unloading(self, chunk):
+        """Drop the resources of a chunk that is about to be evicted."""
+        inside = list(self.resource_index.query_rect(chunk.x0, chunk.y0, chunk.x0 + chunk.cols, chunk.y0 + chunk.rows))
+        for (x, y), _ in inside:
+            self.resource_index.remove(x, y)
+            self.resources.pop((x, y), None)
+    
+    def _record_chunk_resource(self, x, y, resource):
+        """Store a resource change in its chunk so it survives eviction; resource None means removed."""
+        chunk = self.chunk_store.chunk_at(x, y)
+        entries = [entry for entry in chunk.resources if (entry[0], entry[1]) != (x, y)]
+        if resource is not None:
+            entries.append((x, y, resource.__class__.__name__))
+        chunk.resources = entries
+        chunk.dirty = True
+    
+    def set_focus(self, x, y):
+        """
+        Stream map chunks around tile (x, y), usually the player's position.
+        
+        Nearby chunks are read ahead of time on a background thread and
+        distant ones are evicted. Does nothing unless the map is chunked.
+        
+        Args:
+            x: X coordinate of the focus tile
+            y: Y coordinate of the focus tile
+        """
+        if self.chunk_store is not None:
+            self.chunk_store.set_focus(int(x), int(y))
+    
+    def stop_streaming(self):
+        """Stop the background chunk loader of a chunked map, if any."""
+        if self.chunk_store is not None:
+            self.chunk_store.shutdown()
+    
+    @property
+    def game_ticks(self):
+        """Number of the last game tick, from the tick scheduler."""
+        return self.ticks.tick
+    
+    @game_ticks.setter
+    def game_ticks(self, tick):
+        self.ticks.reset(tick)
+    
+    def update(self, delta_time):
+        """
+        Update world state and run the game ticks that fell due.
+        
+        Args:
+            delta_time: Seconds since the last frame
+        """
+        # Hand over paths finished by the background worker since the last frame
+        if self.path_service is not None:
+            self.path_service.poll()
+        
+        # ... and map chunks streamed in around the focus
+        if self.chunk_store is not None:
+            self.chunk_store.poll()
+        
+        self.ticks.advance(delta_time)
+    
+    def _update_world_state(self, tick):
+        """Update world state for one game tick: run the timers that are due."""
+        self.timers.run_due(tick)
+    
+    def respawn_resource(self, x, y, resource_type, delay):
+        """
+        Put a resource back on a tile after a number of ticks.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            resource_type: Class name of the resource, such as 'Tree'
+            delay: Ticks to wait
             
-            # Update world state based on game ticks
-            self._update_world_state()
+        Returns:
+            Timer: The pending respawn, for TimerQueue.cancel
+        """
+        return self.timers.schedule_in(delay, 'respawn_resource', {'x': int(x), 'y': int(y), 'type': resource_type})
     
-    def _update_world_state(self):
-        """Update world state based on game ticks."""
-        # TODO: Implement world state updates based on game ticks
-        # This could include resource regeneration, day/night cycle, etc.
-        pass
+    def _respawn_resource(self, timer):
+        x, y, resource_type = timer.data['x'], timer.data['y'], timer.data['type']
+        tile_type = self.get_tile_type(x, y)
+        if (tile_type is None or tile_type in BLOCKING_TILE_TYPES or self.get_resource_at(x, y) is not None
+                or self.agents.agent_at(x, y) is not None):
+            game_logger.debug(f"Tile ({x}, {y}) is taken; not respawning {resource_type}")
+            return
+        resource = self._create_resource(x, y, resource_type)
+        if resource is not None:
+            self.add_resource(resource)
     
-    def draw(self, screen: pygame.Surface, camera_x: int, camera_y: int) -> None:
+    def draw(self, screen: pygame.Surface, camera_x: int, camera_y: int, queue: RenderQueue = None) -> None:
         """
         Draw the world.
         
@@ -234,6 +390,8 @@ class WorldState:
             screen: The surface to draw on
             camera_x: Camera x offset (will be converted to int)
             camera_y: Camera y offset (will be converted to int)
+            queue: Optional RenderQueue; if given, resources are submitted to it
+                and drawn when the caller flushes it together with other sprites
         """
         try:
             # Ensure camera coordinates are integers
@@ -254,22 +412,22 @@ class WorldState:
             start_x, start_y = int(start_x), int(start_y)
             end_x, end_y = int(end_x), int(end_y)
             
-            # Draw visible tiles
-            for y in range(start_y, end_y):
-                for x in range(start_x, end_x):
-                    tile = self.get_tile(x, y)
-                    if tile:
-                        screen_x = x * self.tile_size - camera_x
-                        screen_y = y * self.tile_size - camera_y
-                        tile.draw(screen, screen_x, screen_y, self.tile_size)
-            
-            # Draw resources
-            for (res_x, res_y), resource in self.resources.items():
-                if (start_x <= res_x < end_x and start_y <= res_y < end_y and 
-                    hasattr(resource, 'draw') and callable(resource.draw)):
-                    screen_x = res_x * self.tile_size - camera_x
-                    screen_y = res_y * self.tile_size - camera_y
-                    resource.draw(screen, screen_x, screen_y, self.asset_manager)
+            # Read any visible map chunks that have not been streamed in yet
+            if self.chunk_store is not None:
+                self.chunk_store.load_area(start_x, start_y, end_x, end_y)
+            
+            # Draw visible terrain from pre-rendered chunks, reusing last frame's if scrolling
+            terrain_renderer = self.scrolling_viewport or self.terrain_cache
+            terrain_renderer.draw(screen, camera_x, camera_y)
+            
+            # Queue only the resources on screen, looked up through the spatial index
+            flush = queue is None
+            if flush:
+                queue = RenderQueue()
+            for _, resource in self.resource_index.query_rect(start_x, start_y, end_x, end_y):
+                resource.submit(queue, screen, camera_x, camera_y, self.asset_manager)
+            if flush:
+                queue.flush(screen)
                     
         except Exception as e:
             game_logger.error(f"Error in WorldState.draw: {e}")
@@ -278,10 +436,28 @@ class WorldState:
                 camera_x, camera_y = 0, 0
             screen.fill((0, 0, 0))  # Clear screen to black on error
     
+    def enable_scrolling_viewport(self, enabled: bool = True) -> None:
+        """
+        Switch draw() between full terrain redraws and the scroll-reuse viewport.
+        
+        The viewport keeps last frame's terrain offscreen and only draws the
+        strips the camera scrolled into view; see ScrollingViewport.
+        
+        Args:
+            enabled: True to use the scroll-reuse viewport, False for full redraws
+        """
+        if enabled and self.scrolling_viewport is None:
+            self.scrolling_viewport = ScrollingViewport(self.terrain_cache)
+        elif not enabled:
+            self.scrolling_viewport = None
+    
     def is_walkable(self, x: int, y: int) -> bool:
         """
         Check if a tile is walkable.
         
+        Reads the precomputed walkability grid, which already accounts for
+        blocking terrain and resources.
+        
         Args:
             x: X coordinate
             y: Y coordinate
@@ -289,31 +465,103 @@ class WorldState:
         Returns:
             True if the tile is walkable, False otherwise
         """
-        tile = self.get_tile(x, y)
-        if not tile:
-            return False
-            
-        # Check if there's a resource that blocks movement
-        resource = self.get_resource_at(x, y)
-        if resource and hasattr(resource, 'blocks_movement') and resource.blocks_movement:
-            return False
-            
-        return tile.walkable
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.walkable_grid[y * self.width + x] == 1
+        return False
+    
+    def _rebuild_walkable_grid(self) -> None:
+        """Recompute the whole walkability grid from tiles and resources."""
+        width = self.width
+        grid = self.walkable_grid
+        grid[:] = bytes(self.tile_grid).translate(WALKABLE_BY_CODE)
+        for (x, y), resource in self.resources.items():
+            if not resource.walkable and 0 <= x < width and 0 <= y < self.height:
+                grid[y * width + x] = 0
+        
+        # The background worker searches its own copy of the grid, so give it a fresh one
+        if self.path_service is not None:
+            self.stop_path_service()
+            self.start_path_service()
+    
+    def _refresh_walkable(self, x: int, y: int) -> None:
+        """
+        Recompute the walkability of a single tile after terrain or resources changed.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return
+        resource = self.resources.get((x, y))
+        blocked = resource is not None and not resource.walkable
+        index = y * self.width + x
+        walkable = 0 if blocked else WALKABLE_BY_CODE[self.tile_grid[index]]
+        if self.walkable_grid[index] != walkable:
+            self.walkable_grid[index] = walkable
+            # Only the chunk around this tile needs new abstract edges
+            hierarchical = self._pathfinders.get('hpa')
+            if hierarchical is not None:
+                hierarchical.invalidate_tile(x, y)
+            # ... and only cached paths over or beside it can have changed
+            self.path_cache.invalidate_tile(x, y)
+            if self.path_service is not None:
+                self.path_service.tile_changed(x, y, walkable)
     
     def get_tile(self, x: int, y: int) -> Optional[Tile]:
         """
         Get the tile at the specified coordinates.
         
+        The Tile is built from the tile grid on each call, so changing it
+        does not affect the world; use set_tile for that.
+        
         Args:
             x: X coordinate
             y: Y coordinate
             
         Returns:
-            The Tile object at (x, y) or None if out of bounds
+            A Tile describing (x, y) or None if out of bounds
         """
         if x < 0 or y < 0 or x >= self.width or y >= self.height:
             return None
-        return self.tiles[y][x]
+        tile_type = self.get_tile_type(x, y)
+        tile_size = self.tile_size
+        return Tile(tile_type, image=self.tile_images.get(tile_type),
+                    rect=pygame.Rect(x * tile_size, y * tile_size, tile_size, tile_size))
+    
+    def get_tile_type(self, x: int, y: int) -> Optional[TileType]:
+        """
+        Get the type of the tile at the specified coordinates.
+        
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            
+        Returns:
+            The TileType at (x, y) or None if out of bounds
+        """
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return None
+        return TILE_TYPES_BY_CODE[self.tile_grid[y * self.width + x]]
+    
+    def draw_tile(self, screen: pygame.Surface, x: int, y: int, screen_x: int, screen_y: int) -> None:
+        """
+        Draw the terrain of tile (x, y) with its top-left corner at (screen_x, screen_y).
+        
+        Args:
+            screen: The surface to draw on
+            x: X coordinate of the tile
+            y: Y coordinate of the tile
+            screen_x: X position to draw at
+            screen_y: Y position to draw at
+        """
+        tile_type = TILE_TYPES_BY_CODE[self.tile_grid[y * self.width + x]]
+        image = self.tile_images.get(tile_type)
+        if image:
+            screen.blit(image, (screen_x, screen_y))
+        else:
+            color = TILE_COLORS.get(tile_type, (0, 0, 0))
+            pygame.draw.rect(screen, color, (screen_x, screen_y, self.tile_size, self.tile_size))
         
     def set_tile(self, x: int, y: int, tile_type: TileType) -> None:
         """
@@ -325,21 +573,13 @@ class WorldState:
             tile_type: Type of tile to set
         """
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.tiles[y][x].tile_type = tile_type
-            self.tiles[y][x].walkable = tile_type not in [TileType.WATER, TileType.STONE]
-            
-            # Update tile image if asset manager is available
-            if self.asset_manager:
-                if tile_type == TileType.GRASS:
-                    self.tiles[y][x].image = self.asset_manager.get_image("grass")
-                elif tile_type == TileType.WATER:
-                    self.tiles[y][x].image = self.asset_manager.get_image("water")
-                elif tile_type == TileType.SAND:
-                    self.tiles[y][x].image = self.asset_manager.get_image("sand")
-                elif tile_type == TileType.DIRT:
-                    self.tiles[y][x].image = self.asset_manager.get_image("dirt")
-                elif tile_type == TileType.STONE:
-                    self.tiles[y][x].image = self.asset_manager.get_image("stone")
+            self.tile_grid[y * self.width + x] = tile_type.value
+            self.changes.set_tile(x, y, tile_type.name)
+            self.unsaved_changes.set_tile(x, y, tile_type.name)
+            self._refresh_walkable(x, y)
+            self.terrain_cache.invalidate_tile(x, y)
+            if self.scrolling_viewport is not None:
+                self.scrolling_viewport.invalidate_tile(x, y)
         
     def get_resource_at(self, x, y):
         """
@@ -352,7 +592,26 @@ class WorldState:
         Returns:
             The Resource object at (x, y) or None if no resource is present
         """
-        return self.resources.get((int(x), int(y)))
+        x, y = int(x), int(y)
+        if self.chunk_store is not None and 0 <= x < self.width and 0 <= y < self.height:
+            self.chunk_store.chunk_at(x, y)
+        return self.resources.get((x, y))
+    
+    def add_resource(self, resource):
+        """
+        Place a resource at its own grid coordinates, replacing any existing one.
+        
+        Args:
+            resource: The Resource to place
+        """
+        x, y = int(resource.x), int(resource.y)
+        if self.chunk_store is not None:
+            self._record_chunk_resource(x, y, resource)
+        self.resources[(x, y)] = resource
+        self.resource_index.insert(x, y, resource)
+        self.changes.add_resource(x, y, resource.__class__.__name__)
+        self.unsaved_changes.add_resource(x, y, resource.__class__.__name__)
+        self._refresh_walkable(x, y)
         
     def remove_resource(self, x, y):
         """
@@ -365,7 +624,123 @@ class WorldState:
         Returns:
             The removed Resource or None if no resource was present
         """
-        return self.resources.pop((int(x), int(y)), None)
+        x, y = int(x), int(y)
+        if self.chunk_store is not None and 0 <= x < self.width and 0 <= y < self.height:
+            self._record_chunk_resource(x, y, None)
+        resource = self.resources.pop((x, y), None)
+        if resource is not None:
+            self.resource_index.remove(x, y)
+            self.changes.remove_resource(x, y)
+            self.unsaved_changes.remove_resource(x, y)
+            self._refresh_walkable(x, y)
+        return resource
+    
+    def take_unsaved_changes(self):
+        """
+        Hand over the changes made since the last call, for an incremental save.
+        
+        Returns:
+            WorldChanges: Tiles and resources changed since the last call
+        """
+        changes = self.unsaved_changes
+        self.unsaved_changes = WorldChanges()
+        return changes
+    
+    def take_unsaved_timers(self):
+        """
+        The pending timers if any were scheduled, cancelled or run since the last call.
+        
+        Returns:
+            list: TimerQueue.to_list rows, or None if the timers did not change
+        """
+        if not self.timers.take_dirty():
+            return None
+        return self.timers.to_list()
+    
+    def apply_changes(self, changes):
+        """
+        Re-apply saved changes on top of the map file.
+        
+        They count towards changes (they differ from the map file) but not
+        towards unsaved_changes, as they came from a save.
+        
+        Args:
+            changes: WorldChanges to apply
+        """
+        unsaved = self.unsaved_changes
+        self.unsaved_changes = WorldChanges()
+        for (x, y), name in changes.tiles.items():
+            if name in TileType.__members__:
+                self.set_tile(x, y, TileType[name])
+        for x, y in changes.removed_resources:
+            self.remove_resource(x, y)
+        for (x, y), name in changes.added_resources.items():
+            resource = self._create_resource(x, y, name)
+            if resource is not None:
+                self.add_resource(resource)
+        self.unsaved_changes = unsaved
+    
+    def get_resources_in_rect(self, x0, y0, x1, y1):
+        """
+        Get the resources inside a rectangle of tiles.
+        
+        Args:
+            x0: Left tile, inclusive
+            y0: Top tile, inclusive
+            x1: Right tile, exclusive
+            y1: Bottom tile, exclusive
+            
+        Returns:
+            List of Resource objects
+        """
+        if self.chunk_store is not None:
+            self.chunk_store.load_area(x0, y0, x1, y1)
+        return [resource for _, resource in self.resource_index.query_rect(x0, y0, x1, y1)]
+    
+    def get_resource_at_point(self, world_x, world_y):
+        """
+        Hit-test resources at a point in world pixels, e.g. a mouse click.
+        
+        Tree sprites reach into the tile above them, so the canopy counts
+        as part of the tree. If sprites overlap, the one drawn in front wins.
+        
+        Args:
+            world_x: X position in world pixels
+            world_y: Y position in world pixels
+            
+        Returns:
+            The Resource under the point, or None
+        """
+        tile_x = int(world_x // self.tile_size)
+        tile_y = int(world_y // self.tile_size)
+        hit = None
+        for _, resource in self.resource_index.query_rect(tile_x, tile_y, tile_x + 1, tile_y + 2):
+            if resource.get_sprite_rect().collidepoint(world_x, world_y):
+                if hit is None or resource.y > hit.y:
+                    hit = resource
+        return hit
+    
+    def find_nearest_resource(self, x, y, resource_type=None, max_distance=None):
+        """
+        Find the resource closest to a tile.
+        
+        Args:
+            x: X coordinate to search from
+            y: Y coordinate to search from
+            resource_type: Optional ResourceType to restrict the search to
+            max_distance: Optional search radius in tiles
+            
+        On a chunked map only the chunks in memory are searched, which
+        covers at least the area around the focus.
+            
+        Returns:
+            The nearest matching Resource, or None
+        """
+        predicate = None
+        if resource_type is not None:
+            predicate = lambda resource: resource.resource_type == resource_type
+        match = self.resource_index.nearest(int(x), int(y), max_distance, predicate)
+        return match[1] if match else None
         
     def get_tile_size(self) -> int:
         """
@@ -408,12 +783,23 @@ class WorldState:
     
     def save_state(self, save_manager=None):
         """
-        Save world state back to the map file.
+        Save world state back to the map file, in the format it was loaded from.
         
         Args:
             save_manager: Kept for compatibility, not used
         """
         try:
+            if self.chunk_store is not None:
+                self.chunk_store.save()
+                game_logger.info(f"Saved changed chunks of {self.map_file}")
+                return
+            
+            if self.map_format == 'binary':
+                resources = [(x, y, resource.__class__.__name__) for (x, y), resource in self.resources.items()]
+                write_binary_map(self.map_file, self.width, self.height, self.tile_size, self.tile_grid, resources)
+                game_logger.info(f"Saved world state to {self.map_file}")
+                return
+            
             # Create a dictionary to hold the map data
             map_data = {
                 'width': self.width,
@@ -424,12 +810,11 @@ class WorldState:
             }
             
             # Save tile data
+            names = {code: tile_type.name for code, tile_type in TILE_TYPES_BY_CODE.items()}
+            width = self.width
             for y in range(self.height):
-                row = []
-                for x in range(self.width):
-                    tile = self.get_tile(x, y)
-                    row.append(tile.tile_type.name)
-                map_data['tiles'].append(row)
+                row = self.tile_grid[y * width:(y + 1) * width]
+                map_data['tiles'].append([names[code] for code in row])
             
             # Save resources
             for (x, y), resource in self.resources.items():
@@ -451,34 +836,95 @@ class WorldState:
             game_logger.error(f"Failed to save world state: {e}")
             raise
         
-    def is_walkable(self, x, y):
+    def save_chunked(self, directory, chunk_size=64):
         """
-        Check if a tile is walkable.
+        Write the world as a chunked map directory that can be streamed, see src.engine.chunked_world.
         
         Args:
-            x: X coordinate
-            y: Y coordinate
+            directory: Directory to write the chunked map to
+            chunk_size: Side length of a chunk in tiles
+        """
+        resources = [(x, y, resource.__class__.__name__) for (x, y), resource in self.resources.items()]
+        write_chunked_map(directory, self.width, self.height, self.tile_size, bytes(self.tile_grid),
+                          self.walkable_grid, resources, chunk_size)
+        game_logger.info(f"Saved {self.width}x{self.height} world to {directory} in {chunk_size}x{chunk_size} chunks")
+        
+    def _get_pathfinder(self, engine):
+        """
+        Get the pathfinding engine with the given name, creating it on first use.
+        
+        Args:
+            engine: 'astar', 'jps' or 'hpa'
             
         Returns:
-            bool: True if the tile is walkable, False otherwise
+            The engine instance for the current grid
         """
-        if 0 <= x < self.width and 0 <= y < self.height:
-            return self.tiles[y][x].walkable
-        return False
+        pathfinder = self._pathfinders.get(engine)
+        if pathfinder is None:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown pathfinding engine: {engine}")
+            pathfinder = ENGINES[engine](self.width, self.height, self.walkable_grid)
+            self._pathfinders[engine] = pathfinder
+        return pathfinder
+    
+    def select_path_engine(self, start_pos, end_pos):
+        """
+        Name of the engine find_path uses when none is given.
+        
+        Returns:
+            self.pathfinding_engine, or 'hpa' for targets farther away than
+            self.hierarchical_path_distance
+        """
+        distance = max(abs(end_pos[0] - start_pos[0]), abs(end_pos[1] - start_pos[1]))
+        if self.hierarchical_path_distance is not None and distance > self.hierarchical_path_distance:
+            return 'hpa'
+        return self.pathfinding_engine
+    
+    def start_path_service(self):
+        """
+        Start searching paths on a background thread.
+        
+        Once started, Player.move_to_tile submits its searches to
+        self.path_service instead of calling find_path, and the results are
+        delivered by update() on a later frame.
+        
+        Returns:
+            The running PathfindingService
+        """
+        if self.path_service is None:
+            self.path_service = PathfindingService(self, ENGINES)
+        return self.path_service
+    
+    def stop_path_service(self):
+        """Stop the background pathfinding thread, dropping unfinished requests."""
+        if self.path_service is not None:
+            self.path_service.shutdown()
+            self.path_service = None
         
-    def find_path(self, start_pos, end_pos):
+    def find_path(self, start_pos, end_pos, engine=None):
         """
         Find a path from start_pos to end_pos using A* algorithm.
         
         Args:
             start_pos: Tuple of (x, y) grid coordinates for the start position
             end_pos: Tuple of (x, y) grid coordinates for the target position
+            engine: Optional engine name ('astar', 'jps' or 'hpa'). Defaults to
+                self.pathfinding_engine, or to 'hpa' for targets farther away than
+                self.hierarchical_path_distance. A* and Jump Point Search return
+                paths of the same length; Jump Point Search expands far fewer nodes
+                on open terrain. HPA* plans over cached chunk entrances and returns
+                a near-optimal RefiningPath whose tiles are worked out as it is walked.
+                
+        Calls without an explicit engine go through self.path_cache: repeated
+        trips between the same tiles are answered with a copy of the cached
+        path until a tile on or next to it changes walkability. HPA* paths
+        are not stored, as that would refine them in full up front; its
+        cached chunk entrances already make repeated long trips cheap.
             
         Returns:
-            List of (x, y) tuples representing the path, or None if no path found
+            List of (x, y) tuples (or a list-like RefiningPath for HPA*) representing
+            the path, or None if no path found
         """
-        import heapq
-        
         # Convert to integers if needed
         start_x, start_y = int(start_pos[0]), int(start_pos[1])
         end_x, end_y = int(end_pos[0]), int(end_pos[1])
@@ -487,71 +933,30 @@ class WorldState:
         if not self.is_walkable(end_x, end_y):
             game_logger.debug(f"Target position ({end_x}, {end_y}) is not walkable")
             return None
-            
-        # Diagonal distance heuristic (better for 8-way movement)
-        def heuristic(a, b):
-            dx = abs(a[0] - b[0])
-            dy = abs(a[1] - b[1])
-            # D1 = cost of straight movement, D2 = cost of diagonal movement
-            D1 = 1
-            D2 = 1.4142  # sqrt(2)
-            return D1 * (dx + dy) + (D2 - 2 * D1) * min(dx, dy)
-        
-        # Initialize data structures
-        open_set = []
-        heapq.heappush(open_set, (0, (start_x, start_y)))
-        
-        came_from = {}
-        g_score = {(start_x, start_y): 0}
-        f_score = {(start_x, start_y): heuristic((start_x, start_y), (end_x, end_y))}
-        
-        # Possible movement directions (8-way movement including diagonals)
-        directions = [
-            (0, 1), (1, 0), (0, -1), (-1, 0),  # Cardinal directions
-            (1, 1), (1, -1), (-1, 1), (-1, -1)   # Diagonal directions
-        ]
-        
-        while open_set:
-            current = heapq.heappop(open_set)[1]
-            
-            if current == (end_x, end_y):
-                # Reconstruct path
-                path = [current]
-                while current in came_from:
-                    current = came_from[current]
-                    path.append(current)
-                path.reverse()
+        
+        use_cache = engine is None and self.path_cache.max_size > 0
+        if use_cache:
+            path = self.path_cache.get((start_x, start_y), (end_x, end_y))
+            if path is not None:
                 return path
-                
-            for dx, dy in directions:
-                neighbor = (current[0] + dx, current[1] + dy)
-                
-                # Check if neighbor is walkable or is the target
-                if neighbor != (end_x, end_y) and not self.is_walkable(neighbor[0], neighbor[1]):
-                    continue
-                    
-                # For diagonal movement, check that both adjacent tiles are walkable
-                # This prevents cutting through walls diagonally
-                if dx != 0 and dy != 0:
-                    if not self.is_walkable(current[0] + dx, current[1]) or not self.is_walkable(current[0], current[1] + dy):
-                        continue
-                    
-                # Calculate tentative g score (diagonal movement costs more)
-                movement_cost = 1.4142 if (dx != 0 and dy != 0) else 1.0  # sqrt(2) for diagonal, 1 for cardinal
-                tentative_g_score = g_score[current] + movement_cost
-                
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + heuristic(neighbor, (end_x, end_y))
-                    
-                    # Add to open set if not already there
-                    if neighbor not in [i[1] for i in open_set]:
-                        heapq.heappush(open_set, (f_score[neighbor], neighbor))
         
-        # No path found
-        game_logger.debug(f"No path found from ({start_x}, {start_y}) to ({end_x}, {end_y})")
-        return None
+        if engine is None:
+            engine = self.select_path_engine((start_x, start_y), (end_x, end_y))
+        
+        pathfinder = self._get_pathfinder(engine)
+        if engine == 'hpa':
+            path = pathfinder.find_lazy_path((start_x, start_y), (end_x, end_y))
+        else:
+            path = pathfinder.find_path((start_x, start_y), (end_x, end_y))
+        if path is None:
+            game_logger.debug(f"No path found from ({start_x}, {start_y}) to ({end_x}, {end_y})")
+            return None
+        
+        if use_cache and engine != 'hpa':
+            self.path_cache.put((start_x, start_y), (end_x, end_y), path)
+            # The caller consumes its path, so it gets its own copy
+            path = list(path)
+        return path
         
     def load_state(self, save_manager):
         """Load world state."""
@@ -559,4 +964,10 @@ class WorldState:
             world_save = save_manager.load_world_save()
             if world_save:
                 self.game_ticks = world_save.get('game_ticks', 0)
+                self.timers.load(world_save.get('timers') or [], self.game_ticks)
+                tilemap = world_save.get('tilemap') or {}
+                if (tilemap.get('width', self.width), tilemap.get('height', self.height)) != (self.width, self.height):
+                    game_logger.warning("World save was made for a map of another size; not applying its changes")
+                else:
+                    self.apply_changes(WorldChanges.from_dict(tilemap))
                 game_logger.info(f"Loaded world state with game ticks: {self.game_ticks}")
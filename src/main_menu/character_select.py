@@ -1,11 +1,12 @@
 import pygame
-import os
+from datetime import datetime
 from .button import Button
 
 class CharacterSelect:
     def __init__(self, save_manager):
         self.save_manager = save_manager
         self.characters = []
+        self.last_played = {}  # Character name -> "last played" text
         self.buttons = []
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
@@ -13,15 +14,13 @@ class CharacterSelect:
         self.setup_ui()
     
     def load_characters(self):
-        """Load saved characters"""
-        self.characters = []
-        if not os.path.exists(self.save_manager.save_directory):
-            os.makedirs(self.save_manager.save_directory, exist_ok=True)
-            return
-            
-        for filename in os.listdir(self.save_manager.save_directory):
-            if filename.endswith(".json") and filename != "world.json":
-                self.characters.append(filename[:-5])  # Remove .json
+        """Load saved characters from the save index, most recently played first"""
+        index = self.save_manager.character_index()
+        self.characters = [entry['name'] for entry in index]
+        self.last_played = {
+            entry['name']: datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M')
+            for entry in index if entry['timestamp']
+        }
     
     def setup_ui(self):
         """Initialize UI elements"""
@@ -58,10 +57,7 @@ class CharacterSelect:
             # Check character buttons
             for btn, char in self.buttons:
                 if btn.is_clicked(mouse_pos):
-                    self.save_manager.character_name = char
-                    self.save_manager.character_save_file = os.path.join(
-                        self.save_manager.save_directory, f"{char}.json"
-                    )
+                    self.save_manager.select_character(char)
                     return "play"
             
             # Check new character button
@@ -78,9 +74,12 @@ class CharacterSelect:
         title = self.font.render("Select Character", True, (255, 255, 255))
         screen.blit(title, (screen.get_width()//2 - title.get_width()//2, 50))
         
-        # Draw character buttons
-        for btn, _ in self.buttons:
+        # Draw character buttons, with when each was last played
+        for btn, char in self.buttons:
             btn.draw(screen, self.small_font)
+            if char in self.last_played:
+                text = self.small_font.render(f"Last played {self.last_played[char]}", True, (150, 150, 150))
+                screen.blit(text, (btn.rect.right + 15, btn.rect.centery - text.get_height() // 2))
         
         # Draw new character button
         self.new_char_btn.draw(screen, self.small_font)
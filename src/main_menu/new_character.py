@@ -1,5 +1,3 @@
-import os
-import json
 import pygame
 from .button import Button
 
@@ -61,8 +59,7 @@ class NewCharacter:
             self.error_message = "Please enter a name"
             return None
         
-        save_path = os.path.join(self.save_manager.save_directory, f"{self.name}.json")
-        if os.path.exists(save_path):
+        if self.save_manager.character_exists(self.name):
             self.error_message = f"Character '{self.name}' already exists"
             return None
         
@@ -73,17 +70,11 @@ class NewCharacter:
             'stats': {'health': 100, 'attack': 10, 'defense': 5}
         }
         
-        try:
-            with open(save_path, 'w') as f:
-                json.dump(char_data, f, indent=4)
-            
-            self.save_manager.character_name = self.name
-            self.save_manager.character_save_file = save_path
-            self.error_message = ""  # Clear any previous error
-            return "play"
-        except IOError as e:
-            self.error_message = f"Error saving character: {str(e)}"
+        if not self.save_manager.create_character(self.name, char_data):
+            self.error_message = "Error saving character"
             return None
+        self.error_message = ""  # Clear any previous error
+        return "play"
     
     def handle_event(self, event):
         """Handle pygame events"""
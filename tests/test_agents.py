@@ -0,0 +1,149 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.game_state.world_state import TileType, WorldState
+
+
+class TestAgentSystem(unittest.TestCase):
+    """Test stepping many agents per tick"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.directory, 'map.json')
+        rng = random.Random(2)
+        tiles = [["WATER" if rng.random() < 0.15 else "GRASS" for _ in range(40)] for _ in range(30)]
+        # A wall across the map with a gap at the bottom, clear tiles on either side
+        for y in range(30):
+            tiles[y][19] = "GRASS"
+            tiles[y][20] = "WATER" if y < 27 else "GRASS"
+            tiles[y][21] = "GRASS"
+        with open(self.map_file, 'w') as f:
+            json.dump({'width': 40, 'height': 30, 'tile_size': 32, 'tiles': tiles, 'resources': {}}, f)
+        self.world = WorldState(map_file=self.map_file)
+        self.agents = self.world.agents
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def walk(self, agent, ticks=100):
+        """Run ticks until the agent is idle, returning the tiles it stood on."""
+        tiles = [(int(self.agents.x[agent]), int(self.agents.y[agent]))]
+        for _ in range(ticks):
+            self.world.ticks.run_ticks(1)
+            tile = (int(self.agents.x[agent]), int(self.agents.y[agent]))
+            if tile != tiles[-1]:
+                tiles.append(tile)
+            if self.agents.is_idle(agent):
+                break
+        return tiles
+
+    def assertValidRoute(self, tiles):
+        for (x0, y0), (x1, y1) in zip(tiles, tiles[1:]):
+            self.assertLessEqual(max(abs(x1 - x0), abs(y1 - y0)), 1)
+            self.assertTrue(self.world.is_walkable(x1, y1))
+            if x0 != x1 and y0 != y1:
+                self.assertTrue(self.world.is_walkable(x1, y0) and self.world.is_walkable(x0, y1),
+                                f"Cut the corner from {(x0, y0)} to {(x1, y1)}")
+
+    def test_routes_are_as_short_as_astar(self):
+        """Straight and searched routes are walkable, never cut corners and are as long as A*'s"""
+        rng = random.Random(5)
+        for _ in range(60):
+            start = goal = None
+            while start == goal or not self.world.find_path(start, goal):
+                start = (rng.randrange(40), rng.randrange(30))
+                goal = (rng.randrange(max(0, start[0] - 6), min(40, start[0] + 7)),
+                        rng.randrange(max(0, start[1] - 6), min(30, start[1] + 7)))
+                if not (self.world.is_walkable(*start) and self.world.is_walkable(*goal)):
+                    start = goal = None
+            agent = self.agents.spawn(*start)
+            self.agents.move_to(agent, *goal)
+            tiles = self.walk(agent)
+            self.assertEqual(tiles[-1], goal)
+            self.assertValidRoute(tiles)
+            self.assertEqual(len(tiles), len(self.world.find_path(start, goal)))
+            self.agents.despawn(agent)
+        self.assertGreater(self.agents.straight_paths, 0)
+        self.assertGreater(self.agents.searches, 0)
+
+    def test_occupancy(self):
+        """Agents never share a tile; the lowest id wins a tile two agents step onto"""
+        first = self.agents.spawn(19, 3)
+        second = self.agents.spawn(21, 27)
+        third = self.agents.spawn(19, 5)
+        with self.assertRaises(ValueError):
+            self.agents.spawn(19, 5)
+        with self.assertRaises(ValueError):
+            self.agents.spawn(20, 3)
+        self.assertEqual(self.agents.agent_at(21, 27), second)
+
+        self.agents.move_to([first, third], [19, 19], [4, 4])
+        self.world.ticks.run_ticks(1)
+        self.assertEqual(self.agents.agent_at(19, 4), first)
+        self.assertEqual(self.agents.agent_at(19, 5), third)
+        self.assertEqual(self.agents.waits, 1)
+
+    def test_wanderers_share_no_tile(self):
+        """A crowd of wanderers keeps one agent per tile and the grid in step with the positions"""
+        walkable = np.flatnonzero(np.frombuffer(self.world.walkable_grid, dtype=np.uint8))
+        tiles = np.random.default_rng(1).choice(walkable, size=300, replace=False)
+        ids = self.agents.spawn_many(tiles % 40, tiles // 40, wander_radius=5)
+        for _ in range(40):
+            self.world.ticks.run_ticks(1)
+            positions = self.agents.y[ids] * 40 + self.agents.x[ids]
+            self.assertEqual(np.unique(positions).size, ids.size)
+            self.assertTrue(np.array_equal(self.agents.occupancy[positions], ids + 1))
+            self.assertEqual(np.count_nonzero(self.agents.occupancy), ids.size)
+        self.assertGreater(self.agents.moves, 1000)
+
+    def test_search_budget(self):
+        """At most max_searches_per_tick searches run in a tick; the rest wait their turn"""
+        self.agents.max_searches_per_tick = 4
+        ids = [self.agents.spawn(19, y) for y in range(0, 20, 2)]
+        self.agents.move_to(ids, 21, 0)  # Behind the wall: no straight route
+        self.world.ticks.run_ticks(1)
+        self.assertEqual(self.agents.searches, 4)
+        self.assertEqual(self.agents.search_backlog, 6)
+        self.world.ticks.run_ticks(2)
+        self.assertEqual(self.agents.search_backlog, 0)
+
+    def test_blocked_path_is_searched_again(self):
+        """An agent whose next tile becomes water finds another way"""
+        agent = self.agents.spawn(19, 10)
+        self.agents.move_to(agent, 19, 0)
+        self.world.ticks.run_ticks(1)
+        self.world.set_tile(19, 8, TileType.WATER)
+        self.world.set_tile(19, 5, TileType.WATER)
+        tiles = self.walk(agent)
+        self.assertEqual(tiles[-1], (19, 0))
+        self.assertNotIn((19, 8), tiles)
+        self.assertValidRoute(tiles)
+
+    def test_same_seed_same_walk(self):
+        """Two worlds with the same agents and seed move them the same way"""
+        worlds = [self.world, WorldState(map_file=self.map_file)]
+        tiles = np.flatnonzero(np.frombuffer(self.world.walkable_grid, dtype=np.uint8))[::40]
+        for world in worlds:
+            world.agents.spawn_many(tiles % 40, tiles // 40, wander_radius=8)
+            world.ticks.run_ticks(30)
+        self.assertTrue(np.array_equal(worlds[0].agents.x, worlds[1].agents.x))
+        self.assertTrue(np.array_equal(worlds[0].agents.y, worlds[1].agents.y))
+
+    def test_despawn_frees_the_tile_and_slot(self):
+        """A despawned agent's tile is free and its id goes to the next spawn"""
+        agent = self.agents.spawn(19, 3, wander_radius=5)
+        self.agents.despawn(agent)
+        self.assertIsNone(self.agents.agent_at(19, 3))
+        self.assertEqual(len(self.agents), 0)
+        self.assertEqual(self.agents.spawn(19, 3), agent)
+        self.assertEqual(len(self.agents), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
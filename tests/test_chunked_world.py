@@ -0,0 +1,137 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import time
+import shutil
+import tempfile
+import unittest
+import pygame
+from src.entities.resources.rock import Rock
+from src.game_state.world_state import WorldState, TileType
+
+
+class StubAssets:
+    """Returns plain colored images instead of loading files"""
+
+    def get_image(self, name):
+        surface = pygame.Surface((32, 32))
+        surface.fill((90, 60, 30))
+        return surface
+
+
+class TestChunkedWorld(unittest.TestCase):
+    """Test that a chunked map streams in and behaves like the whole map"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        tiles = [["GRASS"] * 40 for _ in range(40)]
+        for y in range(5, 35):
+            tiles[y][20] = "WATER"
+        tiles[20][20] = "SAND"
+        tiles[3][7] = "STONE"
+        resources = {'2,2': {'type': 'Tree'}, '30,33': {'type': 'Rock'}, '12,25': {'type': 'Tree'}}
+        map_file = os.path.join(self.directory, 'map.json')
+        with open(map_file, 'w') as f:
+            json.dump({'width': 40, 'height': 40, 'tile_size': 32, 'tiles': tiles, 'resources': resources}, f)
+        self.full = WorldState(map_file=map_file)
+        self.chunked_dir = os.path.join(self.directory, 'chunked')
+        self.full.save_chunked(self.chunked_dir, chunk_size=8)
+        self.world = WorldState(map_file=self.chunked_dir)
+        self.store = self.world.chunk_store
+
+    def tearDown(self):
+        self.world.stop_streaming()
+        shutil.rmtree(self.directory)
+
+    def _wait_for_chunks(self, count):
+        """Poll until the background loader has installed count chunks."""
+        installed = 0
+        deadline = time.time() + 5
+        while installed < count and time.time() < deadline:
+            installed += self.store.poll()
+            time.sleep(0.005)
+        return installed
+
+    def test_nothing_loaded_up_front(self):
+        """Opening a chunked map reads no chunks, yet walkability and paths are known"""
+        self.assertEqual(self.world.map_format, 'chunked')
+        self.assertEqual(self.store.loads, 0)
+        self.assertEqual(self.world.walkable_grid, self.full.walkable_grid)
+        self.assertEqual(self.world.find_path((5, 20), (35, 20)), self.full.find_path((5, 20), (35, 20)))
+        self.assertEqual(self.store.loads, 0)
+
+    def test_tiles_and_resources_load_on_demand(self):
+        """get_tile and get_resource_at read the chunk they need"""
+        for y in range(40):
+            for x in range(40):
+                self.assertEqual(self.world.get_tile_type(x, y), self.full.get_tile_type(x, y))
+        self.assertEqual(self.store.loads, 25)
+        self.assertIsInstance(self.world.get_resource_at(30, 33), Rock)
+        self.assertEqual(sorted(self.world.resources), sorted(self.full.resources))
+
+    def test_draw_matches_whole_map(self):
+        """Drawing streams in the visible chunks and looks the same"""
+        for world in (self.world, self.full):
+            world.asset_manager = StubAssets()
+        expected = pygame.Surface((200, 150))
+        self.full.draw(expected, 300, 700)
+        screen = pygame.Surface((200, 150))
+        self.world.draw(screen, 300, 700)
+        self.assertEqual(pygame.image.tobytes(screen, 'RGB'), pygame.image.tobytes(expected, 'RGB'))
+        self.assertIn((12 // 8, 25 // 8), self.store)
+
+    def test_prefetch_and_evict_around_focus(self):
+        """Chunks near the focus are prefetched; far ones are evicted"""
+        self.store.load_radius = 1
+        self.store.unload_radius = 1
+        self.world.set_focus(4, 4)
+        self.assertEqual(self._wait_for_chunks(4), 4)
+        self.assertEqual(set(chunk.cx + chunk.cy * 10 for chunk in self.store.loaded_chunks()), {0, 1, 10, 11})
+        self.assertIn((2, 2), self.world.resources)
+
+        self.world.set_focus(36, 36)
+        self.assertNotIn((0, 0), self.store)
+        self.assertNotIn((2, 2), self.world.resources)
+        self.assertEqual(self._wait_for_chunks(4), 4)
+        self.assertIn((4, 4), self.store)
+
+    def test_stale_reads_are_not_installed(self):
+        """A chunk read before it was edited and evicted is dropped for the newer read"""
+        self.store.load_radius = 0
+        self.store.unload_radius = 0
+        self.world.set_focus(4, 4)
+        deadline = time.time() + 5
+        while not self.store._finished and time.time() < deadline:
+            time.sleep(0.005)
+        # Loaded on the spot, edited and written back while the first read waits for poll()
+        self.world.set_tile(1, 1, TileType.DIRT)
+        self.world.set_focus(36, 36)
+        self.assertNotIn((0, 0), self.store)
+        self.world.set_focus(4, 4)
+        self.assertEqual(self._wait_for_chunks(1), 1)
+        self.assertEqual(self.world.get_tile_type(1, 1), TileType.DIRT)
+        self.assertEqual(self.store.loads, 2)
+
+    def test_changes_survive_eviction_and_save(self):
+        """Edited chunks are written back when evicted and by save_state"""
+        self.world.set_tile(1, 1, TileType.DIRT)
+        self.world.remove_resource(2, 2)
+        self.world.add_resource(Rock(3, 1))
+        self.world.set_tile(35, 35, TileType.STONE)
+        self.world.set_focus(36, 36)
+        self.assertNotIn((0, 0), self.store)
+        self.world.save_state()
+
+        reopened = WorldState(map_file=self.chunked_dir)
+        self.assertEqual(reopened.get_tile_type(1, 1), TileType.DIRT)
+        self.assertIsNone(reopened.get_resource_at(2, 2))
+        self.assertIsInstance(reopened.get_resource_at(3, 1), Rock)
+        self.assertEqual(reopened.get_tile_type(35, 35), TileType.STONE)
+        self.assertFalse(reopened.is_walkable(3, 1))
+        self.assertTrue(reopened.is_walkable(2, 2))
+        self.assertFalse(reopened.is_walkable(35, 35))
+
+
+if __name__ == "__main__":
+    unittest.main()
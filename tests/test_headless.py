@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import shutil
+import tempfile
+import unittest
+import pygame
+from src.engine.asset_manager import AssetManager
+from src.engine.headless import HeadlessSimulation
+
+
+class TestHeadlessSimulation(unittest.TestCase):
+    """Test running the world without a display"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.directory, 'map.json')
+        tiles = [["GRASS"] * 40 for _ in range(30)]
+        for y in range(5, 25):
+            tiles[y][20] = "WATER"
+        with open(self.map_file, 'w') as f:
+            json.dump({'width': 40, 'height': 30, 'tile_size': 32, 'tiles': tiles,
+                       'resources': {'3,3': {'type': 'Tree'}}}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def simulate(self, ticks, **options):
+        simulation = HeadlessSimulation(self.map_file, seed=4, wander_radius=15, **options)
+        self.addCleanup(simulation.close)
+        simulation.run(ticks)
+        return simulation
+
+    def test_ticks_and_report(self):
+        """The bot walks the player around and every system's time is reported"""
+        simulation = self.simulate(400)
+        self.assertIsNone(pygame.display.get_surface())
+        self.assertIsNone(simulation.player.sprite)
+        self.assertEqual(simulation.world.game_ticks, 400)
+        self.assertGreater(simulation.trips, 5)
+        self.assertGreater(simulation.ticks_per_second, 0)
+        for name in ('WorldState.update', 'PlayerState._tick_player', 'PlayerState.update',
+                     'WorldState._update_world_state', 'bot clicks (pathfinding)'):
+            self.assertIn(name, simulation.timings)
+        self.assertIn('400 ticks', simulation.report())
+
+        # The same seed walks the same way
+        again = self.simulate(400)
+        self.assertEqual((again.player.grid_x, again.player.grid_y),
+                         (simulation.player.grid_x, simulation.player.grid_y))
+
+    def test_saves(self):
+        """With a save directory the run is journaled and checkpointed on close"""
+        saves = os.path.join(self.directory, 'saves')
+        simulation = self.simulate(50, save_directory=saves)
+        self.assertIn('SaveManager.auto_save', simulation.timings)
+        simulation.close()
+        self.assertEqual(simulation.save_manager.load_world_save()['game_ticks'], 50)
+
+    def test_images_load_without_display(self):
+        """Images are left unconverted when there is no display mode"""
+        assets = AssetManager()
+        image = assets.load_image('grass', os.path.join('images', 'grass.png'))
+        self.assertIsNotNone(image)
+
+
+if __name__ == "__main__":
+    unittest.main()
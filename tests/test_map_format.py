@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import shutil
+import tempfile
+import unittest
+from src.engine import map_format
+from src.engine.map_format import json_to_binary, binary_to_json, read_binary_map, is_binary_map
+from src.game_state.world_state import WorldState, TileType
+
+
+class MapFileTestCase(unittest.TestCase):
+    """Writes a small map as JSON and converts it to a binary map"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.json_file = os.path.join(self.directory, 'map.json')
+        self.binary_file = os.path.join(self.directory, 'map.bin')
+        tiles = [[["GRASS", "WATER", "SAND", "DIRT", "STONE"][(x * y + x) % 5] for x in range(7)] for y in range(5)]
+        self.map_data = {
+            'width': 7, 'height': 5, 'tile_size': 32, 'tiles': tiles,
+            'resources': {'1,2': {'type': 'Tree', 'position': [1, 2]},
+                          '6,4': {'type': 'Rock', 'position': [6, 4]}},
+        }
+        with open(self.json_file, 'w') as f:
+            json.dump(self.map_data, f)
+        json_to_binary(self.json_file, self.binary_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class TestMapFormat(MapFileTestCase):
+    """Test the binary map format and its JSON converters"""
+
+    def test_codes_match_tile_types(self):
+        """Tile codes in the file are the TileType values WorldState stores"""
+        for tile_type in TileType:
+            self.assertEqual(map_format.TILE_CODES[tile_type.name], tile_type.value)
+
+    def test_round_trip(self):
+        """JSON converted to binary and back is unchanged"""
+        self.assertTrue(is_binary_map(self.binary_file))
+        self.assertFalse(is_binary_map(self.json_file))
+        back = os.path.join(self.directory, 'back.json')
+        binary_to_json(self.binary_file, back)
+        with open(back) as f:
+            self.assertEqual(json.load(f), self.map_data)
+
+    def test_layout(self):
+        """The file is a header, one byte per tile and 9 bytes per resource"""
+        self.assertEqual(os.path.getsize(self.binary_file), map_format.HEADER.size + 7 * 5 + 2 * 9)
+        map_data = read_binary_map(self.binary_file)
+        self.assertEqual(map_data['tiles'][1 * 7 + 1], TileType.SAND.value)
+        self.assertEqual(sorted(map_data['resources']), [(1, 2, 'Tree'), (6, 4, 'Rock')])
+
+    def test_rejects_other_files(self):
+        """Reading a non-binary map raises ValueError"""
+        with self.assertRaises(ValueError):
+            read_binary_map(self.json_file)
+
+    def test_rejects_unknown_codes(self):
+        """A tile or resource code no type has raises ValueError naming its offset"""
+        with open(self.binary_file, 'rb') as f:
+            data = f.read()
+        tile = map_format.HEADER.size + 2 * 7 + 3
+        second_resource = map_format.HEADER.size + 7 * 5 + map_format.RESOURCE_ENTRY.size
+        # (byte to corrupt, code written there, offset the error names)
+        for offset, code, reported in ((tile, 0, tile), (tile, len(TileType) + 1, tile),
+                                       (second_resource + 8, 3, second_resource)):
+            corrupt = bytearray(data)
+            corrupt[offset] = code
+            with open(self.binary_file, 'wb') as f:
+                f.write(corrupt)
+            with self.assertRaisesRegex(ValueError, f"offset {reported}$"):
+                read_binary_map(self.binary_file)
+
+
+class TestWorldStateBinaryMap(MapFileTestCase):
+    """Test that WorldState loads and saves binary maps like JSON ones"""
+
+    def test_same_world_as_json(self):
+        """Binary and JSON versions of a map load into the same world"""
+        from_json = WorldState(map_file=self.json_file)
+        from_binary = WorldState(map_file=self.binary_file)
+        self.assertEqual(from_binary.map_format, 'binary')
+        self.assertEqual(bytes(from_binary.tile_grid), bytes(from_json.tile_grid))
+        self.assertEqual(from_binary.walkable_grid, from_json.walkable_grid)
+        self.assertEqual(sorted(from_binary.resources), sorted(from_json.resources))
+
+    def test_edits_stay_in_memory_until_saved(self):
+        """set_tile changes the mapped terrain without touching the file until save_state"""
+        world = WorldState(map_file=self.binary_file)
+        self.assertIsInstance(world.tile_grid, memoryview)
+        world.set_tile(0, 0, TileType.STONE)
+        world.remove_resource(1, 2)
+        self.assertEqual(read_binary_map(self.binary_file)['tiles'][0], TileType.GRASS.value)
+        world.save_state()
+        reloaded = WorldState(map_file=self.binary_file)
+        self.assertEqual(reloaded.get_tile_type(0, 0), TileType.STONE)
+        self.assertEqual(list(reloaded.resources), [(6, 4)])
+        # The world mapped before saving still sees its own terrain
+        self.assertEqual(world.get_tile_type(3, 2), reloaded.get_tile_type(3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
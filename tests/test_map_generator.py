@@ -0,0 +1,125 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.engine.map_generator import MapGenerator, create_map, save_map, GRASS, DIRT, WATER
+from src.engine.map_format import read_binary_map
+from src.game_state.world_state import WorldState
+
+
+class TestMapGenerator(unittest.TestCase):
+    """Test the noise-based island generator"""
+
+    def setUp(self):
+        self.generator = MapGenerator(120, 90, seed=11)
+        self.map_data = self.generator.generate_map()
+
+    def test_deterministic_per_seed(self):
+        """The same seed gives the same map; another seed a different one"""
+        again = MapGenerator(120, 90, seed=11).generate_map()
+        self.assertTrue(np.array_equal(again['tiles'], self.map_data['tiles']))
+        self.assertEqual(again['resources'], self.map_data['resources'])
+        other = MapGenerator(120, 90, seed=12).generate_map()
+        self.assertFalse(np.array_equal(other['tiles'], self.map_data['tiles']))
+
+    def test_island_shape(self):
+        """The map is land in the middle and water along every edge"""
+        tiles = self.map_data['tiles']
+        self.assertEqual(tiles.shape, (90, 120))
+        self.assertEqual(tiles.dtype, np.uint8)
+        for edge in (tiles[0], tiles[-1], tiles[:, 0], tiles[:, -1]):
+            self.assertTrue((edge == WATER).all())
+        self.assertGreater((tiles != WATER).mean(), 0.3)
+
+    def test_rectangle_matches_whole_map(self):
+        """Any rectangle generated on its own matches the same part of the whole map"""
+        left, top, width, height = 37, 21, 50, 33
+        tiles = self.generator.generate_tiles(left, top, width, height)
+        self.assertTrue(np.array_equal(tiles, self.map_data['tiles'][top:top + height, left:left + width]))
+        expected = {(x, y, name) for x, y, name in self.map_data['resources']
+                    if left <= x < left + width and top <= y < top + height}
+        self.assertEqual(set(self.generator.place_resources(tiles, left, top)), expected)
+
+    def test_resource_placement(self):
+        """Trees grow on grass, rocks on grass or dirt, and no two touch orthogonally"""
+        tiles = self.map_data['tiles']
+        positions = set()
+        for x, y, name in self.map_data['resources']:
+            self.assertIn(tiles[y, x], (GRASS,) if name == 'Tree' else (GRASS, DIRT))
+            self.assertNotIn((x, y), positions)
+            positions.add((x, y))
+        names = {name for _, _, name in self.map_data['resources']}
+        self.assertEqual(names, {'Tree', 'Rock'})
+        for x, y, name in self.map_data['resources']:
+            same = {(rx, ry) for rx, ry, other in self.map_data['resources'] if other == name}
+            for neighbour in ((x + 1, y), (x, y + 1)):
+                self.assertNotIn(neighbour, same)
+
+    def test_cell_size_below_two(self):
+        """A resource cell too small to jitter in is refused"""
+        self.generator.tree_cell_size = 1
+        with self.assertRaises(ValueError):
+            self.generator.place_resources(self.map_data['tiles'], 0, 0)
+
+
+class TestGeneratedMapFiles(unittest.TestCase):
+    """Test that generated maps load into WorldState"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_json_and_binary_load_the_same_world(self):
+        """A map saved as JSON and as a binary map loads into the same world"""
+        json_file = os.path.join(self.directory, 'island.json')
+        binary_file = os.path.join(self.directory, 'island.bin')
+        map_data = create_map(60, 50, seed=5, path=json_file)
+        save_map(map_data, binary_file)
+
+        from_json = WorldState(map_file=json_file)
+        from_binary = WorldState(map_file=binary_file)
+        self.assertEqual(from_binary.map_format, 'binary')
+        self.assertEqual(bytes(from_json.tile_grid), map_data['tiles'].tobytes())
+        self.assertEqual(bytes(from_binary.tile_grid), map_data['tiles'].tobytes())
+        self.assertEqual(sorted(from_json.resources), sorted((x, y) for x, y, _ in map_data['resources']))
+        self.assertEqual(from_binary.walkable_grid, from_json.walkable_grid)
+
+    def test_parallel_binary_map_matches_whole_map(self):
+        """A binary map generated across worker processes equals the map generated in one piece"""
+        generator = MapGenerator(150, 300, seed=9)
+        expected = generator.generate_map()
+        serial_file = os.path.join(self.directory, 'serial.bin')
+        parallel_file = os.path.join(self.directory, 'parallel.bin')
+        self.assertEqual(generator.write_map(serial_file, workers=1), len(expected['resources']))
+        generator.write_map(parallel_file, workers=2)
+
+        with open(serial_file, 'rb') as serial, open(parallel_file, 'rb') as parallel:
+            self.assertEqual(serial.read(), parallel.read())
+        map_data = read_binary_map(parallel_file)
+        self.assertEqual(bytes(map_data['tiles']), expected['tiles'].tobytes())
+        self.assertEqual(sorted(map_data['resources']), sorted(expected['resources']))
+
+    def test_parallel_chunked_map_matches_whole_map(self):
+        """A chunked map written by worker processes loads into the same world as the whole map"""
+        generator = MapGenerator(100, 70, seed=4)
+        binary_file = os.path.join(self.directory, 'island.bin')
+        chunked_dir = os.path.join(self.directory, 'island')
+        generator.write_map(binary_file)
+        generator.write_map(chunked_dir, workers=2, chunk_size=16)
+
+        whole = WorldState(map_file=binary_file)
+        chunked = WorldState(map_file=chunked_dir)
+        self.assertEqual(chunked.map_format, 'chunked')
+        self.assertEqual(chunked.walkable_grid, whole.walkable_grid)
+        self.assertEqual(bytes(chunked.tile_grid), bytes(whole.tile_grid))
+        self.assertEqual(sorted(chunked.resources), sorted(whole.resources))
+        chunked.stop_streaming()
+
+
+if __name__ == "__main__":
+    unittest.main()
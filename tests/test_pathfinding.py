@@ -0,0 +1,472 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import heapq
+import json
+import random
+import tempfile
+import time
+import unittest
+from src.engine.pathfinding import GridAStar, JumpPointSearch, HierarchicalPathfinder, PathCache
+from src.game_state.world_state import WorldState, TileType
+from src.entities.resources import Tree
+
+
+def path_cost(path):
+    """Total movement cost of a path (1 per cardinal step, 1.4142 per diagonal)."""
+    cost = 0.0
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        cost += 1.4142 if x1 != x2 and y1 != y2 else 1.0
+    return cost
+
+
+def dijkstra_cost(grid, start, goal):
+    """Reference uniform-cost search over a list-of-strings grid ('#' blocks)."""
+    height, width = len(grid), len(grid[0])
+
+    def walkable(x, y):
+        return 0 <= x < width and 0 <= y < height and grid[y][x] != '#'
+
+    best = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        cost, (x, y) = heapq.heappop(heap)
+        if (x, y) == goal:
+            return cost
+        if cost > best[(x, y)]:
+            continue
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]:
+            nx, ny = x + dx, y + dy
+            if not walkable(nx, ny):
+                continue
+            if dx and dy and (not walkable(x + dx, y) or not walkable(x, y + dy)):
+                continue
+            new_cost = cost + (1.4142 if dx and dy else 1.0)
+            if new_cost < best.get((nx, ny), float('inf')):
+                best[(nx, ny)] = new_cost
+                heapq.heappush(heap, (new_cost, (nx, ny)))
+    return None
+
+
+class TestGridAStar(unittest.TestCase):
+    """Test the flat-array A* engine"""
+
+    def _engine(self, grid):
+        height, width = len(grid), len(grid[0])
+        walkable = bytearray(0 if cell == '#' else 1 for row in grid for cell in row)
+        return GridAStar(width, height, walkable)
+
+    def test_straight_path(self):
+        """A clear row produces a straight line including both endpoints"""
+        engine = self._engine(["......"] * 3)
+        self.assertEqual(engine.find_path((1, 1), (5, 1)), [(1, 1), (2, 1), (3, 1), (4, 1), (5, 1)])
+
+    def test_start_equals_goal(self):
+        """Searching for the current tile returns just that tile"""
+        engine = self._engine(["..."] * 3)
+        self.assertEqual(engine.find_path((1, 1), (1, 1)), [(1, 1)])
+
+    def test_no_corner_cutting(self):
+        """Diagonal steps are refused when an adjacent cardinal tile is blocked"""
+        engine = self._engine([
+            "....",
+            ".#..",
+            "....",
+        ])
+        path = engine.find_path((0, 0), (1, 2))
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            if x1 != x2 and y1 != y2:
+                self.assertNotIn((1, 1), [(x2, y1), (x1, y2)])
+
+    def test_unreachable_goal(self):
+        """A walled-off goal yields None"""
+        engine = self._engine([
+            ".....",
+            "..#..",
+            ".#.#.",
+            "..#..",
+        ])
+        self.assertIsNone(engine.find_path((0, 0), (2, 2)))
+
+    def test_blocked_goal(self):
+        """An unwalkable goal yields None without searching"""
+        engine = self._engine(["..#"])
+        self.assertIsNone(engine.find_path((0, 0), (2, 0)))
+        self.assertEqual(engine.nodes_expanded, 0)
+
+    def test_buffers_reused_between_searches(self):
+        """Repeated searches on one engine give independent, correct results"""
+        engine = self._engine(["......"] * 6)
+        first = engine.find_path((0, 0), (5, 5))
+        engine.find_path((5, 0), (0, 5))
+        self.assertEqual(engine.find_path((0, 0), (5, 5)), first)
+
+    def test_optimal_on_random_grids(self):
+        """Path costs match a reference uniform-cost search"""
+        rng = random.Random(1234)
+        for _ in range(30):
+            grid = ["".join('#' if rng.random() < 0.3 else '.' for _ in range(20)) for _ in range(20)]
+            engine = self._engine(grid)
+            for _ in range(5):
+                start = (rng.randrange(20), rng.randrange(20))
+                goal = (rng.randrange(20), rng.randrange(20))
+                if grid[start[1]][start[0]] == '#' or grid[goal[1]][goal[0]] == '#':
+                    continue
+                expected = dijkstra_cost(grid, start, goal)
+                path = engine.find_path(start, goal)
+                if expected is None:
+                    self.assertIsNone(path)
+                else:
+                    self.assertAlmostEqual(path_cost(path), expected, places=6)
+
+
+class TestJumpPointSearch(unittest.TestCase):
+    """Test that Jump Point Search matches A* path lengths"""
+
+    def _engines(self, grid):
+        height, width = len(grid), len(grid[0])
+        walkable = bytearray(0 if cell == '#' else 1 for row in grid for cell in row)
+        return GridAStar(width, height, walkable), JumpPointSearch(width, height, walkable)
+
+    def _assert_valid(self, grid, path):
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            self.assertEqual(max(abs(x1 - x2), abs(y1 - y2)), 1)
+            self.assertNotEqual(grid[y2][x2], '#')
+            if x1 != x2 and y1 != y2:
+                self.assertNotEqual(grid[y1][x2], '#')
+                self.assertNotEqual(grid[y2][x1], '#')
+
+    def test_open_field_expands_fewer_nodes(self):
+        """On open terrain JPS returns a tile-by-tile path while expanding far fewer nodes"""
+        astar, jps = self._engines(["." * 40] * 40)
+        astar_path = astar.find_path((0, 0), (39, 25))
+        jps_path = jps.find_path((0, 0), (39, 25))
+        self.assertEqual(len(jps_path), len(astar_path))
+        self._assert_valid(["." * 40] * 40, jps_path)
+        self.assertLess(jps.nodes_expanded, astar.nodes_expanded)
+
+    def test_same_lengths_on_random_grids(self):
+        """JPS paths are valid and exactly as long as A* paths"""
+        rng = random.Random(99)
+        for _ in range(60):
+            width, height = rng.randint(2, 24), rng.randint(2, 24)
+            density = rng.choice([0.05, 0.2, 0.35])
+            grid = ["".join('#' if rng.random() < density else '.' for _ in range(width)) for _ in range(height)]
+            astar, jps = self._engines(grid)
+            for _ in range(5):
+                start = (rng.randrange(width), rng.randrange(height))
+                goal = (rng.randrange(width), rng.randrange(height))
+                if grid[start[1]][start[0]] == '#' or grid[goal[1]][goal[0]] == '#':
+                    continue
+                astar_path = astar.find_path(start, goal)
+                jps_path = jps.find_path(start, goal)
+                if astar_path is None:
+                    self.assertIsNone(jps_path)
+                    continue
+                self.assertEqual(jps_path[0], start)
+                self.assertEqual(jps_path[-1], goal)
+                self._assert_valid(grid, jps_path)
+                self.assertAlmostEqual(path_cost(jps_path), path_cost(astar_path), places=6)
+
+
+class TestHierarchicalPathfinder(unittest.TestCase):
+    """Test HPA* routes, lazy refinement and chunk invalidation"""
+
+    def _engines(self, grid, cluster_size=4):
+        height, width = len(grid), len(grid[0])
+        walkable = bytearray(0 if cell == '#' else 1 for row in grid for cell in row)
+        return (walkable, GridAStar(width, height, walkable),
+                HierarchicalPathfinder(width, height, walkable, cluster_size))
+
+    def _assert_valid(self, walkable, width, path):
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            self.assertEqual(max(abs(x1 - x2), abs(y1 - y2)), 1)
+            self.assertTrue(walkable[y2 * width + x2])
+            if x1 != x2 and y1 != y2:
+                self.assertTrue(walkable[y1 * width + x2])
+                self.assertTrue(walkable[y2 * width + x1])
+
+    def test_open_field_is_near_optimal(self):
+        """Across open chunks the route is within a few percent of A*'s"""
+        walkable, astar, hpa = self._engines(["." * 80] * 80, cluster_size=16)
+        path = hpa.find_path((0, 0), (79, 50))
+        self._assert_valid(walkable, 80, path)
+        self.assertLess(path_cost(path), path_cost(astar.find_path((0, 0), (79, 50))) * 1.05)
+
+    def test_same_reachability_on_random_grids(self):
+        """HPA* finds a valid path exactly when A* does"""
+        rng = random.Random(7)
+        for _ in range(40):
+            width, height = rng.randint(2, 30), rng.randint(2, 30)
+            density = rng.choice([0.05, 0.2, 0.35])
+            grid = ["".join('#' if rng.random() < density else '.' for _ in range(width)) for _ in range(height)]
+            walkable, astar, hpa = self._engines(grid, cluster_size=rng.choice([4, 5, 8]))
+            for _ in range(5):
+                start = (rng.randrange(width), rng.randrange(height))
+                goal = (rng.randrange(width), rng.randrange(height))
+                if not walkable[start[1] * width + start[0]]:
+                    continue
+                astar_path = astar.find_path(start, goal)
+                hpa_path = hpa.find_path(start, goal)
+                if astar_path is None:
+                    self.assertIsNone(hpa_path)
+                    continue
+                self.assertEqual(hpa_path[0], start)
+                self.assertEqual(hpa_path[-1], goal)
+                self._assert_valid(walkable, width, hpa_path)
+
+    def test_lazy_refinement(self):
+        """Only the legs that are read get refined"""
+        _, _, hpa = self._engines(["." * 64])
+        path = hpa.find_lazy_path((0, 0), (63, 0))
+        self.assertEqual(path[:3], [(0, 0), (1, 0), (2, 0)])
+        self.assertFalse(path.is_refined)
+        self.assertEqual(path.pop(0), (0, 0))
+        self.assertEqual(len(path), 63)
+        self.assertTrue(path.is_refined)
+
+    def test_invalidation_is_local(self):
+        """Changing a tile only drops the cached edges of its own chunk"""
+        grid = ["." * 16] * 16
+        walkable, _, hpa = self._engines(grid)
+        hpa.precompute()
+        self.assertEqual(len(hpa._clusters), 16)
+        walkable[5 * 16 + 5] = 0
+        hpa.invalidate_tile(5, 5)
+        self.assertNotIn((1, 1), hpa._clusters)
+        self.assertEqual(len(hpa._clusters), 15)
+
+    def test_invalidation_reroutes(self):
+        """A wall built after caching is respected by the next search"""
+        grid = ["." * 12] * 12
+        walkable, _, hpa = self._engines(grid)
+        self.assertIsNotNone(hpa.find_path((0, 0), (11, 0)))
+        for y in range(12):
+            walkable[y * 12 + 6] = 0
+            hpa.invalidate_tile(6, y)
+        self.assertIsNone(hpa.find_path((0, 0), (11, 0)))
+        walkable[11 * 12 + 6] = 1
+        hpa.invalidate_tile(6, 11)
+        path = hpa.find_path((0, 0), (11, 0))
+        self.assertIn((6, 11), path)
+        self._assert_valid(walkable, 12, path)
+
+
+class TestPathCache(unittest.TestCase):
+    """Test the LRU path cache and its per-tile invalidation"""
+
+    def test_hits_and_misses(self):
+        """Lookups count hits and misses and hand out independent copies"""
+        cache = PathCache(max_size=4)
+        self.assertIsNone(cache.get((0, 0), (2, 0)))
+        cache.put((0, 0), (2, 0), [(0, 0), (1, 0), (2, 0)])
+        path = cache.get((0, 0), (2, 0))
+        path.pop(0)
+        self.assertEqual(cache.get((0, 0), (2, 0)), [(0, 0), (1, 0), (2, 0)])
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_lru_eviction(self):
+        """The least recently used path is evicted first"""
+        cache = PathCache(max_size=2)
+        cache.put((0, 0), (1, 0), [(0, 0), (1, 0)])
+        cache.put((5, 5), (6, 5), [(5, 5), (6, 5)])
+        cache.get((0, 0), (1, 0))
+        cache.put((9, 9), (9, 8), [(9, 9), (9, 8)])
+        self.assertIn(((0, 0), (1, 0)), cache)
+        self.assertNotIn(((5, 5), (6, 5)), cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_invalidation_is_precise(self):
+        """Only paths on or next to a changed tile are dropped"""
+        cache = PathCache()
+        cache.put((0, 0), (3, 0), [(0, 0), (1, 0), (2, 0), (3, 0)])
+        cache.put((0, 9), (3, 9), [(0, 9), (1, 9), (2, 9), (3, 9)])
+        self.assertEqual(cache.invalidate_tile(2, 1), 1)
+        self.assertNotIn(((0, 0), (3, 0)), cache)
+        self.assertIn(((0, 9), (3, 9)), cache)
+        self.assertEqual(cache.invalidate_tile(6, 6), 0)
+        self.assertEqual(cache.invalidate_tile(1, 9), 1)
+        self.assertEqual(cache._tile_index, {})
+
+
+class TestPathfindingService(unittest.TestCase):
+    """Test background path requests against a loaded world"""
+
+    def setUp(self):
+        tiles = [["GRASS"] * 10 for _ in range(10)]
+        for y in range(1, 9):
+            tiles[y][5] = "WATER"
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'width': 10, 'height': 10, 'tile_size': 32, 'tiles': tiles, 'resources': {}}, self.map_file)
+        self.map_file.close()
+        self.world = WorldState(map_file=self.map_file.name)
+        self.service = self.world.start_path_service()
+
+    def tearDown(self):
+        self.world.stop_path_service()
+        os.remove(self.map_file.name)
+
+    def _wait(self, request, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not request.done and time.monotonic() < deadline:
+            self.service.poll()
+            time.sleep(0.001)
+        self.assertTrue(request.done)
+
+    def test_result_arrives_on_poll(self):
+        """Paths are only delivered by poll() and then land in the path cache"""
+        request = self.service.request((2, 5), (8, 5))
+        self.assertFalse(request.done)
+        self._wait(request)
+        self.assertEqual(request.path, self.world.find_path((2, 5), (8, 5)))
+        self.assertIn(((2, 5), (8, 5)), self.world.path_cache)
+
+    def test_unreachable_goal(self):
+        """A blocked goal is answered with no path"""
+        request = self.service.request((2, 5), (5, 5))
+        self._wait(request)
+        self.assertIsNone(request.path)
+
+    def test_newer_request_cancels_older(self):
+        """A second request from the same owner cancels the first"""
+        owner = object()
+        first = self.service.request((0, 0), (9, 9), owner=owner)
+        second = self.service.request((0, 0), (9, 0), owner=owner)
+        self.assertTrue(first.cancelled)
+        self._wait(second)
+        self.assertEqual(second.path[-1], (9, 0))
+        self.assertFalse(first.done)
+
+    def test_worker_sees_tile_changes(self):
+        """Tile changes made before a request are part of its snapshot"""
+        self.world.set_tile(5, 0, TileType.WATER)
+        self.world.set_tile(5, 9, TileType.WATER)
+        request = self.service.request((2, 5), (8, 5))
+        self._wait(request)
+        self.assertIsNone(request.path)
+        self.world.set_tile(5, 4, TileType.GRASS)
+        request = self.service.request((2, 5), (8, 5))
+        self._wait(request)
+        self.assertIn((5, 4), request.path)
+
+    def test_unknown_engine(self):
+        """Asking for a missing engine fails on the calling thread"""
+        with self.assertRaises(ValueError):
+            self.service.request((0, 0), (1, 1), engine='dijkstra')
+
+
+class TestWorldStatePathfinding(unittest.TestCase):
+    """Test WorldState.find_path on a loaded map"""
+
+    def setUp(self):
+        tiles = [["GRASS"] * 10 for _ in range(10)]
+        for y in range(1, 9):
+            tiles[y][5] = "WATER"
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        resources = {'2,2': {'type': 'Tree', 'x': 2, 'y': 2}}
+        json.dump({'width': 10, 'height': 10, 'tile_size': 32, 'tiles': tiles, 'resources': resources},
+                  self.map_file)
+        self.map_file.close()
+        self.world = WorldState(map_file=self.map_file.name)
+
+    def tearDown(self):
+        os.remove(self.map_file.name)
+
+    def test_path_around_water(self):
+        """The path detours around the water column and stays on walkable tiles"""
+        path = self.world.find_path((2, 5), (8, 5))
+        self.assertEqual(path[0], (2, 5))
+        self.assertEqual(path[-1], (8, 5))
+        for x, y in path:
+            self.assertTrue(self.world.is_walkable(x, y))
+
+    def test_water_target(self):
+        """Clicking on water finds no path"""
+        self.assertIsNone(self.world.find_path((2, 5), (5, 5)))
+
+    def test_resources_block_movement(self):
+        """Trees loaded from the map are obstacles until removed"""
+        self.assertFalse(self.world.is_walkable(2, 2))
+        self.assertIsNone(self.world.find_path((0, 0), (2, 2)))
+        self.world.remove_resource(2, 2)
+        self.assertTrue(self.world.is_walkable(2, 2))
+        self.world.add_resource(Tree(3, 3))
+        self.assertFalse(self.world.is_walkable(3, 3))
+
+    def test_set_tile_updates_walkability(self):
+        """Changing terrain updates the grid used by find_path"""
+        self.world.set_tile(5, 0, TileType.WATER)
+        self.world.set_tile(5, 9, TileType.WATER)
+        self.assertIsNone(self.world.find_path((2, 5), (8, 5)))
+        self.world.set_tile(5, 5, TileType.SAND)
+        self.assertEqual(len(self.world.find_path((2, 5), (8, 5))), 7)
+
+    def test_engine_selection(self):
+        """The engine can be chosen per call or through the world setting"""
+        astar_path = self.world.find_path((0, 0), (9, 9))
+        self.assertEqual(len(self.world.find_path((0, 0), (9, 9), engine='jps')), len(astar_path))
+        self.world.pathfinding_engine = 'jps'
+        self.assertEqual(len(self.world.find_path((0, 0), (9, 9))), len(astar_path))
+        with self.assertRaises(ValueError):
+            self.world.find_path((0, 0), (9, 9), engine='dijkstra')
+
+    def test_long_clicks_use_hierarchical_engine(self):
+        """Targets beyond hierarchical_path_distance get a lazily refined path"""
+        self.world.path_cache.max_size = 0
+        self.world.hierarchical_path_distance = 3
+        path = self.world.find_path((2, 5), (8, 5))
+        self.assertNotIsInstance(path, list)
+        self.assertEqual(path[0], (2, 5))
+        self.assertEqual(list(path)[-1], (8, 5))
+        self.world.hierarchical_path_distance = None
+        self.assertIsInstance(self.world.find_path((2, 5), (8, 5)), list)
+
+    def test_cached_long_clicks_stay_lazy(self):
+        """With the path cache on, a long click's path is still refined as it is walked"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'width': 200, 'height': 40, 'tile_size': 32,
+                       'tiles': [["GRASS"] * 200 for _ in range(40)], 'resources': {}}, f)
+        self.addCleanup(os.remove, f.name)
+        world = WorldState(map_file=f.name)
+        self.assertGreater(world.path_cache.max_size, 0)
+        path = world.find_path((0, 20), (199, 20))
+        self.assertEqual(path[0], (0, 20))
+        self.assertFalse(path.is_refined)
+        self.assertNotIn(((0, 20), (199, 20)), world.path_cache)
+
+    def test_remove_resource_updates_hierarchical_engine(self):
+        """Cached chunk edges are dropped when a resource is removed"""
+        self.assertIsNone(self.world.find_path((0, 0), (2, 2), engine='hpa'))
+        self.world.remove_resource(2, 2)
+        self.assertEqual(list(self.world.find_path((0, 0), (2, 2), engine='hpa'))[-1], (2, 2))
+
+    def test_repeated_trips_hit_the_cache(self):
+        """A repeated trip is served from the cache until its surroundings change"""
+        first = self.world.find_path((0, 0), (4, 9))
+        first.pop(0)
+        self.assertEqual(self.world.find_path((0, 0), (4, 9))[0], (0, 0))
+        self.assertEqual(self.world.path_cache.hits, 1)
+        self.world.set_tile(8, 0, TileType.WATER)
+        self.assertIn(((0, 0), (4, 9)), self.world.path_cache)
+        path = self.world.find_path((0, 0), (4, 9))
+        self.world.set_tile(*path[3], TileType.WATER)
+        self.assertNotIn(((0, 0), (4, 9)), self.world.path_cache)
+        self.assertNotIn(path[3], self.world.find_path((0, 0), (4, 9)))
+
+    def test_resource_changes_invalidate_cache(self):
+        """Removing or adding a resource beside a cached path drops it"""
+        self.world.find_path((1, 1), (1, 4))
+        self.world.remove_resource(2, 2)
+        self.assertNotIn(((1, 1), (1, 4)), self.world.path_cache)
+        self.world.find_path((1, 1), (1, 4))
+        self.world.add_resource(Tree(2, 3))
+        self.assertNotIn(((1, 1), (1, 4)), self.world.path_cache)
+
+    def test_out_of_bounds(self):
+        """Tiles outside the map are never walkable"""
+        self.assertFalse(self.world.is_walkable(-1, 0))
+        self.assertFalse(self.world.is_walkable(0, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import tempfile
+import unittest
+import pygame
+from src.engine.rendering import RenderQueue, LAYER_GROUND, LAYER_SPRITES, LAYER_OVERLAY
+from src.entities.player.player import Player
+from src.entities.resources.tree import Tree
+from src.game_state.world_state import WorldState
+
+
+def solid(color, size=(10, 10)):
+    """A surface filled with one color."""
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
+
+
+class TestRenderQueue(unittest.TestCase):
+    """Test ordering and dirty rects of the sprite queue"""
+
+    def setUp(self):
+        self.queue = RenderQueue()
+        self.screen = pygame.Surface((40, 40))
+
+    def test_sorted_by_key(self):
+        """Items with a larger sort key are drawn in front, whatever the submission order"""
+        self.queue.submit(solid((255, 0, 0)), (0, 0), sort_key=20)
+        self.queue.submit(solid((0, 255, 0)), (5, 5), sort_key=10)
+        self.queue.flush(self.screen)
+        self.assertEqual(self.screen.get_at((7, 7))[:3], (255, 0, 0))
+        self.assertEqual(self.queue.flushed, 2)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_layers_before_keys(self):
+        """Layers are drawn in order, and equal keys keep submission order"""
+        self.queue.submit(solid((0, 0, 255)), (0, 0), sort_key=0, layer=LAYER_OVERLAY)
+        self.queue.submit(solid((255, 0, 0)), (0, 0), sort_key=99, layer=LAYER_SPRITES)
+        self.queue.submit(solid((0, 255, 0)), (20, 20), sort_key=5, layer=LAYER_GROUND)
+        self.queue.submit(solid((255, 255, 0)), (20, 20), sort_key=5, layer=LAYER_GROUND)
+        self.queue.flush(self.screen)
+        self.assertEqual(self.screen.get_at((2, 2))[:3], (0, 0, 255))
+        self.assertEqual(self.screen.get_at((22, 22))[:3], (255, 255, 0))
+
+    def test_dirty_rects_cover_old_and_new(self):
+        """Dirty rects include where sprites were last frame and where they are now"""
+        self.queue.submit(solid((255, 0, 0)), (0, 0))
+        self.assertEqual(self.queue.flush(self.screen, dirty=True), [pygame.Rect(0, 0, 10, 10)])
+        self.queue.submit(solid((255, 0, 0)), (35, 20))
+        rects = self.queue.flush(self.screen, dirty=True)
+        self.assertEqual(rects, [pygame.Rect(35, 20, 5, 10), pygame.Rect(0, 0, 10, 10)])
+        self.assertIsNone(self.queue.flush(self.screen))
+
+
+class StubAssets:
+    """Returns plain colored images instead of loading files"""
+
+    def get_image(self, name):
+        return solid((0, 128, 0), (32, 64))
+
+
+class TestSpriteDepth(unittest.TestCase):
+    """Test that trees and the player overlap by their rows"""
+
+    def setUp(self):
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'width': 10, 'height': 10, 'tile_size': 32,
+                   'tiles': [["GRASS"] * 10 for _ in range(10)], 'resources': {}}, self.map_file)
+        self.map_file.close()
+        self.world = WorldState(map_file=self.map_file.name)
+        self.world.asset_manager = StubAssets()
+        self.screen = pygame.Surface((320, 320))
+
+    def tearDown(self):
+        os.remove(self.map_file.name)
+
+    def _draw(self, player):
+        queue = RenderQueue()
+        self.world.draw(self.screen, 0, 0, queue)
+        player.submit(queue, self.screen)
+        queue.flush(self.screen)
+
+    def test_tree_in_front_of_player_behind_it(self):
+        """A tree on the row below the player covers the player's feet"""
+        self.world.add_resource(Tree(4, 5))
+        player = Player(4, 4, None, None, world_state=self.world)
+        self._draw(player)
+        # The tree sprite reaches 16 pixels up into the player's tile
+        feet = (4 * 32 + 16, 5 * 32 - 12)
+        self.assertTrue(player.rect.collidepoint(feet))
+        self.assertEqual(self.screen.get_at(feet)[:3], (0, 128, 0))
+
+    def test_player_in_front_of_tree_above(self):
+        """The player standing below a tree is drawn over the tree's trunk"""
+        self.world.add_resource(Tree(4, 3))
+        player = Player(4, 4, None, None, world_state=self.world)
+        self._draw(player)
+        trunk = (4 * 32 + 16, 4 * 32 - 4)
+        self.assertNotEqual(self.screen.get_at(trunk)[:3], (0, 128, 0))
+        self.assertTrue(player.rect.collidepoint(trunk))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import shutil
+import tempfile
+import unittest
+from src.engine.headless import HeadlessSimulation
+from src.engine.replay import Replay, ReplayPlayer, ReplayRecorder
+
+
+class TestReplay(unittest.TestCase):
+    """Test recording sessions and playing them back tick for tick"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.directory, 'map.json')
+        tiles = [["GRASS"] * 40 for _ in range(30)]
+        for y in range(5, 25):
+            tiles[y][20] = "WATER"
+        with open(self.map_file, 'w') as f:
+            json.dump({'width': 40, 'height': 30, 'tile_size': 32, 'tiles': tiles,
+                       'resources': {'3,3': {'type': 'Tree'}}}, f)
+        self.replay_file = os.path.join(self.directory, 'session.replay')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, ticks, path_service=False):
+        """Record the headless bot, with a resource respawn pending from before the recording."""
+        simulation = HeadlessSimulation(self.map_file, seed=7, wander_radius=15, path_service=path_service)
+        self.addCleanup(simulation.close)
+        simulation.run(5)
+        simulation.world.remove_resource(3, 3)
+        simulation.world.respawn_resource(3, 3, 'Tree', 100)
+        while simulation.player.moving or simulation.player.path_request is not None:
+            simulation.world.update(simulation.world.ticks.tick_interval)
+        simulation.recorder = ReplayRecorder(self.replay_file, simulation.world, simulation.player_state,
+                                             self.map_file, seed=3)
+        simulation.run(ticks)
+        simulation.recorder.close()
+        return simulation
+
+    def play(self, **options):
+        player = ReplayPlayer(Replay.load(self.replay_file), **options)
+        self.addCleanup(player.close)
+        return player, player.run()
+
+    def test_playback_matches_recording(self):
+        """Every tick of a recorded session checks out, and the game ends where it did"""
+        simulation = self.record(300)
+        replay = Replay.load(self.replay_file)
+        self.assertEqual(replay.end_tick, simulation.world.game_ticks)
+        self.assertGreater(sum(len(entries) for entries in replay.inputs.values()), 3)
+
+        player, matched = self.play()
+        self.assertTrue(matched)
+        self.assertIsNone(player.diverged_at)
+        self.assertEqual(player.ticks_run, 300)
+        self.assertEqual(player.world.game_ticks, simulation.world.game_ticks)
+        self.assertEqual((player.player_state.player.grid_x, player.player_state.player.grid_y),
+                         (simulation.player.grid_x, simulation.player.grid_y))
+        self.assertIsNotNone(player.world.get_resource_at(3, 3))
+
+    def test_background_paths_replay_the_same(self):
+        """Paths searched on the worker start on the same tick as paths searched inline"""
+        self.record(200, path_service=True)
+        _, matched = self.play()
+        self.assertTrue(matched)
+        _, matched = self.play(path_service=True)
+        self.assertTrue(matched)
+
+    def test_divergence_is_reported(self):
+        """A changed click is caught once the player's steps differ, and not before"""
+        self.record(200)
+        with open(self.replay_file) as f:
+            lines = f.read().splitlines()
+        first_click = next(number for number, line in enumerate(lines) if '"click"' in line)
+        entry = json.loads(lines[first_click])
+        entry['click'] = [entry['click'][0] + 1, entry['click'][1]]
+        lines[first_click] = json.dumps(entry)
+        with open(self.replay_file, 'w') as f:
+            f.write('\n'.join(lines[:-1]) + '\n' + lines[-1][:5])
+
+        player, matched = self.play()
+        self.assertFalse(matched)
+        self.assertGreater(player.diverged_at, entry['tick'])
+        self.assertEqual(player.world.game_ticks, player.diverged_at)
+
+    def test_rejects_other_files(self):
+        """Files that are not replays raise ValueError"""
+        with open(self.replay_file, 'w') as f:
+            f.write('{"version": 1}\n')
+        with self.assertRaises(ValueError):
+            Replay.load(self.replay_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
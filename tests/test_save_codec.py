@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import random
+import unittest
+from test_save_journal import SaveTestCase
+from src.engine.save_codec import CODECS, SaveCodec, codec_of, decode_file, get_codec
+from src.game_state.world_state import TileType
+
+
+def populated_world_state(tiles=2000, seed=3):
+    """A world snapshot with many modified tiles and resources."""
+    rng = random.Random(seed)
+    names = ['GRASS', 'WATER', 'SAND', 'DIRT', 'STONE']
+    return {
+        'timestamp': 1700000000,
+        'game_ticks': 123456,
+        'tilemap': {
+            'width': 1000,
+            'height': 1000,
+            'modified_tiles': [[rng.randrange(1000), rng.randrange(1000), rng.choice(names)] for _ in range(tiles)],
+            'removed_resources': [[rng.randrange(1000), rng.randrange(1000)] for _ in range(tiles // 10)],
+            'added_resources': [[rng.randrange(1000), rng.randrange(1000), 'Rock'] for _ in range(tiles // 10)],
+        },
+        'version': '1.0.0',
+    }
+
+
+class TestSaveCodecs(unittest.TestCase):
+    """Test encoding and decoding snapshots with every codec"""
+
+    def test_round_trip(self):
+        """Every codec reads back what JSON would, and files name their codec"""
+        state = populated_world_state()
+        state['extra'] = {'nested': [1, 'two', 3.5, None, True, False, [], {}], 'position': (4, 5), 'é': -2 ** 40}
+        expected = json.loads(json.dumps(state))
+        for codec in CODECS.values():
+            data = codec.encode_file(state)
+            self.assertIs(codec_of(data), CODECS['json'] if codec.codec_id is None else codec)
+            self.assertEqual(decode_file(data), expected, codec.name)
+
+    def test_binary_packs_rows(self):
+        """Lists of rows are stored as columns, much smaller than JSON"""
+        state = populated_world_state()
+        binary = CODECS['binary'].encode_file(state)
+        self.assertLess(len(binary), len(CODECS['fast-json'].encode_file(state)) / 2)
+        # Rows that do not fit a table are still stored, as plain lists
+        mixed = {'rows': [[1, 'a'], [2, 3]], 'big': [[2 ** 40, 1], [0, 1]], 'short': [[1]], 'uneven': [[1, 2], [1]]}
+        self.assertEqual(decode_file(CODECS['binary'].encode_file(mixed)), mixed)
+
+    def test_saves_from_before_codecs_load(self):
+        """A JSON file without a header is read as JSON"""
+        old = json.dumps({'name': 'Ada', 'grid_position': [0, 0]}, indent=4).encode('utf-8')
+        self.assertIs(codec_of(old), CODECS['json'])
+        self.assertEqual(decode_file(old), {'name': 'Ada', 'grid_position': [0, 0]})
+
+    def test_errors(self):
+        """Unknown or abstract codecs, unsupported values and damaged files raise"""
+        with self.assertRaises(ValueError):
+            get_codec('xml')
+        with self.assertRaises(TypeError):
+            SaveCodec()
+        with self.assertRaises(TypeError):
+            CODECS['binary'].encode({'when': object()})
+        data = CODECS['binary'].encode_file(populated_world_state(tiles=50))
+        with self.assertRaises(ValueError):
+            decode_file(data[:-7])
+        with self.assertRaises(ValueError):
+            decode_file(data[:4] + b'\x01\x09' + data[6:])
+
+
+class TestSaveManagerCodecs(SaveTestCase):
+    """Test switching codecs between saves"""
+
+    def test_codec_can_change_between_saves(self):
+        """Snapshots written with different codecs, and journals on top, load the same world"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        for tick, name in enumerate(('binary', 'fast-json', 'binary'), start=1):
+            self.saves.codec = get_codec(name)
+            self.world.set_tile(tick, 1, TileType.SAND)
+            self.saves.checkpoint(self.player, self.world, tick)
+        self.world.set_tile(9, 9, TileType.DIRT)
+        self.saves.auto_save(self.player, self.world, 5)
+
+        self.saves.flush()
+        with open(self.saves.world_save_file, 'rb') as f:
+            self.assertIs(codec_of(f.read()), CODECS['binary'])
+        saves, world = self.reload()
+        for x in (1, 2, 3):
+            self.assertEqual(world.get_tile_type(x, 1), TileType.SAND)
+        self.assertEqual(world.get_tile_type(9, 9), TileType.DIRT)
+        self.assertEqual(world.game_ticks, 5)
+        self.assertEqual(saves.load_character_save()['grid_position'], [3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
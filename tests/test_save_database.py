@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from test_save_journal import SaveTestCase
+from src.engine.save_database import SaveDatabase
+from src.engine.save_manager import SaveManager
+from src.entities.resources.rock import Rock
+from src.game_state.world_state import TileType
+
+
+class SqliteSaveTestCase(SaveTestCase):
+    """SaveTestCase with the SQLite backend"""
+
+    backend = 'sqlite'
+
+
+class TestSqliteSaves(SqliteSaveTestCase):
+    """Test the SQLite save backend behind the SaveManager API"""
+
+    def test_changes_survive_a_restart(self):
+        """Tiles, resources and the position saved between checkpoints are restored"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.world.set_tile(1, 1, TileType.WATER)
+        self.world.remove_resource(5, 5)
+        self.saves.auto_save(self.player, self.world, 1)
+        self.world.add_resource(Rock(6, 6))
+        self.world.remove_resource(8, 2)
+        self.world.add_resource(Rock(8, 2))
+        self.player.grid_x = 9
+        self.saves.auto_save(self.player, self.world, 2)
+
+        saves, world = self.reload()
+        self.assertEqual(world.get_tile_type(1, 1), TileType.WATER)
+        self.assertIsNone(world.get_resource_at(5, 5))
+        self.assertIsInstance(world.get_resource_at(6, 6), Rock)
+        self.assertIsInstance(world.get_resource_at(8, 2), Rock)
+        self.assertEqual(world.game_ticks, 2)
+        self.assertEqual(saves.load_character_save()['grid_position'], [9, 4])
+        self.assertFalse(world.unsaved_changes)
+        self.assertFalse(os.path.exists(self.saves.world_save_file))
+
+    def test_ticks_are_committed_in_batches(self):
+        """auto_save commits once per commit_interval ticks, and checkpoint commits at once"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        commits = self.saves.database.commits
+        for tick in range(1, 10):
+            self.world.set_tile(tick, 0, TileType.SAND)
+            self.saves.auto_save(self.player, self.world, tick)
+        self.assertEqual(self.saves.database.commits, commits)
+        self.world.set_tile(10, 0, TileType.SAND)
+        self.saves.auto_save(self.player, self.world, 10)
+        self.assertEqual(self.saves.database.commits, commits + 1)
+
+        # Another connection sees only committed ticks
+        self.world.set_tile(11, 0, TileType.SAND)
+        self.saves.auto_save(self.player, self.world, 11)
+        reader = SaveDatabase(self.saves.database.path)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.load_world()['game_ticks'], 10)
+        self.saves.checkpoint(self.player, self.world, 12)
+        world = reader.load_world()
+        self.assertEqual(world['game_ticks'], 12)
+        self.assertEqual(sorted(world['tilemap']['modified_tiles']),
+                         sorted([x, 0, 'SAND'] for x in range(1, 12)))
+
+    def test_character_list_uses_the_index(self):
+        """Characters are listed most recently played first from the metadata index"""
+        for name, timestamp in (('Bo', 300), ('Cy', 100), ('Di', 200)):
+            self.saves.create_character(name, {'timestamp': timestamp, 'grid_position': [1, 2]})
+        self.assertEqual(self.saves.list_characters(), ['Bo', 'Di', 'Cy'])
+        self.assertTrue(self.saves.character_exists('Cy'))
+        self.assertFalse(self.saves.character_exists('Ada'))
+
+        plan = ' '.join(row[-1] for row in self.saves.database.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT name, timestamp, grid_x, grid_y, version FROM characters "
+            "ORDER BY timestamp DESC, name"))
+        self.assertIn('COVERING INDEX characters_by_last_played', plan)
+
+        self.assertTrue(self.saves.delete_save_file('Cy.json'))
+        self.assertEqual(self.saves.list_characters(), ['Bo', 'Di'])
+        self.assertFalse(self.saves.delete_save_file('Cy.json'))
+
+    def test_database_uses_wal(self):
+        """The database is opened in WAL mode, and unknown backends are refused"""
+        mode = self.saves.database.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+        with self.assertRaises(ValueError):
+            SaveManager(save_directory=self.directory, backend='xml')
+
+
+if __name__ == "__main__":
+    unittest.main()
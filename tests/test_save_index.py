@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import shutil
+import unittest
+from unittest import mock
+from test_save_journal import SaveTestCase
+from src.engine.save_index import SaveIndex
+from src.engine.save_journal import SaveJournal
+from src.engine.save_manager import SaveManager
+
+
+class TestSaveIndex(SaveTestCase):
+    """Test the save index behind the character select screen"""
+
+    def read_index(self):
+        self.saves.flush()
+        with open(self.saves.index.path) as f:
+            return json.load(f)
+
+    def test_saves_update_the_index(self):
+        """Checkpoints and journaled moves update the character's and the world's entries"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.player.grid_x = 7
+        self.saves.auto_save(self.player, self.world, 1)
+        index = self.read_index()
+        self.assertEqual(index['characters']['Ada']['grid_position'], [7, 4])
+        self.assertEqual(index['characters']['Ada']['version'], '1.0.0')
+        self.assertEqual(index['world']['game_ticks'], 1)
+
+        self.saves.create_character('Bo', {'timestamp': 1, 'grid_position': [2, 2]})
+        self.saves.flush()
+        with mock.patch.object(SaveJournal, 'read_snapshot', side_effect=AssertionError("save was read")), \
+                mock.patch.object(SaveJournal, 'entries', side_effect=AssertionError("journal was read")):
+            saves = SaveManager(save_directory=self.saves.save_directory)
+            self.addCleanup(saves.close)
+            self.assertEqual(saves.list_characters(), ['Ada', 'Bo'])
+            self.assertEqual(saves.world_index()['game_ticks'], 1)
+            saves.character_name = 'Ada'
+            self.assertEqual(saves.get_save_files()[0]['position'], [7, 4])
+
+    def test_rebuild(self):
+        """A missing, damaged or out of date index is rebuilt from the saves"""
+        self.saves.checkpoint(self.player, self.world, 3)
+        self.saves.flush()
+        os.remove(self.saves.index.path)
+        index = SaveIndex(self.saves.save_directory)
+        self.assertEqual(index.character('Ada')['grid_position'], [3, 4])
+        self.assertEqual(index.world()['game_ticks'], 3)
+        self.assertTrue(os.path.exists(index.path))
+
+        with open(index.path, 'w') as f:
+            f.write('{"characters": ')
+        self.assertEqual([entry['name'] for entry in SaveIndex(self.saves.save_directory).characters()], ['Ada'])
+
+        # A save copied in by hand is picked up by the next listing
+        shutil.copy(self.saves.character_save_file, os.path.join(self.saves.save_directory, 'Cy.json'))
+        self.assertEqual(sorted(self.saves.list_characters()), ['Ada', 'Cy'])
+        self.assertEqual(self.saves.rebuild_index(), 2)
+
+    def test_delete_removes_entry(self):
+        """Deleting a save removes it from the index"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.assertTrue(self.saves.delete_save_file('Ada.json'))
+        self.assertTrue(self.saves.delete_save_file('world.json'))
+        index = self.read_index()
+        self.assertEqual(index['characters'], {})
+        self.assertIsNone(index['world'])
+        self.assertEqual(self.saves.list_characters(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import shutil
+import tempfile
+import unittest
+from src.engine.save_journal import SaveJournal, WorldChanges
+from src.engine.save_manager import SaveManager
+from src.entities.resources.rock import Rock
+from src.game_state.world_state import WorldState, TileType
+
+
+class StubPlayer:
+    """Only the fields the save manager reads"""
+
+    def __init__(self, grid_x, grid_y):
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+
+
+class SaveTestCase(unittest.TestCase):
+    """Creates a small map and a save manager writing to a temporary directory"""
+
+    backend = 'files'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.directory, 'map.json')
+        tiles = [["GRASS"] * 30 for _ in range(20)]
+        resources = {'5,5': {'type': 'Tree'}, '8,2': {'type': 'Rock'}}
+        with open(self.map_file, 'w') as f:
+            json.dump({'width': 30, 'height': 20, 'tile_size': 32, 'tiles': tiles, 'resources': resources}, f)
+        self.world = WorldState(map_file=self.map_file)
+        self.player = StubPlayer(3, 4)
+        self.saves = SaveManager(character_name='Ada', save_directory=os.path.join(self.directory, 'saves'),
+                                 backend=self.backend)
+
+    def tearDown(self):
+        self.saves.close()
+        shutil.rmtree(self.directory)
+
+    def reload(self):
+        """A fresh world and save manager reading the same files, as after restarting the game."""
+        self.saves.flush()
+        saves = SaveManager(character_name='Ada', save_directory=self.saves.save_directory, backend=self.backend)
+        self.addCleanup(saves.close)
+        world = WorldState(map_file=self.map_file)
+        world.load_state(saves)
+        return saves, world
+
+
+class TestSaveJournal(SaveTestCase):
+    """Test the snapshot and journal files"""
+
+    def test_replays_entries_and_skips_torn_line(self):
+        """Entries are replayed in order; a line cut short by a crash is dropped and repaired"""
+        journal = SaveJournal(os.path.join(self.directory, 'state.json'))
+        journal.write_snapshot({'a': 1})
+        journal.append({'a': 2})
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"a": 3')
+        self.assertEqual(list(SaveJournal(journal.snapshot_path).entries()), [{'a': 2}])
+
+        reopened = SaveJournal(journal.snapshot_path)
+        reopened.append({'b': 4})
+        self.assertEqual(list(reopened.entries()), [{'a': 2}, {'b': 4}])
+        self.assertEqual(reopened.pending_entries(), 2)
+
+    def test_snapshot_empties_journal(self):
+        """Writing a snapshot removes the journal it contains"""
+        journal = SaveJournal(os.path.join(self.directory, 'state.json'))
+        journal.append({'a': 1})
+        journal.write_snapshot({'a': 1})
+        self.assertFalse(os.path.exists(journal.journal_path))
+        self.assertEqual(journal.read_snapshot(), {'a': 1})
+        self.assertEqual(journal.pending_entries(), 0)
+
+    def test_world_changes_round_trip(self):
+        """Later changes win when merged, and survive to_dict and from_dict"""
+        changes = WorldChanges()
+        changes.set_tile(1, 1, 'SAND')
+        changes.add_resource(2, 2, 'Rock')
+        later = WorldChanges()
+        later.set_tile(1, 1, 'DIRT')
+        later.remove_resource(2, 2)
+        later.remove_resource(5, 5)
+        changes.merge(later)
+        restored = WorldChanges.from_dict(json.loads(json.dumps(changes.to_dict())))
+        self.assertEqual(restored.tiles, {(1, 1): 'DIRT'})
+        self.assertEqual(restored.added_resources, {})
+        self.assertEqual(restored.removed_resources, {(2, 2), (5, 5)})
+
+
+class TestIncrementalSaves(SaveTestCase):
+    """Test that SaveManager journals changes and restores them"""
+
+    def test_idle_ticks_write_only_the_tick(self):
+        """Ticks without changes append a few bytes instead of the whole state"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.saves.flush()
+        snapshot_size = os.path.getsize(self.saves.world_save_file)
+        written = [self.saves.auto_save(self.player, self.world, tick) for tick in range(1, 50)]
+        self.assertLess(max(written), 32)
+        self.assertGreater(snapshot_size, max(written))
+        self.saves.flush()
+        self.assertEqual(os.path.getsize(self.saves.world_save_file), snapshot_size)
+
+    def test_changes_survive_a_restart(self):
+        """Tiles, resources and the position journaled between checkpoints are restored"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.world.set_tile(1, 1, TileType.WATER)
+        self.world.remove_resource(5, 5)
+        self.saves.auto_save(self.player, self.world, 1)
+        self.world.add_resource(Rock(6, 6))
+        self.player.grid_x = 9
+        written = self.saves.auto_save(self.player, self.world, 2)
+        self.assertLess(written, 200)
+
+        saves, world = self.reload()
+        self.assertEqual(world.get_tile_type(1, 1), TileType.WATER)
+        self.assertFalse(world.is_walkable(1, 1))
+        self.assertIsNone(world.get_resource_at(5, 5))
+        self.assertIsInstance(world.get_resource_at(6, 6), Rock)
+        self.assertIsNotNone(world.get_resource_at(8, 2))
+        self.assertEqual(world.game_ticks, 2)
+        self.assertEqual(saves.load_character_save()['grid_position'], [9, 4])
+        # Restored changes are already saved, so they are not journaled again
+        self.assertFalse(world.unsaved_changes)
+
+    def test_compaction(self):
+        """After compact_interval entries the journals are folded into new snapshots"""
+        self.saves.compact_interval = 10
+        self.saves.checkpoint(self.player, self.world, 0)
+        for tick in range(1, 10):
+            self.world.set_tile(tick, 0, TileType.SAND)
+            self.saves.auto_save(self.player, self.world, tick)
+        self.assertEqual(self.saves.world_journal.pending_entries(), 9)
+        self.world.set_tile(10, 0, TileType.SAND)
+        self.saves.auto_save(self.player, self.world, 10)
+        self.saves.flush()
+        self.assertFalse(os.path.exists(self.saves.world_journal.journal_path))
+
+        with open(self.saves.world_save_file) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot['game_ticks'], 10)
+        self.assertEqual(sorted(snapshot['tilemap']['modified_tiles']),
+                         sorted([x, 0, 'SAND'] for x in range(1, 11)))
+        _, world = self.reload()
+        self.assertEqual(world.get_tile_type(10, 0), TileType.SAND)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from src.engine.save_writer import SaveWriter, encode_json_snapshot
+
+
+class TestSaveWriter(unittest.TestCase):
+    """Test the background save writer"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'state.json')
+        self.journal = os.path.join(self.directory, 'state.journal')
+        self.writer = SaveWriter()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.writer.close()
+        shutil.rmtree(self.directory)
+
+    def _blocking_encode(self, state):
+        """Hold the writer thread until the test releases it."""
+        self.release.wait(5)
+        return encode_json_snapshot(state)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_back_to_back_saves_are_coalesced(self):
+        """Snapshots queued while the writer is busy collapse into the latest one"""
+        self.writer.replace(os.path.join(self.directory, 'other.json'), {}, self._blocking_encode)
+        self.writer.append(self.journal, b'1\n')
+        for version in range(5):
+            self.writer.replace(self.path, {'version': version}, remove=[self.journal])
+        self.writer.append(self.journal, b'2\n')
+        self.release.set()
+        self.assertTrue(self.writer.flush(5))
+
+        self.assertEqual(json.loads(self._read(self.path)), {'version': 4})
+        # The append made before the snapshot is covered by it; the later one is kept
+        self.assertEqual(self._read(self.journal), '2\n')
+        self.assertEqual(self.writer.coalesced, 5)
+
+    def test_appends_keep_their_order(self):
+        """Appends are written in the order they were handed over"""
+        for number in range(100):
+            self.writer.append(self.journal, b'%d\n' % number)
+        self.writer.flush()
+        self.assertEqual(self._read(self.journal).split(), [str(number) for number in range(100)])
+
+    def test_failed_write_keeps_old_file(self):
+        """A snapshot that fails to serialise leaves the previous file in place"""
+        self.writer.replace(self.path, {'good': True})
+        self.writer.flush()
+
+        def broken(state):
+            raise TypeError("cannot serialise")
+        self.writer.replace(self.path, {'good': False}, broken)
+        self.writer.flush()
+        self.assertEqual(json.loads(self._read(self.path)), {'good': True})
+        self.assertEqual(self.writer.errors, 1)
+
+    def test_close_writes_everything(self):
+        """close waits for pending saves, and later saves are refused"""
+        self.writer.replace(self.path, {'last': True}, self._blocking_encode)
+        threading.Timer(0.05, self.release.set).start()
+        self.writer.close()
+        self.assertEqual(json.loads(self._read(self.path)), {'last': True})
+        with self.assertRaises(RuntimeError):
+            self.writer.append(self.journal, b'x\n')
+
+
+if __name__ == "__main__":
+    unittest.main()
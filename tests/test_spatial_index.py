@@ -0,0 +1,112 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import random
+import tempfile
+import unittest
+from src.engine.spatial_index import SpatialGrid
+from src.entities.resources.resource import ResourceType
+from src.entities.resources.tree import Tree
+from src.game_state.world_state import WorldState
+
+
+class TestSpatialGrid(unittest.TestCase):
+    """Test the bucketed spatial index against brute-force scans"""
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.grid = SpatialGrid(bucket_size=8)
+        self.items = {}
+        for _ in range(300):
+            x, y = rng.randrange(100), rng.randrange(100)
+            self.items[(x, y)] = (x, y, rng.random() < 0.5)
+            self.grid.insert(x, y, self.items[(x, y)])
+
+    def test_insert_and_remove(self):
+        """Length and lookups follow inserts, replacements and removals"""
+        self.assertEqual(len(self.grid), len(self.items))
+        position = next(iter(self.items))
+        self.grid.insert(*position, 'replaced')
+        self.assertEqual(len(self.grid), len(self.items))
+        self.assertEqual(self.grid.get(*position), 'replaced')
+        self.assertEqual(self.grid.remove(*position), 'replaced')
+        self.assertNotIn(position, self.grid)
+        self.assertIsNone(self.grid.remove(*position))
+        self.assertEqual(len(self.grid), len(self.items) - 1)
+
+    def test_query_rect(self):
+        """Rectangle queries return exactly the objects inside, edges exclusive"""
+        for rect in [(0, 0, 100, 100), (5, 7, 21, 40), (16, 16, 24, 24), (50, 50, 50, 60), (-10, -10, 3, 3)]:
+            x0, y0, x1, y1 = rect
+            expected = {p for p in self.items if x0 <= p[0] < x1 and y0 <= p[1] < y1}
+            found = {p for p, _ in self.grid.query_rect(*rect)}
+            self.assertEqual(found, expected, rect)
+
+    def test_nearest(self):
+        """Nearest matches a brute-force search, with and without filters"""
+        rng = random.Random(9)
+        for _ in range(50):
+            x, y = rng.randrange(-20, 120), rng.randrange(-20, 120)
+            distances = sorted(((p[0] - x) ** 2 + (p[1] - y) ** 2, p) for p in self.items)
+            (position, _) = self.grid.nearest(x, y)
+            self.assertEqual((position[0] - x) ** 2 + (position[1] - y) ** 2, distances[0][0])
+
+            flagged = [(d, p) for d, p in distances if self.items[p][2]]
+            match = self.grid.nearest(x, y, predicate=lambda item: item[2])
+            self.assertEqual((match[0][0] - x) ** 2 + (match[0][1] - y) ** 2, flagged[0][0])
+
+    def test_nearest_max_distance(self):
+        """Objects beyond max_distance are ignored"""
+        grid = SpatialGrid(bucket_size=4)
+        grid.insert(20, 0, 'far')
+        self.assertIsNone(grid.nearest(0, 0, max_distance=19))
+        self.assertEqual(grid.nearest(0, 0, max_distance=20), ((20, 0), 'far'))
+        self.assertIsNone(SpatialGrid().nearest(0, 0))
+
+
+class TestWorldStateResourceIndex(unittest.TestCase):
+    """Test that WorldState keeps its resource index in sync"""
+
+    def setUp(self):
+        resources = {'2,3': {'type': 'Tree'}, '10,3': {'type': 'Rock'}, '30,30': {'type': 'Tree'}}
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'width': 40, 'height': 40, 'tile_size': 32,
+                   'tiles': [["GRASS"] * 40 for _ in range(40)], 'resources': resources}, self.map_file)
+        self.map_file.close()
+        self.world = WorldState(map_file=self.map_file.name)
+
+    def tearDown(self):
+        os.remove(self.map_file.name)
+
+    def test_loaded_resources_indexed(self):
+        """Resources from the map file can be found by area"""
+        self.assertEqual(len(self.world.resource_index), 3)
+        found = self.world.get_resources_in_rect(0, 0, 20, 20)
+        self.assertEqual({(r.x, r.y) for r in found}, {(2, 3), (10, 3)})
+
+    def test_add_and_remove_resource(self):
+        """add_resource and remove_resource update the index"""
+        self.world.remove_resource(2, 3)
+        self.assertEqual(self.world.get_resources_in_rect(0, 0, 5, 5), [])
+        self.world.add_resource(Tree(4, 4))
+        self.assertEqual([(r.x, r.y) for r in self.world.get_resources_in_rect(0, 0, 5, 5)], [(4, 4)])
+
+    def test_find_nearest_resource(self):
+        """Nearest-resource search can be limited to one type"""
+        self.assertEqual(self.world.find_nearest_resource(9, 4).resource_type, ResourceType.ROCK)
+        tree = self.world.find_nearest_resource(9, 4, ResourceType.TREE)
+        self.assertEqual((tree.x, tree.y), (2, 3))
+        self.assertIsNone(self.world.find_nearest_resource(9, 4, ResourceType.TREE, max_distance=5))
+
+    def test_click_on_tree_canopy(self):
+        """Clicking the part of a tree drawn over the tile above hits the tree"""
+        tree = self.world.get_resource_at_point(2 * 32 + 10, 3 * 32 - 8)
+        self.assertEqual((tree.x, tree.y), (2, 3))
+        self.assertIsNone(self.world.get_resource_at_point(2 * 32 + 10, 3 * 32 - 20))
+        rock = self.world.get_resource_at_point(10 * 32 + 5, 3 * 32 + 5)
+        self.assertEqual((rock.x, rock.y), (10, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import tempfile
+import unittest
+import pygame
+from src.game_state.world_state import WorldState, TileType
+
+
+class TerrainTestCase(unittest.TestCase):
+    """Loads a small striped map and compares drawing against per-tile blits"""
+
+    def setUp(self):
+        tiles = [["GRASS"] * 40 for _ in range(40)]
+        for y in range(40):
+            tiles[y][(y * 7) % 40] = "WATER"
+            tiles[y][(y * 3) % 40] = "SAND"
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'width': 40, 'height': 40, 'tile_size': 8, 'tiles': tiles, 'resources': {}}, self.map_file)
+        self.map_file.close()
+        self.world = WorldState(map_file=self.map_file.name)
+        self.cache = self.world.terrain_cache
+        self.cache.chunk_size = 8
+
+    def tearDown(self):
+        os.remove(self.map_file.name)
+
+    def _reference(self, size, camera_x, camera_y):
+        """Draw the visible tiles one by one, as WorldState.draw used to."""
+        screen = pygame.Surface(size)
+        tile_size = self.world.tile_size
+        for y in range(self.world.height):
+            for x in range(self.world.width):
+                self.world.get_tile(x, y).draw(screen, x * tile_size - camera_x, y * tile_size - camera_y, tile_size)
+        return screen
+
+    def _assert_same(self, screen, reference):
+        self.assertEqual(pygame.image.tobytes(screen, 'RGB'), pygame.image.tobytes(reference, 'RGB'))
+
+
+class TestTerrainChunkCache(TerrainTestCase):
+    """Test the baked terrain chunks used by WorldState.draw"""
+
+    def test_matches_per_tile_drawing(self):
+        """Chunked drawing produces the same pixels as drawing every tile"""
+        for camera in [(0, 0), (13, 29), (200, 170), (-5, 4)]:
+            screen = pygame.Surface((100, 90))
+            self.cache.draw(screen, *camera)
+            self._assert_same(screen, self._reference((100, 90), *camera))
+
+    def test_chunks_baked_once(self):
+        """Redrawing the same view reuses the baked chunks"""
+        screen = pygame.Surface((100, 90))
+        self.cache.draw(screen, 0, 0)
+        bakes = self.cache.bakes
+        self.assertEqual(bakes, 4)
+        self.cache.draw(screen, 3, 3)
+        self.assertEqual(self.cache.bakes, bakes)
+
+    def test_set_tile_rebakes_only_its_chunk(self):
+        """Changing a tile re-bakes the one chunk containing it"""
+        screen = pygame.Surface((100, 90))
+        self.world.draw(screen, 0, 0)
+        bakes = self.cache.bakes
+        self.world.set_tile(9, 2, TileType.STONE)
+        self.assertNotIn((1, 0), self.cache)
+        self.assertIn((0, 0), self.cache)
+        self.cache.draw(screen, 0, 0)
+        self.assertEqual(self.cache.bakes, bakes + 1)
+        self._assert_same(screen, self._reference((100, 90), 0, 0))
+
+    def test_lru_eviction(self):
+        """Chunks that have scrolled out of view are evicted oldest first"""
+        self.cache.max_chunks = 2
+        screen = pygame.Surface((64, 64))
+        self.cache.draw(screen, 0, 0)
+        self.cache.draw(screen, 64, 0)
+        self.cache.draw(screen, 128, 0)
+        self.assertEqual(len(self.cache), 2)
+        self.assertNotIn((0, 0), self.cache)
+        self.assertIn((2, 0), self.cache)
+
+    def test_never_evicts_visible_chunks(self):
+        """The cache grows to hold every visible chunk even above max_chunks"""
+        self.cache.max_chunks = 1
+        screen = pygame.Surface((100, 90))
+        self.cache.draw(screen, 0, 0)
+        self.assertEqual(len(self.cache), 4)
+
+
+class TestScrollingViewport(TerrainTestCase):
+    """Test that the scroll-reuse viewport matches full redraws"""
+
+    def setUp(self):
+        super().setUp()
+        self.world.enable_scrolling_viewport()
+        self.viewport = self.world.scrolling_viewport
+
+    def test_scrolling_matches_full_redraw(self):
+        """Frames built from scrolled buffers equal fully redrawn ones"""
+        camera = [20, 30]
+        for dx, dy in [(3, 0), (0, -5), (7, 2), (-4, -4), (0, 0), (-9, 11)]:
+            camera[0] += dx
+            camera[1] += dy
+            screen = pygame.Surface((100, 90))
+            self.viewport.draw(screen, *camera)
+            self._assert_same(screen, self._reference((100, 90), *camera))
+        self.assertEqual(self.viewport.full_redraws, 1)
+        self.assertEqual(self.viewport.strip_redraws, 4)
+
+    def test_full_redraw_on_resize_and_jump(self):
+        """A new screen size or a long camera jump redraws everything"""
+        self.viewport.draw(pygame.Surface((100, 90)), 0, 0)
+        self.viewport.draw(pygame.Surface((120, 90)), 0, 0)
+        self.assertEqual(self.viewport.full_redraws, 2)
+        screen = pygame.Surface((120, 90))
+        self.viewport.draw(screen, 100, 0)
+        self.assertEqual(self.viewport.full_redraws, 3)
+        self._assert_same(screen, self._reference((120, 90), 100, 0))
+
+    def test_changed_tile_is_redrawn(self):
+        """set_tile on a visible tile updates the reused buffer"""
+        self.viewport.draw(pygame.Surface((100, 90)), 0, 0)
+        self.world.set_tile(3, 4, TileType.STONE)
+        screen = pygame.Surface((100, 90))
+        self.world.draw(screen, 1, 1)
+        self._assert_same(screen, self._reference((100, 90), 1, 1))
+
+    def test_disable(self):
+        """Turning the viewport off returns to plain chunk drawing"""
+        self.world.enable_scrolling_viewport(False)
+        self.assertIsNone(self.world.scrolling_viewport)
+
+
+if __name__ == "__main__":
+    unittest.main()
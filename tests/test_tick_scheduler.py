@@ -0,0 +1,105 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import tempfile
+import unittest
+from src.engine.tick_scheduler import TickScheduler
+from src.entities.player.player import Player
+from src.game_state.player_state import PlayerState
+from src.game_state.world_state import WorldState
+
+
+class TestTickScheduler(unittest.TestCase):
+    """Test the fixed-step accumulator, its catch-up cap and its callbacks"""
+
+    def setUp(self):
+        self.scheduler = TickScheduler(tick_interval=0.25, max_ticks_per_frame=4)
+        self.ticks = []
+        self.alphas = []
+        self.scheduler.on_tick(self.ticks.append)
+        self.scheduler.on_frame(self.alphas.append)
+
+    def test_fixed_steps(self):
+        """Ticks fall due every tick_interval, however the time is split into frames"""
+        for _ in range(10):
+            self.scheduler.advance(0.1)
+        self.assertEqual(self.ticks, [1, 2, 3, 4])
+        self.assertAlmostEqual(self.scheduler.alpha, 0.0, places=6)
+        self.assertEqual(len(self.alphas), 10)
+        self.assertAlmostEqual(self.alphas[0], 0.4)
+
+        self.assertEqual(self.scheduler.advance(0.6), 2)
+        self.assertEqual(self.ticks[-2:], [5, 6])
+        self.assertAlmostEqual(self.scheduler.alpha, 0.4)
+
+    def test_catch_up_cap(self):
+        """A long stall runs at most max_ticks_per_frame ticks and drops the rest"""
+        self.assertEqual(self.scheduler.advance(10.1), 4)
+        self.assertEqual(self.scheduler.tick, 4)
+        self.assertEqual(self.scheduler.dropped_ticks, 36)
+        self.assertAlmostEqual(self.scheduler.alpha, 0.4)
+        self.assertEqual(self.scheduler.advance(0.2), 1)
+        self.assertEqual(self.scheduler.dropped_ticks, 36)
+
+    def test_remove_and_reset(self):
+        """Removed callbacks stop being called, and reset continues from a given tick"""
+        self.scheduler.remove(self.ticks.append)
+        self.scheduler.advance(0.5)
+        self.assertEqual(self.ticks, [])
+        self.scheduler.on_tick(self.ticks.append)
+        self.scheduler.reset(100)
+        self.scheduler.advance(0.3)
+        self.assertEqual(self.ticks, [101])
+
+
+class TestPlayerOnTicks(unittest.TestCase):
+    """Test that the player walks on the world's ticks, whatever the frame rate"""
+
+    def setUp(self):
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'width': 20, 'height': 5, 'tile_size': 32,
+                   'tiles': [["GRASS"] * 20 for _ in range(5)], 'resources': {}}, self.map_file)
+        self.map_file.close()
+
+    def tearDown(self):
+        os.remove(self.map_file.name)
+
+    def walk(self, fps, seconds):
+        """Walk 10 tiles east at a frame rate; returns the player and the world."""
+        world = WorldState(map_file=self.map_file.name)
+        player_state = PlayerState(None, None, world_state=world)
+        player = player_state.create_player(0, 2)
+        self.assertTrue(player.move_to_tile(10, 2))
+        for _ in range(int(fps * seconds)):
+            world.update(1.0 / fps)
+            player_state.update(1.0 / fps)
+        return player, world
+
+    def test_frame_rate_independent(self):
+        """The player is on the same tile after the same game time at 20 and 144 frames per second"""
+        slow, slow_world = self.walk(20, 1.4)
+        fast, fast_world = self.walk(144, 1.4)
+        self.assertEqual(slow_world.game_ticks, fast_world.game_ticks)
+        self.assertEqual((slow.grid_x, slow.grid_y), (fast.grid_x, fast.grid_y))
+        self.assertGreater(slow.grid_x, 0)
+
+        arrived, _ = self.walk(30, 4.0)
+        self.assertEqual((arrived.grid_x, arrived.grid_y), (10, 2))
+        self.assertFalse(arrived.moving)
+
+    def test_interpolation_follows_alpha(self):
+        """Between ticks the player is drawn alpha of the way into the tile being entered"""
+        world = WorldState(map_file=self.map_file.name)
+        player = Player(0, 2, None, None, world_state=world)
+        world.ticks.on_tick(player.tick)
+        world.ticks.on_frame(player.interpolate)
+        player.move_to_tile(5, 2)
+        world.update(world.ticks.tick_interval * 2.5)
+        start_x, _ = world.world_to_screen(player.grid_x, 2)
+        next_x, _ = world.world_to_screen(player.next_grid_x, 2)
+        self.assertAlmostEqual(player.x, start_x + (next_x - start_x) * 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
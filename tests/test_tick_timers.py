@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from test_save_journal import SaveTestCase
+from src.engine.tick_timers import TimerQueue
+from src.entities.resources.tree import Tree
+
+
+class TestTimerQueue(unittest.TestCase):
+    """Test running and cancelling timers by game tick"""
+
+    def setUp(self):
+        self.timers = TimerQueue()
+        self.ran = []
+        self.timers.register('note', lambda timer: self.ran.append((timer.tick, timer.data['name'])))
+
+    def test_runs_only_due_timers_in_order(self):
+        """Each tick runs the timers due by then, earliest first and same-tick timers in scheduling order"""
+        self.timers.schedule(5, 'note', {'name': 'b'})
+        self.timers.schedule(3, 'note', {'name': 'a'})
+        self.timers.schedule(5, 'note', {'name': 'c'})
+        for tick in range(1, 5):
+            self.timers.run_due(tick)
+        self.assertEqual(self.ran, [(3, 'a')])
+        self.assertEqual(self.timers.run_due(6), 2)
+        self.assertEqual(self.ran, [(3, 'a'), (5, 'b'), (5, 'c')])
+        self.assertEqual(len(self.timers), 0)
+
+    def test_past_ticks_run_next_tick(self):
+        """Timers scheduled for a tick already run, even by a handler, run on the next one"""
+        self.timers.register('again', lambda timer: self.timers.schedule(self.timers.tick, 'note', {'name': 'x'}))
+        self.timers.run_due(10)
+        self.timers.schedule(2, 'again')
+        self.assertEqual(self.timers.run_due(11), 1)
+        self.assertEqual(self.ran, [])
+        self.timers.run_due(12)
+        self.assertEqual(self.ran, [(12, 'x')])
+
+    def test_cancel(self):
+        """Cancelled timers never run, and the heap drops them once they are most of it"""
+        timers = [self.timers.schedule(tick, 'note', {'name': str(tick)}) for tick in range(1, 11)]
+        for timer in timers[:6]:
+            self.assertTrue(self.timers.cancel(timer))
+        self.assertFalse(self.timers.cancel(timers[0]))
+        self.assertEqual(len(self.timers), 4)
+        self.assertEqual(len(self.timers._heap), 4)
+        self.timers.run_due(20)
+        self.assertEqual([name for _, name in self.ran], ['7', '8', '9', '10'])
+        self.assertFalse(self.timers.cancel(timers[9]))
+
+    def test_round_trip(self):
+        """Pending timers load back from their rows; unknown events are dropped when due"""
+        self.timers.schedule(8, 'note', {'name': 'late'})
+        cancelled = self.timers.schedule(6, 'note', {'name': 'never'})
+        self.timers.schedule(7, 'gone', {'name': 'old'})
+        self.timers.cancel(cancelled)
+        rows = self.timers.to_list()
+        self.assertEqual(rows, [[7, 'gone', {'name': 'old'}], [8, 'note', {'name': 'late'}]])
+
+        loaded = TimerQueue()
+        loaded.register('note', self.timers.handlers['note'])
+        loaded.load(rows, 5)
+        self.assertFalse(loaded.take_dirty())
+        self.assertEqual(loaded.run_due(8), 1)
+        self.assertEqual(self.ran, [(8, 'late')])
+
+
+class TimerSaveTests:
+    """Tests of saving pending timers, run against each save backend"""
+
+    def test_respawn_survives_a_restart(self):
+        """A respawn scheduled after the last snapshot is journaled, reloaded and runs on its tick"""
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.world.ticks.run_ticks(2)
+        self.world.remove_resource(5, 5)
+        self.world.respawn_resource(5, 5, 'Tree', 10)
+        self.saves.auto_save(self.player, self.world, self.world.game_ticks)
+        self.world.ticks.run_ticks(1)
+        self.saves.auto_save(self.player, self.world, self.world.game_ticks)
+
+        _, world = self.reload()
+        self.assertEqual(world.game_ticks, 3)
+        self.assertEqual(world.timers.to_list(), [[12, 'respawn_resource', {'x': 5, 'y': 5, 'type': 'Tree'}]])
+        self.assertIsNone(world.get_resource_at(5, 5))
+        world.ticks.run_ticks(8)
+        self.assertIsNone(world.get_resource_at(5, 5))
+        world.ticks.run_ticks(1)
+        self.assertIsInstance(world.get_resource_at(5, 5), Tree)
+        self.assertEqual(len(world.timers), 0)
+
+    def test_cancelled_and_fired_timers_are_saved(self):
+        """Cancelling or running a timer is saved too, and a taken tile is not respawned on"""
+        first = self.world.respawn_resource(1, 1, 'Rock', 5)
+        self.world.respawn_resource(8, 2, 'Tree', 1)
+        self.saves.checkpoint(self.player, self.world, 0)
+        self.world.timers.cancel(first)
+        self.world.ticks.run_ticks(1)
+        self.assertEqual(self.world.get_resource_at(8, 2).__class__.__name__, 'Rock')
+        self.saves.auto_save(self.player, self.world, self.world.game_ticks)
+        _, world = self.reload()
+        self.assertEqual(world.timers.to_list(), [])
+
+
+class TestTimerSaves(TimerSaveTests, SaveTestCase):
+    """Test pending timers in the snapshot and journal files"""
+
+
+class TestSqliteTimerSaves(TimerSaveTests, SaveTestCase):
+    """Test pending timers in the SQLite backend"""
+
+    backend = 'sqlite'
+
+
+if __name__ == "__main__":
+    unittest.main()
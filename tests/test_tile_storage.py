@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import tempfile
+import unittest
+from src.game_state.world_state import WorldState, TileType
+
+
+class TestTileStorage(unittest.TestCase):
+    """Test the byte-grid terrain storage of WorldState"""
+
+    def setUp(self):
+        tiles = [["GRASS", "WATER", "SAND", "DIRT", "STONE", "LAVA"] for _ in range(4)]
+        self.map_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({'width': 6, 'height': 4, 'tile_size': 32, 'tiles': tiles, 'resources': {}}, self.map_file)
+        self.map_file.close()
+        self.world = WorldState(map_file=self.map_file.name)
+
+    def tearDown(self):
+        os.remove(self.map_file.name)
+
+    def test_loaded_into_byte_grid(self):
+        """Every tile is one byte; unknown names load as grass"""
+        self.assertIsInstance(self.world.tile_grid, bytearray)
+        self.assertEqual(len(self.world.tile_grid), 24)
+        self.assertEqual([self.world.get_tile_type(x, 2) for x in range(6)],
+                         [TileType.GRASS, TileType.WATER, TileType.SAND, TileType.DIRT, TileType.STONE, TileType.GRASS])
+        self.assertEqual(list(self.world.walkable_grid[:6]), [1, 0, 1, 1, 0, 1])
+
+    def test_get_tile_view(self):
+        """get_tile still returns a Tile with type, walkability and rect"""
+        tile = self.world.get_tile(1, 3)
+        self.assertEqual(tile.tile_type, TileType.WATER)
+        self.assertFalse(tile.walkable)
+        self.assertEqual(tuple(tile.rect), (32, 96, 32, 32))
+        self.assertIsNone(self.world.get_tile(6, 0))
+
+    def test_set_tile_updates_grids(self):
+        """set_tile changes the stored type and the walkability"""
+        self.world.set_tile(0, 0, TileType.STONE)
+        self.world.set_tile(1, 0, TileType.SAND)
+        self.assertEqual(self.world.get_tile(0, 0).tile_type, TileType.STONE)
+        self.assertFalse(self.world.is_walkable(0, 0))
+        self.assertTrue(self.world.is_walkable(1, 0))
+
+    def test_save_round_trip(self):
+        """Saved tile names load back into the same grid"""
+        self.world.set_tile(5, 3, TileType.DIRT)
+        grid = bytes(self.world.tile_grid)
+        self.world.save_state()
+        self.assertEqual(bytes(WorldState(map_file=self.map_file.name).tile_grid), grid)
+
+
+if __name__ == "__main__":
+    unittest.main()